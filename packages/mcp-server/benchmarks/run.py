@@ -0,0 +1,55 @@
+"""Run the full benchmark matrix and save the report for regression tracking.
+
+Usage:
+    python benchmarks/run.py                     # writes benchmarks/results/<timestamp>.json
+    python benchmarks/run.py --baseline old.json # also fails on p95 regressions
+
+Set REDIS_URL to include the Redis adapter.
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from claude_session_coordinator.__main__ import cli_main
+
+# Wider than the CLI defaults: small/large projects, few/many keys, small/large values
+SCOPE_COUNTS = "10,100,1000"
+KEY_COUNTS = "1,10,50"
+VALUE_SIZES = "64,4096,65536"
+# Concurrent MCP clients of the load test
+CLIENTS = "200"
+# Scopes of the growth workload (new-scope stores in a large project)
+GROWTH = "4000"
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def main() -> int:
+    """Run the benchmarks, passing extra arguments through to the CLI."""
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = RESULTS_DIR / f"{stamp}.json"
+
+    return cli_main(
+        [
+            "bench",
+            "--scopes",
+            SCOPE_COUNTS,
+            "--keys",
+            KEY_COUNTS,
+            "--value-sizes",
+            VALUE_SIZES,
+            "--clients",
+            CLIENTS,
+            "--growth",
+            GROWTH,
+            "--output",
+            str(output),
+            *sys.argv[1:],
+        ]
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
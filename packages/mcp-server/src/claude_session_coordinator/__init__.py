@@ -4,7 +4,15 @@ This package provides an MCP server that enables multiple Claude AI sessions
 to coordinate work across machines through flexible storage adapters.
 """
 
-from .adapters import AdapterFactory, LocalFileAdapter, StorageAdapter, StorageError
+from .adapters import (
+    AdapterFactory,
+    LocalFileAdapter,
+    LogStructuredAdapter,
+    RedisAdapter,
+    SQLiteAdapter,
+    StorageAdapter,
+    StorageError,
+)
 from .config import get_default_config, load_config, save_config, validate_config
 from .detection import detect_machine_id, detect_project_id
 
@@ -16,6 +24,9 @@ __all__ = [
     # Storage adapters
     "StorageAdapter",
     "LocalFileAdapter",
+    "LogStructuredAdapter",
+    "RedisAdapter",
+    "SQLiteAdapter",
     "AdapterFactory",
     "StorageError",
     # Configuration
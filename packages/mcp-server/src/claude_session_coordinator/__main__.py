@@ -8,8 +8,11 @@ import asyncio
 import sys
 
 from . import __version__
+from .adapters.formats import FORMATS
+from .bench import DEFAULT_KEY_COUNTS, DEFAULT_SCOPE_COUNTS, DEFAULT_VALUE_SIZES
 from .config import get_default_config, load_config
-from .server import main
+from .config import validate_config as check_config
+from .server import TRANSPORTS, main
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -33,6 +36,18 @@ Examples:
   # Validate configuration
   python -m claude_session_coordinator --validate-config
 
+  # Benchmark the storage adapters and write a JSON report
+  python -m claude_session_coordinator bench --output bench.json
+
+  # Rewrite local scope files as MessagePack
+  python -m claude_session_coordinator convert --format msgpack
+
+  # Share one storage adapter between all sessions on this machine
+  python -m claude_session_coordinator daemon
+
+  # Serve many clients from one process over HTTP
+  python -m claude_session_coordinator --transport streamable-http --port 8000
+
 For more information, visit:
   https://github.com/BANCS-Norway/claude_session_coordinator
         """,
@@ -51,9 +66,104 @@ For more information, visit:
 
     parser.add_argument("-v", "--verbose", action="store_true", help="enable verbose logging")
 
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default="stdio",
+        help="MCP transport (default: stdio; the HTTP transports serve many clients)",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address the HTTP transports listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port the HTTP transports listen on")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    bench = subparsers.add_parser(
+        "bench", help="benchmark storage adapters and tool paths, reporting JSON"
+    )
+    bench.add_argument(
+        "--adapters",
+        type=_csv_list,
+        default=None,
+        help="comma-separated adapters to run (default: all registered)",
+    )
+    bench.add_argument(
+        "--scopes", type=_csv_ints, default=DEFAULT_SCOPE_COUNTS, help="scope counts, e.g. 10,100"
+    )
+    bench.add_argument(
+        "--keys", type=_csv_ints, default=DEFAULT_KEY_COUNTS, help="keys per scope, e.g. 10,50"
+    )
+    bench.add_argument(
+        "--value-sizes",
+        type=_csv_ints,
+        default=DEFAULT_VALUE_SIZES,
+        help="value sizes in bytes, e.g. 64,4096",
+    )
+    bench.add_argument(
+        "--tool-rounds",
+        type=int,
+        default=50,
+        help="iterations of the MCP tool-path workload (0 to skip)",
+    )
+    bench.add_argument(
+        "--clients",
+        type=int,
+        default=0,
+        help="concurrent MCP clients to load-test one server with (default: 0, skip)",
+    )
+    bench.add_argument(
+        "--growth",
+        type=int,
+        default=0,
+        help="scopes to create one by one, timing new-scope stores (default: 0, skip)",
+    )
+    bench.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    bench.add_argument(
+        "--baseline", help="earlier JSON report; exit with 1 if p95 latency regressed"
+    )
+    bench.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative p95 increase counted as a regression (default: 0.2)",
+    )
+
+    convert = subparsers.add_parser(
+        "convert", help="rewrite local adapter scope files in another serialization format"
+    )
+    convert.add_argument(
+        "--format", required=True, choices=list(FORMATS), help="target serialization format"
+    )
+    convert.add_argument(
+        "--path",
+        default=None,
+        help="scope file directory (default: base_path of the configured local adapter)",
+    )
+
+    daemon = subparsers.add_parser(
+        "daemon", help="serve the configured storage to MCP servers over a Unix socket"
+    )
+    daemon.add_argument(
+        "--socket",
+        default=None,
+        help="socket path (default: daemon.socket_path, or derived from the storage config)",
+    )
+
     return parser
 
 
+def _csv_list(text: str) -> list[str]:
+    """Parse a comma-separated CLI value."""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def _csv_ints(text: str) -> tuple[int, ...]:
+    """Parse a comma-separated list of integers."""
+    try:
+        return tuple(int(item) for item in _csv_list(text))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers: {text}") from e
+
+
 def validate_config() -> int:
     """Validate the configuration.
 
@@ -86,6 +196,12 @@ def validate_config() -> int:
 
         print(f"✓ Storage configuration: {config['storage']['config']}")
 
+        try:
+            check_config(config)
+        except ValueError as e:
+            print(f"✗ Error: {e}")
+            return 1
+
         # Validate session configuration
         if "session" in config:
             machine_id = config["session"].get("machine_id", "auto")
@@ -124,11 +240,155 @@ def validate_config() -> int:
         return 1
 
 
-def run_server(verbose: bool = False) -> int:
+def run_bench(args: argparse.Namespace) -> int:
+    """Run the benchmark suite and emit its JSON report.
+
+    Args:
+        args: Parsed ``bench`` subcommand arguments
+
+    Returns:
+        Exit code (0 for success, 1 for regressions or errors)
+    """
+    import json
+
+    from .bench import compare_reports, run_benchmarks
+
+    report = run_benchmarks(
+        adapters=args.adapters,
+        scope_counts=args.scopes,
+        key_counts=args.keys,
+        value_sizes=args.value_sizes,
+        tool_rounds=args.tool_rounds,
+        clients=args.clients,
+        growth=args.growth,
+    )
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"✓ Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    for name, reason in report["skipped"].items():
+        print(f"Skipped adapter '{name}': {reason}", file=sys.stderr)
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"✗ Error reading baseline: {e}", file=sys.stderr)
+            return 1
+
+        regressions = compare_reports(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"✗ Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    """Convert the local adapter's scope files to another format.
+
+    Args:
+        args: Parsed ``convert`` subcommand arguments
+
+    Returns:
+        Exit code (0 for success, 1 for errors)
+    """
+    from .adapters import LocalFileAdapter, StorageError
+
+    base_path = args.path
+    if base_path is None:
+        storage = load_config().get("storage", {})
+        if storage.get("adapter", "local") != "local":
+            print(
+                f"✗ Configured adapter is '{storage['adapter']}'; pass --path to convert "
+                "a local scope directory",
+                file=sys.stderr,
+            )
+            return 1
+        base_path = storage.get("config", {}).get("base_path", ".claude/session-state")
+
+    try:
+        adapter = LocalFileAdapter(base_path=base_path, format=args.format)
+        try:
+            converted = adapter.convert_format()
+        finally:
+            adapter.close()
+    except StorageError as e:
+        print(f"✗ Error converting {base_path}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"✓ Converted {converted} scope files in {base_path} to {args.format}")
+    print(f'  Set "format": "{args.format}" in storage.config so new writes use it too')
+    return 0
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    """Run the coordinator daemon until interrupted.
+
+    Args:
+        args: Parsed ``daemon`` subcommand arguments
+
+    Returns:
+        Exit code (0 for success, 1 for errors)
+    """
+    import signal
+
+    from .adapters import AdapterFactory, StorageError
+    from .adapters.aio import DEFAULT_MAX_WORKERS
+    from .daemon import CoordinatorDaemon, default_socket_path
+
+    config = load_config()
+    socket_path = args.socket or config.get("daemon", {}).get("socket_path")
+    if socket_path is None:
+        socket_path = default_socket_path(config["storage"])
+
+    async def serve() -> None:
+        daemon = CoordinatorDaemon(
+            AdapterFactory.create_adapter(config["storage"]),
+            socket_path,
+            max_workers=int(config["storage"].get("max_workers", DEFAULT_MAX_WORKERS)),
+        )
+        task = asyncio.current_task()
+        assert task is not None
+        loop = asyncio.get_running_loop()
+        # Stop cleanly (removing the socket) when the service manager stops us
+        if hasattr(signal, "SIGTERM"):
+            loop.add_signal_handler(signal.SIGTERM, task.cancel)
+        try:
+            await daemon.start()
+        except BaseException:
+            await daemon.storage.close()
+            raise
+        print(f"Coordinator daemon listening on {socket_path}", file=sys.stderr)
+        await daemon.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nShutting down coordinator daemon...", file=sys.stderr)
+    except StorageError as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_server(
+    verbose: bool = False, transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000
+) -> int:
     """Run the MCP server.
 
     Args:
         verbose: Enable verbose logging
+        transport: MCP transport to serve on
+        host: Address the HTTP transports listen on
+        port: Port the HTTP transports listen on
 
     Returns:
         Exit code (0 for success, non-zero for errors)
@@ -137,7 +397,7 @@ def run_server(verbose: bool = False) -> int:
         if verbose:
             print("Starting Claude Session Coordinator MCP server...", file=sys.stderr)
 
-        asyncio.run(main())
+        asyncio.run(main(transport, host, port))
         return 0
 
     except KeyboardInterrupt:
@@ -168,8 +428,19 @@ def cli_main(argv: list[str] | None = None) -> int:
     if args.validate_config:
         return validate_config()
 
+    if args.command == "bench":
+        return run_bench(args)
+
+    if args.command == "convert":
+        return run_convert(args)
+
+    if args.command == "daemon":
+        return run_daemon(args)
+
     # Default: run the server
-    return run_server(verbose=args.verbose)
+    return run_server(
+        verbose=args.verbose, transport=args.transport, host=args.host, port=args.port
+    )
 
 
 if __name__ == "__main__":
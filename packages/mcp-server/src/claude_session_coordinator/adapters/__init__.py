@@ -1,7 +1,24 @@
 """Storage adapters for Claude Session Coordinator."""
 
+from .aio import AsyncStorageAdapter, ThreadedAsyncAdapter, to_async
 from .base import StorageAdapter, StorageError
 from .factory import AdapterFactory
 from .local import LocalFileAdapter
+from .log import LogStructuredAdapter
+from .redis import RedisAdapter
+from .remote import RemoteAdapter
+from .sqlite import SQLiteAdapter
 
-__all__ = ["StorageAdapter", "StorageError", "AdapterFactory", "LocalFileAdapter"]
+__all__ = [
+    "StorageAdapter",
+    "StorageError",
+    "AsyncStorageAdapter",
+    "ThreadedAsyncAdapter",
+    "to_async",
+    "AdapterFactory",
+    "LocalFileAdapter",
+    "LogStructuredAdapter",
+    "RedisAdapter",
+    "RemoteAdapter",
+    "SQLiteAdapter",
+]
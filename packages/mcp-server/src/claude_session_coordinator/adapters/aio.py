@@ -0,0 +1,370 @@
+"""Asynchronous storage adapter interface for Claude Session Coordinator.
+
+The MCP server runs its tools on an asyncio event loop. Calling a blocking
+adapter there stalls every other request from the client while the disk or
+Redis answers, so the server talks to storage through ``AsyncStorageAdapter``
+instead. Every existing (synchronous) ``StorageAdapter`` can be used as one
+through ``ThreadedAsyncAdapter``, which runs its calls in a bounded thread
+pool; ``to_async`` picks the right one.
+"""
+
+import asyncio
+import functools
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from .base import (
+    DEFAULT_INSTANCES,
+    StorageAdapter,
+    claim_in_registry,
+    reap_in_registry,
+    release_in_registry,
+    renew_in_registry,
+)
+
+T = TypeVar("T")
+
+# Storage calls run concurrently by a ThreadedAsyncAdapter
+DEFAULT_MAX_WORKERS = 8
+
+
+class AsyncStorageAdapter(ABC):
+    """Abstract base class for asynchronous storage adapters.
+
+    Mirrors ``StorageAdapter`` method for method, with every method a
+    coroutine. Semantics, arguments and errors are the same as for the
+    synchronous interface; see ``StorageAdapter`` for details. Only the basic
+    operations are abstract, the rest have default implementations built on
+    them.
+    """
+
+    @abstractmethod
+    async def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+
+    @abstractmethod
+    async def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+
+    @abstractmethod
+    async def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+
+    @abstractmethod
+    async def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+
+    @abstractmethod
+    async def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern."""
+
+    @abstractmethod
+    async def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+
+    async def store_many(
+        self, scope: str, values: dict[str, Any], ttl: float | None = None
+    ) -> None:
+        """Store several keys in one scope (one ``store`` per key by default)."""
+        for key, value in values.items():
+            if ttl is None:
+                await self.store(scope, key, value)
+            else:
+                await self.store(scope, key, value, ttl=ttl)
+
+    async def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope (one ``retrieve`` per key by default)."""
+        return {key: await self.retrieve(scope, key) for key in keys}
+
+    async def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope (one ``delete`` per key by default)."""
+        return sum([await self.delete(scope, key) for key in keys])
+
+    async def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern (each scope in turn by default)."""
+        snapshot: dict[str, dict[str, Any]] = {}
+        for scope in await self.list_scopes(pattern):
+            live = await self.list_keys(scope)
+            if not live:
+                continue
+            wanted = live if keys is None else [key for key in keys if key in live]
+            values = await self.retrieve_many(scope, wanted)
+            snapshot[scope] = {key: value for key, value in values.items() if value is not None}
+        return snapshot
+
+    async def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read, modify and write back a whole scope.
+
+        ``fn`` is a plain (synchronous) callback, as for
+        ``StorageAdapter.transact``. The default implementation is NOT
+        atomic; it is provided so simple custom adapters keep working.
+        """
+        before = await self.retrieve_many(scope, await self.list_keys(scope))
+        values = dict(before)
+        result = fn(values)
+
+        changed = {k: v for k, v in values.items() if k not in before or before[k] != v}
+        removed = [k for k in before if k not in values]
+        if changed:
+            await self.store_many(scope, changed)
+        if removed:
+            await self.delete_many(scope, removed)
+        return result
+
+    async def claim_instance(
+        self,
+        scope: str,
+        instance_id: str | None = None,
+        default_instances: tuple[str, ...] = DEFAULT_INSTANCES,
+        lease_ttl: float | None = None,
+    ) -> str | None:
+        """Atomically claim an instance in an instance registry."""
+        return await self.transact(
+            scope,
+            functools.partial(
+                claim_in_registry,
+                instance_id=instance_id,
+                default_instances=default_instances,
+                lease_ttl=lease_ttl,
+                now=time.time(),
+            ),
+        )
+
+    async def renew_lease(self, scope: str, instance_id: str, lease_ttl: float) -> float | None:
+        """Extend the lease on a claimed instance (a heartbeat)."""
+        return await self.transact(
+            scope,
+            functools.partial(
+                renew_in_registry, instance_id=instance_id, expires_at=time.time() + lease_ttl
+            ),
+        )
+
+    async def reap_expired_instances(self, scope: str) -> list[str]:
+        """Release every taken instance whose lease has expired."""
+        return await self.transact(scope, functools.partial(reap_in_registry, now=time.time()))
+
+    async def release_instance(self, scope: str, instance_id: str) -> bool:
+        """Atomically mark an instance as available again and drop its lease."""
+        return await self.transact(
+            scope, functools.partial(release_in_registry, instance_id=instance_id)
+        )
+
+    async def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed (no-op by default)."""
+        return 0
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change (see ``StorageAdapter.watch``).
+
+        Not a coroutine: ``callback`` is called from other threads. Raises
+        NotImplementedError by default.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support change notifications")
+
+    async def awatch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], Awaitable[None]]:
+        """Subscribe like ``watch``, from the event loop.
+
+        The first subscription may start the adapter's change source (a scan
+        of the storage directory, a Redis subscription) and cancelling the
+        last one may stop it. Adapters whose ``watch`` can block override
+        this to do that work off the event loop; by default ``watch`` is
+        called directly.
+
+        Returns:
+            Coroutine function that cancels the subscription
+
+        Raises:
+            NotImplementedError: If the adapter does not support change notifications
+        """
+        unsubscribe = self.watch(callback, pattern)
+
+        async def cancel() -> None:
+            unsubscribe()
+
+        return cancel
+
+    async def flush(self) -> None:
+        """Write any buffered data through to the underlying storage (no-op by default)."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the storage adapter and release resources."""
+
+
+class ThreadedAsyncAdapter(AsyncStorageAdapter):
+    """Runs a synchronous ``StorageAdapter`` in a thread pool.
+
+    Each call is handed to a worker thread, so the event loop keeps serving
+    other requests while it blocks. At most ``max_workers`` calls run at once;
+    further calls queue up. The wrapped adapter must be safe to call from
+    several threads, which all built-in adapters are.
+
+    Example:
+        >>> storage = ThreadedAsyncAdapter(LocalFileAdapter())
+        >>> await storage.store("laptop:org/repo:session:claude_1", "status", "active")
+
+    Attributes:
+        adapter: The wrapped synchronous adapter
+    """
+
+    def __init__(self, adapter: StorageAdapter, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            adapter: Synchronous adapter to run
+            max_workers: Maximum number of storage calls running at once
+        """
+        self.adapter = adapter
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="csc-storage"
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking call in the thread pool and wait for its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+        if ttl is None:
+            await self._run(self.adapter.store, scope, key, value)
+        else:
+            await self._run(self.adapter.store, scope, key, value, ttl=ttl)
+
+    async def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+        return await self._run(self.adapter.retrieve, scope, key)
+
+    async def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+        return await self._run(self.adapter.delete, scope, key)
+
+    async def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+        return await self._run(self.adapter.list_keys, scope)
+
+    async def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern."""
+        return await self._run(self.adapter.list_scopes, pattern)
+
+    async def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+        return await self._run(self.adapter.delete_scope, scope)
+
+    async def store_many(
+        self, scope: str, values: dict[str, Any], ttl: float | None = None
+    ) -> None:
+        """Store several keys in one scope with the adapter's batch operation."""
+        if ttl is None:
+            await self._run(self.adapter.store_many, scope, values)
+        else:
+            await self._run(self.adapter.store_many, scope, values, ttl=ttl)
+
+    async def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope with the adapter's batch operation."""
+        return await self._run(self.adapter.retrieve_many, scope, keys)
+
+    async def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope with the adapter's batch operation."""
+        return await self._run(self.adapter.delete_many, scope, keys)
+
+    async def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern with the adapter's bulk operation."""
+        return await self._run(self.adapter.snapshot_scopes, pattern, keys)
+
+    async def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Run the adapter's atomic read-modify-write; ``fn`` runs in the worker thread."""
+        return await self._run(self.adapter.transact, scope, fn)
+
+    async def claim_instance(
+        self,
+        scope: str,
+        instance_id: str | None = None,
+        default_instances: tuple[str, ...] = DEFAULT_INSTANCES,
+        lease_ttl: float | None = None,
+    ) -> str | None:
+        """Atomically claim an instance in an instance registry."""
+        return await self._run(
+            self.adapter.claim_instance,
+            scope,
+            instance_id,
+            default_instances=default_instances,
+            lease_ttl=lease_ttl,
+        )
+
+    async def renew_lease(self, scope: str, instance_id: str, lease_ttl: float) -> float | None:
+        """Extend the lease on a claimed instance (a heartbeat)."""
+        return await self._run(self.adapter.renew_lease, scope, instance_id, lease_ttl)
+
+    async def reap_expired_instances(self, scope: str) -> list[str]:
+        """Release every taken instance whose lease has expired."""
+        return await self._run(self.adapter.reap_expired_instances, scope)
+
+    async def release_instance(self, scope: str, instance_id: str) -> bool:
+        """Atomically mark an instance as available again and drop its lease."""
+        return await self._run(self.adapter.release_instance, scope, instance_id)
+
+    async def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed."""
+        return await self._run(self.adapter.sweep_expired)
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, using the wrapped adapter's notifications."""
+        return self.adapter.watch(callback, pattern)
+
+    async def awatch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], Awaitable[None]]:
+        """Subscribe like ``watch``, starting and stopping the change source in the thread pool."""
+        unsubscribe = await self._run(self.adapter.watch, callback, pattern)
+
+        async def cancel() -> None:
+            try:
+                await self._run(unsubscribe)
+            except RuntimeError:
+                # The thread pool was shut down with the adapter
+                unsubscribe()
+
+        return cancel
+
+    async def flush(self) -> None:
+        """Write any buffered data through to the underlying storage."""
+        await self._run(self.adapter.flush)
+
+    async def close(self) -> None:
+        """Close the wrapped adapter, then shut down the thread pool."""
+        try:
+            await self._run(self.adapter.close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def to_async(
+    adapter: StorageAdapter | AsyncStorageAdapter, max_workers: int = DEFAULT_MAX_WORKERS
+) -> AsyncStorageAdapter:
+    """Get an asynchronous interface to a storage adapter.
+
+    Args:
+        adapter: Synchronous or asynchronous adapter
+        max_workers: Thread pool size if a synchronous adapter has to be wrapped
+
+    Returns:
+        The adapter itself if it is already asynchronous, otherwise a
+        ``ThreadedAsyncAdapter`` running it
+    """
+    if isinstance(adapter, AsyncStorageAdapter):
+        return adapter
+    return ThreadedAsyncAdapter(adapter, max_workers=max_workers)
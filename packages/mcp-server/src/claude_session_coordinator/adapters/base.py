@@ -6,8 +6,107 @@ different storage backends (local files, Redis, custom implementations) without
 changing client code.
 """
 
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Instances seeded into a project's registry the first time it is used
+DEFAULT_INSTANCES = ("claude_1", "claude_2", "claude_3", "claude_4")
+
+# Seconds an instance claim stays valid without a heartbeat
+DEFAULT_LEASE_TTL = 300.0
+
+
+# Registry updates behind the instance methods, run inside ``transact``.
+# They are shared with ``AsyncStorageAdapter`` so both interfaces behave alike.
+
+
+def claim_in_registry(
+    values: dict[str, Any],
+    instance_id: str | None,
+    default_instances: tuple[str, ...],
+    lease_ttl: float | None,
+    now: float,
+) -> str | None:
+    """Claim an instance in a registry scope's contents (see ``claim_instance``)."""
+    registry = dict(values.get("registry") or dict.fromkeys(default_instances, "available"))
+    leases = dict(values.get("leases") or {})
+
+    def is_free(candidate: str) -> bool:
+        if registry.get(candidate, "available") != "taken":
+            return True
+        expires_at = leases.get(candidate)
+        return expires_at is not None and expires_at <= now
+
+    if instance_id:
+        chosen = instance_id if is_free(instance_id) else None
+    else:
+        chosen = next((k for k in registry if is_free(k)), None)
+    if chosen is None:
+        return None
+
+    registry[chosen] = "taken"
+    if lease_ttl is None:
+        leases.pop(chosen, None)
+    else:
+        leases[chosen] = now + lease_ttl
+    values["registry"] = registry
+    if leases:
+        values["leases"] = leases
+    else:
+        values.pop("leases", None)
+    return chosen
+
+
+def renew_in_registry(values: dict[str, Any], instance_id: str, expires_at: float) -> float | None:
+    """Extend a lease in a registry scope's contents (see ``renew_lease``)."""
+    registry = values.get("registry") or {}
+    if registry.get(instance_id) != "taken":
+        return None
+
+    values["leases"] = {**(values.get("leases") or {}), instance_id: expires_at}
+    return expires_at
+
+
+def reap_in_registry(values: dict[str, Any], now: float) -> list[str]:
+    """Release expired leases in a registry scope's contents (see ``reap_expired_instances``)."""
+    leases = dict(values.get("leases") or {})
+    expired = [k for k, expires_at in leases.items() if expires_at <= now]
+    if not expired:
+        return []
+
+    registry = dict(values.get("registry") or {})
+    for instance in expired:
+        del leases[instance]
+        if instance in registry:
+            registry[instance] = "available"
+    values["registry"] = registry
+    if leases:
+        values["leases"] = leases
+    else:
+        values.pop("leases", None)
+    return expired
+
+
+def release_in_registry(values: dict[str, Any], instance_id: str) -> bool:
+    """Release an instance in a registry scope's contents (see ``release_instance``)."""
+    registry = dict(values.get("registry") or {})
+    if instance_id not in registry:
+        return False
+
+    registry[instance_id] = "available"
+    values["registry"] = registry
+    leases = dict(values.get("leases") or {})
+    if leases.pop(instance_id, None) is not None:
+        if leases:
+            values["leases"] = leases
+        else:
+            values.pop("leases", None)
+    return True
 
 
 class StorageAdapter(ABC):
@@ -22,13 +121,15 @@ class StorageAdapter(ABC):
     """
 
     @abstractmethod
-    def store(self, scope: str, key: str, value: Any) -> None:
+    def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
         """Store a value in the specified scope and key.
 
         Args:
             scope: The scope identifier (e.g., "laptop:org/repo:session:claude_1")
             key: The key within the scope
             value: Any JSON-serializable value to store
+            ttl: Seconds until the value expires; None (the default) keeps it
+                until it is deleted. Storing a key again replaces its TTL.
 
         Raises:
             ValueError: If the value is not JSON-serializable
@@ -115,6 +216,278 @@ class StorageAdapter(ABC):
         """
         pass
 
+    def store_many(self, scope: str, values: dict[str, Any], ttl: float | None = None) -> None:
+        """Store several keys in one scope.
+
+        The default implementation calls ``store`` once per key. Adapters
+        should override it to write all keys with a single I/O operation.
+
+        Args:
+            scope: The scope identifier
+            values: Mapping of keys to JSON-serializable values
+            ttl: Seconds until the values expire; None keeps them
+
+        Raises:
+            StorageError: If storage operation fails
+        """
+        for key, value in values.items():
+            if ttl is None:
+                self.store(scope, key, value)
+            else:
+                self.store(scope, key, value, ttl=ttl)
+
+    def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope.
+
+        The default implementation calls ``retrieve`` once per key. Adapters
+        should override it to read all keys with a single I/O operation.
+
+        Args:
+            scope: The scope identifier
+            keys: Keys to retrieve
+
+        Returns:
+            Mapping of every requested key to its value (None if it doesn't exist)
+
+        Raises:
+            StorageError: If retrieval operation fails
+        """
+        return {key: self.retrieve(scope, key) for key in keys}
+
+    def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope.
+
+        The default implementation calls ``delete`` once per key. Adapters
+        should override it to delete all keys with a single I/O operation.
+
+        Args:
+            scope: The scope identifier
+            keys: Keys to delete
+
+        Returns:
+            Number of keys that existed and were deleted
+
+        Raises:
+            StorageError: If deletion operation fails
+        """
+        return sum(1 for key in keys if self.delete(scope, key))
+
+    def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern in one bulk operation.
+
+        The default implementation lists and reads each scope in turn.
+        Adapters override it to read all scopes with a constant number of
+        I/O operations, e.g. for the ``session://context`` resource.
+
+        Args:
+            pattern: Optional glob-style pattern to filter scopes
+            keys: Keys to read from each scope (default: every key)
+
+        Returns:
+            Mapping of every matching scope with at least one live key to its
+            values; requested keys missing from a scope are left out
+
+        Raises:
+            StorageError: If the scopes cannot be read
+        """
+        snapshot: dict[str, dict[str, Any]] = {}
+        for scope in self.list_scopes(pattern):
+            live = self.list_keys(scope)
+            if not live:
+                continue
+            wanted = live if keys is None else [key for key in keys if key in live]
+            values = self.retrieve_many(scope, wanted)
+            snapshot[scope] = {key: value for key, value in values.items() if value is not None}
+        return snapshot
+
+    def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read, modify and write back a whole scope.
+
+        ``fn`` receives a mutable dict of every key in the scope; keys it adds
+        or changes are stored and keys it removes are deleted once it returns.
+        Adapters override this to run ``fn`` under a lock or in a transaction
+        (retrying if needed) so concurrent callers - including other
+        processes - never interleave. Changes are written through immediately,
+        bypassing any write buffering.
+
+        The default implementation is NOT atomic; it is provided so simple
+        custom adapters keep working.
+
+        Args:
+            scope: The scope identifier
+            fn: Callback that mutates the scope contents and returns a result
+
+        Returns:
+            Whatever ``fn`` returned
+
+        Raises:
+            StorageError: If the scope cannot be read or written
+        """
+        before = self.retrieve_many(scope, self.list_keys(scope))
+        values = dict(before)
+        result = fn(values)
+
+        changed = {k: v for k, v in values.items() if k not in before or before[k] != v}
+        removed = [k for k in before if k not in values]
+        if changed:
+            self.store_many(scope, changed)
+        if removed:
+            self.delete_many(scope, removed)
+        return result
+
+    def claim_instance(
+        self,
+        scope: str,
+        instance_id: str | None = None,
+        default_instances: tuple[str, ...] = DEFAULT_INSTANCES,
+        lease_ttl: float | None = None,
+    ) -> str | None:
+        """Atomically claim an instance in an instance registry.
+
+        The registry is stored under the ``registry`` key of ``scope`` as a
+        mapping of instance id to ``"available"`` or ``"taken"``. It is seeded
+        with ``default_instances`` on first use. Lease expiry times (Unix
+        timestamps) live next to it under the ``leases`` key; a taken instance
+        whose lease has expired can be claimed again. Built on ``transact``,
+        so two sessions can never claim the same instance.
+
+        Args:
+            scope: Scope holding the registry (e.g., "laptop:org/repo:instances")
+            instance_id: Specific instance to claim (added to the registry if
+                unknown); if omitted, the first available instance is claimed
+            default_instances: Instances to seed an empty registry with
+            lease_ttl: Seconds until the claim expires unless renewed with
+                ``renew_lease``; None claims without a lease
+
+        Returns:
+            The claimed instance id, or None if the requested instance is
+            already taken or no instance was available
+
+        Raises:
+            StorageError: If the registry cannot be read or written
+        """
+        return self.transact(
+            scope,
+            functools.partial(
+                claim_in_registry,
+                instance_id=instance_id,
+                default_instances=default_instances,
+                lease_ttl=lease_ttl,
+                now=time.time(),
+            ),
+        )
+
+    def renew_lease(self, scope: str, instance_id: str, lease_ttl: float) -> float | None:
+        """Extend the lease on a claimed instance (a heartbeat).
+
+        Args:
+            scope: Scope holding the registry
+            instance_id: Instance whose lease to renew
+            lease_ttl: Seconds from now until the lease expires
+
+        Returns:
+            The new expiry time as a Unix timestamp, or None if the instance
+            is no longer taken (e.g., it was reaped after its lease expired)
+
+        Raises:
+            StorageError: If the registry cannot be read or written
+        """
+        return self.transact(
+            scope,
+            functools.partial(
+                renew_in_registry, instance_id=instance_id, expires_at=time.time() + lease_ttl
+            ),
+        )
+
+    def reap_expired_instances(self, scope: str) -> list[str]:
+        """Release every taken instance whose lease has expired.
+
+        Only the registry and its leases are read; session scopes are never
+        scanned.
+
+        Args:
+            scope: Scope holding the registry
+
+        Returns:
+            The released instance ids
+
+        Raises:
+            StorageError: If the registry cannot be read or written
+        """
+        return self.transact(scope, functools.partial(reap_in_registry, now=time.time()))
+
+    def release_instance(self, scope: str, instance_id: str) -> bool:
+        """Atomically mark an instance as available again and drop its lease.
+
+        Args:
+            scope: Scope holding the registry
+            instance_id: Instance to release
+
+        Returns:
+            True if the instance was in the registry, False otherwise
+
+        Raises:
+            StorageError: If the registry cannot be read or written
+        """
+        return self.transact(scope, functools.partial(release_in_registry, instance_id=instance_id))
+
+    def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed.
+
+        Expired values are already invisible to reads; sweeping reclaims
+        their space. Adapters keep an expiry index so a sweep only touches
+        values that are actually due. The default implementation does
+        nothing, for adapters without TTL support.
+
+        Returns:
+            Number of values deleted
+
+        Raises:
+            StorageError: If storage operation fails
+        """
+        return 0
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, including changes by other processes.
+
+        ``callback`` is called with the scope that changed, or with None if
+        changes may have been missed and every scope should be treated as
+        changed. It runs on a background or writer thread, so it must be quick
+        and must not call back into the adapter. A change may be reported more
+        than once.
+
+        Adapters that cannot detect changes raise NotImplementedError (the
+        default), and callers fall back to re-reading storage.
+
+        Args:
+            callback: Called for every change to a matching scope
+            pattern: Optional glob-style pattern to filter scopes
+
+        Returns:
+            Function that cancels the subscription
+
+        Raises:
+            NotImplementedError: If the adapter does not support change notifications
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support change notifications")
+
+    def flush(self) -> None:
+        """Write any buffered data through to the underlying storage.
+
+        Adapters that buffer writes (e.g. write-behind mode) must make all
+        previously stored data durable and visible to other processes before
+        returning. The default implementation is a no-op for adapters that
+        write through immediately.
+
+        Raises:
+            StorageError: If buffered data could not be written
+        """
+        pass
+
     @abstractmethod
     def close(self) -> None:
         """Close the storage adapter and release resources.
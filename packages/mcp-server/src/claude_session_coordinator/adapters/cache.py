@@ -0,0 +1,153 @@
+"""In-process cache of parsed scope data for file-backed adapters.
+
+Scope files are small JSON documents that are read far more often than they
+are written (every resource read and ``retrieve_data`` call parses the whole
+scope). This module provides a bounded LRU cache of parsed scopes that is
+revalidated against a cheap ``os.stat`` signature, so unchanged files are
+served from memory while changes made by other processes are still picked up.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+# (st_mtime_ns, st_size, st_ino) - changes whenever the file is rewritten
+StatSignature = tuple[int, int, int]
+
+
+def stat_signature(stat_result: os.stat_result) -> StatSignature:
+    """Build a cache validation signature from a stat result.
+
+    Args:
+        stat_result: Result of ``os.stat``/``os.fstat`` for a scope file
+
+    Returns:
+        Tuple of modification time (ns), size and inode
+    """
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class ScopeCache:
+    """Bounded LRU cache of parsed scope data.
+
+    Entries are keyed by scope and tagged with the stat signature of the file
+    they were parsed from. A lookup only hits when the caller presents the same
+    signature, so a file rewritten by another process is transparently
+    re-read. The cache is bounded both by number of scopes and by the total
+    on-disk size of the cached files; least recently used scopes are evicted
+    first.
+
+    Cached dictionaries are shared with callers and must be treated as
+    read-only.
+
+    Example:
+        >>> cache = ScopeCache(max_scopes=2)
+        >>> cache.put("a:b:c", (1, 10, 7), {"data": {}}, 10)
+        >>> cache.get("a:b:c", (1, 10, 7))
+        {'data': {}}
+    """
+
+    def __init__(self, max_scopes: int = 128, max_bytes: int = 16 * 1024 * 1024) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_scopes: Maximum number of cached scopes (0 disables caching)
+            max_bytes: Maximum total size in bytes of cached scope files
+                (0 disables caching)
+        """
+        self.max_scopes = max_scopes
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[StatSignature, dict[str, Any], int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.max_scopes > 0 and self.max_bytes > 0
+
+    def get(self, scope: str, signature: StatSignature) -> dict[str, Any] | None:
+        """Look up a scope, validating it against the current file signature.
+
+        Args:
+            scope: The scope identifier
+            signature: Stat signature of the scope file as it is now on disk
+
+        Returns:
+            The cached scope data, or None on a miss or stale entry
+        """
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._remove(scope)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(scope)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, scope: str, signature: StatSignature, data: dict[str, Any], size: int) -> None:
+        """Cache parsed scope data.
+
+        Args:
+            scope: The scope identifier
+            signature: Stat signature of the file the data corresponds to
+            data: Parsed scope data
+            size: Size in bytes used for the byte budget (usually the file size)
+        """
+        if not self.enabled or size > self.max_bytes:
+            self.invalidate(scope)
+            return
+
+        with self._lock:
+            if scope in self._entries:
+                self._remove(scope)
+            self._entries[scope] = (signature, data, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_scopes or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, scope: str) -> None:
+        """Drop a scope from the cache if present.
+
+        Args:
+            scope: The scope identifier
+        """
+        with self._lock:
+            if scope in self._entries:
+                self._remove(scope)
+
+    def clear(self) -> None:
+        """Drop all cached scopes."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions, cached scope count and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "scopes": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, scope: str) -> None:
+        """Remove an entry and update the byte count (lock must be held)."""
+        _, _, size = self._entries.pop(scope)
+        self._bytes -= size
@@ -0,0 +1,133 @@
+"""Transparent compression of large stored values.
+
+Sessions sometimes store big plans or file lists under a single key. Adapters
+that keep a whole scope together (one file, one hash) pay for such values on
+every access to the scope, so values whose JSON encoding exceeds a threshold
+are compressed individually and only decompressed when that key is read.
+
+``zlib`` is always available; ``zstd`` requires the optional ``zstandard``
+dependency (``pip install claude-session-coordinator[zstd]``).
+"""
+
+import json
+import zlib
+from typing import Any
+
+from .base import StorageError
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without the extra
+    zstandard = None  # type: ignore[assignment]
+
+CODECS = ("zlib", "zstd")
+
+DEFAULT_THRESHOLD = 4096
+
+# Prefix marking a compressed value where JSON text is otherwise stored
+MARKER = b"\x00"
+
+
+def _check_codec(codec: str) -> None:
+    """Validate a codec name.
+
+    Raises:
+        StorageError: If the codec is unknown or its library is not installed
+    """
+    if codec not in CODECS:
+        raise StorageError(f"Unknown compression codec: '{codec}'. Available: {', '.join(CODECS)}")
+    if codec == "zstd" and zstandard is None:
+        raise StorageError(
+            "zstd compression requires the 'zstandard' package: "
+            "pip install claude-session-coordinator[zstd]"
+        )
+
+
+class ValueCompressor:
+    """Compresses JSON-encoded values above a size threshold.
+
+    Example:
+        >>> compressor = ValueCompressor("zlib", threshold=1024)
+        >>> compressor.compress(b"[]") is None
+        True
+    """
+
+    def __init__(self, codec: str = "zlib", threshold: int = DEFAULT_THRESHOLD) -> None:
+        """Initialize the compressor.
+
+        Args:
+            codec: "zlib" or "zstd"
+            threshold: Minimum size in bytes of a value's JSON encoding to compress it
+
+        Raises:
+            StorageError: If the codec is unknown or unavailable
+        """
+        _check_codec(codec)
+        self.codec = codec
+        self.threshold = threshold
+
+    def compress(self, text: bytes) -> bytes | None:
+        """Compress an encoded value if it is large enough to be worth it.
+
+        Args:
+            text: JSON encoding of the value
+
+        Returns:
+            The compressed bytes, or None if the value is below the threshold
+            or doesn't get smaller
+        """
+        if len(text) < self.threshold:
+            return None
+        if self.codec == "zstd":
+            # Compressor objects aren't thread-safe, and cheap to create
+            compressed = zstandard.ZstdCompressor().compress(text)
+        else:
+            compressed = zlib.compress(text)
+        return compressed if len(compressed) < len(text) else None
+
+
+def decompress(codec: str, compressed: bytes) -> Any:
+    """Decompress and parse a value compressed by ``ValueCompressor``.
+
+    Works regardless of whether compression is enabled for the reader.
+
+    Args:
+        codec: Codec the value was compressed with
+        compressed: The compressed bytes
+
+    Returns:
+        The original value
+
+    Raises:
+        StorageError: If the codec is unavailable
+        ValueError: If the data is corrupt
+    """
+    _check_codec(codec)
+    try:
+        if codec == "zstd":
+            text = zstandard.ZstdDecompressor().decompress(compressed)
+        else:
+            text = zlib.decompress(compressed)
+    except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)) as e:
+        raise ValueError(f"corrupt {codec} data: {e}") from e
+    return json.loads(text)
+
+
+def pack(codec: str, compressed: bytes) -> bytes:
+    """Frame compressed bytes for a store that otherwise holds JSON text.
+
+    Args:
+        codec: Codec the value was compressed with
+        compressed: The compressed bytes
+
+    Returns:
+        ``MARKER`` + codec name + ``:`` + compressed bytes; JSON text never
+        starts with ``MARKER``
+    """
+    return MARKER + codec.encode("ascii") + b":" + compressed
+
+
+def unpack(raw: bytes) -> tuple[str, bytes]:
+    """Split a value framed by ``pack`` into its codec and compressed bytes."""
+    codec, _, compressed = raw[len(MARKER) :].partition(b":")
+    return codec.decode("ascii", "replace"), compressed
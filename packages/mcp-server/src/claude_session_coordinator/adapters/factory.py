@@ -1,15 +1,19 @@
 """Factory for creating storage adapters from configuration.
 
 This module provides a factory pattern for creating storage adapters based on
-configuration. It supports built-in adapters (local, redis) and allows users
+configuration. It supports built-in adapters (local, log, sqlite, redis) and allows users
 to register custom adapter implementations.
 """
 
+import os
 from collections.abc import Callable
 from typing import Any
 
 from .base import StorageAdapter, StorageError
 from .local import LocalFileAdapter
+from .log import LogStructuredAdapter
+from .redis import RedisAdapter
+from .sqlite import SQLiteAdapter
 
 # Type alias for adapter constructor functions
 AdapterConstructor = Callable[[dict[str, Any]], StorageAdapter]
@@ -46,6 +50,15 @@ class AdapterFactory:
         """
         cls._adapters[name] = constructor
 
+    @classmethod
+    def available_adapters(cls) -> list[str]:
+        """List the registered adapter type names.
+
+        Returns:
+            Sorted list of adapter names
+        """
+        return sorted(cls._adapters)
+
     @classmethod
     def create_adapter(cls, config: dict[str, Any]) -> StorageAdapter:
         """Create a storage adapter from configuration.
@@ -88,12 +101,80 @@ class AdapterFactory:
         )
 
 
+def _config_bool(config: dict[str, Any], key: str, default: bool = False) -> bool:
+    """Read a boolean setting, accepting ``true``/``false`` strings.
+
+    Raises:
+        ValueError: If the setting is neither a bool nor a true/false string
+    """
+    value = config.get(key, default)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise ValueError(f"'{key}' must be true or false, got {value!r}")
+
+
 # Register built-in adapters
 def _create_local_adapter(config: dict[str, Any]) -> LocalFileAdapter:
     """Create a LocalFileAdapter from configuration."""
     base_path = config.get("base_path", ".claude/session-state")
-    return LocalFileAdapter(base_path=base_path)
-
-
-# Register the local adapter
+    return LocalFileAdapter(
+        base_path=base_path,
+        cache_max_scopes=int(config.get("cache_max_scopes", 128)),
+        cache_max_bytes=int(config.get("cache_max_bytes", 16 * 1024 * 1024)),
+        write_behind=_config_bool(config, "write_behind"),
+        flush_interval_ms=int(config.get("flush_interval_ms", 1000)),
+        max_dirty_bytes=int(config.get("max_dirty_bytes", 1024 * 1024)),
+        durability=config.get("durability", "none"),
+        group_commit_ms=int(config.get("group_commit_ms", 10)),
+        format=config.get("format", "json"),
+        compression=config.get("compression"),
+        compression_threshold=int(config.get("compression_threshold", 4096)),
+        blob_threshold=(
+            None if config.get("blob_threshold") is None else int(config["blob_threshold"])
+        ),
+        watch_poll_interval_ms=int(config.get("watch_poll_interval_ms", 1000)),
+    )
+
+
+def _create_log_adapter(config: dict[str, Any]) -> LogStructuredAdapter:
+    """Create a LogStructuredAdapter from configuration."""
+    return LogStructuredAdapter(
+        base_path=config.get("base_path", ".claude/session-log"),
+        compaction_threshold=float(config.get("compaction_threshold", 0.5)),
+        compaction_min_bytes=int(config.get("compaction_min_bytes", 64 * 1024)),
+        durability=config.get("durability", "none"),
+        group_commit_ms=int(config.get("group_commit_ms", 10)),
+    )
+
+
+def _create_sqlite_adapter(config: dict[str, Any]) -> SQLiteAdapter:
+    """Create a SQLiteAdapter from configuration."""
+    return SQLiteAdapter(
+        path=config.get("path", ".claude/session-state.sqlite3"),
+        busy_timeout_ms=int(config.get("busy_timeout_ms", 5000)),
+        watch_poll_interval_ms=int(config.get("watch_poll_interval_ms", 1000)),
+    )
+
+
+def _create_redis_adapter(config: dict[str, Any]) -> RedisAdapter:
+    """Create a RedisAdapter from configuration."""
+    url = config.get("url") or config.get("redis_url") or os.environ.get("REDIS_URL")
+    if not url:
+        raise StorageError("Redis adapter requires 'url' in storage.config or REDIS_URL")
+    return RedisAdapter(
+        url=url,
+        key_prefix=config.get("key_prefix", "csc:"),
+        max_connections=int(config.get("max_connections", 16)),
+        compression=config.get("compression"),
+        compression_threshold=int(config.get("compression_threshold", 4096)),
+        enable_keyspace_events=_config_bool(config, "enable_keyspace_events"),
+    )
+
+
+# Register the built-in adapters
 AdapterFactory.register_adapter("local", _create_local_adapter)
+AdapterFactory.register_adapter("log", _create_log_adapter)
+AdapterFactory.register_adapter("sqlite", _create_sqlite_adapter)
+AdapterFactory.register_adapter("redis", _create_redis_adapter)
@@ -0,0 +1,176 @@
+"""Serialization formats for scope files.
+
+Scope files default to indented JSON, which is easy to inspect but expensive
+to write and parse for large values such as ``todos`` lists. The formats here
+trade readability for speed: compact JSON, ``orjson`` (optional dependency,
+``pip install claude-session-coordinator[orjson]``) and MessagePack (optional
+dependency, ``pip install claude-session-coordinator[msgpack]``).
+
+Files in any format other than the default start with a one-line header,
+``#csc:<format>\\n``, naming the format of the rest of the file. Files without
+a header are plain JSON, so directories written by older versions, or with a
+mix of formats, are always readable.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from .base import StorageError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the extra
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - exercised only without the extra
+    msgpack = None  # type: ignore[assignment]
+
+DEFAULT_FORMAT = "json"
+
+HEADER_PREFIX = b"#csc:"
+
+
+class ScopeFormat:
+    """One way of encoding scope data to bytes.
+
+    Attributes:
+        name: Format name used in configuration and file headers
+        label: Human-readable name used in error messages
+        extra: Optional dependency providing the format, if any
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        available: bool = True,
+        extra: str | None = None,
+    ) -> None:
+        """Initialize the format.
+
+        Args:
+            name: Format name used in configuration and file headers
+            label: Human-readable name used in error messages
+            dumps: Encode a value to bytes; raises TypeError/ValueError if it can't
+            loads: Decode bytes to a value; raises ValueError on invalid data
+            available: Whether the backing library is installed
+            extra: Optional dependency providing the format, if any
+        """
+        self.name = name
+        self.label = label
+        self._dumps = dumps
+        self._loads = loads
+        self.available = available
+        self.extra = extra
+
+    @property
+    def header(self) -> bytes:
+        """File header identifying this format (empty for the default)."""
+        return b"" if self.name == DEFAULT_FORMAT else HEADER_PREFIX + self.name.encode() + b"\n"
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        """Encode scope data, including the format header.
+
+        Raises:
+            TypeError: If a value cannot be encoded in this format
+        """
+        try:
+            return self.header + self._dumps(data)
+        except ValueError as e:
+            # e.g. circular references; report like any unencodable value
+            raise TypeError(str(e)) from e
+
+    def loads(self, payload: bytes) -> dict[str, Any]:
+        """Decode scope data (without the header).
+
+        Raises:
+            ValueError: If the payload is not valid data in this format
+        """
+        data = self._loads(payload)
+        if not isinstance(data, dict):
+            raise ValueError(f"expected an object, got {type(data).__name__}")
+        return data
+
+
+FORMATS: dict[str, ScopeFormat] = {
+    "json": ScopeFormat(
+        "json",
+        "JSON",
+        lambda data: json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"),
+        json.loads,
+    ),
+    "json-compact": ScopeFormat(
+        "json-compact",
+        "JSON",
+        lambda data: json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+        json.loads,
+    ),
+    "orjson": ScopeFormat(
+        "orjson",
+        "JSON",
+        lambda data: orjson.dumps(data),
+        lambda payload: orjson.loads(payload),
+        available=orjson is not None,
+        extra="orjson",
+    ),
+    "msgpack": ScopeFormat(
+        "msgpack",
+        "MessagePack",
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False),
+        available=msgpack is not None,
+        extra="msgpack",
+    ),
+}
+
+
+def get_format(name: str) -> ScopeFormat:
+    """Look up a serialization format by name.
+
+    Args:
+        name: Format name ("json", "json-compact", "orjson" or "msgpack")
+
+    Returns:
+        The format
+
+    Raises:
+        StorageError: If the format is unknown or its library is not installed
+    """
+    scope_format = FORMATS.get(name)
+    if scope_format is None:
+        raise StorageError(
+            f"Unknown serialization format: '{name}'. Available formats: {', '.join(FORMATS)}"
+        )
+    if not scope_format.available:
+        raise StorageError(
+            f"The '{name}' format requires the {scope_format.extra} package: "
+            f"pip install claude-session-coordinator[{scope_format.extra}]"
+        )
+    return scope_format
+
+
+def split_header(raw: bytes) -> tuple[ScopeFormat, bytes]:
+    """Detect the format of a scope file from its header.
+
+    Args:
+        raw: Complete file contents
+
+    Returns:
+        The file's format and the payload following the header
+
+    Raises:
+        StorageError: If the header names an unknown or unavailable format
+        ValueError: If the header is malformed
+    """
+    if not raw.startswith(HEADER_PREFIX):
+        return FORMATS[DEFAULT_FORMAT], raw
+
+    end = raw.find(b"\n")
+    if end == -1:
+        raise ValueError("truncated format header")
+    return get_format(raw[len(HEADER_PREFIX) : end].decode("ascii", "replace")), raw[end + 1 :]
@@ -1,48 +1,322 @@
 """Local file storage adapter for Claude Session Coordinator.
 
 This adapter stores data in JSON files on the local filesystem. Each scope
-is stored as a separate JSON file in the configured directory (default: .claude/session-state/).
+is stored as a separate JSON file in the configured directory (default: .claude/session-state/),
+in a directory tree that mirrors the ``machine:project:type:id`` scope segments.
 """
 
+import atexit
+import base64
+import binascii
+import copy
+import hashlib
+import heapq
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, TypeVar
+from urllib.parse import quote, unquote
 
 from .base import StorageAdapter, StorageError
+from .cache import ScopeCache, stat_signature
+from .compression import DEFAULT_THRESHOLD, ValueCompressor, decompress
+from .formats import DEFAULT_FORMAT, FORMATS, get_format, split_header
+from .manifest import ManifestEntry, ScopeManifest
+from .watch import ChangeHub, DirectoryWatcher
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ("none", "fsync", "group")
+
+# Subdirectory holding the sharded scope files
+SCOPES_DIR = "scopes"
+
+# Contended scope-lock waits at least this long are logged at debug level
+_SLOW_LOCK_SECONDS = 0.1
+
+# Leftover temp files older than this (from a crash mid-write) are removed on startup
+_STALE_TEMP_SECONDS = 3600
+
+# Adapters with write-behind data or group-commit fsyncs pending, flushed at exit
+_write_behind_adapters: "weakref.WeakSet[LocalFileAdapter]" = weakref.WeakSet()
+
+
+def fsync_directory(directory: Path) -> None:
+    """Sync a directory so renames and unlinks in it are durable.
+
+    Args:
+        directory: Directory to sync
+
+    Raises:
+        StorageError: If the directory cannot be synced
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError as e:
+        raise StorageError(f"Failed to open directory {directory}: {e}") from e
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        raise StorageError(f"Failed to sync directory {directory}: {e}") from e
+    finally:
+        os.close(fd)
+
+
+@atexit.register
+def _flush_write_behind_adapters() -> None:
+    """Flush every live write-behind adapter on process exit."""
+    for adapter in list(_write_behind_adapters):
+        try:
+            adapter.flush()
+        except StorageError as e:
+            logger.error("Failed to flush write-behind data on exit: %s", e)
+
+
+def _quote_segment(segment: str) -> str:
+    """Percent-escape one scope segment into a file or directory name.
+
+    Everything but letters, digits and ``-_.~`` is escaped, as is a leading
+    ``.`` (no hidden names, ``.`` or ``..``) and a trailing ``.json`` (so a
+    directory can never collide with a scope file). The empty segment
+    becomes a lone ``%``, which escaping never produces otherwise.
+
+    Args:
+        segment: One ``:``-separated part of a scope identifier
+
+    Returns:
+        Name that ``_unquote_segment`` maps back to ``segment``
+    """
+    if not segment:
+        return "%"
+    quoted = quote(segment, safe="-_.~")
+    if quoted.startswith("."):
+        quoted = "%2E" + quoted[1:]
+    if quoted.endswith(".json"):
+        quoted = quoted[:-5] + "%2Ejson"
+    return quoted
+
+
+def _unquote_segment(name: str) -> str:
+    """Reverse ``_quote_segment``."""
+    return "" if name == "%" else unquote(name)
 
 
 class LocalFileAdapter(StorageAdapter):
     """Storage adapter that uses local JSON files.
 
     This adapter is ideal for single-machine use cases. Data is stored in
-    JSON files, one file per scope. Scope names are converted to safe filenames
-    by replacing `:` and `/` with `__`.
+    JSON files, one file per scope, under ``scopes/``. Every ``:``-separated
+    scope segment becomes one directory level (the last one the file name),
+    percent-escaped so the scope can be recovered exactly from the path.
+
+    Scope files written by older versions directly in ``base_path`` (named by
+    replacing ``:`` and ``/`` with ``__``) are still read, moved to the new
+    layout the next time they are written, and can be moved all at once with
+    ``migrate_legacy_layout()``.
+
+    Parsed scope files are kept in a bounded in-process cache that is
+    revalidated with ``os.stat`` on every access, so repeated reads of an
+    unchanged scope do not touch the file contents.
+
+    In write-behind mode, modified scopes are kept in memory and written out
+    on a timer, when the dirty-byte budget is exceeded, on ``flush()``,
+    ``close()`` and at process exit. Reads through the same adapter always
+    see buffered writes; other processes see them once they are flushed.
+
+    Scope files are written to a temporary file and atomically renamed over
+    the old one, so a crash mid-write never leaves a truncated file. The
+    ``durability`` level controls when data is forced to disk: ``"none"``
+    leaves it to the OS, ``"fsync"`` syncs every write before returning, and
+    ``"group"`` syncs all files written in the last ``group_commit_ms``
+    together from a background thread.
+
+    Values larger than ``blob_threshold`` are spilled to blob files under
+    ``.blobs/``, named by a hash of scope, key and content and referenced from
+    the key's metadata, so reading other keys never parses them. A blob is
+    deleted once the scope file no longer referencing it has been written.
+
+    ``list_scopes`` is answered from a scope manifest in ``.index/`` (see
+    ``ScopeManifest``) instead of scanning the directory; it is kept up to
+    date on every write and rebuilt from the scope files if it is missing.
 
     Example:
         Scope: "laptop:BANCS-Norway/my-repo:session:claude_1"
-        File: "laptop__BANCS-Norway__my-repo__session__claude_1.json"
+        File: "scopes/laptop/BANCS-Norway%2Fmy-repo/session/claude_1.json"
     """
 
-    def __init__(self, base_path: str = ".claude/session-state") -> None:
+    def __init__(
+        self,
+        base_path: str = ".claude/session-state",
+        cache_max_scopes: int = 128,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        write_behind: bool = False,
+        flush_interval_ms: int = 1000,
+        max_dirty_bytes: int = 1024 * 1024,
+        durability: str = "none",
+        group_commit_ms: int = 10,
+        format: str = DEFAULT_FORMAT,
+        compression: str | None = None,
+        compression_threshold: int = DEFAULT_THRESHOLD,
+        blob_threshold: int | None = None,
+        watch_poll_interval_ms: int = 1000,
+    ) -> None:
         """Initialize the local file adapter.
 
         Args:
             base_path: Directory where scope files will be stored
+            cache_max_scopes: Maximum number of parsed scopes kept in memory
+                (0 disables the read cache)
+            cache_max_bytes: Maximum total size of cached scope files in bytes
+            write_behind: Buffer writes in memory and flush them in batches
+            flush_interval_ms: Interval between background flushes in write-behind mode
+            max_dirty_bytes: Approximate size of buffered values that forces an
+                immediate flush in write-behind mode
+            durability: When written files are fsynced: "none", "fsync"
+                (every write) or "group" (batched every ``group_commit_ms``)
+            group_commit_ms: Interval between batched fsyncs in "group" mode
+            format: Serialization format for written scope files: "json"
+                (indented), "json-compact", "orjson" or "msgpack". Files in
+                any format are readable regardless of this setting.
+            compression: Compress large values with "zlib" or "zstd" (None disables it)
+            compression_threshold: Minimum JSON size in bytes of a value to compress it
+            blob_threshold: Size in bytes (after compression) from which a value is
+                written to its own blob file instead of the scope file (None disables it)
+            watch_poll_interval_ms: Interval between scans for changes by other
+                processes where inotify is unavailable (only while watched)
+
+        Raises:
+            StorageError: If the durability level, format or compression codec
+                is unknown or unavailable, or the storage directory cannot be created
         """
+        if durability not in DURABILITY_LEVELS:
+            raise StorageError(
+                f"Unknown durability level: '{durability}'. "
+                f"Available levels: {', '.join(DURABILITY_LEVELS)}"
+            )
+
+        self.format = format
+        self._format = get_format(format)
+        self._compressor = (
+            ValueCompressor(compression, compression_threshold) if compression else None
+        )
+        self.blob_threshold = blob_threshold
+        # scope -> blobs no longer referenced once the scope is next written out
+        self._garbage_blobs: dict[str, set[str]] = {}
         self.base_path = Path(base_path).resolve()
+        self._cache = ScopeCache(max_scopes=cache_max_scopes, max_bytes=cache_max_bytes)
         self._ensure_directory()
+        self._manifest = ScopeManifest(self.base_path / ".index" / "manifest.json", self._scan)
+
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_dirty_bytes = max_dirty_bytes
+        # scope -> pending scope data, or None if the scope file is to be removed
+        self._dirty: dict[str, dict[str, Any] | None] = {}
+        self._dirty_bytes = 0
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop_flusher = threading.Event()
+        self._flusher: threading.Thread | None = None
+        # Scope locks held by the current thread (scope -> shared), for re-entry
+        self._held_scope_locks = threading.local()
+        # Fallback per-scope locks where fcntl is unavailable
+        self._scope_locks: dict[str, threading.Lock] = {}
+        self._scope_locks_guard = threading.Lock()
+        self._lock_stats = {
+            mode: {"acquired": 0, "contended": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for mode in ("shared", "exclusive")
+        }
+        self._lock_stats_lock = threading.Lock()
+
+        self.durability = durability
+        self.group_commit_interval = group_commit_ms / 1000
+        # Files (and directories) written since the last group commit
+        self._unsynced: set[Path] = set()
+        self._sync_lock = threading.Lock()
+        self._stop_syncer = threading.Event()
+        self._syncer: threading.Thread | None = None
+
+        # Change notifications; other processes' writes are picked up by
+        # watching the scope files while anybody is subscribed
+        self._changes = ChangeHub(self._start_watcher, self._stop_watcher)
+        self._watcher = DirectoryWatcher(
+            self.base_path, self._on_file_changed, poll_interval=watch_poll_interval_ms / 1000
+        )
+
+        self._remove_stale_temp_files()
+        # Whether scope files in the pre-sharding flat layout may exist
+        self._legacy_layout = self._has_legacy_files()
+
+        if write_behind:
+            _write_behind_adapters.add(self)
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="csc-write-behind", daemon=True
+            )
+            self._flusher.start()
+
+        if durability == "group":
+            _write_behind_adapters.add(self)
+            self._syncer = threading.Thread(
+                target=self._sync_periodically, name="csc-group-commit", daemon=True
+            )
+            self._syncer.start()
 
     def _ensure_directory(self) -> None:
-        """Ensure the storage directory exists."""
+        """Ensure the storage and lock directories exist."""
         try:
             self.base_path.mkdir(parents=True, exist_ok=True)
+            self._locks_path.mkdir(exist_ok=True)
+            self._scopes_path.mkdir(exist_ok=True)
         except OSError as e:
             raise StorageError(f"Failed to create storage directory: {e}") from e
 
+    @property
+    def _scopes_path(self) -> Path:
+        """Root directory of the sharded scope files."""
+        return self.base_path / SCOPES_DIR
+
+    def _get_scope_path(self, scope: str) -> Path:
+        """Get the file path for a scope.
+
+        Args:
+            scope: The scope identifier (e.g., "laptop:org/repo:session:id")
+
+        Returns:
+            Path to the scope file (e.g., "scopes/laptop/org%2Frepo/session/id.json")
+        """
+        *directories, name = [_quote_segment(segment) for segment in scope.split(":")]
+        return self._scopes_path.joinpath(*directories, f"{name}.json")
+
+    def _path_to_scope(self, path: Path) -> str:
+        """Convert a scope file path back to its scope identifier.
+
+        Args:
+            path: Path of a scope file under ``scopes/``
+
+        Returns:
+            The scope identifier
+        """
+        *directories, name = path.relative_to(self._scopes_path).parts
+        return ":".join(_unquote_segment(part) for part in [*directories, name[:-5]])
+
     def _scope_to_filename(self, scope: str) -> str:
-        """Convert a scope identifier to a safe filename.
+        """Convert a scope identifier to its filename in the legacy flat layout.
 
         Args:
             scope: The scope identifier (e.g., "laptop:org/repo:session:id")
@@ -55,7 +329,7 @@ class LocalFileAdapter(StorageAdapter):
         return f"{safe_name}.json"
 
     def _filename_to_scope(self, filename: str) -> str:
-        """Convert a filename back to a scope identifier.
+        """Convert a legacy flat-layout filename back to a scope identifier.
 
         Args:
             filename: The filename (e.g., "laptop__org__repo__session__id.json")
@@ -85,39 +359,305 @@ class LocalFileAdapter(StorageAdapter):
             # Fallback: just join with :
             return ":".join(parts)
 
-    def _get_scope_path(self, scope: str) -> Path:
-        """Get the file path for a scope.
+    def _legacy_scope_path(self, scope: str) -> Path:
+        """Get the path a scope had in the legacy flat layout."""
+        return self.base_path / self._scope_to_filename(scope)
+
+    def _has_legacy_files(self) -> bool:
+        """Check whether any scope file is still in the legacy flat layout."""
+        try:
+            return next(self.base_path.glob("*.json"), None) is not None
+        except OSError as e:
+            raise StorageError(f"Failed to list scope files: {e}") from e
+
+    def _existing_scope_path(self, scope: str) -> Path:
+        """Get the path a scope is currently stored at, old layout included.
 
         Args:
             scope: The scope identifier
 
         Returns:
-            Path to the scope file
+            The legacy path if only that file exists, otherwise the sharded path
         """
-        return self.base_path / self._scope_to_filename(scope)
+        scope_path = self._get_scope_path(scope)
+        if self._legacy_layout and not scope_path.exists():
+            legacy_path = self._legacy_scope_path(scope)
+            if legacy_path.exists():
+                return legacy_path
+        return scope_path
+
+    def _drop_legacy_file(self, scope: str) -> None:
+        """Delete a scope's legacy flat-layout file, if it has one.
+
+        The manifest may list the file under the scope its name decodes to;
+        that alias is dropped too unless it exists in the new layout.
+
+        Raises:
+            OSError: If the file cannot be deleted
+        """
+        legacy_path = self._legacy_scope_path(scope)
+        if not legacy_path.exists():
+            return
+        legacy_path.unlink(missing_ok=True)
+        alias = self._filename_to_scope(legacy_path.name)
+        if alias != scope and not self._get_scope_path(alias).exists():
+            self._manifest.remove(alias)
+
+    def migrate_legacy_layout(self) -> int:
+        """Move every scope file from the legacy flat layout into ``scopes/``.
+
+        Safe to run while other processes use the directory: each file is
+        moved under its scope's exclusive lock, and a scope that already has
+        a file in the new layout keeps it (the legacy copy is older).
+
+        Returns:
+            Number of scope files moved
+
+        Raises:
+            StorageError: If a file cannot be moved
+        """
+        if not self._legacy_layout:
+            return 0
+
+        try:
+            legacy_files = list(self.base_path.glob("*.json"))
+        except OSError as e:
+            raise StorageError(f"Failed to list scope files: {e}") from e
+
+        moved = 0
+        for legacy_path in legacy_files:
+            scope = self._filename_to_scope(legacy_path.name)
+            with self._scope_lock(scope):
+                scope_path = self._get_scope_path(scope)
+                try:
+                    if scope_path.exists():
+                        legacy_path.unlink(missing_ok=True)
+                        continue
+                    scope_path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(legacy_path, scope_path)
+                except FileNotFoundError:
+                    continue  # migrated or deleted by another process
+                except OSError as e:
+                    raise StorageError(f"Failed to migrate scope file {legacy_path}: {e}") from e
+
+                self._cache.invalidate(scope)
+                self._after_write(scope_path)
+                self._manifest.record(
+                    scope,
+                    scope_path.relative_to(self.base_path).as_posix(),
+                    keys=len(self._read_scope_file(scope).get("data", {})),
+                    size=scope_path.stat().st_size,
+                )
+                moved += 1
+
+        self._legacy_layout = self._has_legacy_files()
+        return moved
+
+    @contextmanager
+    def _scope_lock(self, scope: str, shared: bool = False) -> Iterator[None]:
+        """Hold an advisory lock on a scope across threads and processes.
+
+        Takes an ``fcntl.flock`` on a per-scope lock file in ``.locks/``:
+        shared for reads, exclusive for read-modify-write cycles. Every
+        acquisition opens its own descriptor, so the lock also excludes other
+        threads of this process. Re-entering a scope lock already held by the
+        current thread is a no-op. Without ``fcntl`` (Windows), exclusive
+        locks fall back to a per-scope ``threading.Lock`` and shared locks
+        are skipped.
+
+        Args:
+            scope: The scope identifier
+            shared: Take a shared (read) lock instead of an exclusive one
+
+        Raises:
+            StorageError: If the lock file cannot be opened
+        """
+        held: dict[str, bool] = self._held_scope_locks.__dict__.setdefault("scopes", {})
+        if scope in held:
+            yield
+            return
+
+        if fcntl is None:
+            if shared:
+                yield
+                return
+            with self._scope_locks_guard:
+                thread_lock = self._scope_locks.setdefault(scope, threading.Lock())
+            start = time.perf_counter()
+            contended = not thread_lock.acquire(blocking=False)
+            if contended:
+                thread_lock.acquire()
+            self._record_lock_wait(shared, contended, time.perf_counter() - start)
+            held[scope] = shared
+            try:
+                yield
+            finally:
+                del held[scope]
+                thread_lock.release()
+            return
+
+        digest = hashlib.sha1(scope.encode("utf-8")).hexdigest()
+        lock_path = self._locks_path / f"{digest}.lock"
+        try:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise StorageError(f"Failed to open lock file {lock_path}: {e}") from e
+
+        try:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            start = time.perf_counter()
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                contended = False
+            except BlockingIOError:
+                contended = True
+                fcntl.flock(fd, mode)
+            self._record_lock_wait(shared, contended, time.perf_counter() - start)
+
+            held[scope] = shared
+            try:
+                yield
+            finally:
+                del held[scope]
+        finally:
+            # Closing the descriptor releases the flock
+            os.close(fd)
+
+    @property
+    def _locks_path(self) -> Path:
+        """Directory holding the per-scope lock files."""
+        return self.base_path / ".locks"
+
+    def _record_lock_wait(self, shared: bool, contended: bool, waited: float) -> None:
+        """Update lock-wait counters after acquiring a scope lock.
+
+        Args:
+            shared: Whether a shared lock was acquired
+            contended: Whether the lock was held by someone else at first
+            waited: Seconds spent acquiring the lock
+        """
+        with self._lock_stats_lock:
+            stats = self._lock_stats["shared" if shared else "exclusive"]
+            stats["acquired"] += 1
+            if contended:
+                stats["contended"] += 1
+                stats["wait_ms_total"] += waited * 1000
+                stats["wait_ms_max"] = max(stats["wait_ms_max"], waited * 1000)
+
+        if contended and waited >= _SLOW_LOCK_SECONDS:
+            logger.debug(
+                "Waited %.1f ms for a %s scope lock",
+                waited * 1000,
+                "shared" if shared else "exclusive",
+            )
+
+    def lock_stats(self) -> dict[str, dict[str, float]]:
+        """Get scope-lock wait counters.
+
+        Returns:
+            For "shared" and "exclusive" locks: number acquired, number that
+            had to wait (contended), and total and maximum wait in milliseconds
+        """
+        with self._lock_stats_lock:
+            return {mode: dict(stats) for mode, stats in self._lock_stats.items()}
 
     def _load_scope_data(self, scope: str) -> dict[str, Any]:
         """Load data from a scope file.
 
+        The returned dictionary may be shared with the read cache and must not
+        be mutated; use ``_load_scope_data_for_update`` before modifying it.
+
         Args:
             scope: The scope identifier
 
         Returns:
             Dictionary containing the scope data, or empty dict if file doesn't exist
         """
-        scope_path = self._get_scope_path(scope)
-        if not scope_path.exists():
+        if self._dirty:
+            with self._lock:
+                if scope in self._dirty:
+                    return self._dirty[scope] or {}
+
+        with self._scope_lock(scope, shared=True):
+            return self._read_scope_file(scope)
+
+    def _read_scope_file(self, scope: str) -> dict[str, Any]:
+        """Read a scope file through the cache (scope lock must be held).
+
+        Args:
+            scope: The scope identifier
+
+        Returns:
+            Dictionary containing the scope data, or empty dict if file doesn't exist
+        """
+        scope_path = self._existing_scope_path(scope)
+        try:
+            signature = stat_signature(scope_path.stat())
+        except FileNotFoundError:
+            self._cache.invalidate(scope)
             return {}
+        except OSError as e:
+            raise StorageError(f"Failed to read scope file {scope_path}: {e}") from e
+
+        cached = self._cache.get(scope, signature)
+        if cached is not None:
+            return cached
 
         try:
-            with open(scope_path, encoding="utf-8") as f:
-                data = json.load(f)
-                return cast(dict[str, Any], data)
-        except json.JSONDecodeError as e:
-            raise StorageError(f"Invalid JSON in scope file {scope_path}: {e}") from e
+            with open(scope_path, "rb") as f:
+                raw = f.read()
+                signature = stat_signature(os.fstat(f.fileno()))
+        except FileNotFoundError:
+            return {}
         except OSError as e:
             raise StorageError(f"Failed to read scope file {scope_path}: {e}") from e
 
+        data = self._decode(raw, scope_path)
+        self._cache.put(scope, signature, data, signature[1])
+        return data
+
+    @staticmethod
+    def _decode(raw: bytes, scope_path: Path) -> dict[str, Any]:
+        """Parse scope file contents in whichever format they were written.
+
+        Args:
+            raw: Complete file contents
+            scope_path: Path of the file, for error messages
+
+        Returns:
+            The scope data
+
+        Raises:
+            StorageError: If the contents are invalid or in an unavailable format
+        """
+        scope_format = FORMATS[DEFAULT_FORMAT]
+        try:
+            scope_format, payload = split_header(raw)
+            return scope_format.loads(payload)
+        except ValueError as e:
+            raise StorageError(
+                f"Invalid {scope_format.label} in scope file {scope_path}: {e}"
+            ) from e
+
+    def _load_scope_data_for_update(self, scope: str) -> dict[str, Any]:
+        """Load a private, mutable copy of a scope's data.
+
+        Only the ``data`` and ``metadata`` containers are copied; stored values
+        themselves are replaced rather than mutated by the adapter.
+
+        Args:
+            scope: The scope identifier
+
+        Returns:
+            Mutable dictionary containing the scope data
+        """
+        scope_data = dict(self._load_scope_data(scope))
+        scope_data["data"] = dict(scope_data.get("data", {}))
+        scope_data["metadata"] = {
+            key: dict(meta) for key, meta in scope_data.get("metadata", {}).items()
+        }
+        return scope_data
+
     def _save_scope_data(self, scope: str, data: dict[str, Any]) -> None:
         """Save data to a scope file.
 
@@ -129,112 +669,958 @@ class LocalFileAdapter(StorageAdapter):
             StorageError: If save operation fails
         """
         scope_path = self._get_scope_path(scope)
+        tmp_path: str | None = None
 
         try:
-            with open(scope_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            payload = self._format.dumps(data)
         except TypeError as e:
-            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+            self._cache.invalidate(scope)
+            raise StorageError(f"Value is not {self._format.label}-serializable: {e}") from e
+
+        try:
+            # Write a sibling temp file and rename it over the scope file, so
+            # readers and crashes only ever see the old or the new contents
+            try:
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=scope_path.parent, prefix=f".{scope_path.name}.", suffix=".tmp"
+                )
+            except FileNotFoundError:
+                # First scope in this shard directory
+                scope_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=scope_path.parent, prefix=f".{scope_path.name}.", suffix=".tmp"
+                )
+            with open(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+                # The inode and mtime survive the rename, so this matches the final file
+                signature = stat_signature(os.fstat(f.fileno()))
+            os.replace(tmp_path, scope_path)
+            tmp_path = None
+            if self._legacy_layout:
+                # Written to the new layout, so drop the old copy
+                self._drop_legacy_file(scope)
         except OSError as e:
+            self._cache.invalidate(scope)
             raise StorageError(f"Failed to write scope file {scope_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
 
-    def store(self, scope: str, key: str, value: Any) -> None:
+        self._cache.put(scope, signature, data, signature[1])
+        self._after_write(scope_path)
+        self._manifest.record(
+            scope,
+            scope_path.relative_to(self.base_path).as_posix(),
+            keys=len(data.get("data", {})),
+            size=signature[1],
+        )
+        self._collect_garbage_blobs(scope, data)
+
+    def _after_write(self, path: Path) -> None:
+        """Apply the durability level after a file was replaced or removed.
+
+        Args:
+            path: The scope file that changed
+
+        Raises:
+            StorageError: If an fsync fails
+        """
+        if self.durability == "fsync":
+            self._fsync_directory(path.parent)
+        elif self.durability == "group":
+            with self._sync_lock:
+                self._unsynced.add(path)
+
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        """Sync a directory so renames and unlinks in it are durable."""
+        fsync_directory(directory)
+
+    def sync(self) -> None:
+        """Fsync every file written since the last group commit.
+
+        One sync per file and one per directory, however many times each file
+        was written in between. A no-op unless durability is "group".
+
+        Raises:
+            StorageError: If a file or directory cannot be synced
+        """
+        with self._sync_lock:
+            pending, self._unsynced = self._unsynced, set()
+
+        for path in pending:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # removed since; the directory sync covers it
+            except OSError as e:
+                raise StorageError(f"Failed to open {path} for sync: {e}") from e
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                raise StorageError(f"Failed to sync {path}: {e}") from e
+            finally:
+                os.close(fd)
+
+        for directory in {path.parent for path in pending}:
+            self._fsync_directory(directory)
+
+    def _sync_periodically(self) -> None:
+        """Background loop running a group commit every interval."""
+        while not self._stop_syncer.wait(self.group_commit_interval):
+            if not self._unsynced:
+                continue
+            try:
+                self.sync()
+            except StorageError as e:
+                logger.error("Group commit fsync failed: %s", e)
+
+    def _remove_stale_temp_files(self) -> None:
+        """Delete temp files left behind by a crash mid-write.
+
+        Only files older than an hour are removed, so writes in progress in
+        other processes are never disturbed.
+        """
+        cutoff = time.time() - _STALE_TEMP_SECONDS
+        try:
+            for tmp_path in [*self.base_path.glob(".*.tmp"), *self._scopes_path.rglob(".*.tmp")]:
+                if tmp_path.stat().st_mtime < cutoff:
+                    tmp_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Failed to clean up temp files in %s: %s", self.base_path, e)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Get read cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions, cached scope count and bytes
+        """
+        return self._cache.stats()
+
+    def _write_scope_data(self, scope: str, data: dict[str, Any], size_hint: int = 0) -> None:
+        """Persist updated scope data, or buffer it in write-behind mode.
+
+        Callers hold the scope's exclusive lock and call
+        ``_flush_if_over_budget`` once they have released it.
+
+        Args:
+            scope: The scope identifier
+            data: Complete scope data to write
+            size_hint: Approximate number of bytes changed, for the dirty budget
+        """
+        if not self.write_behind:
+            self._save_scope_data(scope, data)
+        else:
+            with self._lock:
+                self._dirty[scope] = data
+                self._dirty_bytes += size_hint
+        self._changes.publish(scope)
+
+    def _remove_scope_file(self, scope: str) -> None:
+        """Remove a scope file, or buffer the removal in write-behind mode.
+
+        Args:
+            scope: The scope identifier
+
+        Raises:
+            StorageError: If the file cannot be deleted
+        """
+        if self.write_behind:
+            with self._lock:
+                self._dirty[scope] = None
+        else:
+            self._unlink_scope_file(scope)
+        self._changes.publish(scope)
+
+    def _unlink_scope_file(self, scope: str) -> None:
+        """Delete a scope file from disk.
+
+        Args:
+            scope: The scope identifier
+
+        Raises:
+            StorageError: If the file cannot be deleted
+        """
+        scope_path = self._get_scope_path(scope)
+        self._cache.invalidate(scope)
+        try:
+            scope_path.unlink(missing_ok=True)
+            if self._legacy_layout:
+                self._drop_legacy_file(scope)
+        except OSError as e:
+            raise StorageError(f"Failed to delete scope file {scope_path}: {e}") from e
+        self._after_write(scope_path)
+        self._manifest.remove(scope)
+        self._collect_garbage_blobs(scope, {})
+
+    def _scope_exists(self, scope: str) -> bool:
+        """Check whether a scope exists, taking buffered writes into account."""
+        with self._lock:
+            if scope in self._dirty:
+                return self._dirty[scope] is not None
+        return self._existing_scope_path(scope).exists()
+
+    def flush(self) -> None:
+        """Write all buffered scopes to disk and run any pending group commit.
+
+        Buffered scope statistics are written to the manifest as well.
+
+        Scopes stay visible in the write-behind buffer until they have been
+        written, so concurrent readers never observe a stale file in between.
+
+        Raises:
+            StorageError: If a scope could not be written; unwritten scopes stay buffered
+        """
+        self._flush_dirty()
+        self.sync()
+        self._manifest.flush()
+
+    def _flush_dirty(self) -> None:
+        """Write all buffered write-behind scopes to disk."""
+        with self._flush_lock:
+            with self._lock:
+                pending = list(self._dirty.items())
+                self._dirty_bytes = 0
+
+            for scope, data in pending:
+                with self._scope_lock(scope):
+                    with self._lock:
+                        # A writer holding the scope lock may have replaced or
+                        # dropped the entry since the snapshot; its version wins
+                        if scope not in self._dirty or self._dirty[scope] is not data:
+                            continue
+                    if data is None:
+                        self._unlink_scope_file(scope)
+                    else:
+                        self._save_scope_data(scope, data)
+                    with self._lock:
+                        del self._dirty[scope]
+
+    def _flush_if_over_budget(self) -> None:
+        """Flush write-behind data once it exceeds ``max_dirty_bytes``.
+
+        Must be called without holding a scope lock, since flushing locks
+        every buffered scope in turn.
+        """
+        if self.write_behind and self._dirty_bytes >= self.max_dirty_bytes:
+            self.flush()
+
+    def _flush_periodically(self) -> None:
+        """Background loop flushing buffered writes every flush interval."""
+        while not self._stop_flusher.wait(self.flush_interval):
+            if not self._dirty:
+                continue
+            try:
+                self.flush()
+            except StorageError as e:
+                logger.error("Write-behind flush failed, will retry: %s", e)
+
+    def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
         """Store a value in the specified scope and key."""
-        # Load existing scope data
-        scope_data = self._load_scope_data(scope)
+        self.store_many(scope, {key: value}, ttl=ttl)
+
+    def store_many(self, scope: str, values: dict[str, Any], ttl: float | None = None) -> None:
+        """Store several keys in one scope with a single read-modify-write."""
+        if not values:
+            return
 
         # Get current timestamp
         now = datetime.utcnow().isoformat()
+        expires_at = None if ttl is None else time.time() + ttl
+
+        with self._scope_lock(scope):
+            # Load existing scope data
+            scope_data = self._load_scope_data_for_update(scope)
+
+            size = 0
+            for key, value in values.items():
+                # Update metadata
+                if key not in scope_data["metadata"]:
+                    scope_data["metadata"][key] = {"created_at": now}
+                scope_data["metadata"][key]["updated_at"] = now
+                if expires_at is None:
+                    scope_data["metadata"][key].pop("expires_at", None)
+                else:
+                    scope_data["metadata"][key]["expires_at"] = expires_at
+
+                # Store the value
+                stored = self._encode_value(scope, key, scope_data["metadata"][key], value)
+                scope_data["data"][key] = stored
+
+                size += self._value_size(stored)
+
+            # Save the updated scope data
+            self._write_scope_data(scope, scope_data, size)
+
+        self._flush_if_over_budget()
+        if expires_at is not None:
+            self._index_expiry(scope, list(values), expires_at)
+
+    def _value_size(self, value: Any) -> int:
+        """Estimate the serialized size of a value for the dirty-byte budget.
+
+        Only computed in write-behind mode, where it also surfaces
+        serialization errors at store time instead of at flush time.
+
+        Raises:
+            StorageError: If the value is not JSON-serializable
+        """
+        if not self.write_behind:
+            return 0
+        try:
+            return len(json.dumps(value, ensure_ascii=False))
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+
+    def _encode_value(self, scope: str, key: str, meta: dict[str, Any], value: Any) -> Any:
+        """Get the form a value is stored in, compressing or spilling it if it is large.
+
+        A compressed value is stored as a base64 string, and its codec is
+        recorded as ``encoding`` in the key's metadata. A value reaching
+        ``blob_threshold`` is written to a blob file, referenced as ``blob`` in
+        the metadata, and stored as None. A blob the key referenced before is
+        queued for deletion.
+
+        Args:
+            scope: The scope identifier
+            key: The key being stored
+            meta: The key's metadata, updated in place
+            value: The value to store
+
+        Returns:
+            The value itself, its compressed form, or None if it was spilled
+
+        Raises:
+            StorageError: If the value is not JSON-serializable (when it has to be
+                encoded here) or its blob cannot be written
+        """
+        old_blob = meta.pop("blob", None)
+        meta.pop("encoding", None)
+        stored = value
+
+        if self._compressor is not None or self.blob_threshold is not None:
+            try:
+                payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            except (TypeError, ValueError) as e:
+                raise StorageError(f"Value is not JSON-serializable: {e}") from e
+
+            compressor = self._compressor
+            compressed = None if compressor is None else compressor.compress(payload)
+            if compressor is not None and compressed is not None:
+                meta["encoding"] = compressor.codec
+                payload = compressed
+                stored = base64.b64encode(compressed).decode("ascii")
+
+            if self.blob_threshold is not None and len(payload) >= self.blob_threshold:
+                meta["blob"] = self._write_blob(scope, key, payload)
+                stored = None
 
-        # Initialize data section if it doesn't exist
-        if "data" not in scope_data:
-            scope_data["data"] = {}
+        if old_blob is not None and old_blob != meta.get("blob"):
+            self._discard_blob(scope, old_blob)
+        return stored
 
-        # Initialize metadata section if it doesn't exist
-        if "metadata" not in scope_data:
-            scope_data["metadata"] = {}
+    def _decode_value(self, scope: str, key: str, scope_data: dict[str, Any]) -> Any:
+        """Get a stored value, loading and decompressing it if needed.
 
-        # Store the value
-        scope_data["data"][key] = value
+        Args:
+            scope: The scope identifier, for error messages
+            key: The key to read
+            scope_data: Loaded scope data containing the key
+
+        Returns:
+            A copy of the value, safe for callers to mutate
+
+        Raises:
+            StorageError: If a compressed value or blob is corrupt, missing or
+                in an unavailable codec
+        """
+        meta = scope_data.get("metadata", {}).get(key, {})
+        encoding = meta.get("encoding")
+        blob = meta.get("blob")
+        if blob is None and encoding is None:
+            return copy.deepcopy(scope_data["data"][key])
+
+        try:
+            if blob is not None:
+                payload = self._read_blob(blob)
+            else:
+                payload = base64.b64decode(scope_data["data"][key], validate=True)
+            return json.loads(payload) if encoding is None else decompress(encoding, payload)
+        except (ValueError, binascii.Error) as e:
+            raise StorageError(f"Invalid compressed value for '{key}' in {scope}: {e}") from e
+
+    @property
+    def _blobs_path(self) -> Path:
+        """Directory holding spilled-out values."""
+        return self.base_path / ".blobs"
+
+    def _blob_path(self, blob: str) -> Path:
+        """Get the file path of a blob, sharded by its first two hex digits."""
+        return self._blobs_path / blob[:2] / blob
+
+    def _write_blob(self, scope: str, key: str, payload: bytes) -> str:
+        """Write a spilled-out value to its blob file.
+
+        Blobs are named by the SHA-256 of scope, key and content, so rewriting
+        an unchanged value reuses its file, while blobs are never shared
+        between keys and can be deleted without reference counting.
+
+        Args:
+            scope: The scope identifier
+            key: The key being stored
+            payload: Encoded (and possibly compressed) value
+
+        Returns:
+            The blob name
+
+        Raises:
+            StorageError: If the blob cannot be written
+        """
+        digest = hashlib.sha256()
+        for part in (scope.encode("utf-8"), key.encode("utf-8"), payload):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        blob = digest.hexdigest()
+
+        blob_path = self._blob_path(blob)
+        if blob_path.exists():
+            return blob
+
+        tmp_path: str | None = None
+        try:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent, prefix=f".{blob}.", suffix=".tmp")
+            with open(fd, "wb") as f:
+                f.write(payload)
+                if self.durability == "fsync":
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, blob_path)
+            tmp_path = None
+        except OSError as e:
+            raise StorageError(f"Failed to write blob {blob_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+        self._after_write(blob_path)
+        return blob
 
-        # Update metadata
-        if key not in scope_data["metadata"]:
-            scope_data["metadata"][key] = {"created_at": now}
-        scope_data["metadata"][key]["updated_at"] = now
+    def _read_blob(self, blob: str) -> bytes:
+        """Read a spilled-out value.
 
-        # Save the updated scope data
-        self._save_scope_data(scope, scope_data)
+        Raises:
+            StorageError: If the blob is missing or unreadable
+        """
+        blob_path = self._blob_path(blob)
+        try:
+            return blob_path.read_bytes()
+        except OSError as e:
+            raise StorageError(f"Failed to read blob {blob_path}: {e}") from e
+
+    def _discard_blob(self, scope: str, blob: str) -> None:
+        """Queue a blob for deletion once the scope has been written without it."""
+        with self._lock:
+            self._garbage_blobs.setdefault(scope, set()).add(blob)
+
+    def _discard_key(self, scope: str, scope_data: dict[str, Any], key: str) -> None:
+        """Remove a key from loaded scope data, queueing its blob for deletion."""
+        scope_data["data"].pop(key, None)
+        meta = scope_data["metadata"].pop(key, None) or {}
+        if "blob" in meta:
+            self._discard_blob(scope, meta["blob"])
+
+    def _collect_garbage_blobs(self, scope: str, data: dict[str, Any]) -> None:
+        """Delete a scope's queued blobs after its file was written or removed.
+
+        Args:
+            scope: The scope identifier
+            data: The scope data just written (empty if the file was removed)
+        """
+        with self._lock:
+            garbage = self._garbage_blobs.pop(scope, None)
+        if not garbage:
+            return
+
+        # Never delete a blob the new contents still reference
+        garbage -= {meta.get("blob") for meta in data.get("metadata", {}).values()}
+        for blob in garbage:
+            blob_path = self._blob_path(blob)
+            try:
+                blob_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Failed to delete unreferenced blob %s: %s", blob_path, e)
+                continue
+            self._after_write(blob_path)
+
+    def gc_blobs(self, grace_seconds: float = _STALE_TEMP_SECONDS) -> int:
+        """Delete blob files no scope references, e.g. after a crash mid-write.
+
+        Blobs younger than ``grace_seconds`` are kept, since another process
+        may have written one whose scope file is not written yet.
+
+        Args:
+            grace_seconds: Minimum age of an unreferenced blob to delete it
+
+        Returns:
+            Number of blobs deleted
+
+        Raises:
+            StorageError: If the scopes or blobs cannot be listed
+        """
+        self.flush()
+        referenced = {
+            meta["blob"]
+            for scope in self._manifest.scopes()
+            for meta in self._load_scope_data(scope).get("metadata", {}).values()
+            if "blob" in meta
+        }
+
+        cutoff = time.time() - grace_seconds
+        deleted = 0
+        try:
+            for blob_path in self._blobs_path.glob("*/*"):
+                if blob_path.name.startswith(".") or blob_path.name in referenced:
+                    continue
+                if blob_path.stat().st_mtime < cutoff:
+                    blob_path.unlink(missing_ok=True)
+                    deleted += 1
+        except OSError as e:
+            raise StorageError(f"Failed to collect unreferenced blobs: {e}") from e
+        return deleted
+
+    @staticmethod
+    def _expired_keys(scope_data: dict[str, Any], now: float) -> set[str]:
+        """Get the keys of a scope whose TTL has passed.
+
+        Args:
+            scope_data: Loaded scope data
+            now: Current Unix time
+
+        Returns:
+            Set of expired keys (usually empty)
+        """
+        return {
+            key
+            for key, meta in scope_data.get("metadata", {}).items()
+            if "expires_at" in meta and meta["expires_at"] <= now
+        }
 
     def retrieve(self, scope: str, key: str) -> Any | None:
         """Retrieve a value from the specified scope and key."""
+        return self.retrieve_many(scope, [key])[key]
+
+    def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope with a single file read."""
         scope_data = self._load_scope_data(scope)
-        return scope_data.get("data", {}).get(key)
+        data = scope_data.get("data", {})
+        expired = self._expired_keys(scope_data, time.time())
+        # Only the requested keys are decoded (and copied, so callers can't
+        # mutate the cached scope data)
+        return {
+            key: (
+                self._decode_value(scope, key, scope_data)
+                if key in data and key not in expired
+                else None
+            )
+            for key in keys
+        }
+
+    def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern, each scope file at most once.
+
+        Scopes come from the manifest, and scope files unchanged since they
+        were last read are served from the cache after an ``os.stat``, so
+        repeated snapshots of mostly idle sessions read hardly any data.
+        """
+        snapshot: dict[str, dict[str, Any]] = {}
+        now = time.time()
+        for scope in self.list_scopes(pattern):
+            scope_data = self._load_scope_data(scope)
+            expired = self._expired_keys(scope_data, now)
+            live = [key for key in scope_data.get("data", {}) if key not in expired]
+            if not live:
+                continue
+            wanted = live if keys is None else [key for key in keys if key in live]
+            snapshot[scope] = {key: self._decode_value(scope, key, scope_data) for key in wanted}
+        return snapshot
 
     def delete(self, scope: str, key: str) -> bool:
         """Delete a specific key from a scope."""
-        scope_data = self._load_scope_data(scope)
+        return self.delete_many(scope, [key]) == 1
+
+    def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope with a single read-modify-write."""
+        with self._scope_lock(scope):
+            scope_data = self._load_scope_data_for_update(scope)
+
+            expired = self._expired_keys(scope_data, time.time())
+
+            # Delete the keys that exist and their metadata
+            deleted = 0
+            removed = False
+            for key in dict.fromkeys(keys):
+                if key in scope_data["data"]:
+                    self._discard_key(scope, scope_data, key)
+                    removed = True
+                    if key not in expired:
+                        deleted += 1
+
+            if not removed:
+                return 0
+
+            # If scope is now empty, delete the file
+            if not scope_data["data"]:
+                self._remove_scope_file(scope)
+            else:
+                # Save the updated scope data
+                self._write_scope_data(scope, scope_data)
+
+        return deleted
+
+    def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read-modify-write a scope under an exclusive file lock.
+
+        The scope is re-read (cache revalidated via ``os.stat``) after the lock
+        is acquired and written straight to disk before it is released, even
+        in write-behind mode.
+        """
+        with self._scope_lock(scope):
+            scope_data = self._load_scope_data_for_update(scope)
+            stored = scope_data["data"]
+            expired = self._expired_keys(scope_data, time.time())
+            # Expired keys are left out, so they are removed from the file below
+            before = {
+                k: self._decode_value(scope, k, scope_data) for k in stored if k not in expired
+            }
+            values = copy.deepcopy(before)
+            result = fn(values)
+
+            now = datetime.utcnow().isoformat()
+            changed = False
+            for key in list(stored):
+                if key not in values:
+                    self._discard_key(scope, scope_data, key)
+                    changed = True
+            for key, value in values.items():
+                if key in before and before[key] == value:
+                    continue
+                if key not in scope_data["metadata"]:
+                    scope_data["metadata"][key] = {"created_at": now}
+                scope_data["metadata"][key]["updated_at"] = now
+                scope_data["metadata"][key].pop("expires_at", None)
+                stored[key] = self._encode_value(scope, key, scope_data["metadata"][key], value)
+                changed = True
+
+            if changed:
+                if stored:
+                    self._save_scope_data(scope, scope_data)
+                else:
+                    self._unlink_scope_file(scope)
+                with self._lock:
+                    self._dirty.pop(scope, None)
+                self._changes.publish(scope)
+
+        return result
+
+    def _index_expiry(self, scope: str, keys: list[str], expires_at: float) -> None:
+        """Record expiring keys in the on-disk expiry index.
 
-        # Check if key exists
-        if "data" not in scope_data or key not in scope_data["data"]:
-            return False
+        The index is an append-only file of ``[expires_at, scope, key]`` lines
+        that ``sweep_expired`` loads into a min-heap. Appends hold a shared
+        lock so they never race with a sweep rewriting the file.
 
-        # Delete the key and its metadata
-        del scope_data["data"][key]
-        if "metadata" in scope_data and key in scope_data["metadata"]:
-            del scope_data["metadata"][key]
+        Args:
+            scope: The scope identifier
+            keys: Keys that were stored with a TTL
+            expires_at: Unix time at which they expire
 
-        # If scope is now empty, delete the file
-        if not scope_data.get("data"):
-            scope_path = self._get_scope_path(scope)
+        Raises:
+            StorageError: If the index cannot be written
+        """
+        lines = "".join(
+            json.dumps([expires_at, scope, key], ensure_ascii=False) + "\n" for key in keys
+        )
+        with self._expiry_index_lock(shared=True):
             try:
-                scope_path.unlink(missing_ok=True)
+                with open(self._expiry_index_path, "a", encoding="utf-8") as f:
+                    f.write(lines)
             except OSError as e:
-                raise StorageError(f"Failed to delete scope file {scope_path}: {e}") from e
-        else:
-            # Save the updated scope data
-            self._save_scope_data(scope, scope_data)
+                raise StorageError(f"Failed to update expiry index: {e}") from e
+
+    @property
+    def _expiry_index_path(self) -> Path:
+        """Path of the expiry index file."""
+        return self.base_path / ".index" / "expiry.jsonl"
 
-        return True
+    @contextmanager
+    def _expiry_index_lock(self, shared: bool) -> Iterator[None]:
+        """Hold a shared or exclusive lock on the expiry index.
+
+        Args:
+            shared: Take a shared (append) lock instead of an exclusive one
+
+        Raises:
+            StorageError: If the lock file cannot be opened
+        """
+        lock_path = self._expiry_index_path.with_suffix(".lock")
+        try:
+            lock_path.parent.mkdir(exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise StorageError(f"Failed to open lock file {lock_path}: {e}") from e
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed, using the on-disk expiry index.
+
+        Only scopes with due index entries are read. Entries made stale by a
+        later store (a new TTL, or none) are re-checked against the scope's
+        metadata and dropped.
+        """
+        if not self._expiry_index_path.exists():
+            return 0
+
+        with self._expiry_index_lock(shared=False):
+            try:
+                with open(self._expiry_index_path, encoding="utf-8") as f:
+                    heap = [tuple(json.loads(line)) for line in f if line.strip()]
+            except (OSError, json.JSONDecodeError) as e:
+                raise StorageError(f"Failed to read expiry index: {e}") from e
+
+            heapq.heapify(heap)
+            now = time.time()
+            due: dict[str, set[str]] = {}
+            while heap and heap[0][0] <= now:
+                _, scope, key = heapq.heappop(heap)
+                due.setdefault(scope, set()).add(key)
+
+            if not due:
+                return 0
+
+            removed = sum(self._purge_expired(scope, keys, now) for scope, keys in due.items())
+
+            tmp_path = self._expiry_index_path.with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for entry in sorted(heap):
+                        f.write(json.dumps(list(entry), ensure_ascii=False) + "\n")
+                os.replace(tmp_path, self._expiry_index_path)
+            except OSError as e:
+                raise StorageError(f"Failed to rewrite expiry index: {e}") from e
+
+        return removed
+
+    def _purge_expired(self, scope: str, keys: set[str], now: float) -> int:
+        """Delete the given keys from a scope if they are still expired.
+
+        Args:
+            scope: The scope identifier
+            keys: Candidate keys from the expiry index
+            now: Current Unix time
+
+        Returns:
+            Number of keys deleted
+        """
+        with self._scope_lock(scope):
+            scope_data = self._load_scope_data_for_update(scope)
+            expired = keys & self._expired_keys(scope_data, now)
+            for key in expired:
+                self._discard_key(scope, scope_data, key)
+
+            if expired:
+                if scope_data["data"]:
+                    self._save_scope_data(scope, scope_data)
+                else:
+                    self._unlink_scope_file(scope)
+                with self._lock:
+                    self._dirty.pop(scope, None)
+                self._changes.publish(scope)
+
+        return len(expired)
 
     def list_keys(self, scope: str) -> list[str]:
         """List all keys in a scope."""
         scope_data = self._load_scope_data(scope)
-        return list(scope_data.get("data", {}).keys())
+        expired = self._expired_keys(scope_data, time.time())
+        return [key for key in scope_data.get("data", {}) if key not in expired]
 
-    def list_scopes(self, pattern: str | None = None) -> list[str]:
-        """List all scopes, optionally filtered by pattern."""
+    def convert_format(self) -> int:
+        """Rewrite every scope file in this adapter's serialization format.
+
+        Files already in the configured format are left alone. Each scope is
+        converted under its exclusive lock, so this is safe while other
+        sessions keep using the directory.
+
+        Returns:
+            Number of scope files rewritten
+
+        Raises:
+            StorageError: If a scope file cannot be read or written
+        """
+        self.flush()
+
+        converted = 0
+        for scope in self._manifest.scopes():
+            with self._scope_lock(scope):
+                scope_path = self._existing_scope_path(scope)
+                try:
+                    raw = scope_path.read_bytes()
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    raise StorageError(f"Failed to read scope file {scope_path}: {e}") from e
+
+                data = self._decode(raw, scope_path)
+                if split_header(raw)[0] is self._format:
+                    continue
+                self._save_scope_data(scope, data)
+                converted += 1
+
+        return converted
+
+    def _scan(self) -> dict[str, ManifestEntry]:
+        """List the scope files on disk, for rebuilding a missing manifest.
+
+        Returns:
+            Manifest entries for every scope file in the storage directory
+
+        Raises:
+            StorageError: If the directory cannot be listed
+        """
         try:
-            # Get all .json files in the storage directory
-            scope_files = [f.name for f in self.base_path.glob("*.json")]
+            # Legacy flat-layout files first, so sharded files win on conflicts
+            scope_files = [
+                (self._filename_to_scope(path.name), path) for path in self.base_path.glob("*.json")
+            ]
+            scope_files += [
+                (self._path_to_scope(path), path)
+                for path in self._scopes_path.rglob("*.json")
+                if not path.name.startswith(".")
+            ]
         except OSError as e:
             raise StorageError(f"Failed to list scope files: {e}") from e
 
-        # Convert filenames back to scope identifiers
-        scopes = [self._filename_to_scope(f) for f in scope_files]
+        entries: dict[str, ManifestEntry] = {}
+        for scope, scope_file in scope_files:
+            try:
+                keys = len(self._decode(scope_file.read_bytes(), scope_file).get("data", {}))
+                stat = scope_file.stat()
+            except FileNotFoundError:
+                continue  # removed while scanning
+            except (OSError, StorageError) as e:
+                logger.warning("Skipping unreadable scope file %s: %s", scope_file, e)
+                continue
+            entries[scope] = {
+                "file": scope_file.relative_to(self.base_path).as_posix(),
+                "keys": keys,
+                "size": stat.st_size,
+                "updated_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+            }
+        return entries
+
+    def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern, from the scope manifest."""
+        scopes = set(self._manifest.scopes(pattern))
 
-        # Filter by pattern if provided
-        if pattern:
-            scopes = [s for s in scopes if fnmatch(s, pattern)]
+        # Overlay buffered writes that haven't reached the disk yet
+        with self._lock:
+            for scope, data in self._dirty.items():
+                if data is None:
+                    scopes.discard(scope)
+                elif not pattern or fnmatch(scope, pattern):
+                    scopes.add(scope)
 
         return sorted(scopes)
 
+    def scope_stats(self, pattern: str | None = None) -> dict[str, ManifestEntry]:
+        """Get the manifest entries of the scopes written to disk.
+
+        Statistics are updated on every write; those of existing scopes may
+        lag behind other processes until they flush or close their adapter.
+
+        Args:
+            pattern: Optional glob pattern to filter scopes
+
+        Returns:
+            Mapping of scope to its file (relative to ``base_path``), number of
+            keys, file size in bytes and last update time
+        """
+        return self._manifest.entries(pattern)
+
     def delete_scope(self, scope: str) -> bool:
         """Delete an entire scope and all its keys."""
-        scope_path = self._get_scope_path(scope)
-
-        if not scope_path.exists():
-            return False
+        with self._scope_lock(scope):
+            if not self._scope_exists(scope):
+                self._cache.invalidate(scope)
+                return False
 
-        try:
-            scope_path.unlink()
+            for meta in self._load_scope_data(scope).get("metadata", {}).values():
+                if "blob" in meta:
+                    self._discard_blob(scope, meta["blob"])
+            self._remove_scope_file(scope)
             return True
-        except OSError as e:
-            raise StorageError(f"Failed to delete scope file {scope_path}: {e}") from e
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, including changes by other processes.
+
+        Writes through this adapter are reported immediately. Scope files
+        written by other processes are detected with inotify (polling every
+        ``watch_poll_interval_ms`` where it is unavailable), which only runs
+        while there are subscribers.
+        """
+        return self._changes.subscribe(callback, pattern)
+
+    def _start_watcher(self) -> None:
+        """Start watching the storage directory (first subscriber arrived)."""
+        self._watcher.start()
+
+    def _stop_watcher(self) -> None:
+        """Stop watching the storage directory (last subscriber left)."""
+        self._watcher.stop()
+
+    def _on_file_changed(self, path: Path | None) -> None:
+        """Translate a changed file into a scope change notification."""
+        if path is None:
+            self._changes.publish(None)
+            return
+        if path.suffix != ".json":
+            return
+        if path.parent == self.base_path:
+            # Scope file in the legacy flat layout
+            self._changes.publish(self._filename_to_scope(path.name))
+        elif self._scopes_path in path.parents:
+            self._changes.publish(self._path_to_scope(path))
 
     def close(self) -> None:
         """Close the storage adapter and release resources.
 
-        For the local file adapter, there are no persistent connections or
-        resources to clean up, so this is a no-op.
+        Flushes buffered writes, runs a final group commit and stops the
+        background threads, then drops the read cache. There are no
+        persistent file handles to clean up.
         """
-        pass
+        self._changes.close()
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+        if self._syncer is not None:
+            self._stop_syncer.set()
+            self._syncer.join()
+            self._syncer = None
+        self.flush()
+        _write_behind_adapters.discard(self)
+        self._cache.clear()
@@ -0,0 +1,662 @@
+"""Append-only log-structured storage adapter for Claude Session Coordinator.
+
+This adapter appends every store/delete as a JSON line to a single segment
+file and keeps an in-memory index from (scope, key) to the byte range of the
+latest record. Writes cost O(value size) instead of O(scope size), a crash can
+at worst lose the record that was being appended, and superseded records are
+reclaimed by background compaction once they make up enough of the file.
+"""
+
+import errno
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, TypeVar
+
+from .base import StorageAdapter, StorageError
+from .local import DURABILITY_LEVELS, fsync_directory
+from .watch import ChangeHub
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# scope -> key -> (offset, length) of the latest "put" record
+LogIndex = dict[str, dict[str, tuple[int, int]]]
+
+# (scope, key) -> expiry Unix time of the latest "put" record, for keys with a TTL
+ExpiryIndex = dict[tuple[str, str], float]
+
+
+class LogStructuredAdapter(StorageAdapter):
+    """Storage adapter backed by an append-only segment file.
+
+    Records are newline-delimited JSON objects:
+
+        {"op": "put", "scope": ..., "key": ..., "value": ..., "ts": ..., "exp": ...}
+        {"op": "del", "scope": ..., "key": ...}
+        {"op": "drop", "scope": ...}
+
+    The segment is replayed on startup to rebuild the index; a torn record at
+    the end of the file (from a crash mid-append) is truncated away. When the
+    fraction of dead bytes exceeds ``compaction_threshold``, live records are
+    copied into a fresh segment in a background thread and atomically swapped
+    in with ``os.replace``.
+
+    ``durability`` works as for the local adapter: ``"none"`` leaves flushing
+    to the OS, ``"fsync"`` syncs the segment after every append, and
+    ``"group"`` syncs it every ``group_commit_ms`` from a background thread.
+    Unless it is ``"none"``, the directory is also synced after compaction
+    swaps in a new segment.
+
+    Values stored with a TTL carry their expiry time (``exp``) in the put
+    record; expiries are also kept in an in-memory min-heap that
+    ``sweep_expired`` pops from.
+
+    The segment is locked exclusively, so only one process may open a given
+    directory at a time; separate sessions share it through the coordinator
+    daemon.
+
+    Example:
+        >>> adapter = LogStructuredAdapter(base_path=".claude/session-log")
+        >>> adapter.store("laptop:org/repo:session:claude_1", "status", "active")
+    """
+
+    SEGMENT_NAME = "segment.log"
+
+    def __init__(
+        self,
+        base_path: str = ".claude/session-log",
+        compaction_threshold: float = 0.5,
+        compaction_min_bytes: int = 64 * 1024,
+        durability: str = "none",
+        group_commit_ms: int = 10,
+    ) -> None:
+        """Initialize the log-structured adapter.
+
+        Args:
+            base_path: Directory holding the segment file
+            compaction_threshold: Garbage ratio (0-1) that triggers compaction
+            compaction_min_bytes: Segment size below which compaction never runs
+            durability: When the segment is fsynced: "none", "fsync" (every
+                append) or "group" (batched in the background)
+            group_commit_ms: Interval between batched fsyncs in "group" mode
+
+        Raises:
+            StorageError: If the durability level is unknown, or the segment
+                cannot be opened or is in use by another process
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise StorageError(
+                f"Unknown durability level: '{durability}'. "
+                f"Available levels: {', '.join(DURABILITY_LEVELS)}"
+            )
+
+        self.base_path = Path(base_path).resolve()
+        self.segment_path = self.base_path / self.SEGMENT_NAME
+        self.compaction_threshold = compaction_threshold
+        self.compaction_min_bytes = compaction_min_bytes
+
+        self._index: LogIndex = {}
+        self._expires: ExpiryIndex = {}
+        self._expiry_heap: list[tuple[float, str, str]] = []
+        self._size = 0
+        self._live_bytes = 0
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self.durability = durability
+        self.group_commit_interval = group_commit_ms / 1000
+        # Whether records were appended since the last group commit
+        self._unsynced = False
+        self._stop_syncer = threading.Event()
+        self._syncer: threading.Thread | None = None
+        # The segment is locked by this process, so every change goes through here
+        self._changes = ChangeHub()
+
+        try:
+            self.base_path.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.segment_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise StorageError(f"Failed to open log segment {self.segment_path}: {e}") from e
+
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError as e:
+                os.close(self._fd)
+                raise StorageError(
+                    f"Log segment {self.segment_path} is in use by another process; "
+                    "run `claude-session-coordinator daemon` so that sessions share it"
+                ) from e
+
+        self._replay()
+
+        if durability == "group":
+            self._syncer = threading.Thread(
+                target=self._sync_periodically, name="csc-group-commit", daemon=True
+            )
+            self._syncer.start()
+
+    def _replay(self) -> None:
+        """Rebuild the index from the segment, truncating a torn final record."""
+        try:
+            with open(self._fd, "rb", closefd=False) as f:
+                f.seek(0)
+                contents = f.read()
+        except OSError as e:
+            raise StorageError(f"Failed to read log segment {self.segment_path}: {e}") from e
+
+        offset = 0
+        while offset < len(contents):
+            end = contents.find(b"\n", offset)
+            if end == -1:
+                break
+            length = end + 1 - offset
+            try:
+                record = json.loads(contents[offset:end])
+            except json.JSONDecodeError:
+                break
+            self._apply(self._index, record, offset, length, self._expires)
+            offset = end + 1
+
+        if offset < len(contents):
+            logger.warning(
+                "Truncating %d bytes of torn records from %s",
+                len(contents) - offset,
+                self.segment_path,
+            )
+            try:
+                os.ftruncate(self._fd, offset)
+            except OSError as e:
+                raise StorageError(f"Failed to repair log segment: {e}") from e
+
+        self._size = offset
+        self._live_bytes = sum(
+            length for keys in self._index.values() for _, length in keys.values()
+        )
+        self._expiry_heap = [(exp, scope, key) for (scope, key), exp in self._expires.items()]
+        heapq.heapify(self._expiry_heap)
+
+    @staticmethod
+    def _apply(
+        index: LogIndex,
+        record: dict[str, Any],
+        offset: int,
+        length: int,
+        expires: ExpiryIndex | None = None,
+    ) -> None:
+        """Apply one log record to an index.
+
+        Args:
+            index: Index to update in place
+            record: Parsed log record
+            offset: Byte offset of the record in its segment
+            length: Byte length of the record including the newline
+            expires: Expiry index to update in place, if any
+        """
+        op = record.get("op")
+        scope = record.get("scope", "")
+
+        if op == "put":
+            index.setdefault(scope, {})[record["key"]] = (offset, length)
+            if expires is not None:
+                if "exp" in record:
+                    expires[(scope, record["key"])] = record["exp"]
+                else:
+                    expires.pop((scope, record["key"]), None)
+        elif op == "del":
+            keys = index.get(scope)
+            if keys is not None:
+                keys.pop(record["key"], None)
+                if not keys:
+                    del index[scope]
+            if expires is not None:
+                expires.pop((scope, record["key"]), None)
+        elif op == "drop":
+            dropped = index.pop(scope, {})
+            if expires is not None:
+                for key in dropped:
+                    expires.pop((scope, key), None)
+
+    def _append(self, records: list[dict[str, Any]]) -> list[tuple[int, int]]:
+        """Append records to the segment with a single write (lock must be held).
+
+        Args:
+            records: Records to append, in order
+
+        Returns:
+            List of (offset, length) of each written record
+
+        Raises:
+            StorageError: If a record cannot be serialized or written
+        """
+        try:
+            lines = [
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+                for record in records
+            ]
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+
+        data = memoryview(b"".join(lines))
+        offset = self._size
+        try:
+            # pwrite may write less than asked for (e.g. on a full disk)
+            written = 0
+            while written < len(data):
+                count = os.pwrite(self._fd, data[written:], offset + written)
+                if count == 0:
+                    raise OSError(errno.EIO, "no bytes written")
+                written += count
+            if self.durability == "fsync":
+                os.fsync(self._fd)
+        except OSError as e:
+            # Drop any partial write so the next append starts on a record boundary
+            try:
+                os.ftruncate(self._fd, offset)
+            except OSError:
+                pass
+            raise StorageError(f"Failed to append to log segment {self.segment_path}: {e}") from e
+
+        if self.durability == "group":
+            self._unsynced = True
+
+        locations = []
+        for line in lines:
+            locations.append((self._size, len(line)))
+            self._size += len(line)
+        return locations
+
+    def sync(self) -> None:
+        """Fsync the segment if records were appended since the last group commit.
+
+        A no-op unless durability is "group"; writers are only blocked while
+        the segment descriptor is duplicated, not during the fsync itself.
+
+        Raises:
+            StorageError: If the segment cannot be synced
+        """
+        with self._lock:
+            if not self._unsynced or self._fd < 0:
+                return
+            self._unsynced = False
+            try:
+                fd = os.dup(self._fd)
+            except OSError as e:
+                self._unsynced = True
+                raise StorageError(f"Failed to sync log segment {self.segment_path}: {e}") from e
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            raise StorageError(f"Failed to sync log segment {self.segment_path}: {e}") from e
+        finally:
+            os.close(fd)
+
+    def _sync_periodically(self) -> None:
+        """Background loop running a group commit every interval."""
+        while not self._stop_syncer.wait(self.group_commit_interval):
+            try:
+                self.sync()
+            except StorageError as e:
+                logger.error("Group commit fsync failed: %s", e)
+
+    def _read_record(self, location: tuple[int, int]) -> dict[str, Any]:
+        """Read and parse the record at a given location (lock must be held)."""
+        offset, length = location
+        try:
+            raw = os.pread(self._fd, length, offset)
+            record: dict[str, Any] = json.loads(raw)
+            return record
+        except (OSError, json.JSONDecodeError) as e:
+            raise StorageError(f"Failed to read log record at offset {offset}: {e}") from e
+
+    def _drop_live(self, scope: str, key: str) -> None:
+        """Forget the live record for a key (lock must be held)."""
+        self._expires.pop((scope, key), None)
+        keys = self._index.get(scope)
+        if keys is None or key not in keys:
+            return
+        self._live_bytes -= keys.pop(key)[1]
+        if not keys:
+            del self._index[scope]
+
+    def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+        self.store_many(scope, {key: value}, ttl=ttl)
+
+    def store_many(self, scope: str, values: dict[str, Any], ttl: float | None = None) -> None:
+        """Store several keys in one scope with a single append."""
+        if not values:
+            return
+
+        now = datetime.utcnow().isoformat()
+        expires_at = None if ttl is None else time.time() + ttl
+        records = []
+        for key, value in values.items():
+            record = {"op": "put", "scope": scope, "key": key, "value": value, "ts": now}
+            if expires_at is not None:
+                record["exp"] = expires_at
+            records.append(record)
+
+        with self._lock:
+            locations = self._append(records)
+            for key, location in zip(values, locations, strict=True):
+                self._drop_live(scope, key)
+                self._index.setdefault(scope, {})[key] = location
+                self._live_bytes += location[1]
+                if expires_at is not None:
+                    self._expires[(scope, key)] = expires_at
+                    heapq.heappush(self._expiry_heap, (expires_at, scope, key))
+        self._changes.publish(scope)
+        self._maybe_compact()
+
+    def _is_expired(self, scope: str, key: str, now: float) -> bool:
+        """Check whether a key's TTL has passed (lock must be held)."""
+        expires_at = self._expires.get((scope, key))
+        return expires_at is not None and expires_at <= now
+
+    def _live_keys(self, scope: str) -> list[str]:
+        """Get the unexpired keys of a scope (lock must be held)."""
+        now = time.time()
+        return [key for key in self._index.get(scope, {}) if not self._is_expired(scope, key, now)]
+
+    def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+        return self.retrieve_many(scope, [key])[key]
+
+    def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope."""
+        result: dict[str, Any | None] = {}
+        now = time.time()
+        with self._lock:
+            locations = self._index.get(scope, {})
+            for key in keys:
+                location = locations.get(key)
+                if location is None or self._is_expired(scope, key, now):
+                    result[key] = None
+                else:
+                    result[key] = self._read_record(location)["value"]
+        return result
+
+    def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern under a single lock acquisition."""
+        snapshot: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for scope in self._index:
+                if pattern and not fnmatch(scope, pattern):
+                    continue
+                live = self._live_keys(scope)
+                if not live:
+                    continue
+                locations = self._index[scope]
+                wanted = live if keys is None else [key for key in keys if key in live]
+                snapshot[scope] = {
+                    key: self._read_record(locations[key])["value"] for key in wanted
+                }
+        return dict(sorted(snapshot.items()))
+
+    def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+        return self.delete_many(scope, [key]) == 1
+
+    def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope with a single append."""
+        now = time.time()
+        with self._lock:
+            existing = self._index.get(scope, {})
+            to_delete = [key for key in dict.fromkeys(keys) if key in existing]
+            if not to_delete:
+                return 0
+            # Expired keys are removed too, but don't count as deleted
+            deleted = sum(1 for key in to_delete if not self._is_expired(scope, key, now))
+            self._append([{"op": "del", "scope": scope, "key": key} for key in to_delete])
+            for key in to_delete:
+                self._drop_live(scope, key)
+        self._changes.publish(scope)
+        self._maybe_compact()
+        return deleted
+
+    def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read-modify-write a scope while holding the adapter lock."""
+        with self._lock:
+            now = time.time()
+            expired = [k for k in self._index.get(scope, {}) if self._is_expired(scope, k, now)]
+            if expired:
+                self.delete_many(scope, expired)
+            before = self.retrieve_many(scope, self._live_keys(scope))
+            values = dict(before)
+            result = fn(values)
+
+            changed = {k: v for k, v in values.items() if k not in before or before[k] != v}
+            removed = [k for k in before if k not in values]
+            if changed:
+                self.store_many(scope, changed)
+            if removed:
+                self.delete_many(scope, removed)
+        return result
+
+    def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed by popping the expiry min-heap.
+
+        Heap entries superseded by a later store or delete no longer match
+        the expiry index and are discarded.
+        """
+        now = time.time()
+        due: dict[str, list[str]] = {}
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, scope, key = heapq.heappop(self._expiry_heap)
+                if self._expires.get((scope, key)) == expires_at:
+                    due.setdefault(scope, []).append(key)
+
+            for scope, keys in due.items():
+                self.delete_many(scope, keys)
+
+        return sum(len(keys) for keys in due.values())
+
+    def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+        with self._lock:
+            return self._live_keys(scope)
+
+    def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern."""
+        with self._lock:
+            scopes = list(self._index.keys())
+
+        if pattern:
+            scopes = [s for s in scopes if fnmatch(s, pattern)]
+
+        return sorted(scopes)
+
+    def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+        with self._lock:
+            keys = self._index.get(scope)
+            if not keys:
+                return False
+            self._append([{"op": "drop", "scope": scope}])
+            self._live_bytes -= sum(length for _, length in keys.values())
+            for key in keys:
+                self._expires.pop((scope, key), None)
+            del self._index[scope]
+        self._changes.publish(scope)
+        self._maybe_compact()
+        return True
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change.
+
+        Only one process can open the segment, so the adapter's own writes
+        are all there is to report.
+        """
+        return self._changes.subscribe(callback, pattern)
+
+    def garbage_ratio(self) -> float:
+        """Get the fraction of the segment occupied by superseded records.
+
+        Returns:
+            Ratio between 0.0 (no garbage) and 1.0 (all garbage)
+        """
+        with self._lock:
+            if self._size == 0:
+                return 0.0
+            return 1.0 - self._live_bytes / self._size
+
+    def _needs_compaction(self) -> bool:
+        """Check whether the garbage threshold is crossed (lock must be held)."""
+        if self._size < self.compaction_min_bytes:
+            return False
+        return self.garbage_ratio() >= self.compaction_threshold
+
+    def _maybe_compact(self) -> None:
+        """Start background compaction if the garbage threshold is crossed."""
+        with self._lock:
+            if self._compactor is not None or not self._needs_compaction():
+                return
+            self._compactor = threading.Thread(
+                target=self._compact_in_background, name="csc-log-compaction", daemon=True
+            )
+            self._compactor.start()
+
+    def _compact_in_background(self) -> None:
+        """Compact until the garbage threshold is no longer crossed.
+
+        Writers don't start another compaction while this one runs, so
+        garbage appended in the meantime is reclaimed by running again.
+        Failures are logged instead of raised.
+        """
+        while True:
+            try:
+                self.compact()
+            except StorageError as e:
+                logger.error("Log compaction failed: %s", e)
+                with self._lock:
+                    self._compactor = None
+                return
+            with self._lock:
+                if not self._needs_compaction():
+                    self._compactor = None
+                    return
+
+    def compact(self) -> None:
+        """Rewrite the segment so it only contains live records.
+
+        Live records are copied without holding the adapter lock; records
+        appended meanwhile are replayed into the new segment under the lock
+        just before it is swapped in, so writers are only blocked briefly.
+        The new segment is always fsynced before the swap; the directory is
+        synced after it unless durability is "none".
+
+        Raises:
+            StorageError: If the new segment cannot be written or synced
+        """
+        with self._compact_lock:
+            with self._lock:
+                snapshot = sorted(
+                    location for keys in self._index.values() for location in keys.values()
+                )
+                copied_until = self._size
+
+            tmp_path = self.segment_path.with_suffix(".compact")
+            new_index: LogIndex = {}
+            try:
+                with open(tmp_path, "wb") as out:
+                    for location in snapshot:
+                        raw = os.pread(self._fd, location[1], location[0])
+                        self._apply(new_index, json.loads(raw), out.tell(), len(raw))
+                        out.write(raw)
+
+                    with self._lock:
+                        # Replay records appended while we were copying
+                        tail = os.pread(self._fd, self._size - copied_until, copied_until)
+                        for line in self._live_tail(tail.splitlines(keepends=True)):
+                            self._apply(new_index, json.loads(line), out.tell(), len(line))
+                            out.write(line)
+                        out.flush()
+                        os.fsync(out.fileno())
+
+                        new_fd = os.open(tmp_path, os.O_RDWR)
+                        if fcntl is not None:
+                            fcntl.flock(new_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.replace(tmp_path, self.segment_path)
+
+                        os.close(self._fd)
+                        self._fd = new_fd
+                        self._index = new_index
+                        self._size = out.tell()
+                        self._live_bytes = sum(
+                            length for keys in new_index.values() for _, length in keys.values()
+                        )
+                        # Everything in the new segment was fsynced above
+                        self._unsynced = False
+            except (OSError, json.JSONDecodeError) as e:
+                tmp_path.unlink(missing_ok=True)
+                raise StorageError(f"Failed to compact log segment: {e}") from e
+
+            if self.durability != "none":
+                fsync_directory(self.base_path)
+
+    @staticmethod
+    def _live_tail(lines: list[bytes]) -> list[bytes]:
+        """Drop superseded puts from records appended during compaction.
+
+        Delete and drop records are kept because they may refer to records
+        already copied into the new segment.
+
+        Args:
+            lines: Raw record lines in append order
+
+        Returns:
+            The lines that still need to be written, in order
+        """
+        records = [json.loads(line) for line in lines]
+        last_put: dict[tuple[str, str], int] = {}
+        for i, record in enumerate(records):
+            if record.get("op") == "put":
+                last_put[(record["scope"], record["key"])] = i
+            elif record.get("op") == "del":
+                last_put.pop((record["scope"], record["key"]), None)
+            elif record.get("op") == "drop":
+                for scope_key in [sk for sk in last_put if sk[0] == record["scope"]]:
+                    del last_put[scope_key]
+
+        live = set(last_put.values())
+        return [
+            line
+            for i, (line, record) in enumerate(zip(lines, records, strict=True))
+            if record.get("op") != "put" or i in live
+        ]
+
+    def close(self) -> None:
+        """Close the storage adapter and release the segment file."""
+        self._changes.close()
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        if self._syncer is not None:
+            self._stop_syncer.set()
+            self._syncer.join()
+            self._syncer = None
+            self.sync()
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
@@ -0,0 +1,579 @@
+"""On-disk scope manifest for file-backed adapters.
+
+Listing scopes by globbing the storage directory and decoding every filename
+gets slow once a project has thousands of session and issue scopes. The
+manifest maps each scope of a storage directory to its file and a few
+statistics, and answers ``list_scopes`` pattern queries from a prefix trie
+over the ``machine:project:type:id`` segments, so only the scopes under the
+literal part of a pattern are ever looked at.
+
+Changes to the set of scopes are appended to a journal immediately (under a
+file lock); statistics of existing scopes are only journaled in batches. The
+journal is folded into a JSON snapshot from time to time.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+from .base import StorageError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+MANIFEST_VERSION = 1
+
+# Scope -> {"file": ..., "keys": ..., "size": ..., "updated_at": ...}
+ManifestEntry = dict[str, Any]
+
+# Statistics updates buffered before they are journaled anyway
+_MAX_PENDING_STATS = 100
+
+# Journal records always allowed before compaction (more if there are more scopes)
+_MIN_COMPACT_RECORDS = 1000
+
+_GLOB_CHARS = "*?["
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Get the part of a glob pattern before its first wildcard.
+
+    Args:
+        pattern: fnmatch-style pattern
+
+    Returns:
+        The literal prefix every matching string must start with
+    """
+    for i, char in enumerate(pattern):
+        if char in _GLOB_CHARS:
+            return pattern[:i]
+    return pattern
+
+
+class _TrieNode:
+    """One scope segment in a ``ScopeTrie``."""
+
+    __slots__ = ("children", "scope")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # The full scope ending at this node, if any
+        self.scope: str | None = None
+
+
+class ScopeTrie:
+    """Prefix trie of scope identifiers split on ``:``.
+
+    Example:
+        >>> trie = ScopeTrie()
+        >>> trie.add("laptop:org/repo:session:claude_1")
+        >>> trie.add("laptop:org/repo:issue:42")
+        >>> trie.match("laptop:org/repo:session:*")
+        ['laptop:org/repo:session:claude_1']
+    """
+
+    def __init__(self, scopes: list[str] | None = None) -> None:
+        """Initialize the trie.
+
+        Args:
+            scopes: Scopes to add initially
+        """
+        self._root = _TrieNode()
+        self._size = 0
+        for scope in scopes or []:
+            self.add(scope)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, scope: str) -> None:
+        """Add a scope (no-op if already present)."""
+        node = self._root
+        for segment in scope.split(":"):
+            node = node.children.setdefault(segment, _TrieNode())
+        if node.scope is None:
+            node.scope = scope
+            self._size += 1
+
+    def discard(self, scope: str) -> None:
+        """Remove a scope if present, pruning nodes that become empty."""
+        path = [self._root]
+        segments = scope.split(":")
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+
+        if path[-1].scope is None:
+            return
+        path[-1].scope = None
+        self._size -= 1
+
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.children or node.scope is not None:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def _collect(self, node: _TrieNode) -> Iterator[str]:
+        """Yield every scope at or below a node."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.scope is not None:
+                yield current.scope
+            stack.extend(current.children.values())
+
+    def match(self, pattern: str | None = None) -> list[str]:
+        """Find the scopes matching an fnmatch-style pattern.
+
+        Leading literal segments of the pattern are followed through the
+        trie; only scopes below the first segment with a wildcard are matched
+        against the full pattern. A ``*`` may still match across ``:``.
+
+        Args:
+            pattern: Glob pattern (e.g., "laptop:org/repo:session:*"), or None for all
+
+        Returns:
+            Sorted list of matching scopes
+        """
+        if not pattern:
+            return sorted(self._collect(self._root))
+
+        node = self._root
+        for segment in pattern.split(":"):
+            prefix = _literal_prefix(segment)
+            if prefix != segment:
+                # Wildcards from here on: check each candidate against the full pattern
+                candidates = [
+                    scope
+                    for name, child in node.children.items()
+                    if name.startswith(prefix)
+                    for scope in self._collect(child)
+                ]
+                return sorted(scope for scope in candidates if fnmatch(scope, pattern))
+
+            child = node.children.get(segment)
+            if child is None:
+                return []
+            node = child
+
+        return [node.scope] if node.scope is not None else []
+
+
+class ScopeManifest:
+    """Persistent index of the scopes stored in a directory.
+
+    The index lives in two files: a JSON snapshot (``manifest.json``) and an
+    append-only journal next to it (``manifest.journal``) holding one JSON
+    line per change since the snapshot was written. Both are loaded once;
+    after that only the journal lines other processes appended are read, so
+    a change costs one small append and a lookup one ``os.stat``. Once the
+    journal has more lines than the snapshot has scopes, the snapshot is
+    rewritten and the journal started over (compaction), keeping the cost of
+    a change constant however many scopes there are.
+
+    When the snapshot is missing (a new directory, or one written by an older
+    version) the index is rebuilt with the ``scan`` callback.
+
+    Callers must hold the scope's lock while recording a change, so changes
+    to one scope reach the journal in the same order as its file.
+
+    Example:
+        >>> manifest = ScopeManifest(Path(".claude/session-state/.index/manifest.json"), scan)
+        >>> manifest.record("laptop:org/repo:session:claude_1", "x.json", keys=2, size=120)
+        >>> manifest.scopes("laptop:org/repo:session:*")
+        ['laptop:org/repo:session:claude_1']
+    """
+
+    def __init__(self, path: Path, scan: Callable[[], dict[str, ManifestEntry]]) -> None:
+        """Initialize the manifest.
+
+        Args:
+            path: Path of the manifest snapshot (the journal is stored next to it)
+            scan: Callback listing the scopes actually on disk, used to
+                rebuild a missing manifest
+        """
+        self.path = path
+        self.journal_path = path.with_suffix(".journal")
+        self._scan = scan
+        self._entries: dict[str, ManifestEntry] = {}
+        self._trie = ScopeTrie()
+        self._loaded = False
+        # Identity of the journal file read so far, and how much of it was applied
+        self._journal_id: tuple[int, int] | None = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        # Statistics of existing scopes not yet written to the journal
+        self._pending_stats: dict[str, ManifestEntry] = {}
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the manifest across processes.
+
+        Raises:
+            StorageError: If the lock file cannot be opened
+        """
+        lock_path = self.path.with_suffix(".lock")
+        try:
+            lock_path.parent.mkdir(exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise StorageError(f"Failed to open lock file {lock_path}: {e}") from e
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply one journal record to the in-memory index."""
+        scope = record.get("scope")
+        if not isinstance(scope, str):
+            return
+        if record.get("op") == "del":
+            self._entries.pop(scope, None)
+            self._pending_stats.pop(scope, None)
+            self._trie.discard(scope)
+        elif isinstance(record.get("entry"), dict):
+            pending = self._pending_stats.get(scope)
+            if pending is not None and pending["file"] != record["entry"].get("file"):
+                # The scope moved to another file; our statistics are for the old one
+                del self._pending_stats[scope]
+                pending = None
+            self._entries[scope] = pending or record["entry"]
+            self._trie.add(scope)
+
+    def _apply_lines(self, data: bytes) -> int:
+        """Apply the complete journal lines in a chunk read from the journal.
+
+        Lines that are not valid JSON (left by a write that crashed) are skipped.
+
+        Returns:
+            Number of bytes consumed (up to and including the last newline)
+        """
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                self._apply(record)
+                self._journal_records += 1
+        return end
+
+    def _read_snapshot(self) -> dict[str, ManifestEntry] | None:
+        """Read the scopes from the snapshot file.
+
+        Returns:
+            The snapshot's entries, or None if the file does not exist
+
+        Raises:
+            StorageError: If the file cannot be read or parsed
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            raise StorageError(f"Failed to read scope manifest {self.path}: {e}") from e
+        return dict(document.get("scopes", {}))
+
+    def _write_snapshot(self) -> None:
+        """Write the in-memory entries to the snapshot file (file lock held).
+
+        Raises:
+            StorageError: If the file cannot be written
+        """
+        tmp_path: str | None = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "scopes": self._entries}, f, ensure_ascii=False
+                )
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+        except OSError as e:
+            raise StorageError(f"Failed to write scope manifest {self.path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def _reset_journal(self) -> None:
+        """Replace the journal with an empty one (file lock held, snapshot up to date).
+
+        Other processes notice the new file and reload the snapshot.
+
+        Raises:
+            StorageError: If the journal cannot be created
+        """
+        tmp_path: str | None = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.journal_path.name}.", suffix=".tmp"
+            )
+            stat = os.fstat(fd)
+            os.close(fd)
+            os.replace(tmp_path, self.journal_path)
+            tmp_path = None
+        except OSError as e:
+            raise StorageError(f"Failed to reset manifest journal {self.journal_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+        self._journal_id = (stat.st_dev, stat.st_ino)
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._pending_stats.clear()
+
+    def _load(self) -> None:
+        """Load the snapshot and the whole journal (file lock held).
+
+        A missing snapshot is rebuilt from the files on disk; a missing
+        journal is created, so that a later compaction is always noticed.
+
+        Raises:
+            StorageError: If the files cannot be read or written
+        """
+        entries = self._read_snapshot()
+        rebuilt = entries is None
+        if entries is None:
+            entries = self._scan()
+
+        # Keep our unwritten statistics for scopes that still exist
+        pending = self._pending_stats
+        self._entries = entries
+        self._trie = ScopeTrie(list(entries))
+        self._pending_stats = {}
+        self._loaded = True
+
+        if rebuilt:
+            self._write_snapshot()
+            self._reset_journal()
+        else:
+            try:
+                with open(self.journal_path, "rb") as f:
+                    stat = os.fstat(f.fileno())
+                    data = f.read()
+            except FileNotFoundError:
+                self._reset_journal()
+            except OSError as e:
+                raise StorageError(
+                    f"Failed to read manifest journal {self.journal_path}: {e}"
+                ) from e
+            else:
+                self._journal_id = (stat.st_dev, stat.st_ino)
+                self._journal_records = 0
+                self._journal_offset = self._apply_lines(data)
+
+        for scope, stats in pending.items():
+            if scope in self._entries and self._entries[scope]["file"] == stats["file"]:
+                self._entries[scope] = stats
+                self._pending_stats[scope] = stats
+
+    def _catch_up(self) -> bool:
+        """Apply the journal lines appended since the last call.
+
+        Returns:
+            False if the snapshot must be reloaded instead (not loaded yet, or
+            the journal was compacted or removed)
+
+        Raises:
+            StorageError: If the journal cannot be read
+        """
+        if not self._loaded:
+            return False
+        try:
+            with open(self.journal_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if (stat.st_dev, stat.st_ino) != self._journal_id:
+                    return False
+                if stat.st_size > self._journal_offset:
+                    f.seek(self._journal_offset)
+                    self._journal_offset += self._apply_lines(f.read())
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            raise StorageError(f"Failed to read manifest journal {self.journal_path}: {e}") from e
+        return True
+
+    def _refresh(self) -> None:
+        """Apply the changes other processes made since the last call.
+
+        Usually only new journal lines are read; the snapshot is reloaded
+        (under the file lock) if the journal was compacted.
+        """
+        if not self._catch_up():
+            with self._file_lock():
+                self._load()
+
+    def _sync(self) -> None:
+        """Like ``_refresh``, for callers already holding the file lock."""
+        if not self._catch_up():
+            self._load()
+
+    def _append(self, records: list[dict[str, Any]]) -> None:
+        """Append records to the journal and apply them (file lock held).
+
+        Lines other processes appended first are applied before ours. The
+        manifest is compacted once the journal outgrows the snapshot.
+
+        Raises:
+            StorageError: If the journal cannot be written
+        """
+        self._sync()
+        if not records:
+            return
+        try:
+            fd = os.open(self.journal_path, os.O_RDWR | os.O_APPEND)
+        except OSError as e:
+            raise StorageError(f"Failed to open manifest journal {self.journal_path}: {e}") from e
+
+        try:
+            size = os.fstat(fd).st_size
+            data = "".join(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for record in records
+            ).encode()
+            if size > self._journal_offset:
+                # A torn line from a crashed writer (we hold the lock): end it first
+                data = b"\n" + data
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            self._journal_offset = size + len(data)
+        except OSError as e:
+            raise StorageError(f"Failed to write manifest journal {self.journal_path}: {e}") from e
+        finally:
+            os.close(fd)
+
+        for record in records:
+            self._apply(record)
+        self._journal_records += len(records)
+
+        if self._journal_records > max(_MIN_COMPACT_RECORDS, len(self._entries)):
+            self._write_snapshot()
+            self._reset_journal()
+
+    def _commit(self, scope: str, entry: ManifestEntry | None) -> None:
+        """Journal a change to the set of scopes.
+
+        Args:
+            scope: The scope identifier
+            entry: New entry, or None if the scope was removed
+        """
+        with self._file_lock():
+            if entry is not None:
+                self._pending_stats.pop(scope, None)
+                self._append([{"op": "set", "scope": scope, "entry": entry}])
+                return
+            self._sync()
+            if scope in self._entries:
+                self._append([{"op": "del", "scope": scope}])
+
+    def record(self, scope: str, file: str, keys: int, size: int) -> None:
+        """Record that a scope file was written.
+
+        New scopes are journaled right away; statistics of existing scopes
+        are buffered and journaled in batches.
+
+        Args:
+            scope: The scope identifier
+            file: Scope file path, relative to the storage directory
+            keys: Number of keys in the scope
+            size: Size of the scope file in bytes
+        """
+        entry = {
+            "file": file,
+            "keys": keys,
+            "size": size,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            if not self._loaded:
+                self._refresh()
+            if scope not in self._entries or self._entries[scope]["file"] != file:
+                self._commit(scope, entry)
+                return
+
+            self._entries[scope] = entry
+            self._pending_stats[scope] = entry
+            if len(self._pending_stats) >= _MAX_PENDING_STATS:
+                self.flush()
+
+    def remove(self, scope: str) -> None:
+        """Record that a scope file was deleted.
+
+        Args:
+            scope: The scope identifier
+        """
+        with self._lock:
+            self._pending_stats.pop(scope, None)
+            self._commit(scope, None)
+
+    def scopes(self, pattern: str | None = None) -> list[str]:
+        """List the scopes in the manifest.
+
+        Args:
+            pattern: Optional glob pattern to filter scopes
+
+        Returns:
+            Sorted list of matching scopes
+        """
+        with self._lock:
+            self._refresh()
+            return self._trie.match(pattern)
+
+    def entries(self, pattern: str | None = None) -> dict[str, ManifestEntry]:
+        """Get the manifest entries of the scopes matching a pattern.
+
+        Args:
+            pattern: Optional glob pattern to filter scopes
+
+        Returns:
+            Mapping of scope to a copy of its entry
+        """
+        with self._lock:
+            self._refresh()
+            return {scope: dict(self._entries[scope]) for scope in self._trie.match(pattern)}
+
+    def flush(self) -> None:
+        """Journal buffered scope statistics.
+
+        Raises:
+            StorageError: If the journal cannot be written
+        """
+        with self._lock:
+            if not self._pending_stats:
+                return
+            with self._file_lock():
+                # Scopes deleted by other processes drop out while catching up
+                self._sync()
+                pending, self._pending_stats = self._pending_stats, {}
+                self._append(
+                    [
+                        {"op": "set", "scope": scope, "entry": stats}
+                        for scope, stats in pending.items()
+                        if scope in self._entries
+                    ]
+                )
@@ -0,0 +1,568 @@
+"""Redis storage adapter for Claude Session Coordinator.
+
+This adapter stores each scope as a Redis hash, which makes the coordinator
+usable across machines and by whole teams. It requires the optional ``redis``
+dependency (``pip install claude-session-coordinator[redis]``).
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from fnmatch import fnmatch
+from typing import Any, TypeVar, cast
+
+from .base import StorageAdapter, StorageError
+from .compression import DEFAULT_THRESHOLD, MARKER, ValueCompressor, decompress, pack, unpack
+from .watch import ChangeHub
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - exercised only without the extra
+    redis = None  # type: ignore[assignment]
+
+# Connection pools shared by every adapter using the same URL, with refcounts
+_pools: dict[tuple[str, int], "redis.ConnectionPool"] = {}
+_pool_refs: dict[tuple[str, int], int] = {}
+_pools_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+_GLOB_CHARS = "*?["
+
+T = TypeVar("T")
+
+
+def _acquire_pool(url: str, max_connections: int) -> "redis.ConnectionPool":
+    """Get (or create) the shared connection pool for a URL.
+
+    Args:
+        url: Redis connection URL
+        max_connections: Maximum number of connections in the pool
+
+    Returns:
+        The shared ConnectionPool
+    """
+    key = (url, max_connections)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+            _pool_refs[key] = 0
+        _pool_refs[key] += 1
+        return _pools[key]
+
+
+def _release_pool(url: str, max_connections: int) -> None:
+    """Drop a reference to a shared pool, disconnecting it when unused."""
+    key = (url, max_connections)
+    with _pools_lock:
+        if key not in _pools:
+            return
+        _pool_refs[key] -= 1
+        if _pool_refs[key] <= 0:
+            _pools.pop(key).disconnect()
+            del _pool_refs[key]
+
+
+def _escape_redis_glob(text: str) -> str:
+    """Escape characters that are special in Redis MATCH patterns."""
+    return "".join("\\" + char if char in "*?[]\\" else char for char in text)
+
+
+class RedisAdapter(StorageAdapter):
+    """Storage adapter backed by Redis hashes.
+
+    Layout (with the default ``csc:`` key prefix):
+
+        csc:scope:{scope}  - hash of key -> JSON-encoded value
+        csc:ttl:{scope}    - hash of key -> expiry Unix time, for keys with a TTL
+        csc:scopes         - set of all non-empty scopes (the scope index)
+        csc:expiry         - sorted set of [scope, key] by expiry time
+
+    Multi-key operations are sent as a single pipeline, and ``list_scopes``
+    walks the scope index with ``SSCAN`` instead of running ``KEYS`` over the
+    whole keyspace. Expired values read as missing and are deleted by
+    ``sweep_expired``, which pops due members from the ``expiry`` sorted set.
+    Adapters created with the same URL share one ``ConnectionPool``.
+
+    Example:
+        >>> adapter = RedisAdapter(url="redis://localhost:6379/0")
+        >>> adapter.store("laptop:org/repo:session:claude_1", "status", "active")
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "csc:",
+        max_connections: int = 16,
+        client: "redis.Redis | None" = None,
+        compression: str | None = None,
+        compression_threshold: int = DEFAULT_THRESHOLD,
+        enable_keyspace_events: bool = False,
+    ) -> None:
+        """Initialize the Redis adapter.
+
+        Args:
+            url: Redis connection URL
+            key_prefix: Prefix for every Redis key written by the adapter
+            max_connections: Size of the shared connection pool
+            client: Pre-built client to use instead of the shared pool (e.g. for tests)
+            compression: Compress large values with "zlib" or "zstd" (None disables it)
+            compression_threshold: Minimum JSON size in bytes of a value to compress it
+            enable_keyspace_events: Turn on the server's keyspace notifications
+                (``CONFIG SET notify-keyspace-events``) if they are off when
+                watching starts; this changes the setting for every client of the server
+
+        Raises:
+            StorageError: If the redis package or the compression codec is unavailable
+        """
+        if redis is None and client is None:
+            raise StorageError(
+                "The Redis adapter requires the 'redis' package: "
+                "pip install claude-session-coordinator[redis]"
+            )
+
+        self.url = url
+        self.key_prefix = key_prefix
+        self.max_connections = max_connections
+        self.enable_keyspace_events = enable_keyspace_events
+        self._owns_pool = client is None
+        self._compressor = (
+            ValueCompressor(compression, compression_threshold) if compression else None
+        )
+
+        if client is None:
+            client = redis.Redis(connection_pool=_acquire_pool(url, max_connections))
+        self._client = client
+        self._index_key = f"{key_prefix}scopes"
+        self._expiry_key = f"{key_prefix}expiry"
+        self._changes = ChangeHub(self._start_listener, self._stop_listener)
+        self._listener: Any = None
+
+    def _scope_key(self, scope: str) -> str:
+        """Get the Redis key of a scope's hash."""
+        return f"{self.key_prefix}scope:{scope}"
+
+    def _ttl_key(self, scope: str) -> str:
+        """Get the Redis key of a scope's expiry-time hash."""
+        return f"{self.key_prefix}ttl:{scope}"
+
+    @staticmethod
+    def _expiry_member(scope: str, key: str) -> str:
+        """Get the expiry sorted-set member of a key."""
+        return json.dumps([scope, key], ensure_ascii=False)
+
+    @staticmethod
+    def _expired(raw_expires_at: bytes | str | None, now: float) -> bool:
+        """Check whether a stored expiry time has passed."""
+        return raw_expires_at is not None and float(raw_expires_at) <= now
+
+    @staticmethod
+    def _text(raw: bytes | str) -> str:
+        """Decode a hash field name."""
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    def _run(self, operation: Callable[[], Any]) -> Any:
+        """Run a Redis operation, translating client errors.
+
+        Args:
+            operation: Callable performing the Redis calls
+
+        Returns:
+            The operation's result
+
+        Raises:
+            StorageError: If Redis reports an error or is unreachable
+        """
+        try:
+            return operation()
+        except redis.RedisError as e:
+            raise StorageError(f"Redis operation failed: {e}") from e
+
+    def _transaction(self, fn: Callable[["redis.client.Pipeline"], T], *watches: str) -> T:
+        """Run ``fn`` in a WATCH/MULTI transaction on ``watches`` and return its result."""
+        # redis-py types the callable as returning None, but value_from_callable returns it
+        func = cast(Callable[["redis.client.Pipeline"], None], fn)
+        return cast(
+            T,
+            self._run(lambda: self._client.transaction(func, *watches, value_from_callable=True)),
+        )
+
+    def _encode(self, value: Any) -> str | bytes:
+        """Serialize a value to JSON text, compressing it if it is large.
+
+        Compressed values are framed by ``compression.pack``, so they start
+        with a byte JSON text never starts with.
+        """
+        try:
+            text = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+
+        if self._compressor is not None:
+            compressed = self._compressor.compress(text.encode("utf-8"))
+            if compressed is not None:
+                return pack(self._compressor.codec, compressed)
+        return text
+
+    @staticmethod
+    def _decode(raw: bytes | str | None) -> Any | None:
+        """Deserialize a stored value, decompressing it if needed."""
+        if raw is None:
+            return None
+        if isinstance(raw, bytes) and raw.startswith(MARKER):
+            try:
+                return decompress(*unpack(raw))
+            except ValueError as e:
+                raise StorageError(f"Invalid compressed value: {e}") from e
+        return json.loads(raw)
+
+    def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+        self.store_many(scope, {key: value}, ttl=ttl)
+
+    def store_many(self, scope: str, values: dict[str, Any], ttl: float | None = None) -> None:
+        """Store several keys in one scope with a single pipelined transaction."""
+        if not values:
+            return
+
+        # Any keys: redis-py's hset field type differs between client versions
+        mapping: dict[Any, str | bytes] = {
+            key: self._encode(value) for key, value in values.items()
+        }
+        members = [self._expiry_member(scope, key) for key in values]
+        expires_at = None if ttl is None else time.time() + ttl
+
+        def operation() -> None:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.hset(self._scope_key(scope), mapping=mapping)
+            if expires_at is None:
+                pipe.hdel(self._ttl_key(scope), *values)
+                pipe.zrem(self._expiry_key, *members)
+            else:
+                pipe.hset(self._ttl_key(scope), mapping=dict.fromkeys(values, expires_at))
+                pipe.zadd(self._expiry_key, dict.fromkeys(members, expires_at))
+            pipe.sadd(self._index_key, scope)
+            pipe.execute()
+
+        self._run(operation)
+        self._changes.publish(scope)
+
+    def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+        return self.retrieve_many(scope, [key])[key]
+
+    def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope with a single pipelined HMGET."""
+        if not keys:
+            return {}
+
+        def operation() -> list[Any]:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.hmget(self._scope_key(scope), keys)
+            pipe.hmget(self._ttl_key(scope), keys)
+            return cast(list[Any], pipe.execute())
+
+        raw_values, raw_expiries = self._run(operation)
+        now = time.time()
+        return {
+            key: None if self._expired(expires_at, now) else self._decode(raw)
+            for key, raw, expires_at in zip(keys, raw_values, raw_expiries, strict=True)
+        }
+
+    def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern with one pipelined round trip.
+
+        The scopes are found with ``list_scopes``; their hashes (or just the
+        requested fields) and expiry times are then fetched in one pipeline.
+        """
+        scopes = self.list_scopes(pattern)
+        if not scopes:
+            return {}
+
+        def operation() -> list[Any]:
+            pipe = self._client.pipeline(transaction=False)
+            for scope in scopes:
+                if keys is None:
+                    pipe.hgetall(self._scope_key(scope))
+                else:
+                    pipe.hkeys(self._scope_key(scope))
+                    if keys:
+                        pipe.hmget(self._scope_key(scope), keys)
+                pipe.hgetall(self._ttl_key(scope))
+            return cast(list[Any], pipe.execute())
+
+        replies = iter(self._run(operation))
+        now = time.time()
+        snapshot: dict[str, dict[str, Any]] = {}
+        for scope in scopes:
+            if keys is None:
+                raw = {self._text(k): v for k, v in next(replies).items()}
+            else:
+                present = {self._text(k) for k in next(replies)}
+                fetched = next(replies) if keys else []
+                raw = {self._text(k): None for k in present}
+                raw.update({k: v for k, v in zip(keys, fetched) if v is not None})
+            expiries = {self._text(k): v for k, v in next(replies).items()}
+
+            live = {k: v for k, v in raw.items() if not self._expired(expiries.get(k), now)}
+            if not live:
+                continue
+            wanted = live if keys is None else [key for key in keys if key in live]
+            snapshot[scope] = {key: self._decode(live[key]) for key in wanted}
+        return snapshot
+
+    def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+        return self.delete_many(scope, [key]) == 1
+
+    def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys, dropping the scope from the index if it empties.
+
+        Runs as a WATCH/MULTI transaction on the scope hash so a concurrent
+        store can't be lost from the scope index. Expired keys are removed
+        too, but don't count as deleted.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return 0
+
+        scope_key = self._scope_key(scope)
+        ttl_key = self._ttl_key(scope)
+
+        def transaction(pipe: "redis.client.Pipeline") -> int:
+            existing = pipe.hmget(scope_key, unique_keys)
+            expiries = pipe.hmget(ttl_key, unique_keys)
+            present = sum(1 for raw in existing if raw is not None)
+            remaining = pipe.hlen(scope_key) - present
+            now = time.time()
+            deleted = sum(
+                1
+                for raw, expires_at in zip(existing, expiries, strict=True)
+                if raw is not None and not self._expired(expires_at, now)
+            )
+
+            pipe.multi()
+            if present:
+                pipe.hdel(scope_key, *unique_keys)
+                pipe.hdel(ttl_key, *unique_keys)
+                pipe.zrem(self._expiry_key, *(self._expiry_member(scope, k) for k in unique_keys))
+            if remaining <= 0:
+                pipe.srem(self._index_key, scope)
+            return deleted
+
+        deleted = self._transaction(transaction, scope_key, ttl_key)
+        self._changes.publish(scope)
+        return deleted
+
+    def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read-modify-write a scope with optimistic locking.
+
+        The scope hash is WATCHed while it is read and ``fn`` runs; if another
+        client modifies it before EXEC, the whole cycle is retried, so ``fn``
+        may be called more than once and must not have side effects.
+        """
+        scope_key = self._scope_key(scope)
+        ttl_key = self._ttl_key(scope)
+
+        def transaction(pipe: "redis.client.Pipeline") -> T:
+            raw = {self._text(k): v for k, v in pipe.hgetall(scope_key).items()}
+            expiries = {self._text(k): v for k, v in pipe.hgetall(ttl_key).items()}
+            now = time.time()
+            # Expired keys are left out, so they are removed below
+            before = {
+                k: self._decode(v)
+                for k, v in raw.items()
+                if not self._expired(expiries.get(k), now)
+            }
+            # Deep copy, so values changed in place still differ from before
+            values = copy.deepcopy(before)
+            result = fn(values)
+
+            changed: dict[Any, str | bytes] = {
+                k: self._encode(v) for k, v in values.items() if k not in before or before[k] != v
+            }
+            removed = [k for k in raw if k not in values]
+            untimed = [k for k in [*changed, *removed] if k in expiries]
+
+            pipe.multi()
+            if changed:
+                pipe.hset(scope_key, mapping=changed)
+            if removed:
+                pipe.hdel(scope_key, *removed)
+            if untimed:
+                pipe.hdel(ttl_key, *untimed)
+                pipe.zrem(self._expiry_key, *(self._expiry_member(scope, k) for k in untimed))
+            if values:
+                pipe.sadd(self._index_key, scope)
+            else:
+                pipe.srem(self._index_key, scope)
+            return result
+
+        result = self._transaction(transaction, scope_key, ttl_key)
+        self._changes.publish(scope)
+        return result
+
+    def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed, popping due members of the expiry set."""
+        now = time.time()
+        members = self._run(lambda: self._client.zrangebyscore(self._expiry_key, "-inf", now))
+
+        removed = 0
+        for member in members:
+            scope, key = json.loads(member)
+            removed += self._purge_expired(scope, key, member, now)
+        return removed
+
+    def _purge_expired(self, scope: str, key: str, member: bytes | str, now: float) -> int:
+        """Delete one key if it is still expired, in a WATCH/MULTI transaction.
+
+        Returns:
+            1 if the key was deleted, 0 if it had been renewed or removed meanwhile
+        """
+        scope_key = self._scope_key(scope)
+        ttl_key = self._ttl_key(scope)
+
+        def transaction(pipe: "redis.client.Pipeline") -> int:
+            expires_at = pipe.hget(ttl_key, key)
+            expired = self._expired(expires_at, now)
+            remaining = pipe.hlen(scope_key) - (1 if expired else 0)
+
+            pipe.multi()
+            if expired:
+                pipe.hdel(scope_key, key)
+                pipe.hdel(ttl_key, key)
+                if remaining <= 0:
+                    pipe.srem(self._index_key, scope)
+            if expires_at is None or expired:
+                pipe.zrem(self._expiry_key, member)
+            return 1 if expired else 0
+
+        purged = self._transaction(transaction, scope_key, ttl_key)
+        if purged:
+            self._changes.publish(scope)
+        return purged
+
+    def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+
+        def operation() -> list[Any]:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.hkeys(self._scope_key(scope))
+            pipe.hgetall(self._ttl_key(scope))
+            return cast(list[Any], pipe.execute())
+
+        raw_keys, raw_expiries = self._run(operation)
+        expiries = {self._text(k): v for k, v in raw_expiries.items()}
+        now = time.time()
+        keys = [self._text(k) for k in raw_keys]
+        return [k for k in keys if not self._expired(expiries.get(k), now)]
+
+    def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern.
+
+        The literal prefix of the pattern is pushed down to ``SSCAN MATCH``;
+        the full pattern is then applied with ``fnmatch``.
+        """
+        match = None
+        if pattern:
+            prefix = pattern
+            for i, char in enumerate(pattern):
+                if char in _GLOB_CHARS:
+                    prefix = pattern[:i]
+                    break
+            match = _escape_redis_glob(prefix) + "*"
+
+        raw_scopes = self._run(
+            lambda: list(self._client.sscan_iter(self._index_key, match=match, count=1000))
+        )
+        scopes = [self._text(s) for s in raw_scopes]
+
+        if pattern:
+            scopes = [s for s in scopes if fnmatch(s, pattern)]
+
+        return sorted(scopes)
+
+    def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+
+        def operation() -> bool:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.delete(self._scope_key(scope))
+            pipe.delete(self._ttl_key(scope))
+            pipe.srem(self._index_key, scope)
+            deleted, _, _ = pipe.execute()
+            return bool(deleted)
+
+        deleted = bool(self._run(operation))
+        if deleted:
+            self._changes.publish(scope)
+        return deleted
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, including changes by other clients.
+
+        Writes through this adapter are reported immediately; other clients'
+        writes arrive as Redis keyspace notifications on a background thread.
+        These need hash events enabled on the server (``notify-keyspace-events
+        Kh``). If they are off, a warning is logged and only this adapter's
+        writes are reported, unless ``enable_keyspace_events`` allows the
+        adapter to turn them on itself.
+        """
+        return self._changes.subscribe(callback, pattern)
+
+    def _start_listener(self) -> None:
+        """Subscribe to keyspace notifications for scope hashes (first subscriber arrived)."""
+        try:
+            flags = self._text(
+                self._client.config_get("notify-keyspace-events").get("notify-keyspace-events")
+                or ""
+            )
+            if "K" not in flags or not {"h", "A"} & set(flags):
+                if not self.enable_keyspace_events:
+                    logger.warning(
+                        "Redis keyspace notifications are off (notify-keyspace-events=%r); "
+                        "changes by other sessions will not be reported. Set it to 'Kh' on "
+                        "the server, or set enable_keyspace_events in the storage config",
+                        flags,
+                    )
+                else:
+                    self._client.config_set("notify-keyspace-events", "".join({*flags, "K", "h"}))
+        except redis.RedisError as e:
+            logger.warning(
+                "Could not enable Redis keyspace notifications (%s); changes by other "
+                "sessions will not be reported",
+                e,
+            )
+
+        db = self._client.connection_pool.connection_kwargs.get("db", 0)
+        channel_prefix = f"__keyspace@{db}__:{self._scope_key('')}"
+
+        def handler(message: dict[str, Any]) -> None:
+            self._changes.publish(self._text(message["channel"])[len(channel_prefix) :])
+
+        try:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{_escape_redis_glob(channel_prefix) + "*": handler})
+            self._listener = pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+        except redis.RedisError as e:
+            logger.warning("Could not subscribe to Redis keyspace notifications: %s", e)
+
+    def _stop_listener(self) -> None:
+        """Stop listening for keyspace notifications (last subscriber left)."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def close(self) -> None:
+        """Release this adapter's reference to the shared connection pool."""
+        self._changes.close()
+        if self._owns_pool:
+            _release_pool(self.url, self.max_connections)
+            self._owns_pool = False
@@ -0,0 +1,377 @@
+"""Storage adapter backed by a coordinator daemon.
+
+Every Claude session normally runs its own MCP server process with its own
+storage adapter, so sessions only share state through the disk (or Redis)
+and each process keeps its own caches. A coordinator daemon
+(``claude-session-coordinator daemon``) owns a single adapter instead, and
+the per-session servers forward their storage calls to it over a Unix domain
+socket with ``RemoteAdapter``. Reads of another session's state are then
+answered from the daemon's memory.
+
+The protocol is newline-delimited JSON:
+
+    request:  {"id": 1, "method": "store", "params": {"scope": ..., ...}}
+    response: {"id": 1, "result": ...}
+              {"id": 1, "error": {"type": "StorageError", "message": ...}}
+    event:    {"event": "change", "scope": ...}
+
+Requests without an ``id`` (``watch``/``unwatch``) get no response. Several
+requests may be in flight on one connection; responses can arrive in any
+order.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from .aio import AsyncStorageAdapter
+from .base import DEFAULT_INSTANCES, StorageError
+from .watch import ChangeHub
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROTOCOL_VERSION = 1
+
+# Largest message either side accepts, in bytes
+STREAM_LIMIT = 64 * 1024 * 1024
+
+# Seconds a call waits for the daemon's response before failing
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# Adapter methods the daemon serves
+METHODS = frozenset(
+    {
+        "store",
+        "retrieve",
+        "delete",
+        "list_keys",
+        "list_scopes",
+        "delete_scope",
+        "store_many",
+        "retrieve_many",
+        "delete_many",
+        "snapshot_scopes",
+        "claim_instance",
+        "renew_lease",
+        "reap_expired_instances",
+        "release_instance",
+        "sweep_expired",
+        "flush",
+    }
+)
+
+# Exceptions re-raised as their own type on the client; others become StorageError
+ERRORS: dict[str, type[Exception]] = {
+    "StorageError": StorageError,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+    "NotImplementedError": NotImplementedError,
+}
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """Encode a protocol message as one line of JSON.
+
+    Raises:
+        TypeError: If the message contains a value that is not JSON-serializable
+    """
+    try:
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+    except ValueError as e:
+        # e.g. circular references; report like any unencodable value
+        raise TypeError(str(e)) from e
+
+
+class RemoteAdapter(AsyncStorageAdapter):
+    """Asynchronous adapter forwarding every call to a coordinator daemon.
+
+    The connection is opened on first use and re-opened after the daemon
+    restarts. Calls in flight when the connection drops, or that get no
+    response within ``request_timeout`` seconds (a hung daemon), fail with
+    ``StorageError``. The adapter must be used from a single event loop.
+
+    Operations that must be atomic (``claim_instance``, ``renew_lease``, ...)
+    run atomically in the daemon. ``transact`` is not available, since its
+    callback cannot be sent over the socket.
+
+    Example:
+        >>> storage = RemoteAdapter("/run/user/1000/csc-1000-3f2a.sock")
+        >>> await storage.store("laptop:org/repo:session:claude_1", "status", "active")
+
+    Attributes:
+        socket_path: Path of the daemon's Unix domain socket
+        request_timeout: Seconds to wait for each response (None waits forever)
+    """
+
+    def __init__(
+        self, socket_path: str | Path, request_timeout: float | None = DEFAULT_REQUEST_TIMEOUT
+    ) -> None:
+        """Initialize the adapter (without connecting yet).
+
+        Args:
+            socket_path: Path of the daemon's Unix domain socket
+            request_timeout: Seconds to wait for each response (None waits forever)
+        """
+        self.socket_path = Path(socket_path)
+        self.request_timeout = request_timeout
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._connect_lock = asyncio.Lock()
+        self._connecting: asyncio.Task[None] | None = None
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._next_id = 0
+        self._changes = ChangeHub(self._start_watching, self._stop_watching)
+
+    async def connect(self) -> dict[str, Any]:
+        """Connect to the daemon if not connected yet.
+
+        Returns:
+            The daemon's greeting (protocol version and process id)
+
+        Raises:
+            StorageError: If the daemon is not reachable or speaks another protocol version
+        """
+        async with self._connect_lock:
+            if self._writer is None:
+                try:
+                    reader, writer = await asyncio.open_unix_connection(
+                        str(self.socket_path), limit=STREAM_LIMIT
+                    )
+                except OSError as e:
+                    raise StorageError(
+                        f"Cannot connect to coordinator daemon at {self.socket_path}: {e}"
+                    ) from e
+                self._writer = writer
+                self._reader_task = asyncio.get_running_loop().create_task(
+                    self._read_responses(reader, writer)
+                )
+                if self._changes.active:
+                    self._send({"method": "watch"})
+
+        greeting = await self._call("hello", version=PROTOCOL_VERSION)
+        if greeting.get("version") != PROTOCOL_VERSION:
+            raise StorageError(
+                f"Coordinator daemon speaks protocol version {greeting.get('version')}, "
+                f"expected {PROTOCOL_VERSION}; restart the daemon"
+            )
+        return cast(dict[str, Any], greeting)
+
+    def _send(self, message: dict[str, Any]) -> None:
+        """Write a message to the connection (must be connected)."""
+        assert self._writer is not None
+        self._writer.write(encode_message(message))
+
+    async def _call(self, method: str, **params: Any) -> Any:
+        """Send a request and wait for its response.
+
+        Raises:
+            StorageError: If the connection fails, the daemon reports an error
+                or doesn't respond within the request timeout
+        """
+        if self._writer is None:
+            await self.connect()
+        assert self._writer is not None
+
+        self._next_id += 1
+        request_id = self._next_id
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({"id": request_id, "method": method, "params": params})
+        except TypeError as e:
+            del self._pending[request_id]
+            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+        try:
+            return await asyncio.wait_for(future, self.request_timeout)
+        except asyncio.TimeoutError as e:
+            raise StorageError(
+                f"Coordinator daemon at {self.socket_path} did not answer '{method}' "
+                f"within {self.request_timeout:g}s"
+            ) from e
+        finally:
+            # A late response finds no pending call and is dropped
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Resolve pending calls and publish change events until the connection closes."""
+        error = "connection closed by the daemon"
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "event" in message:
+                    self._changes.publish(message.get("scope"))
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    exc_type = ERRORS.get(message["error"].get("type"), StorageError)
+                    future.set_exception(exc_type(message["error"].get("message", "")))
+                else:
+                    future.set_result(message.get("result"))
+        except (OSError, ValueError) as e:
+            error = str(e)
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+                pending, self._pending = self._pending, {}
+                for future in pending.values():
+                    if not future.done():
+                        future.set_exception(
+                            StorageError(f"Lost connection to coordinator daemon: {error}")
+                        )
+                if self._changes.active:
+                    # Changes made while reconnecting would go unnoticed
+                    self._changes.publish(None)
+
+    def _start_watching(self) -> None:
+        """Ask the daemon for change events (first subscriber arrived)."""
+        if self._writer is not None:
+            self._send({"method": "watch"})
+        elif self._connecting is None or self._connecting.done():
+            # Nothing else may be about to connect; the connection subscribes when it opens
+            self._connecting = asyncio.get_running_loop().create_task(self._connect_quietly())
+
+    def _stop_watching(self) -> None:
+        """Stop the daemon's change events (last subscriber left)."""
+        if self._writer is not None:
+            self._send({"method": "unwatch"})
+
+    async def _connect_quietly(self) -> None:
+        """Connect in the background for a new watch, logging failures."""
+        try:
+            await self.connect()
+        except StorageError as e:
+            logger.warning("Cannot watch for changes: %s", e)
+
+    async def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+        await self._call("store", scope=scope, key=key, value=value, ttl=ttl)
+
+    async def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+        return await self._call("retrieve", scope=scope, key=key)
+
+    async def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+        return cast(bool, await self._call("delete", scope=scope, key=key))
+
+    async def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+        return cast(list[str], await self._call("list_keys", scope=scope))
+
+    async def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern."""
+        return cast(list[str], await self._call("list_scopes", pattern=pattern))
+
+    async def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+        return cast(bool, await self._call("delete_scope", scope=scope))
+
+    async def store_many(
+        self, scope: str, values: dict[str, Any], ttl: float | None = None
+    ) -> None:
+        """Store several keys in one scope in one round trip."""
+        await self._call("store_many", scope=scope, values=values, ttl=ttl)
+
+    async def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope in one round trip."""
+        return cast(
+            dict[str, Any | None], await self._call("retrieve_many", scope=scope, keys=keys)
+        )
+
+    async def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope in one round trip."""
+        return cast(int, await self._call("delete_many", scope=scope, keys=keys))
+
+    async def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern in one round trip."""
+        return cast(
+            dict[str, dict[str, Any]],
+            await self._call("snapshot_scopes", pattern=pattern, keys=keys),
+        )
+
+    async def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Not available over the daemon connection.
+
+        Raises:
+            StorageError: Always
+        """
+        raise StorageError(
+            "transact() cannot run over a coordinator daemon connection; "
+            "use claim_instance/renew_lease/release_instance, which run atomically in the daemon"
+        )
+
+    async def claim_instance(
+        self,
+        scope: str,
+        instance_id: str | None = None,
+        default_instances: tuple[str, ...] = DEFAULT_INSTANCES,
+        lease_ttl: float | None = None,
+    ) -> str | None:
+        """Atomically claim an instance in an instance registry."""
+        claimed = await self._call(
+            "claim_instance",
+            scope=scope,
+            instance_id=instance_id,
+            default_instances=list(default_instances),
+            lease_ttl=lease_ttl,
+        )
+        return cast(str | None, claimed)
+
+    async def renew_lease(self, scope: str, instance_id: str, lease_ttl: float) -> float | None:
+        """Extend the lease on a claimed instance (a heartbeat)."""
+        expires_at = await self._call(
+            "renew_lease", scope=scope, instance_id=instance_id, lease_ttl=lease_ttl
+        )
+        return cast(float | None, expires_at)
+
+    async def reap_expired_instances(self, scope: str) -> list[str]:
+        """Release every taken instance whose lease has expired."""
+        return cast(list[str], await self._call("reap_expired_instances", scope=scope))
+
+    async def release_instance(self, scope: str, instance_id: str) -> bool:
+        """Atomically mark an instance as available again and drop its lease."""
+        return cast(
+            bool, await self._call("release_instance", scope=scope, instance_id=instance_id)
+        )
+
+    async def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed."""
+        return cast(int, await self._call("sweep_expired"))
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, using the daemon's change events.
+
+        Must be called from the adapter's event loop. After a lost
+        connection, subscribers are sent None (changes may have been missed).
+        """
+        return self._changes.subscribe(callback, pattern)
+
+    async def flush(self) -> None:
+        """Have the daemon write buffered data through to storage."""
+        await self._call("flush")
+
+    async def close(self) -> None:
+        """Close the connection (the daemon and its adapter keep running)."""
+        self._changes.close()
+        if self._writer is not None:
+            # The reader notices and fails any calls still in flight
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+        if self._connecting is not None:
+            self._connecting.cancel()
@@ -0,0 +1,468 @@
+"""SQLite storage adapter for Claude Session Coordinator.
+
+This adapter stores all scopes in a single SQLite database using the stdlib
+``sqlite3`` module. The database runs in WAL mode so several Claude sessions on
+the same machine can read concurrently while one of them writes, and every
+write is a single short transaction, so concurrent writers never lose updates.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, TypeVar
+
+from .base import StorageAdapter, StorageError
+from .watch import ChangeHub
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (scope, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scopes (
+    scope TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS entries_scope_insert AFTER INSERT ON entries
+BEGIN
+    INSERT OR IGNORE INTO scopes (scope) VALUES (NEW.scope);
+END;
+
+CREATE TRIGGER IF NOT EXISTS entries_scope_delete AFTER DELETE ON entries
+WHEN NOT EXISTS (SELECT 1 FROM entries WHERE scope = OLD.scope)
+BEGIN
+    DELETE FROM scopes WHERE scope = OLD.scope;
+END;
+"""
+
+# Partial index over expiring entries only; sweeps walk it in expiry order
+_EXPIRY_INDEX = (
+    "CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at) "
+    "WHERE expires_at IS NOT NULL"
+)
+
+T = TypeVar("T")
+
+_UPSERT = (
+    "INSERT INTO entries (scope, key, value, created_at, updated_at, expires_at) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (scope, key) DO UPDATE SET "
+    "value = excluded.value, updated_at = excluded.updated_at, "
+    "expires_at = excluded.expires_at"
+)
+
+# Appended to queries on entries so expired rows read as missing
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+_GLOB_CHARS = "*?["
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Get the part of a glob pattern before its first wildcard.
+
+    Args:
+        pattern: fnmatch-style pattern
+
+    Returns:
+        The literal prefix every matching string must start with
+    """
+    for i, char in enumerate(pattern):
+        if char in _GLOB_CHARS:
+            return pattern[:i]
+    return pattern
+
+
+class SQLiteAdapter(StorageAdapter):
+    """Storage adapter backed by a SQLite database.
+
+    Entries live in an ``entries`` table keyed by ``(scope, key)``. A separate
+    ``scopes`` table, maintained by triggers, indexes the set of non-empty
+    scopes, so ``list_scopes(pattern)`` is a range query on the literal prefix
+    of the pattern followed by ``fnmatch`` on the candidates only. Scope
+    identifiers are stored verbatim, so any characters are preserved.
+
+    Example:
+        >>> adapter = SQLiteAdapter(path=".claude/session-state.sqlite3")
+        >>> adapter.store("laptop:org/repo:session:claude_1", "status", "active")
+        >>> adapter.list_scopes("laptop:org/repo:session:*")
+        ['laptop:org/repo:session:claude_1']
+    """
+
+    def __init__(
+        self,
+        path: str = ".claude/session-state.sqlite3",
+        busy_timeout_ms: int = 5000,
+        watch_poll_interval_ms: int = 1000,
+    ) -> None:
+        """Initialize the SQLite adapter.
+
+        Args:
+            path: Path of the database file (created if missing)
+            busy_timeout_ms: How long to wait for another process's write lock
+            watch_poll_interval_ms: How often to check for other processes' commits
+                while somebody watches for changes
+        """
+        self.path = Path(path).resolve()
+        self._lock = threading.RLock()
+        self.watch_poll_interval = watch_poll_interval_ms / 1000
+        self._changes = ChangeHub(self._start_poller, self._stop_poller)
+        self._poller: threading.Thread | None = None
+        self._stop_polling = threading.Event()
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path),
+                timeout=busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if "expires_at" not in columns:
+                # Databases created before TTL support
+                self._conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+            self._conn.execute(_EXPIRY_INDEX)
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError(f"Failed to open SQLite database {self.path}: {e}") from e
+
+    def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> int:
+        """Execute a modifying statement, translating SQLite errors.
+
+        Args:
+            sql: SQL statement
+            params: Statement parameters
+
+        Returns:
+            Number of rows changed
+
+        Raises:
+            StorageError: If the statement fails
+        """
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).rowcount
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+
+    def _query(self, sql: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
+        """Run a query and fetch all rows, translating SQLite errors.
+
+        Args:
+            sql: SQL query
+            params: Query parameters
+
+        Returns:
+            List of result rows
+
+        Raises:
+            StorageError: If the query fails
+        """
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        """Serialize a value to JSON text."""
+        try:
+            return json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"Value is not JSON-serializable: {e}") from e
+
+    def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value in the specified scope and key."""
+        now = datetime.utcnow().isoformat()
+        expires_at = None if ttl is None else time.time() + ttl
+        self._execute(_UPSERT, (scope, key, self._encode(value), now, now, expires_at))
+        self._changes.publish(scope)
+
+    def store_many(self, scope: str, values: dict[str, Any], ttl: float | None = None) -> None:
+        """Store several keys in one scope in a single transaction."""
+        if not values:
+            return
+
+        now = datetime.utcnow().isoformat()
+        expires_at = None if ttl is None else time.time() + ttl
+        rows = [
+            (scope, key, self._encode(value), now, now, expires_at) for key, value in values.items()
+        ]
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(_UPSERT, rows)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+        self._changes.publish(scope)
+
+    def retrieve(self, scope: str, key: str) -> Any | None:
+        """Retrieve a value from the specified scope and key."""
+        rows = self._query(
+            f"SELECT value FROM entries WHERE scope = ? AND key = ? AND {_LIVE}",
+            (scope, key, time.time()),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def retrieve_many(self, scope: str, keys: list[str]) -> dict[str, Any | None]:
+        """Retrieve several keys from one scope with a single query."""
+        result: dict[str, Any | None] = dict.fromkeys(keys)
+        if not keys:
+            return result
+
+        placeholders = ", ".join("?" * len(keys))
+        rows = self._query(
+            f"SELECT key, value FROM entries "
+            f"WHERE scope = ? AND key IN ({placeholders}) AND {_LIVE}",
+            (scope, *keys, time.time()),
+        )
+        for key, value in rows:
+            result[key] = json.loads(value)
+        return result
+
+    def snapshot_scopes(
+        self, pattern: str | None = None, keys: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Read every scope matching a pattern with a single query.
+
+        The literal prefix of the pattern bounds a range scan of the primary
+        key; values of keys that weren't requested are never transferred.
+        """
+        prefix = _literal_prefix(pattern) if pattern else ""
+        params: tuple[Any, ...] = ()
+        if keys is None:
+            column = "value"
+        else:
+            placeholders = ", ".join("?" * len(keys)) or "NULL"
+            column, params = f"CASE WHEN key IN ({placeholders}) THEN value END", tuple(keys)
+
+        sql = f"SELECT scope, key, {column} FROM entries WHERE {_LIVE}"
+        where: tuple[Any, ...] = (time.time(),)
+        if prefix:
+            sql += " AND scope >= ? AND scope < ?"
+            where += (prefix, prefix + "\U0010ffff")
+        rows = self._query(sql + " ORDER BY scope", params + where)
+
+        snapshot: dict[str, dict[str, Any]] = {}
+        for scope, key, value in rows:
+            if pattern and not fnmatch(scope, pattern):
+                continue
+            values = snapshot.setdefault(scope, {})
+            if value is not None:
+                values[key] = json.loads(value)
+        if keys is not None:
+            # Report requested keys in the order they were asked for
+            snapshot = {
+                scope: {key: values[key] for key in keys if key in values}
+                for scope, values in snapshot.items()
+            }
+        return snapshot
+
+    def delete(self, scope: str, key: str) -> bool:
+        """Delete a specific key from a scope."""
+        return self.delete_many(scope, [key]) == 1
+
+    def delete_many(self, scope: str, keys: list[str]) -> int:
+        """Delete several keys from one scope with a single statement."""
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return 0
+
+        placeholders = ", ".join("?" * len(unique_keys))
+        where = f"scope = ? AND key IN ({placeholders})"
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Expired rows are removed too, but don't count as deleted
+                    (deleted,) = self._conn.execute(
+                        f"SELECT COUNT(*) FROM entries WHERE {where} AND {_LIVE}",
+                        (scope, *unique_keys, time.time()),
+                    ).fetchone()
+                    removed = self._conn.execute(
+                        f"DELETE FROM entries WHERE {where}", (scope, *unique_keys)
+                    ).rowcount
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+        if removed:
+            self._changes.publish(scope)
+        return int(deleted)
+
+    def transact(self, scope: str, fn: Callable[[dict[str, Any]], T]) -> T:
+        """Atomically read-modify-write a scope in an IMMEDIATE transaction.
+
+        ``BEGIN IMMEDIATE`` takes the database write lock up front, so other
+        processes wait (up to the busy timeout) instead of racing the read.
+        """
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = self._conn.execute(
+                        f"SELECT key, value FROM entries WHERE scope = ? AND {_LIVE}",
+                        (scope, time.time()),
+                    ).fetchall()
+                    before = {key: json.loads(value) for key, value in rows}
+                    values = dict(before)
+                    result = fn(values)
+
+                    now = datetime.utcnow().isoformat()
+                    changed = [
+                        (scope, key, self._encode(value), now, now, None)
+                        for key, value in values.items()
+                        if key not in before or before[key] != value
+                    ]
+                    removed = [(scope, key) for key in before if key not in values]
+                    if changed:
+                        self._conn.executemany(_UPSERT, changed)
+                    if removed:
+                        self._conn.executemany(
+                            "DELETE FROM entries WHERE scope = ? AND key = ?", removed
+                        )
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+        if changed or removed:
+            self._changes.publish(scope)
+        return result
+
+    def sweep_expired(self) -> int:
+        """Delete values whose TTL has passed, via the partial expiry index."""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    scopes = self._conn.execute(
+                        "SELECT DISTINCT scope FROM entries WHERE expires_at <= ?", (now,)
+                    ).fetchall()
+                    removed = self._conn.execute(
+                        "DELETE FROM entries WHERE expires_at <= ?", (now,)
+                    ).rowcount
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(f"SQLite operation failed: {e}") from e
+        for (scope,) in scopes:
+            self._changes.publish(scope)
+        return removed
+
+    def list_keys(self, scope: str) -> list[str]:
+        """List all keys in a scope."""
+        rows = self._query(
+            f"SELECT key FROM entries WHERE scope = ? AND {_LIVE}", (scope, time.time())
+        )
+        return [row[0] for row in rows]
+
+    def list_scopes(self, pattern: str | None = None) -> list[str]:
+        """List all scopes, optionally filtered by pattern."""
+        prefix = _literal_prefix(pattern) if pattern else ""
+
+        if prefix:
+            # Every scope starting with prefix sorts in [prefix, prefix + U+10FFFF)
+            rows = self._query(
+                "SELECT scope FROM scopes WHERE scope >= ? AND scope < ? ORDER BY scope",
+                (prefix, prefix + "\U0010ffff"),
+            )
+        else:
+            rows = self._query("SELECT scope FROM scopes ORDER BY scope")
+
+        scopes = [row[0] for row in rows]
+        if pattern and pattern != prefix:
+            scopes = [s for s in scopes if fnmatch(s, pattern)]
+        elif pattern:
+            scopes = [s for s in scopes if s == pattern]
+
+        return scopes
+
+    def delete_scope(self, scope: str) -> bool:
+        """Delete an entire scope and all its keys."""
+        if self._execute("DELETE FROM entries WHERE scope = ?", (scope,)) == 0:
+            return False
+        self._changes.publish(scope)
+        return True
+
+    def watch(
+        self, callback: Callable[[str | None], None], pattern: str | None = None
+    ) -> Callable[[], None]:
+        """Get notified when scopes change, including changes by other processes.
+
+        Writes through this adapter are reported with their scope. Commits by
+        other connections are detected by polling ``PRAGMA data_version``
+        every ``watch_poll_interval_ms`` and reported as ``None`` (any scope
+        may have changed), since SQLite doesn't say which rows they touched.
+        """
+        return self._changes.subscribe(callback, pattern)
+
+    def _start_poller(self) -> None:
+        """Start polling for other connections' commits (first subscriber arrived)."""
+        self._stop_polling.clear()
+        version = self._data_version()
+        self._poller = threading.Thread(
+            target=self._poll_data_version, args=(version,), name="csc-sqlite-watch", daemon=True
+        )
+        self._poller.start()
+
+    def _stop_poller(self) -> None:
+        """Stop polling (last subscriber left)."""
+        poller, self._poller = self._poller, None
+        if poller is not None:
+            self._stop_polling.set()
+            poller.join()
+
+    def _data_version(self) -> int:
+        """Get the database's data version, which changes when another connection commits."""
+        return int(self._query("PRAGMA data_version")[0][0])
+
+    def _poll_data_version(self, version: int) -> None:
+        """Report other connections' commits until stopped."""
+        while not self._stop_polling.wait(self.watch_poll_interval):
+            try:
+                current = self._data_version()
+            except StorageError as e:
+                logger.warning("Failed to check for database changes: %s", e)
+                continue
+            if current != version:
+                version = current
+                self._changes.publish(None)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._changes.close()
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                raise StorageError(f"Failed to close SQLite database: {e}") from e
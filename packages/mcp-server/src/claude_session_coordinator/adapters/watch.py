@@ -0,0 +1,368 @@
+"""Change notifications for storage adapters.
+
+Adapters that support ``StorageAdapter.watch`` keep a ``ChangeHub``: writes
+made through the adapter are published to it synchronously, and changes made
+by other processes are fed in by a background source - an inotify watch of
+the storage directory for local files (polling where inotify is
+unavailable), keyspace notifications for Redis. The external source only
+runs while somebody is subscribed.
+
+Notifications say *which scope* changed, not how; subscribers re-read the
+scope if they care. A notification for ``None`` means changes may have been
+missed (e.g. an event queue overflowed) and every scope should be treated as
+changed.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from collections.abc import Callable
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Called with the scope that changed, or None if any scope may have changed
+ChangeCallback = Callable[[str | None], None]
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ChangeHub:
+    """Fans out scope change notifications to subscribers.
+
+    ``start_source``/``stop_source`` are called when the first subscriber
+    arrives and the last one leaves, to run a background watcher only while
+    it is needed. Subscribers may come and go from several threads at once;
+    the source is started and stopped one call at a time.
+
+    Example:
+        >>> hub = ChangeHub()
+        >>> unsubscribe = hub.subscribe(print, "laptop:org/repo:session:*")
+        >>> hub.publish("laptop:org/repo:session:claude_1")
+        laptop:org/repo:session:claude_1
+    """
+
+    def __init__(
+        self,
+        start_source: Callable[[], None] | None = None,
+        stop_source: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the hub.
+
+        Args:
+            start_source: Starts the external change source
+            stop_source: Stops the external change source
+        """
+        self._start_source = start_source
+        self._stop_source = stop_source
+        self._subscribers: dict[int, tuple[ChangeCallback, str | None]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # Serializes starting and stopping the source; held while they run
+        self._source_lock = threading.Lock()
+        self._source_running = False
+
+    def subscribe(self, callback: ChangeCallback, pattern: str | None = None) -> Callable[[], None]:
+        """Register a callback for changes to scopes matching a pattern.
+
+        Callbacks run in the thread that made or detected the change, possibly
+        while the adapter holds a lock, so they must be quick and must not
+        call back into the adapter; hand the work off instead.
+
+        Args:
+            callback: Called with each changed scope (or None, see module docs)
+            pattern: Optional glob pattern to filter scopes
+
+        Returns:
+            Function that cancels the subscription
+        """
+        with self._lock:
+            subscription = self._next_id
+            self._next_id += 1
+            self._subscribers[subscription] = (callback, pattern)
+        self._update_source()
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if self._subscribers.pop(subscription, None) is None:
+                    return
+            self._update_source()
+
+        return unsubscribe
+
+    def _update_source(self) -> None:
+        """Start or stop the external source to match whether anybody is subscribed."""
+        with self._source_lock:
+            active = self.active
+            if active and not self._source_running:
+                if self._start_source is not None:
+                    self._start_source()
+                self._source_running = True
+            elif not active and self._source_running:
+                self._source_running = False
+                if self._stop_source is not None:
+                    self._stop_source()
+
+    @property
+    def active(self) -> bool:
+        """Whether anybody is subscribed."""
+        return bool(self._subscribers)
+
+    def publish(self, scope: str | None) -> None:
+        """Notify the subscribers interested in a changed scope.
+
+        Args:
+            scope: The scope that changed, or None if any scope may have changed
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, pattern in subscribers:
+            if scope is not None and pattern and not fnmatch(scope, pattern):
+                continue
+            try:
+                callback(scope)
+            except Exception:
+                logger.exception("Change notification callback failed")
+
+    def close(self) -> None:
+        """Drop every subscription and stop the external source."""
+        with self._lock:
+            self._subscribers.clear()
+        self._update_source()
+
+
+class _Inotify:
+    """Minimal ctypes binding of Linux inotify."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return int(wd)
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """Read the pending events as (watch descriptor, mask, name) tuples."""
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def inotify_available() -> bool:
+    """Check whether inotify can be used on this platform."""
+    if not hasattr(os, "pipe") or ctypes.util.find_library("c") is None:
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    except OSError:
+        return False
+    return hasattr(libc, "inotify_init1")
+
+
+class DirectoryWatcher:
+    """Reports changed files in a directory tree from a background thread.
+
+    Uses inotify on Linux, watching every directory in the tree (and
+    directories created later). Elsewhere, or if inotify cannot be set up,
+    the tree is polled every ``poll_interval`` seconds, comparing file sizes
+    and modification times.
+
+    Only files whose name does not start with "." are reported, so the
+    adapters' temp files are ignored.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        on_change: Callable[[Path | None], None],
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            root: Directory to watch, recursively
+            on_change: Called with each changed file, or None after an overflow
+            poll_interval: Seconds between scans when polling
+        """
+        self.root = root
+        self._on_change = on_change
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._inotify: _Inotify | None = None
+        self._wake_r = self._wake_w = -1
+        # inotify watch descriptor -> directory
+        self._watches: dict[int, Path] = {}
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether changes are detected by inotify rather than polling."""
+        return self._inotify is not None
+
+    def start(self) -> None:
+        """Start watching (no-op if already started)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        if inotify_available():
+            try:
+                self._inotify = _Inotify()
+                self._watch_tree(self.root, report=False)
+            except OSError as e:
+                logger.warning("inotify unavailable (%s), polling %s instead", e, self.root)
+                self._close_inotify()
+
+        target: Callable[..., None]
+        args: tuple[Any, ...]
+        if self._inotify is not None:
+            self._wake_r, self._wake_w = os.pipe()
+            target, args = self._run_inotify, ()
+        else:
+            # Scan before returning, so changes made right after start() are seen
+            target, args = self._run_polling, (self._snapshot(),)
+        self._thread = threading.Thread(target=target, args=args, name="csc-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the background thread to exit."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        if self._wake_w >= 0:
+            os.write(self._wake_w, b"x")
+        self._thread.join()
+        self._thread = None
+        self._close_inotify()
+
+    def _close_inotify(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._wake_r = self._wake_w = -1
+        self._watches.clear()
+
+    def _watch_tree(self, directory: Path, report: bool) -> None:
+        """Watch a directory and its subdirectories.
+
+        Args:
+            directory: Directory to add
+            report: Report the files already in it (for directories created
+                after the watch started, whose first files may predate the watch)
+        """
+        assert self._inotify is not None
+        try:
+            wd = self._inotify.add_watch(directory, _WATCH_MASK)
+        except FileNotFoundError:
+            return
+        self._watches[wd] = directory
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                self._watch_tree(Path(entry.path), report)
+            elif report:
+                self._on_change(Path(entry.path))
+
+    def _run_inotify(self) -> None:
+        assert self._inotify is not None
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._inotify.fd, self._wake_r], [], [])
+            if self._stop.is_set():
+                return
+            if self._inotify.fd not in ready:
+                continue
+            for wd, mask, name in self._inotify.read_events():
+                if mask & _IN_Q_OVERFLOW:
+                    self._on_change(None)
+                    continue
+                if mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or not name or name.startswith("."):
+                    continue
+                path = directory / name
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._watch_tree(path, report=True)
+                    continue
+                if mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_DELETE):
+                    self._on_change(path)
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        """Get the size and modification time of every file in the tree."""
+        files: dict[Path, tuple[int, int]] = {}
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                path = Path(directory, name)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _run_polling(self, before: dict[Path, tuple[int, int]]) -> None:
+        while not self._stop.wait(self.poll_interval):
+            after = self._snapshot()
+            for path in before.keys() | after.keys():
+                if before.get(path) != after.get(path):
+                    self._on_change(path)
+            before = after
@@ -0,0 +1,464 @@
+"""Benchmarks for storage adapters and MCP tool paths.
+
+Drives every registered adapter through store/retrieve/list_scopes/delete_scope
+workloads over a matrix of scope counts, key counts and value sizes, times
+the server's tool functions end to end, and optionally load-tests many MCP
+clients connected to one server at once. Results are plain JSON (latency
+percentiles in microseconds plus throughput) so runs can be saved and compared
+for regression tracking.
+
+Run with: claude-session-coordinator bench
+"""
+
+import asyncio
+import math
+import os
+import platform
+import tempfile
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from . import __version__
+from .adapters import AdapterFactory, StorageAdapter, StorageError, to_async
+
+DEFAULT_SCOPE_COUNTS = (10, 100)
+DEFAULT_KEY_COUNTS = (10,)
+DEFAULT_VALUE_SIZES = (64, 4096)
+
+# Number of list_scopes calls timed per workload
+LIST_SCOPES_ROUNDS = 20
+
+# Scope prefix used by every workload, so list_scopes patterns are realistic
+SCOPE_PREFIX = "bench-machine:bench-org/bench-repo"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Get a nearest-rank percentile of a list of samples.
+
+    Args:
+        samples: Measured values (need not be sorted)
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile value, or 0.0 for an empty list
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples_ns: list[int]) -> dict[str, float]:
+    """Summarize per-operation latencies.
+
+    Args:
+        samples_ns: Latency of each operation in nanoseconds
+
+    Returns:
+        Dictionary with count, p50/p95/p99/mean latency in microseconds and
+        throughput in operations per second
+    """
+    samples_us = [sample / 1000 for sample in samples_ns]
+    total_s = sum(samples_ns) / 1e9
+    return {
+        "count": len(samples_us),
+        "p50_us": round(percentile(samples_us, 50), 2),
+        "p95_us": round(percentile(samples_us, 95), 2),
+        "p99_us": round(percentile(samples_us, 99), 2),
+        "mean_us": round(sum(samples_us) / len(samples_us), 2) if samples_us else 0.0,
+        "ops_per_sec": round(len(samples_us) / total_s, 1) if total_s else 0.0,
+    }
+
+
+def _timed(operation: Callable[[], Any], samples: list[int]) -> None:
+    """Run an operation once and record its latency."""
+    start = time.perf_counter_ns()
+    operation()
+    samples.append(time.perf_counter_ns() - start)
+
+
+def bench_adapter_config(name: str, workdir: Path) -> dict[str, Any]:
+    """Build a throwaway storage configuration for an adapter.
+
+    Args:
+        name: Registered adapter name
+        workdir: Empty directory the adapter may write to
+
+    Returns:
+        Storage configuration for ``AdapterFactory.create_adapter``
+    """
+    if name == "redis":
+        # Never touch real data: use a unique key prefix per run
+        config: dict[str, Any] = {"key_prefix": f"csc-bench-{uuid.uuid4().hex[:8]}:"}
+        if os.environ.get("REDIS_URL"):
+            config["url"] = os.environ["REDIS_URL"]
+        return {"adapter": name, "config": config}
+
+    # Built-in file adapters use one of these; custom adapters may use either
+    return {
+        "adapter": name,
+        "config": {"base_path": str(workdir / name), "path": str(workdir / f"{name}.sqlite3")},
+    }
+
+
+def run_workload(
+    adapter: StorageAdapter, scope_count: int, key_count: int, value_size: int
+) -> dict[str, dict[str, float]]:
+    """Time the basic adapter operations for one point of the matrix.
+
+    Every scope gets ``key_count`` keys holding a ``value_size``-byte string;
+    all scopes are deleted again at the end, so the adapter is left empty.
+
+    Args:
+        adapter: Adapter to benchmark
+        scope_count: Number of scopes to write
+        key_count: Number of keys per scope
+        value_size: Size of each value in bytes
+
+    Returns:
+        Mapping of operation name to its latency summary
+    """
+    value = "x" * value_size
+    scopes = [f"{SCOPE_PREFIX}:session:bench_{i}" for i in range(scope_count)]
+    keys = [f"key_{i}" for i in range(key_count)]
+    samples: dict[str, list[int]] = {
+        "store": [],
+        "retrieve": [],
+        "list_scopes": [],
+        "delete_scope": [],
+    }
+
+    for scope in scopes:
+        for key in keys:
+            _timed(lambda: adapter.store(scope, key, value), samples["store"])
+
+    for scope in scopes:
+        for key in keys:
+            _timed(lambda: adapter.retrieve(scope, key), samples["retrieve"])
+
+    for _ in range(LIST_SCOPES_ROUNDS):
+        _timed(lambda: adapter.list_scopes(f"{SCOPE_PREFIX}:session:*"), samples["list_scopes"])
+
+    for scope in scopes:
+        _timed(lambda: adapter.delete_scope(scope), samples["delete_scope"])
+
+    return {operation: summarize(timings) for operation, timings in samples.items()}
+
+
+@contextmanager
+def _server_state(adapter: StorageAdapter) -> Iterator[Any]:
+    """Point the server at a coordinator context for an adapter for the duration."""
+    from . import server
+    from .context import CoordinatorContext
+
+    saved = server.coordinator
+    machine_id, project_id = SCOPE_PREFIX.split(":")
+    coordinator = CoordinatorContext(
+        to_async(adapter), machine_id=machine_id, project_id=project_id
+    )
+    server.coordinator = coordinator
+    try:
+        yield server
+    finally:
+        # The adapter is not the context's, so only the subscriptions are closed
+        asyncio.run(coordinator.aclose())
+        server.coordinator = saved
+
+
+def run_tool_workload(
+    adapter: StorageAdapter, rounds: int, value_size: int
+) -> dict[str, dict[str, float]]:
+    """Time the MCP tool functions end to end on top of an adapter.
+
+    Measures the work a Claude session triggers per call - scope prefixing,
+    session checks, the hop to the storage thread pool and the storage round
+    trips - without the MCP transport. All calls run on one event loop.
+
+    Args:
+        adapter: Adapter the server should use
+        rounds: Number of times each tool is called
+        value_size: Size of stored values in bytes
+
+    Returns:
+        Mapping of tool name to its latency summary
+    """
+    value = "x" * value_size
+    samples: dict[str, list[int]] = {
+        "sign_on": [],
+        "store_data": [],
+        "retrieve_data": [],
+        "list_scopes": [],
+        "session_context": [],
+        "sign_off": [],
+    }
+
+    loop = asyncio.new_event_loop()
+    try:
+        with _server_state(adapter) as server:
+
+            def call(tool: Callable[..., Awaitable[Any]], *args: Any) -> Callable[[], Any]:
+                return lambda: loop.run_until_complete(tool(*args))
+
+            for i in range(rounds):
+                _timed(call(server.sign_on), samples["sign_on"])
+                _timed(
+                    call(server.store_data, "session:claude_1", f"key_{i}", value),
+                    samples["store_data"],
+                )
+                _timed(
+                    call(server.retrieve_data, "session:claude_1", f"key_{i}"),
+                    samples["retrieve_data"],
+                )
+                _timed(call(server.list_scopes, "session:*"), samples["list_scopes"])
+                _timed(call(server.get_session_context), samples["session_context"])
+                _timed(call(server.sign_off), samples["sign_off"])
+
+            for scope in adapter.list_scopes(f"{SCOPE_PREFIX}:*"):
+                adapter.delete_scope(scope)
+    finally:
+        loop.close()
+
+    return {tool: summarize(timings) for tool, timings in samples.items()}
+
+
+def run_client_workload(adapter: StorageAdapter, clients: int) -> dict[str, Any]:
+    """Time many MCP clients sharing one server and storage adapter.
+
+    Connects ``clients`` in-memory MCP clients to the server at once, as the
+    HTTP transports would; each signs on to its own instance, stores and
+    reads a value, reads ``session://context`` and signs off. Unlike
+    ``run_tool_workload`` this goes through the MCP protocol layer and the
+    per-connection session state.
+
+    Args:
+        adapter: Adapter the server should use
+        clients: Number of concurrent clients
+
+    Returns:
+        The client count, the wall-clock time of the whole run in seconds,
+        and the latency summary of each tool under ``tools``
+
+    Raises:
+        RuntimeError: If a tool call fails
+    """
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from pydantic import AnyUrl
+
+    samples: dict[str, list[int]] = {
+        "sign_on": [],
+        "store_data": [],
+        "retrieve_data": [],
+        "session_context": [],
+        "sign_off": [],
+    }
+
+    async def timed(name: str, call: Awaitable[Any]) -> None:
+        start = time.perf_counter_ns()
+        result = await call
+        samples[name].append(time.perf_counter_ns() - start)
+        if getattr(result, "isError", False):
+            raise RuntimeError(f"{name} failed: {result.content}")
+
+    async def client(server: Any, instance: str) -> None:
+        scope = f"session:{instance}"
+        async with create_connected_server_and_client_session(server.app) as session:
+            await timed("sign_on", session.call_tool("sign_on", {"session_id": instance}))
+            await timed(
+                "store_data",
+                session.call_tool("store_data", {"scope": scope, "key": "status", "value": "x"}),
+            )
+            await timed(
+                "retrieve_data",
+                session.call_tool("retrieve_data", {"scope": scope, "key": "status"}),
+            )
+            await timed("session_context", session.read_resource(AnyUrl("session://context")))
+            await timed("sign_off", session.call_tool("sign_off", {}))
+
+    async def run_clients(server: Any) -> None:
+        await asyncio.gather(*(client(server, f"bench_{i}") for i in range(clients)))
+
+    with _server_state(adapter) as server:
+        start = time.perf_counter()
+        asyncio.run(run_clients(server))
+        wall_s = time.perf_counter() - start
+
+    for scope in adapter.list_scopes(f"{SCOPE_PREFIX}:*"):
+        adapter.delete_scope(scope)
+
+    return {
+        "clients": clients,
+        "wall_s": round(wall_s, 3),
+        "tools": {tool: summarize(timings) for tool, timings in samples.items()},
+    }
+
+
+def run_growth_workload(adapter: StorageAdapter, scope_count: int) -> dict[str, Any]:
+    """Time stores that create new scopes while a project grows large.
+
+    Creates ``scope_count`` scopes one store at a time, so the later stores
+    run against thousands of existing scopes; per-scope bookkeeping whose
+    cost grows with the number of scopes (e.g. rewriting an index) shows up
+    in the tail latencies. ``list_scopes`` is timed at the final size, and
+    every scope is deleted again at the end.
+
+    Args:
+        adapter: Adapter to benchmark
+        scope_count: Number of scopes to create
+
+    Returns:
+        The scope count and the latency summary of each operation under ``operations``
+    """
+    scopes = [f"{SCOPE_PREFIX}:issue:growth_{i}" for i in range(scope_count)]
+    samples: dict[str, list[int]] = {"store_new_scope": [], "list_scopes": []}
+
+    for scope in scopes:
+        _timed(lambda: adapter.store(scope, "status", "open"), samples["store_new_scope"])
+
+    for _ in range(LIST_SCOPES_ROUNDS):
+        _timed(lambda: adapter.list_scopes(f"{SCOPE_PREFIX}:issue:*"), samples["list_scopes"])
+
+    for scope in scopes:
+        adapter.delete_scope(scope)
+
+    return {
+        "scopes": scope_count,
+        "operations": {operation: summarize(timings) for operation, timings in samples.items()},
+    }
+
+
+def run_benchmarks(
+    adapters: list[str] | None = None,
+    scope_counts: tuple[int, ...] = DEFAULT_SCOPE_COUNTS,
+    key_counts: tuple[int, ...] = DEFAULT_KEY_COUNTS,
+    value_sizes: tuple[int, ...] = DEFAULT_VALUE_SIZES,
+    tool_rounds: int = 50,
+    clients: int = 0,
+    growth: int = 0,
+) -> dict[str, Any]:
+    """Benchmark adapters over the workload matrix.
+
+    Each adapter gets a fresh temporary directory (and, for Redis, a unique
+    key prefix). Adapters that cannot be created or reached - e.g. Redis
+    without ``REDIS_URL`` - are reported under ``skipped`` instead of failing
+    the run.
+
+    Args:
+        adapters: Adapter names to run (default: every registered adapter)
+        scope_counts: Numbers of scopes to benchmark with
+        key_counts: Numbers of keys per scope to benchmark with
+        value_sizes: Value sizes in bytes to benchmark with
+        tool_rounds: Iterations of the tool-path workload (0 disables it)
+        clients: Concurrent MCP clients of the load test (0 disables it)
+        growth: Scopes created by the growth workload (0 disables it)
+
+    Returns:
+        JSON-serializable report with ``meta``, ``results``, ``tools``,
+        ``clients``, ``growth`` and ``skipped`` sections
+    """
+    names = adapters or AdapterFactory.available_adapters()
+    report: dict[str, Any] = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": [],
+        "tools": {},
+        "clients": {},
+        "growth": {},
+        "skipped": {},
+    }
+
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix=f"csc-bench-{name}-") as tmp:
+            if name == "redis" and not os.environ.get("REDIS_URL"):
+                report["skipped"][name] = "set REDIS_URL to benchmark the Redis adapter"
+                continue
+
+            try:
+                adapter = AdapterFactory.create_adapter(bench_adapter_config(name, Path(tmp)))
+                adapter.list_scopes(f"{SCOPE_PREFIX}:*")
+            except StorageError as e:
+                report["skipped"][name] = str(e)
+                continue
+
+            try:
+                for scope_count in scope_counts:
+                    for key_count in key_counts:
+                        for value_size in value_sizes:
+                            report["results"].append(
+                                {
+                                    "adapter": name,
+                                    "scopes": scope_count,
+                                    "keys": key_count,
+                                    "value_size": value_size,
+                                    "operations": run_workload(
+                                        adapter, scope_count, key_count, value_size
+                                    ),
+                                }
+                            )
+                if tool_rounds:
+                    report["tools"][name] = run_tool_workload(
+                        adapter, tool_rounds, min(value_sizes, default=64)
+                    )
+                if clients:
+                    report["clients"][name] = run_client_workload(adapter, clients)
+                if growth:
+                    report["growth"][name] = run_growth_workload(adapter, growth)
+            finally:
+                adapter.close()
+
+    return report
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> list[str]:
+    """Find p95 latency regressions between two benchmark reports.
+
+    Args:
+        baseline: Earlier report from ``run_benchmarks``
+        current: New report from ``run_benchmarks``
+        threshold: Relative p95 increase (0.2 = 20%) counted as a regression
+
+    Returns:
+        Human-readable description of each regression (empty if none)
+    """
+
+    def index(report: dict[str, Any]) -> dict[tuple[Any, ...], dict[str, float]]:
+        rows: dict[tuple[Any, ...], dict[str, float]] = {}
+        for result in report.get("results", []):
+            point = (result["adapter"], result["scopes"], result["keys"], result["value_size"])
+            for operation, summary in result["operations"].items():
+                rows[point + (operation,)] = summary
+        for adapter, tools in report.get("tools", {}).items():
+            for tool, summary in tools.items():
+                rows[(adapter, "tool", tool)] = summary
+        for adapter, load in report.get("clients", {}).items():
+            for tool, summary in load["tools"].items():
+                rows[(adapter, f"clients-{load['clients']}", tool)] = summary
+        for adapter, grown in report.get("growth", {}).items():
+            for operation, summary in grown["operations"].items():
+                rows[(adapter, f"growth-{grown['scopes']}", operation)] = summary
+        return rows
+
+    before = index(baseline)
+    regressions = []
+    for point, summary in index(current).items():
+        old = before.get(point)
+        if old is None or not old["p95_us"]:
+            continue
+        change = summary["p95_us"] / old["p95_us"] - 1
+        if change > threshold:
+            label = "/".join(str(part) for part in point)
+            regressions.append(
+                f"{label}: p95 {old['p95_us']}us -> {summary['p95_us']}us (+{change:.0%})"
+            )
+    return regressions
@@ -5,6 +5,9 @@ import os
 from pathlib import Path
 from typing import Any, cast
 
+# Adapters whose storage only one process can open at a time
+SINGLE_PROCESS_ADAPTERS = ["log"]
+
 
 def load_config() -> dict[str, Any]:
     """Load configuration from file or use defaults.
@@ -73,6 +76,7 @@ def get_default_config() -> dict[str, Any]:
         "session": {
             "machine_id": "auto",  # "auto" = use hostname, or specify custom value
             "project_detection": "git",  # "git" or "directory"
+            "lease_ttl_seconds": 300,  # instance claims expire without a heartbeat
         },
     }
 
@@ -99,16 +103,36 @@ def validate_config(config: dict[str, Any]) -> bool:
         raise ValueError("Missing 'storage.config' in config")
 
     # Validate adapter type is known
-    valid_adapters = ["local", "redis"]  # Extend as new adapters are added
+    valid_adapters = ["local", "log", "sqlite", "redis"]  # Extend as new adapters are added
     adapter_type = config["storage"]["adapter"]
     if adapter_type not in valid_adapters:
         raise ValueError(
             f"Unknown adapter type: {adapter_type}. " f"Valid options: {', '.join(valid_adapters)}"
         )
 
+    # Each session runs its own server, so these are only shared through the daemon
+    if adapter_type in SINGLE_PROCESS_ADAPTERS and not daemon_explicitly_enabled(config):
+        raise ValueError(
+            f"The '{adapter_type}' adapter can only be opened by one process at a time. "
+            'Set "daemon": {"enabled": true} and run `claude-session-coordinator daemon` '
+            "so that sessions share it"
+        )
+
     return True
 
 
+def daemon_explicitly_enabled(config: dict[str, Any]) -> bool:
+    """Check whether the configuration explicitly enables the coordinator daemon.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        True if ``daemon.enabled`` is set to true
+    """
+    return config.get("daemon", {}).get("enabled") is True
+
+
 def save_config(config: dict[str, Any], location: str = "project") -> None:
     """Save configuration to a file.
 
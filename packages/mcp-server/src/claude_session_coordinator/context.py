@@ -0,0 +1,246 @@
+"""Coordinator state shared by the sessions of a server process.
+
+``CoordinatorContext`` holds what the server needs to coordinate one
+project: the storage adapter, the detected machine and project, the lease
+TTL, the project's storage settings, the session context view and the
+resource subscriptions. Every connected client gets a ``ClientConnection``
+holding the session it claimed with ``sign_on``; the tool handlers reach the
+connection (and through it the context) of the request they serve.
+
+One process can therefore host any number of isolated sessions sharing one
+adapter and one cache: over stdio there is one connection, over the HTTP
+transports one per client, and further contexts can be created for other
+projects (or tests) next to the one the server was started with.
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import anyio
+from mcp.server.session import ServerSession
+
+from .adapters import AdapterFactory, AsyncStorageAdapter, RemoteAdapter, StorageError, to_async
+from .adapters.aio import DEFAULT_MAX_WORKERS
+from .adapters.base import DEFAULT_LEASE_TTL
+from .adapters.remote import DEFAULT_REQUEST_TIMEOUT
+from .daemon import configured_socket_path, daemon_running
+from .detection import detect_machine_id, detect_project_id
+from .settings import Settings
+from .subscriptions import ResourceSubscriptions
+from .view import SessionContextView
+
+logger = logging.getLogger(__name__)
+
+# Seconds a disconnecting client's instance release may take
+RELEASE_TIMEOUT = 5.0
+
+
+class ClientConnection:
+    """State of one connected MCP client.
+
+    Example:
+        >>> async with coordinator.connect() as connection:
+        ...     connection.session = {"session_id": "claude_1", ...}  # after sign_on
+
+    Attributes:
+        coordinator: The context the client is connected to
+        session: The session claimed with ``sign_on``, or None if not signed on
+        server_session: The client's MCP session, once it subscribed to a resource
+    """
+
+    def __init__(self, coordinator: "CoordinatorContext") -> None:
+        """Initialize a connection that has not signed on yet.
+
+        Args:
+            coordinator: The context the client is connected to
+        """
+        self.coordinator = coordinator
+        self.session: dict[str, str] | None = None
+        self.server_session: ServerSession | None = None
+
+
+class CoordinatorContext:
+    """Storage, project identity and caches shared by a project's sessions.
+
+    Example:
+        >>> coordinator = CoordinatorContext(to_async(LocalFileAdapter()), "laptop", "org/repo")
+        >>> async with coordinator.connect() as connection:
+        ...     ...  # serve one client
+
+    Attributes:
+        storage: Adapter shared by every session
+        machine_id: Detected (or configured) machine identifier
+        project_id: Detected (or configured) project identifier
+        lease_ttl: Seconds an instance claim lasts without renewal
+        settings: The project's storage settings
+        owns_storage: Whether ``aclose`` closes the adapter (the context created it)
+        connections: Clients currently connected
+        default_connection: Connection used for calls outside MCP requests
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageAdapter,
+        machine_id: str,
+        project_id: str,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        settings: Settings | None = None,
+        owns_storage: bool = False,
+    ) -> None:
+        """Initialize the context.
+
+        Args:
+            storage: Adapter shared by every session
+            machine_id: Machine identifier
+            project_id: Project identifier
+            lease_ttl: Seconds an instance claim lasts without renewal
+            settings: The project's storage settings (default: .claude/settings.local.json)
+            owns_storage: Whether ``aclose`` closes the adapter
+        """
+        self.storage = storage
+        self.machine_id = machine_id
+        self.project_id = project_id
+        self.lease_ttl = lease_ttl
+        self.settings = settings or Settings()
+        self.owns_storage = owns_storage
+        self.connections: set[ClientConnection] = set()
+        self.default_connection = ClientConnection(self)
+        self._context_view: SessionContextView | None = None
+        self._subscriptions: ResourceSubscriptions | None = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "CoordinatorContext":
+        """Create the context for the current directory from configuration.
+
+        Uses the coordinator daemon's adapter if a daemon serves the
+        configured storage, and otherwise creates the adapter itself. Either
+        way the context owns the adapter and closes it in ``aclose``.
+
+        Args:
+            config: Full configuration
+
+        Returns:
+            The new context
+        """
+        socket_path = configured_socket_path(config)
+        storage: AsyncStorageAdapter
+        if socket_path is not None and daemon_running(socket_path):
+            # Share the daemon's adapter with the other sessions
+            timeout = config.get("daemon", {}).get(
+                "request_timeout_seconds", DEFAULT_REQUEST_TIMEOUT
+            )
+            storage = RemoteAdapter(
+                socket_path, request_timeout=None if timeout is None else float(timeout)
+            )
+            logger.info("Using coordinator daemon at %s", socket_path)
+        else:
+            # Synchronous adapters run in a thread pool
+            storage = to_async(
+                AdapterFactory.create_adapter(config["storage"]),
+                max_workers=int(config["storage"].get("max_workers", DEFAULT_MAX_WORKERS)),
+            )
+
+        return cls(
+            storage,
+            detect_machine_id(config),
+            detect_project_id(config),
+            lease_ttl=float(config.get("session", {}).get("lease_ttl_seconds", DEFAULT_LEASE_TTL)),
+            owns_storage=True,
+        )
+
+    @property
+    def prefix(self) -> str:
+        """The project's ``machine:project`` scope prefix."""
+        return f"{self.machine_id}:{self.project_id}"
+
+    @property
+    def context_view(self) -> SessionContextView:
+        """The project's session context view, shared by every connection."""
+        if self._context_view is None:
+            self._context_view = SessionContextView(self.storage, self.prefix)
+        return self._context_view
+
+    @property
+    def subscriptions(self) -> ResourceSubscriptions:
+        """The connected clients' resource subscriptions."""
+        if self._subscriptions is None:
+            self._subscriptions = ResourceSubscriptions(self.storage)
+        return self._subscriptions
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[ClientConnection]:
+        """Track a client for as long as it is connected.
+
+        When the client disconnects, its instance is released and its
+        resource subscriptions are dropped.
+        """
+        connection = ClientConnection(self)
+        self.connections.add(connection)
+        try:
+            yield connection
+        finally:
+            self.connections.discard(connection)
+            # Runs while the connection's tasks are being cancelled
+            with anyio.move_on_after(RELEASE_TIMEOUT, shield=True):
+                await self.close_connection(connection)
+
+    async def close_connection(self, connection: ClientConnection) -> None:
+        """Release a client's instance and drop its subscriptions.
+
+        The session state itself is kept, as with ``sign_off``.
+        """
+        if self._subscriptions is not None and connection.server_session is not None:
+            await self._subscriptions.unsubscribe_session(connection.server_session)
+        session, connection.session = connection.session, None
+        if session is None:
+            return
+        try:
+            await self.storage.release_instance(
+                f"{session['full_scope_prefix']}:instances", session["session_id"]
+            )
+        except StorageError as e:
+            # The lease expires on its own
+            logger.warning("Cannot release instance %s: %s", session["session_id"], e)
+
+    async def maintain_leases(self) -> list[str]:
+        """Renew the connected sessions' leases and free instances whose leases expired.
+
+        Called periodically by the background reaper. If a session's lease was
+        lost (e.g., the machine slept past the TTL and another server reaped
+        it), the instance is re-claimed if still free; otherwise the session is
+        cleared.
+
+        Returns:
+            Instance ids released by the reaper
+        """
+        instances_scope = f"{self.prefix}:instances"
+
+        for connection in (self.default_connection, *self.connections):
+            if not connection.session:
+                continue
+            session_id = connection.session["session_id"]
+            if await self.storage.renew_lease(instances_scope, session_id, self.lease_ttl) is None:
+                claimed = await self.storage.claim_instance(
+                    instances_scope, session_id, lease_ttl=self.lease_ttl
+                )
+                if claimed is None:
+                    logger.warning("Lost instance %s to another session", session_id)
+                    connection.session = None
+
+        return await self.storage.reap_expired_instances(instances_scope)
+
+    async def aclose(self) -> None:
+        """Cancel the subscriptions and the view's notifications, and close an owned adapter.
+
+        Closing the adapter writes out buffered data (write-behind values,
+        manifest statistics) and stops its background threads; an adapter
+        the context was given is left open for its owner to close.
+        """
+        if self._subscriptions is not None:
+            await self._subscriptions.aclose()
+        if self._context_view is not None:
+            await self._context_view.aclose()
+        if self.owns_storage:
+            await self.storage.close()
@@ -0,0 +1,281 @@
+"""Shared coordinator daemon.
+
+``claude-session-coordinator daemon`` runs one storage adapter for all the
+Claude sessions that use the same storage, and serves it on a Unix domain
+socket. MCP servers started while the daemon runs find its socket and
+forward their storage calls to it (see ``adapters.remote``) instead of
+opening storage themselves, so the sessions share one set of caches, one
+change feed and one expiry sweeper.
+
+The socket's location is derived from the storage configuration, so
+sessions using different storage never reach the wrong daemon. It can be
+set explicitly with ``daemon.socket_path``; ``"daemon": {"enabled": false}``
+makes MCP servers always open storage themselves.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from .adapters import AsyncStorageAdapter, StorageAdapter, StorageError, to_async
+from .adapters.aio import DEFAULT_MAX_WORKERS
+from .adapters.remote import ERRORS, METHODS, PROTOCOL_VERSION, STREAM_LIMIT, encode_message
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps of expired values
+SWEEP_INTERVAL = 60.0
+
+# Storage config keys holding paths, made absolute when deriving the socket path
+_PATH_KEYS = ("base_path", "path")
+
+
+def default_socket_path(storage_config: dict[str, Any]) -> Path:
+    """Get the daemon socket path for a storage configuration.
+
+    The name is a hash of the configuration with relative paths resolved
+    against the current directory, so every session using the same storage
+    derives the same socket.
+
+    Args:
+        storage_config: The ``storage`` section of the configuration
+
+    Returns:
+        Socket path in ``$XDG_RUNTIME_DIR`` (or the temp directory)
+    """
+    config = dict(storage_config.get("config", {}))
+    for key in _PATH_KEYS:
+        if isinstance(config.get(key), str):
+            config[key] = str(Path(config[key]).resolve())
+    identity = json.dumps(
+        {**storage_config, "config": config}, sort_keys=True, separators=(",", ":")
+    )
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(runtime_dir) / f"csc-{uid}-{digest}.sock"
+
+
+def configured_socket_path(config: dict[str, Any]) -> Path | None:
+    """Get the daemon socket path for a configuration.
+
+    Args:
+        config: Full configuration
+
+    Returns:
+        The socket path, or None if the daemon is disabled or unsupported here
+    """
+    daemon_config = config.get("daemon", {})
+    if not daemon_config.get("enabled", True) or not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = daemon_config.get("socket_path")
+    return Path(socket_path) if socket_path else default_socket_path(config["storage"])
+
+
+def daemon_running(socket_path: Path) -> bool:
+    """Check whether a daemon is accepting connections on a socket.
+
+    Args:
+        socket_path: Path of the Unix domain socket
+
+    Returns:
+        True if something listens on the socket
+    """
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        probe.settimeout(1.0)
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+class CoordinatorDaemon:
+    """Serves one storage adapter to MCP servers over a Unix domain socket.
+
+    Example:
+        >>> daemon = CoordinatorDaemon(LocalFileAdapter(), "/tmp/csc.sock")
+        >>> await daemon.serve_forever()
+
+    Attributes:
+        storage: The shared adapter
+        socket_path: Path of the Unix domain socket
+    """
+
+    def __init__(
+        self,
+        adapter: StorageAdapter | AsyncStorageAdapter,
+        socket_path: str | Path,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Initialize the daemon.
+
+        Args:
+            adapter: Storage adapter to share (closed when the daemon stops)
+            socket_path: Path of the Unix domain socket to listen on
+            max_workers: Thread pool size if a synchronous adapter has to be wrapped
+        """
+        self.storage = to_async(adapter, max_workers=max_workers)
+        self.socket_path = Path(socket_path)
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        """Start listening.
+
+        A socket left behind by a daemon that crashed is replaced.
+
+        Raises:
+            StorageError: If another daemon is already listening on the socket
+        """
+        if daemon_running(self.socket_path):
+            raise StorageError(f"A coordinator daemon is already running at {self.socket_path}")
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+
+        # Only the user running the daemon may connect. The socket is created
+        # under a restrictive umask, so it is never accessible to others, not
+        # even between bind() and chmod()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            sock.bind(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, sock=sock, limit=STREAM_LIMIT
+        )
+        logger.info("Coordinator daemon listening on %s", self.socket_path)
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled, sweeping expired values (starts listening if needed)."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        sweeper = asyncio.get_running_loop().create_task(self._sweep_periodically())
+        try:
+            await self._server.serve_forever()
+        finally:
+            sweeper.cancel()
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening, drop the connections and close the adapter."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            self.socket_path.unlink(missing_ok=True)
+        for connection in list(self._connections):
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.storage.close()
+
+    async def _sweep_periodically(self) -> None:
+        """Delete expired values every ``SWEEP_INTERVAL`` seconds."""
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            try:
+                removed = await self.storage.sweep_expired()
+            except StorageError as e:
+                logger.warning("Expiry sweep failed: %s", e)
+                continue
+            if removed:
+                logger.info("Swept %d expired values", removed)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one MCP server's requests until it disconnects."""
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        loop = asyncio.get_running_loop()
+        requests: set[asyncio.Task[None]] = set()
+        # Older Pythons don't allow concurrent drain() calls on one writer
+        drain_lock = asyncio.Lock()
+        unwatch: Callable[[], Awaitable[None]] | None = None
+
+        def send_change(scope: str | None) -> None:
+            if not writer.is_closing():
+                writer.write(encode_message({"event": "change", "scope": scope}))
+
+        def on_change(scope: str | None) -> None:
+            # Called from storage threads
+            try:
+                loop.call_soon_threadsafe(send_change, scope)
+            except RuntimeError:
+                # The event loop has shut down
+                pass
+
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                method = message.get("method")
+                if method == "watch":
+                    if unwatch is None:
+                        unwatch = await self.storage.awatch(on_change)
+                elif method == "unwatch":
+                    if unwatch is not None:
+                        await unwatch()
+                        unwatch = None
+                else:
+                    request = loop.create_task(self._handle_request(writer, drain_lock, message))
+                    requests.add(request)
+                    request.add_done_callback(requests.discard)
+        except (OSError, ValueError, NotImplementedError) as e:
+            # Broken connection, malformed message, or an adapter without watch
+            logger.warning("Closing daemon connection: %s", e)
+        finally:
+            if unwatch is not None:
+                await unwatch()
+            for request in requests:
+                request.cancel()
+            writer.close()
+            self._connections.discard(task)
+
+    async def _handle_request(
+        self, writer: asyncio.StreamWriter, drain_lock: asyncio.Lock, message: dict[str, Any]
+    ) -> None:
+        """Run one request against the adapter and write its response."""
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        try:
+            if method == "hello":
+                result: Any = {"version": PROTOCOL_VERSION, "pid": os.getpid()}
+            elif method in METHODS:
+                if "default_instances" in params:
+                    params["default_instances"] = tuple(params["default_instances"])
+                result = await getattr(self.storage, method)(**params)
+            else:
+                raise ValueError(f"Unknown method: {method}")
+            response = encode_message({"id": request_id, "result": result})
+        except Exception as e:
+            error_type = type(e).__name__ if type(e).__name__ in ERRORS else "StorageError"
+            response = encode_message(
+                {"id": request_id, "error": {"type": error_type, "message": str(e)}}
+            )
+        if writer.is_closing():
+            return
+        writer.write(response)
+        try:
+            async with drain_lock:
+                await writer.drain()
+        except OSError:
+            # The client went away; the connection handler cleans up
+            pass
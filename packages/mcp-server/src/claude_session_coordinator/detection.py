@@ -1,10 +1,16 @@
 """Machine and project detection utilities."""
 
+import json
+import os
 import socket
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Any, cast
 
+# Project detected at the last start, relative to the project directory
+DETECTION_CACHE = Path(".claude/detection-cache.json")
+
 
 def detect_machine_id(config: dict[str, Any]) -> str:
     """Detect machine identifier.
@@ -14,6 +20,11 @@ def detect_machine_id(config: dict[str, Any]) -> str:
 
     Returns:
         Machine identifier (hostname or configured value)
+
+    Note:
+        The hostname is not cached with the project: ``gethostname`` is a
+        single system call, cheaper than reading the cache file, and a
+        cached name would outlive a rename of the machine.
     """
     machine_id_setting = config.get("session", {}).get("machine_id", "auto")
 
@@ -47,14 +58,50 @@ def detect_project_id(config: dict[str, Any]) -> str:
 def _detect_project_from_git() -> str:
     """Detect project from git remote URL.
 
+    The ``origin`` URL is read straight from the repository's ``.git/config``
+    and the result cached in ``.claude/detection-cache.json``, keyed by the
+    current directory and the mtimes of that file and of the user and system
+    git configs, so a server start usually needs neither a ``git`` subprocess
+    nor a parse. ``git remote get-url origin`` is only run if the config
+    cannot be read here (no repository found, includes, URL rewrites in any
+    of the configs or an unrecognized URL); inside a repository its result,
+    or the directory name if it has no usable origin, is cached as well.
+
     Returns:
-        Project identifier (owner/repo) from git remote
+        Project identifier (owner/repo) from git remote, or the directory name
+    """
+    git_config = _find_git_config(Path.cwd())
+    if git_config is not None:
+        shared_configs = _shared_git_configs()
+        cached = _load_cached_project(git_config, shared_configs)
+        if cached is not None:
+            return cached
+        remote_url = None
+        if not any(_rewrites_urls(path) for path in shared_configs):
+            remote_url = _read_origin_url(git_config)
+        project_id = _parse_remote_url(remote_url) if remote_url else None
+        if project_id is None:
+            # Git has no usable origin either, fallback to directory name
+            project_id = _run_git_remote() or _detect_project_from_directory()
+        # Cached whichever way it was found, so later starts skip git too
+        _save_cached_project(git_config, shared_configs, project_id)
+        return project_id
+    else:
+        project_id = _run_git_remote()
+        if project_id is not None:
+            return project_id
 
-    Raises:
-        subprocess.CalledProcessError: If git command fails
+    # Git has no usable origin, fallback to directory name
+    return _detect_project_from_directory()
+
+
+def _run_git_remote() -> str | None:
+    """Get the project from ``git remote get-url origin``.
+
+    Returns:
+        Project identifier (owner/repo), or None if git fails or the URL is unrecognized
     """
     try:
-        # Get git remote URL
         result = subprocess.run(
             ["git", "remote", "get-url", "origin"],
             capture_output=True,
@@ -62,33 +109,240 @@ def _detect_project_from_git() -> str:
             check=True,
             timeout=5,
         )
-        remote_url = result.stdout.strip()
-
-        # Parse owner/repo from URL
-        # Supports formats:
-        #   git@github.com:BANCS-Norway/claude_session_coordinator.git
-        #   https://github.com/BANCS-Norway/claude_session_coordinator.git
-
-        if remote_url.startswith("git@"):
-            # SSH format: git@github.com:owner/repo.git
-            parts = remote_url.split(":")
-            if len(parts) >= 2:
-                owner_repo = parts[1].replace(".git", "")
-                return owner_repo
-        elif remote_url.startswith("http://") or remote_url.startswith("https://"):
-            # HTTPS format: https://github.com/owner/repo.git
-            parts = remote_url.rstrip("/").split("/")
-            if len(parts) >= 2:
-                owner = parts[-2]
-                repo = parts[-1].replace(".git", "")
-                return f"{owner}/{repo}"
-
-        # Fallback to directory name if parsing fails
-        return _detect_project_from_directory()
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        # Git command failed or git is not installed
+        return None
+    return _parse_remote_url(result.stdout.strip())
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-        # Git command failed, fallback to directory name
-        return _detect_project_from_directory()
+
+def _parse_remote_url(remote_url: str) -> str | None:
+    """Parse owner/repo from a git remote URL.
+
+    Supports formats:
+        git@github.com:BANCS-Norway/claude_session_coordinator.git
+        https://github.com/BANCS-Norway/claude_session_coordinator.git
+
+    Args:
+        remote_url: The remote URL
+
+    Returns:
+        Project identifier (owner/repo), or None if the URL is unrecognized
+    """
+    if remote_url.startswith("git@"):
+        # SSH format: git@github.com:owner/repo.git
+        parts = remote_url.split(":")
+        if len(parts) >= 2:
+            owner_repo = parts[1].replace(".git", "")
+            return owner_repo
+    elif remote_url.startswith("http://") or remote_url.startswith("https://"):
+        # HTTPS format: https://github.com/owner/repo.git
+        parts = remote_url.rstrip("/").split("/")
+        if len(parts) >= 2:
+            owner = parts[-2]
+            repo = parts[-1].replace(".git", "")
+            return f"{owner}/{repo}"
+    return None
+
+
+def _find_git_config(start: Path) -> Path | None:
+    """Find the config file of the repository containing a directory.
+
+    Handles ``.git`` files (worktrees and submodules) pointing at the real
+    git directory, and worktrees sharing the main repository's config.
+
+    Args:
+        start: Directory to search from (and then its parents)
+
+    Returns:
+        Path of the repository's config file, or None if not in a repository
+    """
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        try:
+            if dot_git.is_file():
+                # "gitdir: <path>" written by worktrees and submodules
+                content = dot_git.read_text(encoding="utf-8").strip()
+                if not content.startswith("gitdir:"):
+                    return None
+                git_dir = directory / content[len("gitdir:") :].strip()
+            elif dot_git.is_dir():
+                git_dir = dot_git
+            else:
+                continue
+            commondir = git_dir / "commondir"
+            if commondir.is_file():
+                git_dir = git_dir / commondir.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        config = git_dir / "config"
+        return config if config.is_file() else None
+    return None
+
+
+def _shared_git_configs() -> list[Path]:
+    """Get the user and system git config files that exist.
+
+    These apply to every repository, so a URL rewrite in them changes the
+    origin URL git reports. Follows ``GIT_CONFIG_GLOBAL``,
+    ``GIT_CONFIG_SYSTEM`` and ``GIT_CONFIG_NOSYSTEM``; a system config outside
+    ``/etc`` (git built with another prefix) is not found.
+
+    Returns:
+        Paths of the existing files
+    """
+    candidates = []
+    if os.environ.get("GIT_CONFIG_GLOBAL"):
+        candidates.append(Path(os.environ["GIT_CONFIG_GLOBAL"]).expanduser())
+    else:
+        xdg_config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+        candidates += [Path(xdg_config_home) / "git" / "config", Path.home() / ".gitconfig"]
+    if os.environ.get("GIT_CONFIG_NOSYSTEM", "").lower() not in ("1", "true", "yes", "on"):
+        candidates.append(Path(os.environ.get("GIT_CONFIG_SYSTEM") or "/etc/gitconfig"))
+    return [path for path in candidates if path.is_file()]
+
+
+def _rewrites_urls(git_config: Path) -> bool:
+    """Check whether a git config file may rewrite remote URLs.
+
+    Args:
+        git_config: Path of a git config file
+
+    Returns:
+        True if the file sets ``insteadOf``, includes other files or cannot be read
+    """
+    try:
+        lines = git_config.read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return True
+    for line in lines:
+        line = line.strip().lower()
+        if line.startswith("[include") or line.partition("=")[0].strip().endswith("insteadof"):
+            return True
+    return False
+
+
+def _read_origin_url(git_config: Path) -> str | None:
+    """Read the ``origin`` remote's URL from a git config file.
+
+    Only the plain syntax git itself writes is understood. Files that
+    include other files or rewrite URLs (``insteadOf``) are left to git.
+
+    Args:
+        git_config: Path of the repository's config file
+
+    Returns:
+        The first ``url`` of ``[remote "origin"]``, or None if absent or not readable here
+    """
+    try:
+        lines = git_config.read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    in_origin = False
+    url = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            section = line[1 : line.find("]")].strip()
+            name, _, subsection = section.partition(" ")
+            name = name.lower()
+            if name.startswith("include"):
+                return None
+            in_origin = (name == "remote" and subsection.strip() == '"origin"') or (
+                name == "remote.origin"
+            )
+            continue
+        key, _, value = line.partition("=")
+        key = key.strip().lower()
+        if key.endswith("insteadof"):
+            return None
+        if in_origin and key == "url" and url is None:
+            url = _unquote_value(value)
+    return url
+
+
+def _unquote_value(value: str) -> str:
+    """Strip quotes and trailing comments from a git config value."""
+    result = []
+    quoted = False
+    for char in value.strip():
+        if char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            result.append(char)
+    return "".join(result).strip()
+
+
+def _config_mtimes(shared_configs: list[Path]) -> dict[str, int]:
+    """Get the mtimes of the user and system git configs, keyed by path."""
+    return {str(path): path.stat().st_mtime_ns for path in shared_configs}
+
+
+def _load_cached_project(git_config: Path, shared_configs: list[Path]) -> str | None:
+    """Get the project detected at an earlier start, if still valid.
+
+    Args:
+        git_config: Path of the repository's config file
+        shared_configs: The user and system git config files
+
+    Returns:
+        The cached project identifier, or None if missing or stale
+    """
+    try:
+        cached = json.loads(DETECTION_CACHE.read_text(encoding="utf-8"))
+        mtime_ns = git_config.stat().st_mtime_ns
+        shared_mtimes = _config_mtimes(shared_configs)
+    except (OSError, ValueError):
+        return None
+    if (
+        isinstance(cached, dict)
+        and cached.get("cwd") == str(Path.cwd())
+        and cached.get("git_config") == str(git_config)
+        and cached.get("mtime_ns") == mtime_ns
+        and cached.get("shared_configs", {}) == shared_mtimes
+        and isinstance(cached.get("project_id"), str)
+    ):
+        return cast(str, cached["project_id"])
+    return None
+
+
+def _save_cached_project(git_config: Path, shared_configs: list[Path], project_id: str) -> None:
+    """Cache a detected project for the next start (best effort).
+
+    Args:
+        git_config: Path of the repository's config file
+        shared_configs: The user and system git config files
+        project_id: The detected project identifier
+    """
+    tmp_path: str | None = None
+    try:
+        entry = {
+            "cwd": str(Path.cwd()),
+            "git_config": str(git_config),
+            "mtime_ns": git_config.stat().st_mtime_ns,
+            "shared_configs": _config_mtimes(shared_configs),
+            "project_id": project_id,
+        }
+        DETECTION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        # Rename a temp file into place, so sessions starting together never
+        # read a half-written cache
+        fd, tmp_path = tempfile.mkstemp(
+            dir=DETECTION_CACHE.parent, prefix=f".{DETECTION_CACHE.name}.", suffix=".tmp"
+        )
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, DETECTION_CACHE)
+        tmp_path = None
+    except OSError:
+        # A read-only directory only costs the next start a re-read
+        pass
+    finally:
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
 
 
 def _detect_project_from_directory() -> str:
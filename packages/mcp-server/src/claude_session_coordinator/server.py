@@ -2,46 +2,160 @@
 
 This module implements the main MCP server that provides tools, resources,
 and prompts for coordinating multiple Claude sessions across machines.
+
+Tools, resources and prompts are coroutines. Storage is accessed through an
+``AsyncStorageAdapter`` (synchronous adapters run in a bounded thread pool)
+and config/settings files are read in worker threads, so a slow disk or Redis
+call never blocks other requests in flight.
+
+Clients can subscribe to the session resources to be notified when another
+session changes them, instead of polling.
+
+The server speaks MCP over stdio by default. With the HTTP transports
+(``streamable-http`` or ``sse``) one process serves many clients. Server state
+lives in a ``CoordinatorContext`` rather than module globals, and the session
+each client claims with ``sign_on`` is kept per connection (see ``context``).
+
+If a coordinator daemon serves the configured storage, the server forwards
+its storage calls to the daemon rather than opening storage itself.
 """
 
+import asyncio
+import glob
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import Any
 
+from mcp import types
 from mcp.server.fastmcp import FastMCP
+from mcp.server.transport_security import TransportSecuritySettings
+from pydantic import AnyUrl
 
-from .adapters import AdapterFactory, StorageAdapter
+from .adapters import AdapterFactory, RemoteAdapter, StorageError
 from .config import load_config
-from .detection import detect_machine_id, detect_project_id
-from .settings import Settings, get_adapter_info, get_scope_description, recommend_adapter
+from .context import ClientConnection, CoordinatorContext
+from .settings import get_adapter_info, get_scope_description, recommend_adapter
+from .subscriptions import MAX_WATCH_TIMEOUT, wait_for_change
+
+logger = logging.getLogger(__name__)
+
+# Transports the server can speak
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+# Hosts the SDK's DNS rebinding protection accepts by default
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Seconds between sweeps of expired values
+SWEEP_INTERVAL = 60.0
+
+
+@asynccontextmanager
+async def client_connection(_: FastMCP) -> AsyncIterator[ClientConnection]:
+    """Connect a client to the coordinator for its lifetime (the MCP lifespan)."""
+    async with get_coordinator().connect() as connection:
+        yield connection
+
+
+app = FastMCP("claude-session-coordinator", lifespan=client_connection)
+
+# The context the MCP app serves, set by initialize_server
+coordinator: CoordinatorContext | None = None
+
+
+def initialize_server() -> CoordinatorContext:
+    """Initialize the server with configuration and storage adapter.
+
+    Returns:
+        The context the server now serves
+    """
+    global coordinator
 
-# Global server state
-app = FastMCP("claude-session-coordinator")
-storage: StorageAdapter | None = None
-machine_id: str = ""
-project_id: str = ""
-current_session: dict[str, str] | None = None
-settings_manager: Settings = Settings()
+    coordinator = CoordinatorContext.from_config(load_config())
+    return coordinator
 
 
-def initialize_server() -> None:
-    """Initialize the server with configuration and storage adapter."""
-    global storage, machine_id, project_id
+def get_coordinator() -> CoordinatorContext:
+    """Get the context the server serves.
 
-    # Load configuration
-    config = load_config()
+    Raises:
+        RuntimeError: If the server has not been initialized
+    """
+    if coordinator is None:
+        raise RuntimeError("Server not initialized")
+    return coordinator
 
-    # Create storage adapter from config
-    storage = AdapterFactory.create_adapter(config["storage"])
 
-    # Detect machine and project
-    machine_id = detect_machine_id(config)
-    project_id = detect_project_id(config)
+def get_connection() -> ClientConnection:
+    """Get the connection of the client whose request is being handled.
+
+    Outside an MCP request (e.g. when a tool is called directly), this is the
+    coordinator's default connection.
+
+    Raises:
+        RuntimeError: If the server has not been initialized
+    """
+    try:
+        return app.get_context().request_context.lifespan_context  # type: ignore[no-any-return]
+    except ValueError:
+        return get_coordinator().default_connection
+
+
+async def _expiry_sweeper(coordinator: CoordinatorContext) -> None:
+    """Delete expired values every ``SWEEP_INTERVAL`` seconds."""
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        try:
+            removed = await coordinator.storage.sweep_expired()
+        except StorageError as e:
+            logger.warning("Expiry sweep failed: %s", e)
+            continue
+        if removed:
+            logger.info("Swept %d expired values", removed)
+
+
+async def _lease_reaper(coordinator: CoordinatorContext) -> None:
+    """Run ``CoordinatorContext.maintain_leases`` every third of the lease TTL."""
+    while True:
+        await asyncio.sleep(coordinator.lease_ttl / 3)
+        try:
+            released = await coordinator.maintain_leases()
+        except StorageError as e:
+            logger.warning("Lease maintenance failed: %s", e)
+            continue
+        if released:
+            logger.info("Released expired instances: %s", ", ".join(released))
+
+
+def resource_scope_patterns(uri: str) -> list[str]:
+    """Get the storage scopes a subscribable resource is built from.
+
+    Args:
+        uri: Resource URI
+
+    Returns:
+        Glob patterns of the scopes whose changes update the resource
+
+    Raises:
+        ValueError: If the resource doesn't support subscriptions
+        RuntimeError: If the server has not been initialized
+    """
+    prefix = get_connection().coordinator.prefix
+    if uri == "session://context":
+        return [f"{prefix}:instances", f"{prefix}:session:*"]
+    instance_id = uri.removeprefix("session://state/")
+    if instance_id != uri and instance_id:
+        return [f"{prefix}:session:{glob.escape(instance_id)}"]
+    raise ValueError(f"Resource {uri} does not support subscriptions")
 
 
 # Tool implementations
 
 
 @app.tool()
-def sign_on(session_id: str | None = None) -> dict[str, str]:
+async def sign_on(session_id: str | None = None) -> dict[str, str]:
     """Sign on to claim an instance and establish session identity.
 
     🔹 REQUIRED FIRST STEP: Call this before any other operations.
@@ -49,7 +163,8 @@ def sign_on(session_id: str | None = None) -> dict[str, str]:
     What it does:
     - Auto-detects machine (from hostname)
     - Auto-detects project (from git remote)
-    - Claims first available instance (or use session_id parameter)
+    - Atomically claims first available instance (or use session_id parameter)
+    - Takes a lease on it that the server renews while it is running
     - Returns your session context
 
     Parameters:
@@ -66,39 +181,34 @@ def sign_on(session_id: str | None = None) -> dict[str, str]:
 
     After signing on, all other tools will work with your session context automatically.
     """
-    global current_session
-
-    if storage is None:
-        raise RuntimeError("Server not initialized")
+    connection = get_connection()
+    coordinator = connection.coordinator
 
-    # Auto-detect or assign session
-    if not session_id:
-        # Find first available
-        instances_scope = f"{machine_id}:{project_id}:instances"
-        instances = storage.retrieve(instances_scope, "registry") or {}
-
-        # Find first available instance, default to claude_1 if none exist
-        session_id = next((k for k, v in instances.items() if v == "available"), "claude_1")
-
-    # Mark as taken
-    instances_scope = f"{machine_id}:{project_id}:instances"
-    instances = storage.retrieve(instances_scope, "registry") or {}
-    instances[session_id] = "taken"
-    storage.store(instances_scope, "registry", instances)
-
-    # Set current session context
-    current_session = {
-        "machine": machine_id,
-        "project": project_id,
+    # Atomically claim the requested instance, or the first available one
+    instances_scope = f"{coordinator.prefix}:instances"
+    claimed = await coordinator.storage.claim_instance(
+        instances_scope, session_id, lease_ttl=coordinator.lease_ttl
+    )
+    if claimed is None:
+        if session_id:
+            raise RuntimeError(f"Instance {session_id} is already taken")
+        raise RuntimeError("All instances are currently taken")
+    session_id = claimed
+
+    # Set this connection's session context
+    session = {
+        "machine": coordinator.machine_id,
+        "project": coordinator.project_id,
         "session_id": session_id,
-        "full_scope_prefix": f"{machine_id}:{project_id}",
+        "full_scope_prefix": coordinator.prefix,
     }
+    connection.session = session
 
-    return current_session
+    return session
 
 
 @app.tool()
-def sign_off() -> dict[str, Any]:
+async def sign_off() -> dict[str, Any]:
     """Sign off from current session and release the instance.
 
     When done working:
@@ -112,28 +222,61 @@ def sign_off() -> dict[str, Any]:
       "session": {...session info...}
     }
     """
-    global current_session
-
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         return {"status": "no active session"}
 
     # Mark instance as available
     instances_scope = f"{current_session['full_scope_prefix']}:instances"
-    instances = storage.retrieve(instances_scope, "registry") or {}
-    instances[current_session["session_id"]] = "available"
-    storage.store(instances_scope, "registry", instances)
+    await connection.coordinator.storage.release_instance(
+        instances_scope, current_session["session_id"]
+    )
 
-    result = {"status": "signed off", "session": current_session}
-    current_session = None
+    connection.session = None
+    return {"status": "signed off", "session": current_session}
 
-    return result
+
+@app.tool()
+async def heartbeat() -> dict[str, Any]:
+    """Renew the lease on your instance.
+
+    Instances are claimed with a lease (5 minutes by default). The server
+    renews it automatically while it runs; instances whose lease expires,
+    e.g. because a session crashed without sign_off, are freed for others.
+    Call this to renew explicitly, e.g. before a long-running operation.
+
+    Returns:
+    {
+      "session_id": "claude_1",
+      "lease_expires_at": "2025-01-01T12:05:00+00:00",
+      "lease_ttl_seconds": 300.0
+    }
+    """
+    connection = get_connection()
+    current_session = connection.session
+    if not current_session:
+        raise RuntimeError("Not signed on. Call sign_on() first.")
+
+    instances_scope = f"{current_session['full_scope_prefix']}:instances"
+    session_id = current_session["session_id"]
+    lease_ttl = connection.coordinator.lease_ttl
+    expires_at = await connection.coordinator.storage.renew_lease(
+        instances_scope, session_id, lease_ttl
+    )
+    if expires_at is None:
+        connection.session = None
+        raise RuntimeError(f"Lease on {session_id} has expired. Call sign_on() again.")
+
+    return {
+        "session_id": session_id,
+        "lease_expires_at": datetime.fromtimestamp(expires_at, timezone.utc).isoformat(),
+        "lease_ttl_seconds": lease_ttl,
+    }
 
 
 @app.tool()
-def store_data(scope: str, key: str, value: Any) -> None:
+async def store_data(scope: str, key: str, value: Any, ttl: float | None = None) -> None:
     """Store data in a scoped context.
 
     All scopes are automatically prefixed with your machine:project context.
@@ -142,25 +285,30 @@ def store_data(scope: str, key: str, value: Any) -> None:
     - scope: Logical scope (e.g., "session:claude_1", "issue:15")
     - key: Key to store under
     - value: Value to store (must be JSON-serializable)
+    - ttl (optional): Seconds until the value expires and is cleaned up.
+      Use it for ephemeral state such as locks or "currently editing" markers.
 
     Example:
         store_data("session:claude_1", "current_issue", 15)
         store_data("session:claude_1", "todos", [...])
         store_data("issue:15", "status", "in_progress")
+        store_data("files", "src/server.py", "claude_1", ttl=600)
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
     # Auto-prefix with session context
     full_scope = f"{current_session['full_scope_prefix']}:{scope}"
-    storage.store(full_scope, key, value)
+    if ttl is None:
+        await connection.coordinator.storage.store(full_scope, key, value)
+    else:
+        await connection.coordinator.storage.store(full_scope, key, value, ttl=ttl)
 
 
 @app.tool()
-def retrieve_data(scope: str, key: str) -> Any:
+async def retrieve_data(scope: str, key: str) -> Any:
     """Retrieve data from a scoped context.
 
     Parameters:
@@ -174,18 +322,68 @@ def retrieve_data(scope: str, key: str) -> Any:
         issue = retrieve_data("session:claude_1", "current_issue")
         todos = retrieve_data("session:claude_1", "todos")
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
+    connection = get_connection()
+    current_session = connection.session
+    if not current_session:
+        raise RuntimeError("Must call sign_on() first")
+
+    full_scope = f"{current_session['full_scope_prefix']}:{scope}"
+    return await connection.coordinator.storage.retrieve(full_scope, key)
+
 
+@app.tool()
+async def store_data_batch(scope: str, values: dict[str, Any]) -> None:
+    """Store several keys in a scoped context in one operation.
+
+    Prefer this over repeated store_data calls when updating multiple keys
+    at once; the scope is read and written only once.
+
+    Parameters:
+    - scope: Logical scope (e.g., "session:claude_1", "issue:15")
+    - values: Mapping of keys to values (each must be JSON-serializable)
+
+    Example:
+        store_data_batch("session:claude_1", {
+            "current_issue": 15,
+            "status": "in_progress",
+            "todos": [...],
+        })
+    """
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
     full_scope = f"{current_session['full_scope_prefix']}:{scope}"
-    return storage.retrieve(full_scope, key)
+    await connection.coordinator.storage.store_many(full_scope, values)
 
 
 @app.tool()
-def delete_data(scope: str, key: str) -> bool:
+async def retrieve_data_batch(scope: str, keys: list[str]) -> dict[str, Any]:
+    """Retrieve several keys from a scoped context in one operation.
+
+    Parameters:
+    - scope: Logical scope (e.g., "session:claude_1", "issue:15")
+    - keys: Keys to retrieve
+
+    Returns:
+        Mapping of each requested key to its value (None if not found)
+
+    Example:
+        state = retrieve_data_batch("session:claude_1", ["current_issue", "todos"])
+        # → {"current_issue": 15, "todos": [...]}
+    """
+    connection = get_connection()
+    current_session = connection.session
+    if not current_session:
+        raise RuntimeError("Must call sign_on() first")
+
+    full_scope = f"{current_session['full_scope_prefix']}:{scope}"
+    return await connection.coordinator.storage.retrieve_many(full_scope, keys)
+
+
+@app.tool()
+async def delete_data(scope: str, key: str) -> bool:
     """Delete a specific key from a scope.
 
     Parameters:
@@ -195,18 +393,17 @@ def delete_data(scope: str, key: str) -> bool:
     Returns:
         True if the key existed and was deleted, False otherwise
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
     full_scope = f"{current_session['full_scope_prefix']}:{scope}"
-    return storage.delete(full_scope, key)
+    return await connection.coordinator.storage.delete(full_scope, key)
 
 
 @app.tool()
-def list_keys(scope: str) -> list[str]:
+async def list_keys(scope: str) -> list[str]:
     """List all keys in a scope.
 
     Parameters:
@@ -219,18 +416,17 @@ def list_keys(scope: str) -> list[str]:
         keys = list_keys("session:claude_1")
         # → ["current_issue", "todos", "status"]
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
     full_scope = f"{current_session['full_scope_prefix']}:{scope}"
-    return storage.list_keys(full_scope)
+    return await connection.coordinator.storage.list_keys(full_scope)
 
 
 @app.tool()
-def list_scopes(pattern: str | None = None) -> list[str]:
+async def list_scopes(pattern: str | None = None) -> list[str]:
     """List all scopes, optionally filtered by pattern.
 
     Scopes are automatically filtered to your machine:project context,
@@ -249,9 +445,8 @@ def list_scopes(pattern: str | None = None) -> list[str]:
         sessions = list_scopes("session:*")
         # → ["session:claude_1", "session:claude_2"]
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
@@ -261,7 +456,7 @@ def list_scopes(pattern: str | None = None) -> list[str]:
     else:
         full_pattern = f"{current_session['full_scope_prefix']}:*"
 
-    scopes = storage.list_scopes(full_pattern)
+    scopes = await connection.coordinator.storage.list_scopes(full_pattern)
 
     # Strip prefix for cleaner output
     prefix = f"{current_session['full_scope_prefix']}:"
@@ -269,7 +464,7 @@ def list_scopes(pattern: str | None = None) -> list[str]:
 
 
 @app.tool()
-def delete_scope(scope: str) -> bool:
+async def delete_scope(scope: str) -> bool:
     """Delete an entire scope and all its keys.
 
     ⚠️ WARNING: This permanently deletes all data in the scope.
@@ -283,18 +478,59 @@ def delete_scope(scope: str) -> bool:
     Example:
         delete_scope("issue:15")  # Delete all data for issue 15
     """
-    if storage is None:
-        raise RuntimeError("Server not initialized")
-
+    connection = get_connection()
+    current_session = connection.session
     if not current_session:
         raise RuntimeError("Must call sign_on() first")
 
     full_scope = f"{current_session['full_scope_prefix']}:{scope}"
-    return storage.delete_scope(full_scope)
+    return await connection.coordinator.storage.delete_scope(full_scope)
 
 
 @app.tool()
-def update_storage_settings(
+async def watch_scope(scope: str, timeout: float = 30.0) -> dict[str, Any]:
+    """Wait until another session changes a scope, instead of polling it.
+
+    Returns as soon as the scope changes, or after the timeout. Use it to
+    react to other sessions' progress, e.g. wait for claude_2 to finish an
+    issue before starting one that depends on it.
+
+    Parameters:
+    - scope: Logical scope or glob pattern (e.g., "session:claude_2", "issue:*")
+    - timeout (optional): Seconds to wait at most (default 30, at most 300)
+
+    Returns:
+    {
+      "changed": true,
+      "scopes": ["session:claude_2"]
+    }
+
+    Only changes made after the call are reported; read the scope first, then
+    watch it. "scopes" is the pattern itself if the storage could not tell
+    which scope changed.
+    """
+    connection = get_connection()
+    current_session = connection.session
+    if not current_session:
+        raise RuntimeError("Must call sign_on() first")
+
+    prefix = f"{current_session['full_scope_prefix']}:"
+    timeout = min(max(timeout, 0.0), MAX_WATCH_TIMEOUT)
+    try:
+        changed = await wait_for_change(connection.coordinator.storage, f"{prefix}{scope}", timeout)
+    except NotImplementedError as e:
+        raise RuntimeError(f"Storage adapter cannot watch for changes: {e}") from e
+
+    return {
+        "changed": bool(changed),
+        "scopes": list(
+            dict.fromkeys(scope if s is None else s.removeprefix(prefix) for s in changed)
+        ),
+    }
+
+
+@app.tool()
+async def update_storage_settings(
     adapter: str,
     scope: str,
     reason: str,
@@ -307,7 +543,7 @@ def update_storage_settings(
     - Simplifying back to single-machine → switch to "single-machine"
 
     Parameters:
-    - adapter: Storage adapter to use ("local" or "redis")
+    - adapter: Storage adapter to use (any registered adapter, e.g. "local" or "redis")
     - scope: Coordination scope ("single-machine", "multi-machine", or "team")
     - reason: Why you're making this change (for documentation)
 
@@ -322,7 +558,7 @@ def update_storage_settings(
         )
     """
     # Validate parameters
-    valid_adapters = ["local", "redis"]
+    valid_adapters = AdapterFactory.available_adapters()
     valid_scopes = ["single-machine", "multi-machine", "team"]
 
     if adapter not in valid_adapters:
@@ -342,7 +578,7 @@ def update_storage_settings(
         )
 
     # Load current config to check adapter availability
-    config = load_config()
+    config = await asyncio.to_thread(load_config)
     adapter_info = get_adapter_info(adapter, config)  # type: ignore
 
     if not adapter_info["ready"]:
@@ -352,21 +588,24 @@ def update_storage_settings(
         )
 
     # Update settings file
-    if settings_manager.exists():
-        settings_manager.update(
+    settings_manager = get_connection().coordinator.settings
+    if await asyncio.to_thread(settings_manager.exists):
+        await asyncio.to_thread(
+            settings_manager.update,
             storage_adapter=adapter,  # type: ignore
             coordination_scope=scope,  # type: ignore
             notes=reason,
         )
     else:
-        settings_manager.save(
+        await asyncio.to_thread(
+            settings_manager.save,
             storage_adapter=adapter,  # type: ignore
             coordination_scope=scope,  # type: ignore
             notes=reason,
         )
 
     # Return new settings with guidance
-    new_settings = settings_manager.load()
+    new_settings = await asyncio.to_thread(settings_manager.load)
     scope_info = get_scope_description(scope)  # type: ignore
 
     return {
@@ -386,7 +625,7 @@ def update_storage_settings(
 
 
 @app.resource("session://context")
-def get_session_context() -> str:
+async def get_session_context() -> str:
     """Provide current session context and available instances.
 
     Claude can read this resource to understand:
@@ -398,57 +637,17 @@ def get_session_context() -> str:
     Returns:
         JSON string with session context information
     """
-    if storage is None:
+    try:
+        connection = get_connection()
+    except RuntimeError:
         return '{"error": "Server not initialized"}'
 
-    # Get current state
-    instances_scope = f"{machine_id}:{project_id}:instances"
-    instances = storage.retrieve(instances_scope, "registry") or {
-        "claude_1": "available",
-        "claude_2": "available",
-        "claude_3": "available",
-        "claude_4": "available",
-    }
-
-    # Find active sessions
-    active_sessions = []
-    for instance_id, status in instances.items():
-        if status == "taken":
-            session_scope = f"{machine_id}:{project_id}:session:{instance_id}"
-            keys = storage.list_keys(session_scope)
-            if keys:
-                current_issue = storage.retrieve(session_scope, "current_issue")
-                todos = storage.retrieve(session_scope, "todos") or []
-                active_sessions.append(
-                    {
-                        "instance": instance_id,
-                        "status": status,
-                        "current_issue": current_issue,
-                        "todo_count": len(todos) if isinstance(todos, list) else 0,
-                    }
-                )
-
-    context = {
-        "machine": machine_id,
-        "project": project_id,
-        "current_session": current_session,
-        "instances": instances,
-        "active_sessions": active_sessions,
-        "first_available": next((k for k, v in instances.items() if v == "available"), None),
-        "instructions": {
-            "if_not_signed_on": "Call sign_on() to claim an instance",
-            "if_signed_on": "Use store_data/retrieve_data to work with session state",
-            "when_done": "Call sign_off() to release your instance",
-        },
-    }
-
-    import json
-
-    return json.dumps(context, indent=2)
+    # Served from the in-memory view, which only re-reads scopes that changed
+    return await connection.coordinator.context_view.render(connection.session)
 
 
 @app.resource("session://state/{instance_id}")
-def get_session_state(instance_id: str) -> str:
+async def get_session_state(instance_id: str) -> str:
     """Read another session's state (read-only coordination).
 
     Allows sessions to see what others are working on without
@@ -460,30 +659,29 @@ def get_session_state(instance_id: str) -> str:
     Returns:
         JSON string with session state information
     """
-    if storage is None:
+    try:
+        connection = get_connection()
+    except RuntimeError:
         return '{"error": "Server not initialized"}'
 
-    session_scope = f"{machine_id}:{project_id}:session:{instance_id}"
+    session_scope = f"{connection.coordinator.prefix}:session:{instance_id}"
 
-    keys = storage.list_keys(session_scope)
+    keys = await connection.coordinator.storage.list_keys(session_scope)
     if not keys:
         return '{"error": "Session not found or not active"}'
 
     state = {
         "instance": instance_id,
-        "current_issue": storage.retrieve(session_scope, "current_issue"),
-        "status": storage.retrieve(session_scope, "status"),
-        "todos": storage.retrieve(session_scope, "todos"),
-        "last_updated": storage.retrieve(session_scope, "last_updated"),
+        **await connection.coordinator.storage.retrieve_many(
+            session_scope, ["current_issue", "status", "todos", "last_updated"]
+        ),
     }
 
-    import json
-
     return json.dumps(state, indent=2)
 
 
 @app.resource("session://storage-config")
-def get_storage_config() -> str:
+async def get_storage_config() -> str:
     """Show current storage settings and available options.
 
     This resource provides information about:
@@ -495,18 +693,16 @@ def get_storage_config() -> str:
     Returns:
         JSON string with storage configuration information
     """
-    import json
-
     # Load current settings
-    current_settings = settings_manager.load()
+    current_settings = await asyncio.to_thread(get_connection().coordinator.settings.load)
 
     # Load configuration to check adapter availability
-    config = load_config()
+    config = await asyncio.to_thread(load_config)
 
-    # Get info for all available adapters
+    # Get info for every registered adapter
     available_options = {
-        "local": get_adapter_info("local", config),
-        "redis": get_adapter_info("redis", config),
+        name: get_adapter_info(name, config)  # type: ignore
+        for name in AdapterFactory.available_adapters()
     }
 
     # Build response
@@ -561,22 +757,60 @@ def get_storage_config() -> str:
     return json.dumps(response, indent=2)
 
 
+@app._mcp_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Subscribe the requesting client to updates of a session resource."""
+    patterns = resource_scope_patterns(str(uri))
+    connection = get_connection()
+    session = app.get_context().session
+    # Dropped when the client disconnects
+    connection.server_session = session
+    try:
+        await connection.coordinator.subscriptions.subscribe(session, str(uri), patterns)
+    except NotImplementedError as e:
+        raise RuntimeError(f"Storage adapter cannot watch for changes: {e}") from e
+
+
+@app._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """Cancel the requesting client's subscription to a resource."""
+    await get_connection().coordinator.subscriptions.unsubscribe(
+        app.get_context().session, str(uri)
+    )
+
+
+def _get_capabilities(*args: Any, **kwargs: Any) -> types.ServerCapabilities:
+    """Get the server capabilities, advertising resource subscriptions."""
+    capabilities = _get_sdk_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+# The SDK never advertises subscriptions, even with the handlers registered
+_get_sdk_capabilities = app._mcp_server.get_capabilities
+app._mcp_server.get_capabilities = _get_capabilities  # type: ignore[method-assign]
+
+
 # Prompt implementations
 
 
 @app.prompt()
-def startup() -> str:
+async def startup() -> str:
     """Guide Claude through session startup.
 
     This prompt is shown when Claude connects to help establish
     session identity and understand the current state.
     """
-    if storage is None:
+    try:
+        coordinator = get_connection().coordinator
+    except RuntimeError:
         return "⚠️ Server not initialized"
+    settings_manager = coordinator.settings
 
     # Check if this is first run (no storage settings configured)
-    if not settings_manager.exists():
-        config = load_config()
+    if not await asyncio.to_thread(settings_manager.exists):
+        config = await asyncio.to_thread(load_config)
         local_info = get_adapter_info("local", config)
         redis_info = get_adapter_info("redis", config)
 
@@ -620,24 +854,18 @@ What are your coordination needs?
 """
 
     # Settings exist - proceed with normal startup
-    current_settings = settings_manager.load()
+    current_settings = await asyncio.to_thread(settings_manager.load)
     current_adapter = current_settings.get("storage_adapter") if current_settings else "unknown"
     current_scope = current_settings.get("coordination_scope") if current_settings else "unknown"
 
-    instances_scope = f"{machine_id}:{project_id}:instances"
-    instances = storage.retrieve(instances_scope, "registry") or {
-        "claude_1": "available",
-        "claude_2": "available",
-        "claude_3": "available",
-        "claude_4": "available",
-    }
+    instances = await coordinator.context_view.instances()
 
     first_available = next((k for k, v in instances.items() if v == "available"), None)
 
     if first_available is None:
         active_count = sum(1 for v in instances.values() if v == "taken")
         return f"""
-⚠️ All instances are currently taken in {project_id}.
+⚠️ All instances are currently taken in {coordinator.project_id}.
 
 Active sessions: {active_count}
 
@@ -650,8 +878,8 @@ Please wait for an instance to become available, or ask the user which instance
     return f"""
 # Session Coordinator Startup
 
-You are starting a new session in: **{project_id}**
-Machine: {machine_id}
+You are starting a new session in: **{coordinator.project_id}**
+Machine: {coordinator.machine_id}
 
 ## Storage Configuration
 - Adapter: {current_adapter}
@@ -674,11 +902,16 @@ Would you like me to sign on now?
 
 
 @app.prompt()
-def sign_off_prompt() -> str:
+async def sign_off_prompt() -> str:
     """Guide Claude through proper sign-off procedure.
 
     Reminds about incomplete work and ensures proper cleanup.
     """
+    try:
+        connection = get_connection()
+    except RuntimeError:
+        return "No active session to sign off from."
+    current_session = connection.session
     if not current_session:
         return "No active session to sign off from."
 
@@ -686,8 +919,11 @@ def sign_off_prompt() -> str:
     session_scope = (
         f"{current_session['full_scope_prefix']}:session:{current_session['session_id']}"
     )
-    current_issue = storage.retrieve(session_scope, "current_issue") if storage else None
-    todos = storage.retrieve(session_scope, "todos") if storage else []
+    values = await connection.coordinator.storage.retrieve_many(
+        session_scope, ["current_issue", "todos"]
+    )
+    current_issue = values["current_issue"]
+    todos = values["todos"]
 
     if isinstance(todos, list):
         incomplete = [t for t in todos if isinstance(t, dict) and t.get("status") != "completed"]
@@ -720,14 +956,14 @@ Call `sign_off()` to release instance {current_session['session_id']}.
 
 
 @app.prompt()
-def first_run_storage() -> str:
+async def first_run_storage() -> str:
     """Guide users through storage adapter selection on first run.
 
     This prompt is shown when .claude/settings.local.json doesn't exist yet,
     helping users understand coordination options and make an informed choice.
     """
     # Load config to check adapter availability
-    config = load_config()
+    config = await asyncio.to_thread(load_config)
     local_info = get_adapter_info("local", config)
     redis_info = get_adapter_info("redis", config)
 
@@ -788,13 +1024,46 @@ Your choice will be saved to `.claude/settings.local.json` (gitignored).
 # Server entry point
 
 
-async def main() -> None:
-    """Main entry point for the MCP server."""
-    initialize_server()
-    await app.run_stdio_async()
+async def main(transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Main entry point for the MCP server.
 
+    Args:
+        transport: One of ``TRANSPORTS``
+        host: Address the HTTP transports listen on
+        port: Port the HTTP transports listen on
 
-if __name__ == "__main__":
-    import asyncio
+    Raises:
+        ValueError: If the transport is unknown
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{transport}'. Valid options: {', '.join(TRANSPORTS)}")
+
+    coordinator = initialize_server()
+    tasks = [asyncio.create_task(_lease_reaper(coordinator))]
+    if not isinstance(coordinator.storage, RemoteAdapter):
+        # A daemon sweeps its storage itself
+        tasks.append(asyncio.create_task(_expiry_sweeper(coordinator)))
+    try:
+        if transport == "stdio":
+            await app.run_stdio_async()
+        else:
+            app.settings.host, app.settings.port = host, port
+            if host not in LOOPBACK_HOSTS:
+                # The localhost-only Host check would reject every remote client
+                app.settings.transport_security = TransportSecuritySettings(
+                    enable_dns_rebinding_protection=False
+                )
+                logger.warning("Serving on %s without authentication", host)
+            if transport == "sse":
+                await app.run_sse_async()
+            else:
+                await app.run_streamable_http_async()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Writes out buffered data and stops the adapter's threads
+        await coordinator.aclose()
 
+
+if __name__ == "__main__":
     asyncio.run(main())
@@ -10,8 +10,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal
 
+from .config import daemon_explicitly_enabled
+
 # Type aliases for better type hints
-AdapterType = Literal["local", "redis"]
+AdapterType = Literal["local", "log", "sqlite", "redis"]
 CoordinationScope = Literal["single-machine", "multi-machine", "team"]
 
 
@@ -186,6 +188,35 @@ def get_adapter_info(adapter: AdapterType, config: dict[str, Any]) -> dict[str,
             "setup_required": False,
             "setup_instructions": None,
         }
+    elif adapter == "log":
+        # Only one process can open the log, so sessions must share it via the daemon
+        daemon_enabled = daemon_explicitly_enabled(config)
+
+        return {
+            "name": "log",
+            "display_name": "Log-Structured Storage",
+            "ready": daemon_enabled,
+            "capabilities": (
+                "Single-machine coordination; only one process can open a log directory, "
+                "so several sessions need the coordinator daemon"
+            ),
+            "setup_required": not daemon_enabled,
+            "setup_instructions": (
+                'Set "daemon": {"enabled": true} in config and run '
+                "`claude-session-coordinator daemon`"
+                if not daemon_enabled
+                else None
+            ),
+        }
+    elif adapter == "sqlite":
+        return {
+            "name": "sqlite",
+            "display_name": "SQLite Storage",
+            "ready": True,
+            "capabilities": "Single-machine coordination, safe for many concurrent sessions",
+            "setup_required": False,
+            "setup_instructions": None,
+        }
     elif adapter == "redis":
         # Check if Redis is configured
         redis_config = config.get("storage", {}).get("config", {})
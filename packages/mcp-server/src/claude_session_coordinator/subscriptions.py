@@ -0,0 +1,184 @@
+"""Change notifications pushed to MCP clients.
+
+Instead of polling ``session://context`` or ``session://state/{instance_id}``
+to see another session's progress, clients can subscribe to those resources
+and are sent ``notifications/resources/updated`` when a scope behind them
+changes, or call the ``watch_scope`` tool, which waits for the next change to
+a scope. Both are built on ``AsyncStorageAdapter.awatch``, which starts and
+stops the adapter's change source off the event loop.
+"""
+
+import asyncio
+import functools
+import logging
+from collections.abc import Awaitable, Callable
+
+from mcp.server.session import ServerSession
+
+from .adapters import AsyncStorageAdapter
+
+logger = logging.getLogger(__name__)
+
+# Longest a watch_scope call may wait, in seconds
+MAX_WATCH_TIMEOUT = 300.0
+
+
+class ResourceSubscriptions:
+    """Sends resource-updated notifications to subscribed client sessions.
+
+    Each subscription watches the storage scopes a resource is built from.
+    Changes are reported from storage threads and handed to the event loop;
+    several changes to a resource that arrive before its notification is
+    sent are coalesced into one.
+
+    Example:
+        >>> subscriptions = ResourceSubscriptions(storage)
+        >>> await subscriptions.subscribe(session, "session://state/claude_2",
+        ...                               ["laptop:org/repo:session:claude_2"])
+
+    Attributes:
+        storage: Adapter whose changes are watched
+    """
+
+    def __init__(self, storage: AsyncStorageAdapter) -> None:
+        """Initialize the subscriptions.
+
+        Args:
+            storage: Adapter whose changes are watched
+        """
+        self.storage = storage
+        # (session, uri) -> functions cancelling the storage watches
+        self._subscriptions: dict[
+            tuple[ServerSession, str], list[Callable[[], Awaitable[None]]]
+        ] = {}
+        # Notifications scheduled but not sent yet
+        self._pending: set[tuple[ServerSession, str]] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def subscribe(self, session: ServerSession, uri: str, patterns: list[str]) -> None:
+        """Subscribe a client session to a resource.
+
+        Subscribing again to the same resource replaces the earlier subscription.
+
+        Args:
+            session: The client's session
+            uri: Resource URI to send in notifications
+            patterns: Glob patterns of the scopes the resource is built from
+
+        Raises:
+            NotImplementedError: If the adapter does not support change notifications
+        """
+        self._loop = asyncio.get_running_loop()
+        await self.unsubscribe(session, uri)
+
+        callback = functools.partial(self._on_change, (session, uri))
+        unsubscribes: list[Callable[[], Awaitable[None]]] = []
+        try:
+            for pattern in patterns:
+                unsubscribes.append(await self.storage.awatch(callback, pattern))
+        except BaseException:
+            for unsubscribe in unsubscribes:
+                await unsubscribe()
+            raise
+        self._subscriptions[(session, uri)] = unsubscribes
+
+    async def unsubscribe(self, session: ServerSession, uri: str) -> bool:
+        """Cancel a client session's subscription to a resource.
+
+        Returns:
+            True if the session was subscribed
+        """
+        unsubscribes = self._subscriptions.pop((session, uri), None)
+        for unsubscribe in unsubscribes or []:
+            await unsubscribe()
+        return unsubscribes is not None
+
+    async def unsubscribe_session(self, session: ServerSession) -> None:
+        """Cancel all of a client session's subscriptions (e.g. when it disconnects)."""
+        for uri in self.subscribed(session):
+            await self.unsubscribe(session, uri)
+
+    def subscribed(self, session: ServerSession) -> list[str]:
+        """Get the URIs a client session is subscribed to."""
+        return sorted(uri for subscriber, uri in self._subscriptions if subscriber is session)
+
+    def _on_change(self, subscription: tuple[ServerSession, str], scope: str | None) -> None:
+        """Schedule a notification (called from storage threads)."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._schedule, subscription)
+        except RuntimeError:
+            # The event loop has shut down
+            pass
+
+    def _schedule(self, subscription: tuple[ServerSession, str]) -> None:
+        """Start sending a notification unless one is already pending."""
+        if subscription in self._pending or subscription not in self._subscriptions:
+            return
+        self._pending.add(subscription)
+        task = asyncio.get_running_loop().create_task(self._send(subscription))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, subscription: tuple[ServerSession, str]) -> None:
+        """Send a resource-updated notification, dropping sessions that went away."""
+        self._pending.discard(subscription)
+        session, uri = subscription
+        try:
+            await session.send_resource_updated(uri)  # type: ignore[arg-type]
+        except Exception as e:
+            logger.debug("Dropping subscriptions of a closed session: %s", e)
+            await self.unsubscribe_session(session)
+
+    async def aclose(self) -> None:
+        """Cancel every subscription."""
+        for task in self._tasks:
+            task.cancel()
+        for session, uri in list(self._subscriptions):
+            await self.unsubscribe(session, uri)
+
+
+async def wait_for_change(
+    storage: AsyncStorageAdapter, pattern: str, timeout: float
+) -> list[str | None]:
+    """Wait for changes to scopes matching a pattern.
+
+    Args:
+        storage: Adapter to watch
+        pattern: Glob pattern of the scopes to watch
+        timeout: Seconds to wait at most
+
+    Returns:
+        The changed scopes (None if unknown scopes changed), or an empty list
+        if nothing changed before the timeout
+
+    Raises:
+        NotImplementedError: If the adapter does not support change notifications
+    """
+    loop = asyncio.get_running_loop()
+    changed: list[str | None] = []
+    event = asyncio.Event()
+
+    def record(scope: str | None) -> None:
+        changed.append(scope)
+        event.set()
+
+    def on_change(scope: str | None) -> None:
+        try:
+            loop.call_soon_threadsafe(record, scope)
+        except RuntimeError:
+            # The event loop has shut down
+            pass
+
+    unsubscribe = await storage.awatch(on_change, pattern)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await unsubscribe()
+    # Let changes reported together with the first one arrive too
+    await asyncio.sleep(0)
+    return list(dict.fromkeys(changed))
@@ -0,0 +1,219 @@
+"""Materialized session context view.
+
+Clients read the ``session://context`` resource and the ``startup`` prompt
+often, and the answer only changes when a session claims or releases an
+instance or updates its state. ``SessionContextView`` keeps the instance
+registry and the active sessions' summary fields in memory, subscribes to
+the adapter's change notifications on first use, and on each read only re-reads the
+scopes that changed since the last one. The rendered JSON is cached until
+something changes, so repeated reads do no I/O at all.
+
+Adapters without change notifications are read in full on every access,
+as before.
+"""
+
+import asyncio
+import glob
+import json
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .adapters import AsyncStorageAdapter
+from .adapters.base import DEFAULT_INSTANCES
+
+# Session fields summarized in the context view
+SUMMARY_KEYS = ["current_issue", "todos"]
+
+# Seconds after which the view is re-read in full even without notifications,
+# in case one was missed
+DEFAULT_MAX_AGE = 30.0
+
+
+class SessionContextView:
+    """In-memory view of a project's instances and active sessions.
+
+    Example:
+        >>> view = SessionContextView(storage, "laptop:org/repo")
+        >>> text = await view.render(current_session)  # reads storage
+        >>> text = await view.render(current_session)  # cached, no I/O
+
+    Attributes:
+        storage: Adapter the view reads from
+        prefix: The project's ``machine:project`` scope prefix
+    """
+
+    def __init__(
+        self, storage: AsyncStorageAdapter, prefix: str, max_age: float = DEFAULT_MAX_AGE
+    ) -> None:
+        """Initialize the view (it subscribes to the project's changes on first use).
+
+        Args:
+            storage: Adapter to read from
+            prefix: The project's ``machine:project`` scope prefix
+            max_age: Seconds after which the view is re-read in full anyway
+        """
+        self.storage = storage
+        self.prefix = prefix
+        self.max_age = max_age
+        self._instances_scope = f"{prefix}:instances"
+        self._session_prefix = f"{prefix}:session:"
+
+        self._registry: dict[str, str] | None = None
+        # Session scope -> summary fields of every non-empty session scope
+        self._sessions: dict[str, dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        # Rendered JSON per session id (clients sharing a server have different
+        # sessions), with the session it was rendered for
+        self._rendered: dict[str | None, tuple[dict[str, str] | None, str]] = {}
+
+        # Changes reported since the last refresh (written by notifier threads)
+        self._lock = threading.Lock()
+        self._stale_all = True
+        self._stale_registry = False
+        self._stale_sessions: set[str] = set()
+        # Serializes refreshes, so no reader renders while another is mid-refresh
+        self._refresh_lock = asyncio.Lock()
+
+        # Whether the adapter reports changes; known after the first refresh
+        self.cacheable = False
+        self._watching = False
+        self._unsubscribe: Callable[[], Awaitable[None]] | None = None
+
+    def _on_change(self, scope: str | None) -> None:
+        """Record a change reported by the adapter."""
+        with self._lock:
+            if scope is None:
+                self._stale_all = True
+            elif scope == self._instances_scope:
+                self._stale_registry = True
+            elif scope.startswith(self._session_prefix):
+                self._stale_sessions.add(scope)
+
+    async def _refresh(self) -> bool:
+        """Re-read whatever changed since the last refresh.
+
+        Returns:
+            True if anything was re-read
+        """
+        async with self._refresh_lock:
+            return await self._refresh_locked()
+
+    async def _refresh_locked(self) -> bool:
+        """Re-read whatever changed since the last refresh (refresh lock held)."""
+        if not self._watching:
+            # Subscribe before the first full read, so no change slips in between
+            try:
+                self._unsubscribe = await self.storage.awatch(self._on_change, f"{self.prefix}:*")
+                self.cacheable = True
+            except NotImplementedError:
+                self.cacheable = False
+            self._watching = True
+
+        with self._lock:
+            if not self.cacheable or time.monotonic() - self._loaded_at > self.max_age:
+                self._stale_all = True
+            stale_all, self._stale_all = self._stale_all, False
+            stale_registry, self._stale_registry = self._stale_registry, False
+            stale_sessions, self._stale_sessions = self._stale_sessions, set()
+
+        try:
+            if stale_all:
+                self._loaded_at = time.monotonic()
+                self._registry, self._sessions = await asyncio.gather(
+                    self.storage.retrieve(self._instances_scope, "registry"),
+                    self.storage.snapshot_scopes(f"{self._session_prefix}*", keys=SUMMARY_KEYS),
+                )
+                return True
+
+            reads: list[Awaitable[Any]] = []
+            if stale_registry:
+                reads.append(self.storage.retrieve(self._instances_scope, "registry"))
+            reads.extend(
+                self.storage.snapshot_scopes(glob.escape(scope), keys=SUMMARY_KEYS)
+                for scope in stale_sessions
+            )
+            results = await asyncio.gather(*reads)
+        except BaseException:
+            # Nothing was applied; try again on the next read
+            with self._lock:
+                self._stale_all |= stale_all
+                self._stale_registry |= stale_registry
+                self._stale_sessions |= stale_sessions
+            raise
+
+        snapshots = results
+        if stale_registry:
+            self._registry, *snapshots = results
+        for scope, snapshot in zip(stale_sessions, snapshots, strict=True):
+            if scope in snapshot:
+                self._sessions[scope] = snapshot[scope]
+            else:
+                self._sessions.pop(scope, None)
+        return bool(results)
+
+    async def instances(self) -> dict[str, str]:
+        """Get the instance registry (with the default instances if it doesn't exist yet)."""
+        if await self._refresh():
+            self._rendered.clear()
+        return dict(self._registry or dict.fromkeys(DEFAULT_INSTANCES, "available"))
+
+    async def render(self, current_session: dict[str, str] | None) -> str:
+        """Get the ``session://context`` document.
+
+        Args:
+            current_session: This server's session, included in the document
+
+        Returns:
+            JSON text, cached until the view or ``current_session`` changes
+        """
+        if await self._refresh():
+            self._rendered.clear()
+        session_id = None if current_session is None else current_session.get("session_id")
+        rendered = self._rendered.get(session_id)
+        if rendered is not None and rendered[0] == current_session:
+            return rendered[1]
+
+        machine, project = self.prefix.split(":", 1)
+        instances = self._registry or dict.fromkeys(DEFAULT_INSTANCES, "available")
+
+        active_sessions = []
+        for instance_id, status in instances.items():
+            values = self._sessions.get(f"{self._session_prefix}{instance_id}")
+            if status == "taken" and values is not None:
+                todos = values.get("todos") or []
+                active_sessions.append(
+                    {
+                        "instance": instance_id,
+                        "status": status,
+                        "current_issue": values.get("current_issue"),
+                        "todo_count": len(todos) if isinstance(todos, list) else 0,
+                    }
+                )
+
+        context = {
+            "machine": machine,
+            "project": project,
+            "current_session": current_session,
+            "instances": instances,
+            "active_sessions": active_sessions,
+            "first_available": next((k for k, v in instances.items() if v == "available"), None),
+            "instructions": {
+                "if_not_signed_on": "Call sign_on() to claim an instance",
+                "if_signed_on": "Use store_data/retrieve_data to work with session state",
+                "when_done": "Call sign_off() to release your instance",
+            },
+        }
+        text = json.dumps(context, indent=2)
+        self._rendered[session_id] = (
+            None if current_session is None else dict(current_session),
+            text,
+        )
+        return text
+
+    async def aclose(self) -> None:
+        """Stop receiving change notifications."""
+        if self._unsubscribe is not None:
+            unsubscribe, self._unsubscribe = self._unsubscribe, None
+            await unsubscribe()
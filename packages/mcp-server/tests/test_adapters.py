@@ -1,18 +1,76 @@
 """Comprehensive tests for storage adapters."""
 
+import asyncio
 import json
+import os
 import tempfile
+import threading
+import time
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
 from claude_session_coordinator.adapters import (
     AdapterFactory,
+    AsyncStorageAdapter,
     LocalFileAdapter,
+    LogStructuredAdapter,
+    RedisAdapter,
+    SQLiteAdapter,
     StorageAdapter,
     StorageError,
+    ThreadedAsyncAdapter,
+    to_async,
 )
+from claude_session_coordinator.adapters.manifest import ScopeTrie
+from claude_session_coordinator.adapters.watch import ChangeHub
+
+
+def _sqlite_writer(path: str, worker: int, count: int) -> None:
+    """Store keys from a separate process (used by the SQLite concurrency test)."""
+    adapter = SQLiteAdapter(path=path)
+    for i in range(count):
+        adapter.store("laptop:org/repo:session:shared", f"w{worker}_{i}", i)
+    adapter.close()
+
+
+def _local_claimer(base_path: str) -> str | None:
+    """Claim an instance from a separate process (used by the claim race test)."""
+    adapter = LocalFileAdapter(base_path=base_path)
+    try:
+        return adapter.claim_instance("laptop:org/repo:instances")
+    finally:
+        adapter.close()
+
+
+def _local_writer(base_path: str, worker: int, count: int) -> None:
+    """Store keys from a separate process (used by the local file locking test)."""
+    adapter = LocalFileAdapter(base_path=base_path)
+    for i in range(count):
+        adapter.store("laptop:org/repo:session:shared", f"w{worker}_{i}", i)
+    adapter.close()
+
+
+@pytest.fixture(params=["local", "log", "sqlite", "redis"])
+def adapter(request: pytest.FixtureRequest, tmp_path: Path) -> StorageAdapter:
+    """Create each built-in adapter in a temporary directory."""
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        adapter = RedisAdapter(client=fakeredis.FakeRedis())
+        yield adapter
+        adapter.close()
+        return
+
+    if request.param == "sqlite":
+        config = {"path": str(tmp_path / "state.sqlite3")}
+    else:
+        config = {"base_path": str(tmp_path)}
+    adapter = AdapterFactory.create_adapter({"adapter": request.param, "config": config})
+    yield adapter
+    adapter.close()
 
 
 class TestLocalFileAdapter:
@@ -39,7 +97,7 @@ class TestLocalFileAdapter:
         assert storage_path.is_dir()
 
     def test_scope_to_filename_conversion(self, adapter: LocalFileAdapter) -> None:
-        """Test scope name to filename conversion."""
+        """Test scope name to legacy flat-layout filename conversion."""
         scope = "laptop:BANCS-Norway/my-repo:session:claude_1"
         filename = adapter._scope_to_filename(scope)
         assert filename == "laptop__BANCS-Norway__my-repo__session__claude_1.json"
@@ -143,7 +201,7 @@ class TestLocalFileAdapter:
         key = "only_key"
 
         adapter.store(scope, key, "value")
-        scope_file = temp_dir / adapter._scope_to_filename(scope)
+        scope_file = adapter._get_scope_path(scope)
         assert scope_file.exists()
 
         adapter.delete(scope, key)
@@ -216,7 +274,7 @@ class TestLocalFileAdapter:
         adapter.store(scope, "key1", "value1")
         adapter.store(scope, "key2", "value2")
 
-        scope_file = temp_dir / adapter._scope_to_filename(scope)
+        scope_file = adapter._get_scope_path(scope)
         assert scope_file.exists()
 
         # Delete the scope
@@ -238,7 +296,7 @@ class TestLocalFileAdapter:
         adapter.store(scope, key, "initial")
 
         # Load the scope file directly to check metadata
-        scope_file = temp_dir / adapter._scope_to_filename(scope)
+        scope_file = adapter._get_scope_path(scope)
         with open(scope_file) as f:
             scope_data = json.load(f)
 
@@ -279,7 +337,8 @@ class TestLocalFileAdapter:
     def test_invalid_json_raises_error(self, adapter: LocalFileAdapter, temp_dir: Path) -> None:
         """Test that corrupted JSON file raises StorageError."""
         scope = "laptop:org/repo:session:test"
-        scope_file = temp_dir / adapter._scope_to_filename(scope)
+        scope_file = adapter._get_scope_path(scope)
+        scope_file.parent.mkdir(parents=True)
 
         # Write invalid JSON
         with open(scope_file, "w") as f:
@@ -322,10 +381,13 @@ class TestLocalFileAdapter:
         # Create the file first
         adapter.store(scope, "key", "value")
 
+        # Read through a second adapter so the read cache is cold
+        reader = LocalFileAdapter(base_path=str(temp_dir))
+
         # Mock open to raise OSError
         with patch("builtins.open", side_effect=OSError("Read permission denied")):
             with pytest.raises(StorageError, match="Failed to read scope file"):
-                adapter.retrieve(scope, "key")
+                reader.retrieve(scope, "key")
 
     def test_save_non_json_serializable_value(self, adapter: LocalFileAdapter) -> None:
         """Test that non-JSON-serializable values raise StorageError."""
@@ -383,7 +445,7 @@ class TestLocalFileAdapter:
         assert result is True
 
         # Verify the file still exists and other keys remain
-        scope_file = temp_dir / adapter._scope_to_filename(scope)
+        scope_file = adapter._get_scope_path(scope)
         assert scope_file.exists()
 
         assert adapter.retrieve(scope, "key1") == "value1"
@@ -414,8 +476,8 @@ class TestLocalFileAdapter:
                 adapter.delete_scope(scope)
 
 
-class TestAdapterFactory:
-    """Tests for AdapterFactory."""
+class TestLocalFileAdapterCache:
+    """Tests for the LocalFileAdapter read cache."""
 
     @pytest.fixture
     def temp_dir(self) -> Path:
@@ -423,91 +485,2316 @@ class TestAdapterFactory:
         with tempfile.TemporaryDirectory() as tmpdir:
             yield Path(tmpdir)
 
-    def test_create_local_adapter(self, temp_dir: Path) -> None:
-        """Test creating a local adapter from configuration."""
-        config = {"adapter": "local", "config": {"base_path": str(temp_dir)}}
+    def test_repeated_reads_hit_cache(self, temp_dir: Path) -> None:
+        """Test that unchanged scope files are served from memory."""
+        scope = "laptop:org/repo:session:test"
+        LocalFileAdapter(base_path=str(temp_dir)).store(scope, "key", "value")
+
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        assert adapter.retrieve(scope, "key") == "value"
+        assert adapter.list_keys(scope) == ["key"]
+        assert adapter.retrieve(scope, "key") == "value"
+
+        stats = adapter.cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+        assert stats["scopes"] == 1
+
+    def test_external_write_invalidates_cache(self, temp_dir: Path) -> None:
+        """Test that a write by another adapter instance is picked up."""
+        scope = "laptop:org/repo:session:test"
+        reader = LocalFileAdapter(base_path=str(temp_dir))
+        writer = LocalFileAdapter(base_path=str(temp_dir))
+
+        writer.store(scope, "key", "v1")
+        assert reader.retrieve(scope, "key") == "v1"
+
+        writer.store(scope, "key", "a longer second value")
+        assert reader.retrieve(scope, "key") == "a longer second value"
+
+        writer.delete_scope(scope)
+        assert reader.retrieve(scope, "key") is None
+
+    def test_retrieved_values_do_not_alias_cache(self, temp_dir: Path) -> None:
+        """Test that mutating a retrieved value does not corrupt cached data."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:instances"
+        adapter.store(scope, "registry", {"claude_1": "available"})
+
+        registry = adapter.retrieve(scope, "registry")
+        registry["claude_1"] = "taken"
+
+        assert adapter.retrieve(scope, "registry") == {"claude_1": "available"}
+
+    def test_lru_eviction_by_scope_count(self, temp_dir: Path) -> None:
+        """Test that the least recently used scope is evicted first."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), cache_max_scopes=2)
+        for i in range(3):
+            adapter.store(f"laptop:org/repo:issue:{i}", "key", i)
+
+        stats = adapter.cache_stats()
+        assert stats["scopes"] == 2
+        assert stats["evictions"] == 1
+
+    def test_byte_budget_limits_cache(self, temp_dir: Path) -> None:
+        """Test that scopes larger than the byte budget are not cached."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), cache_max_bytes=64)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "x" * 200)
+
+        assert adapter.retrieve(scope, "key") == "x" * 200
+        assert adapter.cache_stats()["scopes"] == 0
+
+    def test_cache_disabled(self, temp_dir: Path) -> None:
+        """Test that a zero-sized cache always reads from disk."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), cache_max_scopes=0)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "value")
+
+        assert adapter.retrieve(scope, "key") == "value"
+        assert adapter.retrieve(scope, "key") == "value"
+        assert adapter.cache_stats()["hits"] == 0
+
+    def test_factory_passes_cache_config(self, temp_dir: Path) -> None:
+        """Test that cache limits are read from storage.config."""
+        config = {
+            "adapter": "local",
+            "config": {"base_path": str(temp_dir), "cache_max_scopes": 3, "cache_max_bytes": 99},
+        }
 
         adapter = AdapterFactory.create_adapter(config)
         assert isinstance(adapter, LocalFileAdapter)
-        assert adapter.base_path == temp_dir
+        assert adapter._cache.max_scopes == 3
+        assert adapter._cache.max_bytes == 99
+
+
+class TestScopeManifest:
+    """Tests for the LocalFileAdapter scope manifest and its prefix trie."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_trie_matches_patterns(self) -> None:
+        """Test literal, wildcard and cross-segment pattern matching."""
+        trie = ScopeTrie(
+            [
+                "laptop:org/repo:session:claude_1",
+                "laptop:org/repo:session:claude_2",
+                "laptop:org/repo:issue:42",
+                "laptop:org/other:session:claude_1",
+                "desktop:org/repo:session:claude_1",
+            ]
+        )
+
+        assert trie.match("laptop:org/repo:session:*") == [
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
+        assert trie.match("laptop:org/repo:*") == [
+            "laptop:org/repo:issue:42",
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
+        assert trie.match("laptop:org/re*:claude_1") == ["laptop:org/repo:session:claude_1"]
+        assert trie.match("*:session:claude_1") == [
+            "desktop:org/repo:session:claude_1",
+            "laptop:org/other:session:claude_1",
+            "laptop:org/repo:session:claude_1",
+        ]
+        assert trie.match("laptop:org/repo:issue:42") == ["laptop:org/repo:issue:42"]
+        assert trie.match("laptop:org/repo:issue") == []
+        assert len(trie.match()) == 5
+
+    def test_trie_discard_prunes(self) -> None:
+        """Test that removing scopes keeps prefixes of other scopes intact."""
+        trie = ScopeTrie(["a:b", "a:b:c"])
+
+        trie.discard("a:b:c")
+        trie.discard("missing:scope")
+
+        assert trie.match() == ["a:b"]
+        trie.discard("a:b")
+        assert len(trie) == 0
+        assert trie.match("a:*") == []
+
+    def test_list_scopes_does_not_glob(self, temp_dir: Path) -> None:
+        """Test that list_scopes is answered from the manifest once it exists."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store("laptop:org/repo:session:claude_1", "key", "value")
+
+        with patch("pathlib.Path.glob", side_effect=AssertionError("directory scanned")):
+            assert adapter.list_scopes("laptop:org/repo:session:*") == [
+                "laptop:org/repo:session:claude_1"
+            ]
+
+    def test_manifest_tracks_stats(self, temp_dir: Path) -> None:
+        """Test that the manifest records file, key count and size per scope."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:claude_1"
+        adapter.store_many(scope, {"a": 1, "b": 2})
+
+        entry = adapter.scope_stats()[scope]
+        assert entry["file"] == "scopes/laptop/org%2Frepo/session/claude_1.json"
+        assert entry["keys"] == 2
+        assert entry["size"] == adapter._get_scope_path(scope).stat().st_size
+
+        adapter.delete_scope(scope)
+        assert adapter.scope_stats() == {}
+
+    def test_changes_from_other_adapter_are_seen(self, temp_dir: Path) -> None:
+        """Test that scopes added or removed by another process show up."""
+        reader = LocalFileAdapter(base_path=str(temp_dir))
+        writer = LocalFileAdapter(base_path=str(temp_dir))
+        assert reader.list_scopes() == []
+
+        writer.store("laptop:org/repo:session:claude_1", "key", "value")
+        writer.store("laptop:org/repo:session:claude_2", "key", "value")
+        assert reader.list_scopes() == [
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
+
+        writer.delete_scope("laptop:org/repo:session:claude_1")
+        assert reader.list_scopes() == ["laptop:org/repo:session:claude_2"]
+
+    def test_stats_flush_keeps_other_processes_changes(self, temp_dir: Path) -> None:
+        """Test that buffered statistics don't resurrect or drop scopes."""
+        first = LocalFileAdapter(base_path=str(temp_dir))
+        second = LocalFileAdapter(base_path=str(temp_dir))
+        first.store("laptop:org/repo:session:a", "key", 1)
+        first.store("laptop:org/repo:session:a", "key", 2)
+
+        second.delete_scope("laptop:org/repo:session:a")
+        second.store("laptop:org/repo:session:b", "key", 1)
+        first.close()
+
+        assert LocalFileAdapter(base_path=str(temp_dir)).list_scopes() == [
+            "laptop:org/repo:session:b"
+        ]
+
+    def test_missing_manifest_is_rebuilt(self, temp_dir: Path) -> None:
+        """Test that scope files written without a manifest are indexed."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store("laptop:org/repo:session:claude_1", "key", "value")
+        adapter.store("laptop:org/repo:issue:42", "key", "value")
+        (temp_dir / ".index" / "manifest.json").unlink()
+
+        fresh = LocalFileAdapter(base_path=str(temp_dir))
+        assert fresh.list_scopes("laptop:org/repo:*") == [
+            "laptop:org/repo:issue:42",
+            "laptop:org/repo:session:claude_1",
+        ]
+        assert fresh.scope_stats()["laptop:org/repo:issue:42"]["keys"] == 1
+
+    def test_new_scopes_are_journaled(self, temp_dir: Path) -> None:
+        """Test that creating a scope appends to the journal instead of rewriting the manifest."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store("laptop:org/repo:session:claude_1", "key", "value")
+        manifest = temp_dir / ".index" / "manifest.json"
+        journal = temp_dir / ".index" / "manifest.journal"
+        snapshot = manifest.stat()
+
+        for i in range(5):
+            adapter.store(f"laptop:org/repo:issue:{i}", "key", "value")
+        adapter.delete_scope("laptop:org/repo:issue:0")
+
+        assert manifest.stat().st_mtime_ns == snapshot.st_mtime_ns
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert [record["op"] for record in records[-6:]] == ["set"] * 5 + ["del"]
+        assert len(LocalFileAdapter(base_path=str(temp_dir)).list_scopes()) == 5
+
+    def test_compaction_is_seen_by_other_adapters(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a reader loaded before a compaction reloads the new snapshot."""
+        monkeypatch.setattr("claude_session_coordinator.adapters.manifest._MIN_COMPACT_RECORDS", 10)
+        reader = LocalFileAdapter(base_path=str(temp_dir))
+        writer = LocalFileAdapter(base_path=str(temp_dir))
+        assert reader.list_scopes() == []
+
+        for i in range(25):
+            writer.store(f"laptop:org/repo:issue:{i}", "key", "value")
+        writer.delete_scope("laptop:org/repo:issue:3")
+
+        journal = temp_dir / ".index" / "manifest.journal"
+        assert len(journal.read_text().splitlines()) <= 10
+        snapshot = json.loads((temp_dir / ".index" / "manifest.json").read_text())
+        assert len(snapshot["scopes"]) >= 10
+        assert len(reader.list_scopes()) == 24
+        assert "laptop:org/repo:issue:3" not in reader.list_scopes()
+
+    def test_torn_journal_line_is_skipped(self, temp_dir: Path) -> None:
+        """Test that a line left half-written by a crash doesn't corrupt later records."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store("laptop:org/repo:session:claude_1", "key", "value")
+        with open(temp_dir / ".index" / "manifest.journal", "a", encoding="utf-8") as f:
+            f.write('{"op": "set", "scope": "laptop:org/re')
+
+        adapter.store("laptop:org/repo:session:claude_2", "key", "value")
+
+        assert LocalFileAdapter(base_path=str(temp_dir)).list_scopes() == [
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
 
-    def test_create_local_adapter_default_path(self) -> None:
-        """Test creating local adapter with default path."""
-        config = {"adapter": "local", "config": {}}
+
+class TestLocalFileAdapterLayout:
+    """Tests for the sharded scope file layout and the legacy migration."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_scope_path_is_sharded(self, temp_dir: Path) -> None:
+        """Test that each scope segment becomes a directory level."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        path = adapter._get_scope_path("laptop:BANCS-Norway/my-repo:session:claude_1")
+
+        assert (
+            path
+            == temp_dir.resolve() / "scopes/laptop/BANCS-Norway%2Fmy-repo/session/claude_1.json"
+        )
+
+    @pytest.mark.parametrize(
+        "scope",
+        [
+            "laptop:org/repo/extra:session:claude_1",
+            "laptop:org__repo:issue:42",
+            "laptop:org/repo:notes:50%:done",
+            "laptop::..:.hidden",
+            "laptop:org/repo:a.json:b",
+            "laptop:org/repo:a:b.json",
+            "single",
+            "laptop:org/repo:session:ünïcødé spaces",
+        ],
+    )
+    def test_scopes_round_trip(self, temp_dir: Path, scope: str) -> None:
+        """Test that scopes are recovered exactly from their file paths."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        path = adapter._get_scope_path(scope)
+
+        assert path.is_relative_to(temp_dir.resolve() / "scopes")
+        assert adapter._path_to_scope(path) == scope
+
+        adapter.store(scope, "key", "value")
+        assert adapter.retrieve(scope, "key") == "value"
+        (temp_dir / ".index" / "manifest.json").unlink()
+        assert LocalFileAdapter(base_path=str(temp_dir)).list_scopes() == [scope]
+
+    def test_file_and_directory_segments_do_not_collide(self, temp_dir: Path) -> None:
+        """Test that a scope can be a prefix of another scope."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store("laptop:org/repo:session", "key", 1)
+        adapter.store("laptop:org/repo:session:claude_1", "key", 2)
+
+        assert adapter.retrieve("laptop:org/repo:session", "key") == 1
+        assert adapter.retrieve("laptop:org/repo:session:claude_1", "key") == 2
+
+    def _write_legacy(self, temp_dir: Path, filename: str, data: dict[str, Any]) -> None:
+        """Write a scope file the way the flat layout did."""
+        document = {"data": data, "metadata": {key: {} for key in data}}
+        (temp_dir / filename).write_text(json.dumps(document))
+
+    def test_legacy_files_are_read_and_migrated_on_write(self, temp_dir: Path) -> None:
+        """Test that flat-layout files keep working and move on their next write."""
+        self._write_legacy(temp_dir, "laptop__org__repo__session__claude_1.json", {"a": 1})
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:claude_1"
+
+        assert adapter.list_scopes() == [scope]
+        assert adapter.retrieve(scope, "a") == 1
+
+        adapter.store(scope, "b", 2)
+
+        assert not (temp_dir / "laptop__org__repo__session__claude_1.json").exists()
+        assert adapter.retrieve_many(scope, ["a", "b"]) == {"a": 1, "b": 2}
+        assert adapter.scope_stats()[scope]["file"].startswith("scopes/")
+
+    def test_migrate_legacy_layout(self, temp_dir: Path) -> None:
+        """Test moving all flat-layout files at once."""
+        self._write_legacy(temp_dir, "laptop__org__repo__session__claude_1.json", {"a": 1})
+        self._write_legacy(temp_dir, "laptop__org__repo__issue__42.json", {"b": 2})
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+
+        assert adapter.migrate_legacy_layout() == 2
+        assert adapter.migrate_legacy_layout() == 0
+
+        assert list(temp_dir.glob("*.json")) == []
+        assert adapter.list_scopes() == [
+            "laptop:org/repo:issue:42",
+            "laptop:org/repo:session:claude_1",
+        ]
+        assert adapter.retrieve("laptop:org/repo:issue:42", "b") == 2
+        assert adapter.scope_stats()["laptop:org/repo:issue:42"]["keys"] == 1
+
+    def test_migration_keeps_newer_sharded_file(self, temp_dir: Path) -> None:
+        """Test that a stale legacy copy never overwrites the new layout."""
+        scope = "laptop:org/repo:session:claude_1"
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        adapter.store(scope, "a", "new")
+        self._write_legacy(temp_dir, "laptop__org__repo__session__claude_1.json", {"a": "old"})
+
+        migrating = LocalFileAdapter(base_path=str(temp_dir))
+        assert migrating.migrate_legacy_layout() == 0
+
+        assert migrating.retrieve(scope, "a") == "new"
+        assert list(temp_dir.glob("*.json")) == []
+
+
+class TestScopeFormats:
+    """Tests for pluggable scope file serialization formats."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.mark.parametrize("name", ["json", "json-compact", "orjson", "msgpack"])
+    def test_round_trip(self, temp_dir: Path, name: str) -> None:
+        """Test storing and reading back values in every format."""
+        if name in ("orjson", "msgpack"):
+            pytest.importorskip(name)
+        adapter = LocalFileAdapter(base_path=str(temp_dir), format=name)
+        scope = "laptop:org/repo:session:test"
+        value = {"todos": [{"title": "Fix ünïcode", "done": False, "weight": 1.5}], "n": None}
+
+        adapter.store(scope, "state", value)
+
+        fresh = LocalFileAdapter(base_path=str(temp_dir))
+        assert fresh.retrieve(scope, "state") == value
+        raw = adapter._get_scope_path(scope).read_bytes()
+        if name == "json":
+            assert json.loads(raw)["data"]["state"] == value
+        else:
+            assert raw.startswith(f"#csc:{name}\n".encode())
+
+    def test_mixed_directory(self, temp_dir: Path) -> None:
+        """Test that scopes written in different formats are all readable."""
+        pytest.importorskip("msgpack")
+        LocalFileAdapter(base_path=str(temp_dir)).store("a:b:c:json", "key", 1)
+        LocalFileAdapter(base_path=str(temp_dir), format="msgpack").store("a:b:c:mp", "key", 2)
+
+        adapter = LocalFileAdapter(base_path=str(temp_dir), format="json-compact")
+        assert adapter.retrieve("a:b:c:json", "key") == 1
+        assert adapter.retrieve("a:b:c:mp", "key") == 2
+
+    def test_unknown_format(self, temp_dir: Path) -> None:
+        """Test that an unknown format is rejected at construction."""
+        with pytest.raises(StorageError, match="Unknown serialization format"):
+            LocalFileAdapter(base_path=str(temp_dir), format="yaml")
+
+    def test_missing_dependency(self, temp_dir: Path) -> None:
+        """Test the error when a format's library is not installed."""
+        from claude_session_coordinator.adapters import formats
+
+        with patch.object(formats.FORMATS["msgpack"], "available", False):
+            with pytest.raises(StorageError, match=r"pip install .*\[msgpack\]"):
+                LocalFileAdapter(base_path=str(temp_dir), format="msgpack")
+
+    def test_invalid_msgpack(self, temp_dir: Path) -> None:
+        """Test that corrupt binary scope files raise StorageError."""
+        pytest.importorskip("msgpack")
+        adapter = LocalFileAdapter(base_path=str(temp_dir), format="msgpack")
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "value")
+        adapter._get_scope_path(scope).write_bytes(b"#csc:msgpack\n\xc1")
+
+        with pytest.raises(StorageError, match="Invalid MessagePack"):
+            LocalFileAdapter(base_path=str(temp_dir)).retrieve(scope, "key")
+
+    def test_convert_format(self, temp_dir: Path) -> None:
+        """Test rewriting existing scope files in a new format."""
+        old = LocalFileAdapter(base_path=str(temp_dir))
+        old.store("a:b:c:one", "key", 1)
+        old.store("a:b:c:two", "key", 2)
+
+        adapter = LocalFileAdapter(base_path=str(temp_dir), format="json-compact")
+        assert adapter.convert_format() == 2
+        assert adapter.convert_format() == 0
+
+        assert adapter._get_scope_path("a:b:c:one").read_bytes().startswith(b"#csc:json-compact")
+        assert old.retrieve("a:b:c:two", "key") == 2
+
+    def test_factory_passes_format(self, temp_dir: Path) -> None:
+        """Test configuring the format through the factory."""
+        config = {
+            "adapter": "local",
+            "config": {"base_path": str(temp_dir), "format": "json-compact"},
+        }
 
         adapter = AdapterFactory.create_adapter(config)
-        assert isinstance(adapter, LocalFileAdapter)
-        assert str(adapter.base_path).endswith(".claude/session-state")
+        assert adapter.format == "json-compact"
+
+
+class TestCompression:
+    """Tests for transparent compression of large values."""
+
+    BIG = {"plan": [f"step {i}: refactor module {i % 7}" for i in range(500)]}
+
+    @pytest.fixture(params=["local", "redis"])
+    def make_adapter(self, request: pytest.FixtureRequest, tmp_path: Path) -> Any:
+        """Build adapters sharing one store, with the given compression settings."""
+        if request.param == "redis":
+            fakeredis = pytest.importorskip("fakeredis")
+            server = fakeredis.FakeServer()
+            return lambda **kwargs: RedisAdapter(
+                client=fakeredis.FakeRedis(server=server), **kwargs
+            )
+        return lambda **kwargs: LocalFileAdapter(base_path=str(tmp_path), **kwargs)
+
+    @pytest.mark.parametrize("codec", ["zlib", "zstd"])
+    def test_large_values_round_trip(self, make_adapter: Any, codec: str) -> None:
+        """Test that compressed values read back unchanged, even without compression."""
+        if codec == "zstd":
+            pytest.importorskip("zstandard")
+        adapter = make_adapter(compression=codec, compression_threshold=256)
+        scope = "laptop:org/repo:session:test"
 
-    def test_create_adapter_missing_type(self) -> None:
-        """Test that missing adapter type raises error."""
-        config = {"config": {}}
+        adapter.store_many(scope, {"big": self.BIG, "small": "tiny"})
 
-        with pytest.raises(StorageError, match="Adapter type not specified"):
-            AdapterFactory.create_adapter(config)
+        assert adapter.retrieve_many(scope, ["big", "small"]) == {"big": self.BIG, "small": "tiny"}
+        assert make_adapter().retrieve(scope, "big") == self.BIG
 
-    def test_create_adapter_unknown_type(self) -> None:
-        """Test that unknown adapter type raises error."""
-        config = {"adapter": "unknown", "config": {}}
+    def test_only_requested_key_is_decompressed(self, make_adapter: Any) -> None:
+        """Test that reading other keys of the scope never decompresses."""
+        adapter = make_adapter(compression="zlib", compression_threshold=256)
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"big": self.BIG, "status": "active"})
 
-        with pytest.raises(StorageError, match="Unknown adapter type"):
-            AdapterFactory.create_adapter(config)
+        with patch("claude_session_coordinator.adapters.compression.zlib.decompress") as unzip:
+            assert adapter.retrieve(scope, "status") == "active"
+        unzip.assert_not_called()
 
-    def test_register_custom_adapter(self, temp_dir: Path) -> None:
-        """Test registering and creating a custom adapter."""
+    def test_transact_with_compressed_values(self, make_adapter: Any) -> None:
+        """Test read-modify-write of a compressed value."""
+        adapter = make_adapter(compression="zlib", compression_threshold=256)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
 
-        class CustomAdapter(StorageAdapter):
-            def __init__(self, custom_param: str) -> None:
-                self.custom_param = custom_param
+        def append(values: dict[str, Any]) -> None:
+            values["big"]["plan"].append("done")
 
-            def store(self, scope: str, key: str, value: Any) -> None:
-                pass
+        adapter.transact(scope, append)
 
-            def retrieve(self, scope: str, key: str) -> Any | None:
-                return None
+        assert adapter.retrieve(scope, "big")["plan"][-1] == "done"
 
-            def delete(self, scope: str, key: str) -> bool:
-                return False
+    def test_local_file_holds_compressed_blob(self, tmp_path: Path) -> None:
+        """Test the on-disk form of a compressed value."""
+        adapter = LocalFileAdapter(
+            base_path=str(tmp_path), compression="zlib", compression_threshold=256
+        )
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"big": self.BIG, "small": [1, 2]})
+
+        document = json.loads(adapter._get_scope_path(scope).read_text())
+        assert isinstance(document["data"]["big"], str)
+        assert document["metadata"]["big"]["encoding"] == "zlib"
+        assert document["data"]["small"] == [1, 2]
+        assert "encoding" not in document["metadata"]["small"]
+
+        adapter.store(scope, "big", "now small")
+        document = json.loads(adapter._get_scope_path(scope).read_text())
+        assert "encoding" not in document["metadata"]["big"]
+
+    def test_corrupt_compressed_value(self, tmp_path: Path) -> None:
+        """Test that a damaged blob raises StorageError."""
+        adapter = LocalFileAdapter(
+            base_path=str(tmp_path), compression="zlib", compression_threshold=256
+        )
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
+        path = adapter._get_scope_path(scope)
+        document = json.loads(path.read_text())
+        document["data"]["big"] = "bm90IHpsaWI="
+        path.write_text(json.dumps(document))
 
-            def list_keys(self, scope: str) -> list[str]:
-                return []
+        with pytest.raises(StorageError, match="Invalid compressed value"):
+            LocalFileAdapter(base_path=str(tmp_path)).retrieve(scope, "big")
 
-            def list_scopes(self, pattern: str | None = None) -> list[str]:
-                return []
+    def test_unknown_codec(self, tmp_path: Path) -> None:
+        """Test that an unknown codec is rejected."""
+        with pytest.raises(StorageError, match="Unknown compression codec"):
+            LocalFileAdapter(base_path=str(tmp_path), compression="lz4")
 
-            def delete_scope(self, scope: str) -> bool:
-                return False
 
-            def close(self) -> None:
-                pass
+class TestBlobSpill:
+    """Tests for spilling oversized values to blob files."""
 
-        def create_custom(config: dict[str, Any]) -> CustomAdapter:
-            return CustomAdapter(custom_param=config.get("custom_param", "default"))
+    BIG = {"plan": [f"step {i}: refactor module {i % 7}" for i in range(500)]}
 
-        # Register the custom adapter
-        AdapterFactory.register_adapter("custom", create_custom)
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def _blobs(self, temp_dir: Path) -> list[Path]:
+        return sorted(path for path in (temp_dir / ".blobs").glob("*/*"))
+
+    def test_large_value_is_spilled(self, temp_dir: Path) -> None:
+        """Test that only values over the threshold leave the scope file."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024)
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"big": self.BIG, "status": "active"})
+
+        document = json.loads(adapter._get_scope_path(scope).read_text())
+        assert document["data"] == {"big": None, "status": "active"}
+        blob = document["metadata"]["big"]["blob"]
+        assert self._blobs(temp_dir) == [temp_dir / ".blobs" / blob[:2] / blob]
+
+        reader = LocalFileAdapter(base_path=str(temp_dir))
+        with patch.object(LocalFileAdapter, "_read_blob") as read_blob:
+            assert reader.retrieve(scope, "status") == "active"
+        read_blob.assert_not_called()
+        assert reader.retrieve(scope, "big") == self.BIG
+
+    def test_spill_with_compression(self, temp_dir: Path) -> None:
+        """Test that compressed values are spilled in compressed form."""
+        adapter = LocalFileAdapter(
+            base_path=str(temp_dir),
+            compression="zlib",
+            compression_threshold=256,
+            blob_threshold=256,
+        )
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
+
+        meta = json.loads(adapter._get_scope_path(scope).read_text())["metadata"]["big"]
+        assert meta["encoding"] == "zlib"
+        assert len(self._blobs(temp_dir)[0].read_bytes()) < len(json.dumps(self.BIG))
+        assert LocalFileAdapter(base_path=str(temp_dir)).retrieve(scope, "big") == self.BIG
+
+    def test_overwrite_and_delete_remove_blob(self, temp_dir: Path) -> None:
+        """Test that blobs are deleted once their key no longer references them."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024)
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "big", self.BIG)
+        first = self._blobs(temp_dir)
+        adapter.store(scope, "big", self.BIG)
+        assert self._blobs(temp_dir) == first
+
+        adapter.store(scope, "big", {"plan": [*self.BIG["plan"], "done"]})
+        second = self._blobs(temp_dir)
+        assert len(second) == 1 and second != first
+
+        adapter.store(scope, "big", "small now")
+        assert self._blobs(temp_dir) == []
+
+        adapter.store(scope, "big", self.BIG)
+        adapter.delete(scope, "big")
+        assert self._blobs(temp_dir) == []
+
+        adapter.store(scope, "big", self.BIG)
+        adapter.delete_scope(scope)
+        assert self._blobs(temp_dir) == []
+
+    def test_transact_removal_deletes_blob(self, temp_dir: Path) -> None:
+        """Test that keys removed in a transaction release their blobs."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024)
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"big": self.BIG, "status": "active"})
+
+        adapter.transact(scope, lambda values: values.pop("big"))
+
+        assert adapter.retrieve(scope, "big") is None
+        assert self._blobs(temp_dir) == []
+
+    def test_write_behind_keeps_blob_until_flush(self, temp_dir: Path) -> None:
+        """Test that a blob outlives its key until the scope file is written."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024, write_behind=True)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
+        adapter.flush()
+
+        adapter.delete(scope, "big")
+        assert len(self._blobs(temp_dir)) == 1
+        assert LocalFileAdapter(base_path=str(temp_dir)).retrieve(scope, "big") == self.BIG
+
+        adapter.flush()
+        assert self._blobs(temp_dir) == []
+        adapter.close()
+
+    def test_missing_blob(self, temp_dir: Path) -> None:
+        """Test that a missing blob raises StorageError."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
+        self._blobs(temp_dir)[0].unlink()
+
+        with pytest.raises(StorageError, match="Failed to read blob"):
+            adapter.retrieve(scope, "big")
+
+    def test_gc_blobs_removes_orphans(self, temp_dir: Path) -> None:
+        """Test that unreferenced blobs past the grace period are collected."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), blob_threshold=1024)
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "big", self.BIG)
+        orphan = temp_dir / ".blobs" / "ab" / ("ab" + "0" * 62)
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(b"[]")
+
+        assert adapter.gc_blobs() == 0
+        assert adapter.gc_blobs(grace_seconds=0) == 1
+        assert not orphan.exists()
+        assert adapter.retrieve(scope, "big") == self.BIG
+
+
+class TestLocalFileAdapterDurability:
+    """Tests for atomic scope file writes and durability levels."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_failed_write_keeps_old_file(self, temp_dir: Path) -> None:
+        """Test that a crash mid-write leaves the previous contents intact."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), durability="fsync")
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "old")
+
+        with patch(
+            "claude_session_coordinator.adapters.local.os.fsync", side_effect=OSError("disk full")
+        ):
+            with pytest.raises(StorageError, match="disk full"):
+                adapter.store(scope, "key", "new")
+
+        fresh = LocalFileAdapter(base_path=str(temp_dir))
+        assert fresh.retrieve(scope, "key") == "old"
+        assert list(temp_dir.rglob(".*.tmp")) == []
+
+    def test_write_replaces_inode(self, temp_dir: Path) -> None:
+        """Test that writes rename a new file into place instead of truncating."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", 1)
+        path = adapter._get_scope_path(scope)
+        inode = path.stat().st_ino
+
+        adapter.store(scope, "key", 2)
+
+        assert path.stat().st_ino != inode
+        assert adapter.retrieve(scope, "key") == 2
+
+    def test_fsync_durability_syncs_every_write(self, temp_dir: Path) -> None:
+        """Test that "fsync" syncs the file and its directory on each write."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), durability="fsync")
+
+        with patch("claude_session_coordinator.adapters.local.os.fsync") as fsync:
+            adapter.store("laptop:org/repo:session:a", "key", 1)
+            adapter.store("laptop:org/repo:session:a", "key", 2)
+
+        assert fsync.call_count == 4
+
+    def test_group_durability_batches_syncs(self, temp_dir: Path) -> None:
+        """Test that "group" syncs each written file once per commit."""
+        adapter = LocalFileAdapter(
+            base_path=str(temp_dir), durability="group", group_commit_ms=3_600_000
+        )
+
+        with patch("claude_session_coordinator.adapters.local.os.fsync") as fsync:
+            for i in range(10):
+                adapter.store("laptop:org/repo:session:a", f"k{i}", i)
+                adapter.store("laptop:org/repo:session:b", f"k{i}", i)
+            assert fsync.call_count == 0
+
+            adapter.sync()
+            # Two files plus their shared directory
+            assert fsync.call_count == 3
+
+            adapter.sync()
+            assert fsync.call_count == 3
+
+        adapter.close()
+
+    def test_group_commit_runs_in_background(self, temp_dir: Path) -> None:
+        """Test that the group-commit thread syncs pending writes."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), durability="group", group_commit_ms=5)
+        adapter.store("laptop:org/repo:session:a", "key", 1)
+
+        deadline = time.monotonic() + 2
+        while adapter._unsynced and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert not adapter._unsynced
+        adapter.close()
+
+    def test_unknown_durability(self, temp_dir: Path) -> None:
+        """Test that an unknown durability level is rejected."""
+        with pytest.raises(StorageError, match="Unknown durability level"):
+            LocalFileAdapter(base_path=str(temp_dir), durability="sometimes")
+
+    def test_stale_temp_files_are_removed(self, temp_dir: Path) -> None:
+        """Test that old temp files from a crash are cleaned up on startup."""
+        stale = temp_dir / ".scope.json.abc123.tmp"
+        fresh = temp_dir / ".scope.json.def456.tmp"
+        stale.write_text("{")
+        fresh.write_text("{")
+        old = time.time() - 7200
+        os.utime(stale, (old, old))
+
+        LocalFileAdapter(base_path=str(temp_dir))
+
+        assert not stale.exists()
+        assert fresh.exists()
+
+    def test_factory_passes_durability(self, temp_dir: Path) -> None:
+        """Test configuring durability through the factory."""
+        config = {
+            "adapter": "local",
+            "config": {"base_path": str(temp_dir), "durability": "group", "group_commit_ms": 50},
+        }
 
-        # Create instance
-        config = {"adapter": "custom", "config": {"custom_param": "test_value"}}
         adapter = AdapterFactory.create_adapter(config)
+        assert adapter.durability == "group"
+        assert adapter.group_commit_interval == 0.05
+        adapter.close()
 
-        assert isinstance(adapter, CustomAdapter)
-        assert adapter.custom_param == "test_value"
 
-    def test_custom_adapter_creation_failure(self) -> None:
-        """Test that exceptions during custom adapter creation are handled."""
+class TestLocalFileAdapterLocking:
+    """Tests for per-scope shared/exclusive file locks."""
 
-        def failing_creator(config: dict[str, Any]) -> StorageAdapter:
-            raise ValueError("Creation failed!")
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
 
-        # Register a failing adapter
-        AdapterFactory.register_adapter("failing", failing_creator)
+    def test_concurrent_processes_lose_no_updates(self, temp_dir: Path) -> None:
+        """Test that stores from several processes to one scope all survive."""
+        import multiprocessing
 
-        config = {"adapter": "failing", "config": {}}
+        ctx = multiprocessing.get_context("spawn")
+        workers = [
+            ctx.Process(target=_local_writer, args=(str(temp_dir), worker, 25))
+            for worker in range(4)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        keys = adapter.list_keys("laptop:org/repo:session:shared")
+        assert len(keys) == 100
+
+    def test_concurrent_threads_lose_no_updates(self, temp_dir: Path) -> None:
+        """Test that stores from several threads to one scope all survive."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:shared"
+
+        def write(worker: int) -> None:
+            for i in range(25):
+                adapter.store(scope, f"w{worker}_{i}", i)
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(LocalFileAdapter(base_path=str(temp_dir)).list_keys(scope)) == 100
+
+    def test_shared_locks_do_not_block_each_other(self, temp_dir: Path) -> None:
+        """Test that readers can hold a scope lock at the same time."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:test"
+        acquired = threading.Event()
 
-        with pytest.raises(StorageError, match="Failed to create adapter"):
+        def read() -> None:
+            with adapter._scope_lock(scope, shared=True):
+                acquired.set()
+
+        with adapter._scope_lock(scope, shared=True):
+            reader = threading.Thread(target=read)
+            reader.start()
+            assert acquired.wait(timeout=5)
+        reader.join()
+
+        assert adapter.lock_stats()["shared"]["contended"] == 0
+
+    def test_exclusive_lock_blocks_readers(self, temp_dir: Path) -> None:
+        """Test that a writer holds off readers and the wait is recorded."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "value")
+        results: list[Any] = []
+
+        with adapter._scope_lock(scope):
+            reader = threading.Thread(target=lambda: results.append(adapter.retrieve(scope, "key")))
+            reader.start()
+            time.sleep(0.1)
+            assert results == []
+        reader.join(timeout=5)
+
+        assert results == ["value"]
+        stats = adapter.lock_stats()["shared"]
+        assert stats["contended"] == 1
+        assert stats["wait_ms_max"] > 0
+
+    def test_scope_lock_is_reentrant(self, temp_dir: Path) -> None:
+        """Test that a thread holding a scope lock can use the adapter on it."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:test"
+
+        with adapter._scope_lock(scope):
+            adapter.store(scope, "key", "value")
+            assert adapter.retrieve(scope, "key") == "value"
+
+        assert adapter.lock_stats()["exclusive"]["contended"] == 0
+
+    def test_write_behind_over_budget_flush(self, temp_dir: Path) -> None:
+        """Test that exceeding the dirty budget still flushes under scope locks."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir), write_behind=True, max_dirty_bytes=1)
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "key", "value")
+
+        assert LocalFileAdapter(base_path=str(temp_dir)).retrieve(scope, "key") == "value"
+        adapter.close()
+
+
+class TestLocalFileAdapterWriteBehind:
+    """Tests for the LocalFileAdapter write-behind mode."""
+
+    @pytest.mark.parametrize(
+        ("setting", "expected"), [(True, True), ("true", True), ("false", False), (False, False)]
+    )
+    def test_factory_parses_write_behind(
+        self, temp_dir: Path, setting: Any, expected: bool
+    ) -> None:
+        """Test that write_behind accepts booleans and true/false strings."""
+        config = {
+            "adapter": "local",
+            "config": {"base_path": str(temp_dir), "write_behind": setting},
+        }
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, LocalFileAdapter)
+        assert adapter.write_behind is expected
+        adapter.close()
+
+    @pytest.mark.parametrize("setting", ["0", "no", 1])
+    def test_factory_rejects_non_boolean_write_behind(self, temp_dir: Path, setting: Any) -> None:
+        """Test that other write_behind values fail instead of enabling buffering."""
+        config = {
+            "adapter": "local",
+            "config": {"base_path": str(temp_dir), "write_behind": setting},
+        }
+
+        with pytest.raises(StorageError, match="'write_behind' must be true or false"):
             AdapterFactory.create_adapter(config)
 
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def adapter(self, temp_dir: Path) -> LocalFileAdapter:
+        """Create a write-behind adapter that never flushes on its own."""
+        adapter = LocalFileAdapter(
+            base_path=str(temp_dir), write_behind=True, flush_interval_ms=3_600_000
+        )
+        yield adapter
+        adapter.close()
+
+    def test_writes_are_buffered_until_flush(
+        self, adapter: LocalFileAdapter, temp_dir: Path
+    ) -> None:
+        """Test that stores are coalesced in memory and written on flush."""
+        scope = "laptop:org/repo:session:test"
+        for i in range(10):
+            adapter.store(scope, f"key{i}", i)
+
+        scope_file = adapter._get_scope_path(scope)
+        assert not scope_file.exists()
+        assert adapter.retrieve(scope, "key9") == 9
+        assert adapter.list_scopes() == [scope]
+
+        adapter.flush()
+
+        assert scope_file.exists()
+        with open(scope_file) as f:
+            assert len(json.load(f)["data"]) == 10
+
+    def test_buffered_deletes(self, adapter: LocalFileAdapter, temp_dir: Path) -> None:
+        """Test that deletes are buffered and applied on flush."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "value")
+        adapter.flush()
+
+        assert adapter.delete_scope(scope) is True
+        assert adapter.retrieve(scope, "key") is None
+        assert adapter.list_scopes() == []
+        assert adapter.delete_scope(scope) is False
+
+        scope_file = adapter._get_scope_path(scope)
+        assert scope_file.exists()
+        adapter.flush()
+        assert not scope_file.exists()
+
+    def test_dirty_budget_forces_flush(self, temp_dir: Path) -> None:
+        """Test that exceeding max_dirty_bytes flushes immediately."""
+        adapter = LocalFileAdapter(
+            base_path=str(temp_dir),
+            write_behind=True,
+            flush_interval_ms=3_600_000,
+            max_dirty_bytes=100,
+        )
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "small", "x")
+        assert not (adapter._get_scope_path(scope)).exists()
+
+        adapter.store(scope, "large", "x" * 200)
+        assert (adapter._get_scope_path(scope)).exists()
+        adapter.close()
+
+    def test_close_flushes(self, temp_dir: Path) -> None:
+        """Test that close() writes buffered data."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LocalFileAdapter(
+            base_path=str(temp_dir), write_behind=True, flush_interval_ms=3_600_000
+        )
+        adapter.store(scope, "key", "value")
+        adapter.close()
+
+        assert LocalFileAdapter(base_path=str(temp_dir)).retrieve(scope, "key") == "value"
+
+    def test_background_flush(self, temp_dir: Path) -> None:
+        """Test that the background flusher writes data on its interval."""
+        import time
+
+        scope = "laptop:org/repo:session:test"
+        adapter = LocalFileAdapter(base_path=str(temp_dir), write_behind=True, flush_interval_ms=10)
+        adapter.store(scope, "key", "value")
+
+        scope_file = adapter._get_scope_path(scope)
+        deadline = time.monotonic() + 5
+        while not scope_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert scope_file.exists()
+        adapter.close()
+
+    def test_non_serializable_value_fails_at_store(self, adapter: LocalFileAdapter) -> None:
+        """Test that serialization errors surface at store time."""
+        with pytest.raises(StorageError, match="not JSON-serializable"):
+            adapter.store("laptop:org/repo:session:test", "key", object())
+
+
+class TestLogStructuredAdapter:
+    """Tests for LogStructuredAdapter."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def adapter(self, temp_dir: Path) -> LogStructuredAdapter:
+        """Create a LogStructuredAdapter instance for testing."""
+        adapter = LogStructuredAdapter(base_path=str(temp_dir))
+        yield adapter
+        adapter.close()
+
+    def test_store_retrieve_delete(self, adapter: LogStructuredAdapter) -> None:
+        """Test the basic key-value operations."""
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "config", {"nested": [1, 2, 3]})
+        adapter.store(scope, "status", "active")
+        adapter.store(scope, "status", "done")
+
+        assert adapter.retrieve(scope, "config") == {"nested": [1, 2, 3]}
+        assert adapter.retrieve(scope, "status") == "done"
+        assert adapter.retrieve(scope, "missing") is None
+        assert sorted(adapter.list_keys(scope)) == ["config", "status"]
+
+        assert adapter.delete(scope, "status") is True
+        assert adapter.delete(scope, "status") is False
+        assert adapter.list_keys(scope) == ["config"]
+
+    def test_list_and_delete_scopes(self, adapter: LogStructuredAdapter) -> None:
+        """Test scope listing with patterns and scope deletion."""
+        adapter.store("laptop:org/repo:session:claude_1", "key", "value")
+        adapter.store("laptop:org/repo:session:claude_2", "key", "value")
+        adapter.store("laptop:org/repo:issue:15", "key", "value")
+
+        assert adapter.list_scopes("*:session:*") == [
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
+        assert len(adapter.list_scopes()) == 3
+
+        assert adapter.delete_scope("laptop:org/repo:issue:15") is True
+        assert adapter.delete_scope("laptop:org/repo:issue:15") is False
+        assert adapter.retrieve("laptop:org/repo:issue:15", "key") is None
+
+    def test_state_survives_reopen(self, temp_dir: Path) -> None:
+        """Test that the index is rebuilt from the segment on startup."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LogStructuredAdapter(base_path=str(temp_dir))
+        adapter.store(scope, "kept", 1)
+        adapter.store(scope, "deleted", 2)
+        adapter.delete(scope, "deleted")
+        adapter.store("laptop:org/repo:issue:1", "key", "value")
+        adapter.delete_scope("laptop:org/repo:issue:1")
+        adapter.close()
+
+        reopened = LogStructuredAdapter(base_path=str(temp_dir))
+        assert reopened.list_scopes() == [scope]
+        assert reopened.list_keys(scope) == ["kept"]
+        assert reopened.retrieve(scope, "kept") == 1
+        reopened.close()
+
+    def test_torn_record_is_truncated(self, temp_dir: Path) -> None:
+        """Test that a partial record from a crash is discarded on startup."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LogStructuredAdapter(base_path=str(temp_dir))
+        adapter.store(scope, "key", "value")
+        adapter.close()
+
+        segment = temp_dir / LogStructuredAdapter.SEGMENT_NAME
+        intact_size = segment.stat().st_size
+        with open(segment, "ab") as f:
+            f.write(b'{"op":"put","scope":"laptop:org/repo:session:test","key":"k2","val')
+
+        reopened = LogStructuredAdapter(base_path=str(temp_dir))
+        assert reopened.list_keys(scope) == ["key"]
+        assert segment.stat().st_size == intact_size
+
+        reopened.store(scope, "k2", "after crash")
+        assert reopened.retrieve(scope, "k2") == "after crash"
+        reopened.close()
+
+    def test_compaction_reclaims_garbage(self, temp_dir: Path) -> None:
+        """Test that compaction drops superseded records and keeps live data."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LogStructuredAdapter(base_path=str(temp_dir), compaction_min_bytes=1 << 30)
+        for i in range(50):
+            adapter.store(scope, "counter", i)
+        adapter.store(scope, "other", "value")
+
+        assert adapter.garbage_ratio() > 0.9
+        size_before = adapter.segment_path.stat().st_size
+
+        adapter.compact()
+
+        assert adapter.garbage_ratio() == 0.0
+        assert adapter.segment_path.stat().st_size < size_before
+        assert adapter.retrieve(scope, "counter") == 49
+        assert adapter.retrieve(scope, "other") == "value"
+        adapter.close()
+
+        reopened = LogStructuredAdapter(base_path=str(temp_dir))
+        assert reopened.retrieve(scope, "counter") == 49
+        reopened.close()
+
+    def test_background_compaction_triggers(self, temp_dir: Path) -> None:
+        """Test that crossing the garbage threshold compacts automatically."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LogStructuredAdapter(
+            base_path=str(temp_dir), compaction_threshold=0.5, compaction_min_bytes=256
+        )
+        for i in range(100):
+            adapter.store(scope, "counter", i)
+        adapter.close()
+
+        reopened = LogStructuredAdapter(base_path=str(temp_dir))
+        assert reopened.retrieve(scope, "counter") == 99
+        # Garbage appended during a compaction is reclaimed by another pass
+        assert reopened.garbage_ratio() < 0.9
+        reopened.close()
+
+    def test_short_writes_are_completed(self, adapter: LogStructuredAdapter) -> None:
+        """Test that an append keeps writing when pwrite writes only part of it."""
+        scope = "laptop:org/repo:session:test"
+        real_pwrite = os.pwrite
+
+        def short_pwrite(fd: int, data: bytes, offset: int) -> int:
+            return real_pwrite(fd, bytes(data[:7]), offset)
+
+        with patch("claude_session_coordinator.adapters.log.os.pwrite", short_pwrite):
+            adapter.store_many(scope, {"a": "x" * 100, "b": [1, 2, 3]})
+        adapter.store(scope, "c", "after")
+        adapter.close()
+
+        reopened = LogStructuredAdapter(base_path=str(adapter.base_path))
+        assert reopened.retrieve_many(scope, ["a", "b", "c"]) == {
+            "a": "x" * 100,
+            "b": [1, 2, 3],
+            "c": "after",
+        }
+        reopened.close()
+
+    def test_failed_write_is_truncated(self, adapter: LogStructuredAdapter) -> None:
+        """Test that a write that stops making progress leaves no partial record."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store(scope, "key", "before")
+        size = adapter.segment_path.stat().st_size
+        real_pwrite = os.pwrite
+        calls = []
+
+        def stalled_pwrite(fd: int, data: bytes, offset: int) -> int:
+            calls.append(offset)
+            return real_pwrite(fd, bytes(data[:5]), offset) if len(calls) == 1 else 0
+
+        with patch("claude_session_coordinator.adapters.log.os.pwrite", stalled_pwrite):
+            with pytest.raises(StorageError, match="Failed to append"):
+                adapter.store(scope, "key", "after")
+
+        assert adapter.segment_path.stat().st_size == size
+        assert adapter.retrieve(scope, "key") == "before"
+
+    def test_fsync_durability_syncs_every_append(self, temp_dir: Path) -> None:
+        """Test that "fsync" syncs the segment on each append."""
+        adapter = LogStructuredAdapter(base_path=str(temp_dir), durability="fsync")
+
+        with patch("claude_session_coordinator.adapters.log.os.fsync") as fsync:
+            adapter.store("laptop:org/repo:session:a", "key", 1)
+            adapter.store("laptop:org/repo:session:a", "key", 2)
+
+        assert fsync.call_count == 2
+        adapter.close()
+
+    def test_group_durability_batches_syncs(self, temp_dir: Path) -> None:
+        """Test that "group" syncs the segment once per commit."""
+        adapter = LogStructuredAdapter(
+            base_path=str(temp_dir), durability="group", group_commit_ms=3_600_000
+        )
+
+        with patch("claude_session_coordinator.adapters.log.os.fsync") as fsync:
+            for i in range(10):
+                adapter.store("laptop:org/repo:session:a", f"k{i}", i)
+            assert fsync.call_count == 0
+
+            adapter.sync()
+            assert fsync.call_count == 1
+            adapter.sync()
+            assert fsync.call_count == 1
+
+        adapter.close()
+
+    @pytest.mark.parametrize(("durability", "expected"), [("none", 0), ("fsync", 1), ("group", 1)])
+    def test_compaction_syncs_directory(
+        self, temp_dir: Path, durability: str, expected: int
+    ) -> None:
+        """Test that the segment swap is made durable unless durability is "none"."""
+        scope = "laptop:org/repo:session:test"
+        adapter = LogStructuredAdapter(
+            base_path=str(temp_dir), compaction_min_bytes=1 << 30, durability=durability
+        )
+        for i in range(10):
+            adapter.store(scope, "counter", i)
+
+        with patch("claude_session_coordinator.adapters.log.fsync_directory") as fsync_directory:
+            adapter.compact()
+
+        assert fsync_directory.call_count == expected
+        if expected:
+            fsync_directory.assert_called_with(adapter.base_path)
+        assert adapter.retrieve(scope, "counter") == 9
+        adapter.close()
+
+    def test_unknown_durability(self, temp_dir: Path) -> None:
+        """Test that an unknown durability level is rejected."""
+        with pytest.raises(StorageError, match="Unknown durability level"):
+            LogStructuredAdapter(base_path=str(temp_dir), durability="sometimes")
+
+    def test_segment_is_locked(self, adapter: LogStructuredAdapter, temp_dir: Path) -> None:
+        """Test that a second adapter cannot open the same segment."""
+        with pytest.raises(StorageError, match="in use"):
+            LogStructuredAdapter(base_path=str(temp_dir))
+
+    def test_non_serializable_value(self, adapter: LogStructuredAdapter) -> None:
+        """Test that non-JSON-serializable values raise StorageError."""
+        with pytest.raises(StorageError, match="not JSON-serializable"):
+            adapter.store("laptop:org/repo:session:test", "key", object())
+
+    def test_factory_creates_log_adapter(self, temp_dir: Path) -> None:
+        """Test creating the log adapter from configuration."""
+        config = {
+            "adapter": "log",
+            "config": {"base_path": str(temp_dir), "compaction_threshold": 0.75},
+        }
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, LogStructuredAdapter)
+        assert adapter.compaction_threshold == 0.75
+        adapter.close()
+
+
+class TestSQLiteAdapter:
+    """Tests for SQLiteAdapter."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def adapter(self, temp_dir: Path) -> SQLiteAdapter:
+        """Create a SQLiteAdapter instance for testing."""
+        adapter = SQLiteAdapter(path=str(temp_dir / "state.sqlite3"))
+        yield adapter
+        adapter.close()
+
+    def test_store_retrieve_delete(self, adapter: SQLiteAdapter) -> None:
+        """Test the basic key-value operations."""
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "config", {"nested": [1, 2, 3]})
+        adapter.store(scope, "status", "active")
+        adapter.store(scope, "status", "done")
+
+        assert adapter.retrieve(scope, "config") == {"nested": [1, 2, 3]}
+        assert adapter.retrieve(scope, "status") == "done"
+        assert adapter.retrieve(scope, "missing") is None
+        assert sorted(adapter.list_keys(scope)) == ["config", "status"]
+
+        assert adapter.delete(scope, "status") is True
+        assert adapter.delete(scope, "status") is False
+
+    def test_wal_mode_enabled(self, adapter: SQLiteAdapter) -> None:
+        """Test that the database uses write-ahead logging."""
+        assert adapter._query("PRAGMA journal_mode")[0][0] == "wal"
+
+    def test_list_scopes_with_pattern(self, adapter: SQLiteAdapter) -> None:
+        """Test prefix and wildcard scope queries."""
+        adapter.store("laptop:org1/repo1:session:claude_1", "key", "value")
+        adapter.store("laptop:org1/repo2:session:claude_2", "key", "value")
+        adapter.store("desktop:org2/repo1:session:claude_1", "key", "value")
+        adapter.store("laptop:org1/repo1:task:task_1", "key", "value")
+
+        assert len(adapter.list_scopes()) == 4
+        assert len(adapter.list_scopes("laptop:*")) == 3
+        assert len(adapter.list_scopes("*:session:*")) == 3
+        assert adapter.list_scopes("laptop:org1/repo1:task:task_1") == [
+            "laptop:org1/repo1:task:task_1"
+        ]
+        assert adapter.list_scopes("laptop:org1/repo1:task") == []
+
+    def test_scopes_are_stored_verbatim(self, adapter: SQLiteAdapter) -> None:
+        """Test that scopes with slashes and underscores round-trip exactly."""
+        scope = "laptop:org/repo:issue:feature/a__b"
+        adapter.store(scope, "key", "value")
+
+        assert adapter.list_scopes() == [scope]
+
+    def test_scope_index_follows_deletes(self, adapter: SQLiteAdapter) -> None:
+        """Test that scopes disappear once their last key is deleted."""
+        adapter.store("laptop:org/repo:issue:1", "a", 1)
+        adapter.store("laptop:org/repo:issue:1", "b", 2)
+        adapter.store("laptop:org/repo:issue:2", "a", 1)
+
+        adapter.delete("laptop:org/repo:issue:1", "a")
+        assert "laptop:org/repo:issue:1" in adapter.list_scopes()
+
+        adapter.delete("laptop:org/repo:issue:1", "b")
+        assert adapter.list_scopes() == ["laptop:org/repo:issue:2"]
+
+        assert adapter.delete_scope("laptop:org/repo:issue:2") is True
+        assert adapter.delete_scope("laptop:org/repo:issue:2") is False
+        assert adapter.list_scopes() == []
+
+    def test_non_serializable_value(self, adapter: SQLiteAdapter) -> None:
+        """Test that non-JSON-serializable values raise StorageError."""
+        with pytest.raises(StorageError, match="not JSON-serializable"):
+            adapter.store("laptop:org/repo:session:test", "key", object())
+
+    def test_concurrent_processes_do_not_lose_updates(self, temp_dir: Path) -> None:
+        """Test that several processes writing one scope keep every key."""
+        import multiprocessing
+
+        path = str(temp_dir / "state.sqlite3")
+        SQLiteAdapter(path=path).close()
+
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_sqlite_writer, args=(path, w, 25)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            assert worker.exitcode == 0
+
+        adapter = SQLiteAdapter(path=path)
+        assert len(adapter.list_keys("laptop:org/repo:session:shared")) == 100
+        adapter.close()
+
+    def test_factory_creates_sqlite_adapter(self, temp_dir: Path) -> None:
+        """Test creating the SQLite adapter from configuration."""
+        config = {"adapter": "sqlite", "config": {"path": str(temp_dir / "db.sqlite3")}}
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, SQLiteAdapter)
+        assert adapter.path == temp_dir / "db.sqlite3"
+        adapter.close()
+
+
+class TestRedisAdapter:
+    """Tests for RedisAdapter against an in-process fakeredis server."""
+
+    @pytest.fixture
+    def adapter(self) -> RedisAdapter:
+        """Create a RedisAdapter backed by fakeredis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        adapter = RedisAdapter(client=fakeredis.FakeRedis())
+        yield adapter
+        adapter.close()
+
+    def test_store_retrieve_delete(self, adapter: RedisAdapter) -> None:
+        """Test the basic key-value operations."""
+        scope = "laptop:org/repo:session:test"
+
+        adapter.store(scope, "config", {"nested": [1, 2, 3]})
+        adapter.store(scope, "status", "done")
+
+        assert adapter.retrieve(scope, "config") == {"nested": [1, 2, 3]}
+        assert adapter.retrieve(scope, "missing") is None
+        assert sorted(adapter.list_keys(scope)) == ["config", "status"]
+
+        assert adapter.delete(scope, "status") is True
+        assert adapter.delete(scope, "status") is False
+
+    def test_scope_layout(self, adapter: RedisAdapter) -> None:
+        """Test that scopes are hashes tracked in the scope index set."""
+        adapter.store("laptop:org/repo:session:test", "key", "value")
+
+        client = adapter._client
+        assert client.type("csc:scope:laptop:org/repo:session:test") == b"hash"
+        assert client.smembers("csc:scopes") == {b"laptop:org/repo:session:test"}
+
+    def test_list_scopes_with_pattern(self, adapter: RedisAdapter) -> None:
+        """Test listing scopes from the index with glob patterns."""
+        adapter.store("laptop:org1/repo1:session:claude_1", "key", "value")
+        adapter.store("laptop:org1/repo2:session:claude_2", "key", "value")
+        adapter.store("desktop:org2/repo1:session:claude_1", "key", "value")
+        adapter.store("laptop:org1/repo1:issue:feature/a__b", "key", "value")
+
+        assert len(adapter.list_scopes()) == 4
+        assert len(adapter.list_scopes("laptop:*")) == 3
+        assert len(adapter.list_scopes("*:session:*")) == 3
+        assert adapter.list_scopes("laptop:org1/repo1:issue:*") == [
+            "laptop:org1/repo1:issue:feature/a__b"
+        ]
+
+    def test_scope_index_follows_deletes(self, adapter: RedisAdapter) -> None:
+        """Test that emptied and deleted scopes leave the index."""
+        adapter.store_many("laptop:org/repo:issue:1", {"a": 1, "b": 2})
+        adapter.store("laptop:org/repo:issue:2", "a", 1)
+
+        adapter.delete("laptop:org/repo:issue:1", "a")
+        assert "laptop:org/repo:issue:1" in adapter.list_scopes()
+
+        adapter.delete_many("laptop:org/repo:issue:1", ["b"])
+        assert adapter.list_scopes() == ["laptop:org/repo:issue:2"]
+
+        assert adapter.delete_scope("laptop:org/repo:issue:2") is True
+        assert adapter.delete_scope("laptop:org/repo:issue:2") is False
+        assert adapter.list_scopes() == []
+
+    def test_key_prefix(self) -> None:
+        """Test that all keys live under the configured prefix."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        adapter = RedisAdapter(key_prefix="team-a:", client=client)
+        adapter.store("laptop:org/repo:session:test", "key", "value")
+
+        assert all(key.startswith(b"team-a:") for key in client.keys("*"))
+
+    def test_redis_errors_become_storage_errors(self, adapter: RedisAdapter) -> None:
+        """Test that client errors surface as StorageError."""
+        from unittest.mock import patch
+
+        import redis
+
+        with patch.object(adapter._client, "pipeline", side_effect=redis.ConnectionError("down")):
+            with pytest.raises(StorageError, match="Redis operation failed"):
+                adapter.retrieve("laptop:org/repo:session:test", "key")
+
+    def test_adapters_share_connection_pool(self) -> None:
+        """Test that adapters for the same URL share one ConnectionPool."""
+        pytest.importorskip("redis")
+        first = RedisAdapter(url="redis://localhost:6399/0")
+        second = RedisAdapter(url="redis://localhost:6399/0")
+
+        assert first._client.connection_pool is second._client.connection_pool
+
+        first.close()
+        second.close()
+
+    def test_factory_requires_url(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the factory refuses to create a Redis adapter without a URL."""
+        monkeypatch.delenv("REDIS_URL", raising=False)
+
+        with pytest.raises(StorageError, match="requires 'url'"):
+            AdapterFactory.create_adapter({"adapter": "redis", "config": {}})
+
+    def test_factory_creates_redis_adapter(self) -> None:
+        """Test creating the Redis adapter from configuration."""
+        pytest.importorskip("redis")
+        config = {
+            "adapter": "redis",
+            "config": {"url": "redis://localhost:6399/1", "key_prefix": "x:"},
+        }
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, RedisAdapter)
+        assert adapter.key_prefix == "x:"
+        adapter.close()
+
+
+class TestBulkOperations:
+    """Tests for store_many / retrieve_many / delete_many across adapters."""
+
+    def test_store_and_retrieve_many(self, adapter: StorageAdapter) -> None:
+        """Test storing and retrieving several keys at once."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store("laptop:org/repo:session:test", "existing", "old")
+
+        adapter.store_many(scope, {"a": 1, "b": [2, 3], "existing": "new"})
+
+        assert adapter.retrieve_many(scope, ["a", "b", "existing", "missing"]) == {
+            "a": 1,
+            "b": [2, 3],
+            "existing": "new",
+            "missing": None,
+        }
+        assert sorted(adapter.list_keys(scope)) == ["a", "b", "existing"]
+
+    def test_retrieve_many_from_missing_scope(self, adapter: StorageAdapter) -> None:
+        """Test that retrieving from a missing scope returns all None."""
+        assert adapter.retrieve_many("laptop:org/repo:session:none", ["a", "b"]) == {
+            "a": None,
+            "b": None,
+        }
+
+    def test_delete_many(self, adapter: StorageAdapter) -> None:
+        """Test deleting several keys at once."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"a": 1, "b": 2, "c": 3})
+
+        assert adapter.delete_many(scope, ["a", "b", "missing", "a"]) == 2
+        assert adapter.list_keys(scope) == ["c"]
+
+        assert adapter.delete_many(scope, ["c"]) == 1
+        assert adapter.list_scopes() == []
+        assert adapter.delete_many(scope, ["c"]) == 0
+
+    def test_empty_batches(self, adapter: StorageAdapter) -> None:
+        """Test that empty batches are no-ops."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {})
+
+        assert adapter.retrieve_many(scope, []) == {}
+        assert adapter.delete_many(scope, []) == 0
+        assert adapter.list_scopes() == []
+
+    def test_snapshot_scopes(self, adapter: StorageAdapter) -> None:
+        """Test reading every matching scope in one call."""
+        adapter.store_many("laptop:org/repo:session:claude_1", {"current_issue": 15, "todos": []})
+        adapter.store_many("laptop:org/repo:session:claude_2", {"status": "idle"})
+        adapter.store("laptop:org/repo:session:claude_3", "todos", [1], ttl=-1)
+        adapter.store("laptop:org/repo:issue:15", "status", "open")
+
+        assert adapter.snapshot_scopes("laptop:org/repo:session:*") == {
+            "laptop:org/repo:session:claude_1": {"current_issue": 15, "todos": []},
+            "laptop:org/repo:session:claude_2": {"status": "idle"},
+        }
+        assert adapter.snapshot_scopes("laptop:org/repo:session:*", keys=["todos", "missing"]) == {
+            "laptop:org/repo:session:claude_1": {"todos": []},
+            "laptop:org/repo:session:claude_2": {},
+        }
+        assert list(adapter.snapshot_scopes(keys=[])) == [
+            "laptop:org/repo:issue:15",
+            "laptop:org/repo:session:claude_1",
+            "laptop:org/repo:session:claude_2",
+        ]
+        assert adapter.snapshot_scopes("other:*") == {}
+
+    def test_local_store_many_writes_once(self, tmp_path: Path) -> None:
+        """Test that LocalFileAdapter.store_many rewrites the scope file once."""
+        from unittest.mock import patch
+
+        adapter = LocalFileAdapter(base_path=str(tmp_path))
+        with patch.object(adapter, "_save_scope_data", wraps=adapter._save_scope_data) as save:
+            adapter.store_many("laptop:org/repo:session:test", {f"k{i}": i for i in range(10)})
+
+        assert save.call_count == 1
+
+    def test_default_implementations(self) -> None:
+        """Test the StorageAdapter fallbacks built on single-key methods."""
+
+        class DictAdapter(StorageAdapter):
+            def __init__(self) -> None:
+                self.data: dict[str, dict[str, Any]] = {}
+
+            def store(self, scope: str, key: str, value: Any) -> None:
+                self.data.setdefault(scope, {})[key] = value
+
+            def retrieve(self, scope: str, key: str) -> Any | None:
+                return self.data.get(scope, {}).get(key)
+
+            def delete(self, scope: str, key: str) -> bool:
+                return self.data.get(scope, {}).pop(key, None) is not None
+
+            def list_keys(self, scope: str) -> list[str]:
+                return list(self.data.get(scope, {}))
+
+            def list_scopes(self, pattern: str | None = None) -> list[str]:
+                return list(self.data)
+
+            def delete_scope(self, scope: str) -> bool:
+                return self.data.pop(scope, None) is not None
+
+            def close(self) -> None:
+                pass
+
+        adapter = DictAdapter()
+        adapter.store_many("s", {"a": 1, "b": 2})
+
+        assert adapter.retrieve_many("s", ["a", "c"]) == {"a": 1, "c": None}
+        assert adapter.delete_many("s", ["a", "c"]) == 1
+        assert adapter.list_keys("s") == ["b"]
+        assert adapter.snapshot_scopes(keys=["b", "c"]) == {"s": {"b": 2}}
+
+
+class TestExpiry:
+    """Tests for per-key TTLs and sweep_expired across adapters."""
+
+    SCOPE = "laptop:org/repo:locks"
+
+    def test_expired_values_read_as_missing(self, adapter: StorageAdapter) -> None:
+        """Test lazy expiry on every read path."""
+        adapter.store(self.SCOPE, "gone", "x", ttl=-1)
+        adapter.store(self.SCOPE, "kept", "y", ttl=60)
+        adapter.store(self.SCOPE, "forever", "z")
+
+        assert adapter.retrieve(self.SCOPE, "gone") is None
+        assert adapter.retrieve_many(self.SCOPE, ["gone", "kept", "forever"]) == {
+            "gone": None,
+            "kept": "y",
+            "forever": "z",
+        }
+        assert sorted(adapter.list_keys(self.SCOPE)) == ["forever", "kept"]
+        assert adapter.delete(self.SCOPE, "gone") is False
+
+    def test_value_expires_after_ttl(self, adapter: StorageAdapter) -> None:
+        """Test that a value disappears once its TTL passes."""
+        adapter.store(self.SCOPE, "editing", "src/server.py", ttl=0.05)
+        assert adapter.retrieve(self.SCOPE, "editing") == "src/server.py"
+
+        time.sleep(0.1)
+        assert adapter.retrieve(self.SCOPE, "editing") is None
+
+    def test_store_replaces_ttl(self, adapter: StorageAdapter) -> None:
+        """Test that storing again without a TTL makes the value permanent."""
+        adapter.store(self.SCOPE, "lock", "claude_1", ttl=-1)
+        adapter.store(self.SCOPE, "lock", "claude_2")
+
+        assert adapter.retrieve(self.SCOPE, "lock") == "claude_2"
+        assert adapter.sweep_expired() == 0
+        assert adapter.retrieve(self.SCOPE, "lock") == "claude_2"
+
+    def test_store_many_with_ttl(self, adapter: StorageAdapter) -> None:
+        """Test that a batch TTL applies to every key in it."""
+        adapter.store_many(self.SCOPE, {"a": 1, "b": 2}, ttl=-1)
+
+        assert adapter.list_keys(self.SCOPE) == []
+        assert adapter.sweep_expired() == 2
+
+    def test_sweep_expired(self, adapter: StorageAdapter) -> None:
+        """Test that the sweeper deletes only due values and empty scopes."""
+        other = "laptop:org/repo:markers"
+        adapter.store(self.SCOPE, "gone", 1, ttl=-1)
+        adapter.store(self.SCOPE, "kept", 2, ttl=60)
+        adapter.store(other, "gone", 3, ttl=-1)
+
+        assert adapter.sweep_expired() == 2
+        assert adapter.list_scopes() == [self.SCOPE]
+        assert adapter.list_keys(self.SCOPE) == ["kept"]
+        assert adapter.sweep_expired() == 0
+
+    def test_transact_skips_expired(self, adapter: StorageAdapter) -> None:
+        """Test that transact never sees expired values."""
+        adapter.store(self.SCOPE, "gone", 1, ttl=-1)
+        adapter.store(self.SCOPE, "kept", 2)
+
+        assert adapter.transact(self.SCOPE, lambda values: sorted(values)) == ["kept"]
+
+    def test_local_sweep_uses_persisted_index(self, tmp_path: Path) -> None:
+        """Test that another adapter instance can sweep from the on-disk index."""
+        writer = LocalFileAdapter(base_path=str(tmp_path))
+        writer.store(self.SCOPE, "gone", 1, ttl=-1)
+        writer.store("laptop:org/repo:untouched", "key", 2)
+
+        sweeper = LocalFileAdapter(base_path=str(tmp_path))
+        with patch.object(sweeper, "_load_scope_data", wraps=sweeper._load_scope_data) as load:
+            assert sweeper.sweep_expired() == 1
+
+        assert [call.args[0] for call in load.call_args_list] == [self.SCOPE]
+        assert sweeper.list_scopes() == ["laptop:org/repo:untouched"]
+        assert (tmp_path / ".index" / "expiry.jsonl").read_text() == ""
+
+    def test_local_flush_keeps_concurrent_sweep(self, tmp_path: Path) -> None:
+        """Test that a flush never writes expired keys back after a sweep."""
+        adapter = LocalFileAdapter(
+            base_path=str(tmp_path), write_behind=True, flush_interval_ms=3_600_000
+        )
+        adapter.store(self.SCOPE, "gone", 1, ttl=-1)
+        adapter.store(self.SCOPE, "kept", 2)
+        scope_lock = adapter._scope_lock
+        raced = []
+
+        def racing_scope_lock(scope: str, shared: bool = False) -> Any:
+            # Sweep between the flush taking its snapshot and locking the scope
+            if not raced:
+                raced.append(scope)
+                adapter.sweep_expired()
+            return scope_lock(scope, shared)
+
+        with patch.object(adapter, "_scope_lock", racing_scope_lock):
+            adapter.flush()
+
+        other = LocalFileAdapter(base_path=str(tmp_path))
+        assert list(other._load_scope_data(self.SCOPE)["data"]) == ["kept"]
+        adapter.close()
+
+    def test_sqlite_adds_expiry_column_to_old_database(self, tmp_path: Path) -> None:
+        """Test opening a database created before TTL support."""
+        import sqlite3
+
+        path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE entries (scope TEXT NOT NULL, key TEXT NOT NULL, "
+            "value TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL, "
+            "PRIMARY KEY (scope, key)) WITHOUT ROWID"
+        )
+        conn.execute("INSERT INTO entries VALUES ('s', 'k', '1', 'now', 'now')")
+        conn.commit()
+        conn.close()
+
+        adapter = SQLiteAdapter(path=str(path))
+        assert adapter.retrieve("s", "k") == 1
+        adapter.store("s", "t", 2, ttl=-1)
+        assert adapter.sweep_expired() == 1
+        adapter.close()
+
+
+class TestInstanceClaiming:
+    """Tests for transact / claim_instance / release_instance across adapters."""
+
+    SCOPE = "laptop:org/repo:instances"
+
+    def test_transact_applies_changes(self, adapter: StorageAdapter) -> None:
+        """Test that transact stores changed keys and deletes removed ones."""
+        scope = "laptop:org/repo:session:test"
+        adapter.store_many(scope, {"a": 1, "b": 2})
+
+        def update(values: dict[str, Any]) -> int:
+            values["a"] += 10
+            values["c"] = 3
+            del values["b"]
+            return len(values)
+
+        assert adapter.transact(scope, update) == 2
+        assert adapter.retrieve_many(scope, ["a", "b", "c"]) == {"a": 11, "b": None, "c": 3}
+
+        adapter.transact(scope, lambda values: values.clear())
+        assert adapter.list_scopes() == []
+
+    def test_claim_seeds_default_registry(self, adapter: StorageAdapter) -> None:
+        """Test claiming from an empty registry."""
+        assert adapter.claim_instance(self.SCOPE) == "claude_1"
+        assert adapter.claim_instance(self.SCOPE) == "claude_2"
+
+        registry = adapter.retrieve(self.SCOPE, "registry")
+        assert registry == {
+            "claude_1": "taken",
+            "claude_2": "taken",
+            "claude_3": "available",
+            "claude_4": "available",
+        }
+
+    def test_claim_specific_and_exhausted(self, adapter: StorageAdapter) -> None:
+        """Test claiming named instances and running out of instances."""
+        assert adapter.claim_instance(self.SCOPE, "claude_3") == "claude_3"
+        assert adapter.claim_instance(self.SCOPE, "claude_3") is None
+        assert adapter.claim_instance(self.SCOPE, "claude_9") == "claude_9"
+
+        for _ in range(3):
+            assert adapter.claim_instance(self.SCOPE) is not None
+        assert adapter.claim_instance(self.SCOPE) is None
+
+    def test_release_instance(self, adapter: StorageAdapter) -> None:
+        """Test that a released instance can be claimed again."""
+        adapter.claim_instance(self.SCOPE)
+
+        assert adapter.release_instance(self.SCOPE, "claude_1") is True
+        assert adapter.release_instance(self.SCOPE, "claude_9") is False
+        assert adapter.claim_instance(self.SCOPE) == "claude_1"
+
+    def test_expired_lease_can_be_reclaimed(self, adapter: StorageAdapter) -> None:
+        """Test that a taken instance with an expired lease is free again."""
+        assert adapter.claim_instance(self.SCOPE, "claude_1", lease_ttl=-1) == "claude_1"
+        assert adapter.claim_instance(self.SCOPE, "claude_2", lease_ttl=60) == "claude_2"
+
+        assert adapter.claim_instance(self.SCOPE, "claude_2") is None
+        assert adapter.claim_instance(self.SCOPE, lease_ttl=60) == "claude_1"
+        assert adapter.retrieve(self.SCOPE, "leases")["claude_1"] > time.time()
+
+    def test_renew_lease(self, adapter: StorageAdapter) -> None:
+        """Test renewing the lease of a claimed instance."""
+        adapter.claim_instance(self.SCOPE, lease_ttl=-1)
+
+        expires_at = adapter.renew_lease(self.SCOPE, "claude_1", 60)
+        assert expires_at is not None and expires_at > time.time()
+        assert adapter.reap_expired_instances(self.SCOPE) == []
+        assert adapter.renew_lease(self.SCOPE, "claude_2", 60) is None
+
+    def test_reap_expired_instances(self, adapter: StorageAdapter) -> None:
+        """Test that only instances with expired leases are released."""
+        adapter.claim_instance(self.SCOPE, "claude_1", lease_ttl=-1)
+        adapter.claim_instance(self.SCOPE, "claude_2", lease_ttl=60)
+        adapter.claim_instance(self.SCOPE, "claude_3")
+
+        assert adapter.reap_expired_instances(self.SCOPE) == ["claude_1"]
+
+        registry = adapter.retrieve(self.SCOPE, "registry")
+        assert registry["claude_1"] == "available"
+        assert registry["claude_2"] == "taken"
+        assert registry["claude_3"] == "taken"
+        assert list(adapter.retrieve(self.SCOPE, "leases")) == ["claude_2"]
+
+    def test_release_drops_lease(self, adapter: StorageAdapter) -> None:
+        """Test that signing off removes the lease entry."""
+        adapter.claim_instance(self.SCOPE, lease_ttl=60)
+        adapter.release_instance(self.SCOPE, "claude_1")
+
+        assert adapter.retrieve(self.SCOPE, "leases") is None
+
+    def test_parallel_claims_never_collide(self, adapter: StorageAdapter) -> None:
+        """Test a burst of 20 concurrent claims against 20 instances."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        instances = tuple(f"claude_{i}" for i in range(1, 21))
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            claims = list(
+                pool.map(
+                    lambda _: adapter.claim_instance(self.SCOPE, default_instances=instances),
+                    range(20),
+                )
+            )
+
+        assert sorted(claims) == sorted(instances)
+        assert set(adapter.retrieve(self.SCOPE, "registry").values()) == {"taken"}
+
+    def test_local_claims_across_processes(self, tmp_path: Path) -> None:
+        """Test that the file lock serializes claims from separate processes."""
+        import multiprocessing
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(4) as pool:
+            claims = pool.map(_local_claimer, [str(tmp_path)] * 4)
+
+        assert sorted(claims) == ["claude_1", "claude_2", "claude_3", "claude_4"]
+
+    def test_local_transact_writes_through(self, tmp_path: Path) -> None:
+        """Test that transact bypasses write-behind buffering."""
+        adapter = LocalFileAdapter(base_path=str(tmp_path), write_behind=True)
+        adapter.store(self.SCOPE, "pending", 1)
+
+        adapter.claim_instance(self.SCOPE)
+
+        other = LocalFileAdapter(base_path=str(tmp_path))
+        assert other.retrieve(self.SCOPE, "registry")["claude_1"] == "taken"
+        assert other.retrieve(self.SCOPE, "pending") == 1
+        adapter.close()
+
+    def test_local_flush_keeps_concurrent_transact(self, tmp_path: Path) -> None:
+        """Test that a flush never writes its snapshot over a later transact."""
+        adapter = LocalFileAdapter(
+            base_path=str(tmp_path), write_behind=True, flush_interval_ms=3_600_000
+        )
+        adapter.store(self.SCOPE, "pending", 1)
+        scope_lock = adapter._scope_lock
+        raced = []
+
+        def racing_scope_lock(scope: str, shared: bool = False) -> Any:
+            # Claim between the flush taking its snapshot and locking the scope
+            if not raced:
+                raced.append(scope)
+                adapter.claim_instance(self.SCOPE)
+            return scope_lock(scope, shared)
+
+        with patch.object(adapter, "_scope_lock", racing_scope_lock):
+            adapter.flush()
+
+        other = LocalFileAdapter(base_path=str(tmp_path))
+        assert other.retrieve(self.SCOPE, "registry")["claude_1"] == "taken"
+        assert other.retrieve(self.SCOPE, "pending") == 1
+        adapter.close()
+
+
+def _wait_for(predicate: Any, timeout: float = 5.0) -> bool:
+    """Poll until a condition holds (for changes reported by background threads)."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class TestChangeNotifications:
+    """Tests for StorageAdapter.watch and the change hub behind it."""
+
+    def test_hub_filters_by_pattern(self) -> None:
+        """Test that subscribers only see scopes matching their pattern."""
+        hub = ChangeHub()
+        sessions: list[str | None] = []
+        everything: list[str | None] = []
+        hub.subscribe(sessions.append, "laptop:org/repo:session:*")
+        unsubscribe = hub.subscribe(everything.append)
+
+        hub.publish("laptop:org/repo:session:claude_1")
+        hub.publish("laptop:org/repo:instances")
+        hub.publish(None)
+        unsubscribe()
+        hub.publish("laptop:org/repo:session:claude_2")
+
+        assert sessions == [
+            "laptop:org/repo:session:claude_1",
+            None,
+            "laptop:org/repo:session:claude_2",
+        ]
+        assert everything == ["laptop:org/repo:session:claude_1", "laptop:org/repo:instances", None]
+
+    def test_hub_runs_source_while_subscribed(self) -> None:
+        """Test that the external source starts and stops with the subscribers."""
+        calls: list[str] = []
+        hub = ChangeHub(lambda: calls.append("start"), lambda: calls.append("stop"))
+
+        first = hub.subscribe(lambda scope: None)
+        second = hub.subscribe(lambda scope: None)
+        first()
+        first()
+        assert calls == ["start"]
+
+        second()
+        assert calls == ["start", "stop"]
+        assert not hub.active
+
+    def test_hub_source_follows_concurrent_subscribers(self) -> None:
+        """Test that subscribing from many threads at once starts and stops the source in turn."""
+        calls: list[str] = []
+        hub = ChangeHub(lambda: calls.append("start"), lambda: calls.append("stop"))
+
+        def churn() -> None:
+            for _ in range(200):
+                hub.subscribe(lambda scope: None)()
+
+        threads = [threading.Thread(target=churn) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls[::2] == ["start"] * (len(calls) // 2)
+        assert calls[1::2] == ["stop"] * (len(calls) // 2)
+        assert calls[-1] == "stop"
+        assert not hub.active
+
+    def test_hub_survives_failing_callback(self) -> None:
+        """Test that one failing subscriber doesn't stop the others."""
+        hub = ChangeHub()
+        seen: list[str | None] = []
+        hub.subscribe(lambda scope: 1 / 0)
+        hub.subscribe(seen.append)
+
+        hub.publish("laptop:org/repo:instances")
+
+        assert seen == ["laptop:org/repo:instances"]
+
+    def test_own_writes_are_reported(self, adapter: StorageAdapter) -> None:
+        """Test that writes through the adapter notify its subscribers."""
+        scope = "laptop:org/repo:session:claude_1"
+        seen: list[str | None] = []
+        unsubscribe = adapter.watch(seen.append, "laptop:org/repo:*")
+
+        adapter.store(scope, "status", "active")
+        adapter.store("other:project:session:claude_1", "status", "active")
+        adapter.claim_instance("laptop:org/repo:instances", "claude_1")
+        adapter.delete_scope(scope)
+        unsubscribe()
+
+        assert _wait_for(lambda: seen.count(scope) >= 2)
+        assert "laptop:org/repo:instances" in seen
+        assert "other:project:session:claude_1" not in seen
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_local_reports_other_processes(self, tmp_path: Path, use_inotify: bool) -> None:
+        """Test that scope files written by another adapter instance are reported."""
+        watcher = LocalFileAdapter(base_path=str(tmp_path), watch_poll_interval_ms=20)
+        writer = LocalFileAdapter(base_path=str(tmp_path))
+        seen: list[str | None] = []
+
+        with patch(
+            "claude_session_coordinator.adapters.watch.inotify_available", return_value=use_inotify
+        ):
+            unsubscribe = watcher.watch(seen.append)
+        try:
+            assert watcher._watcher.uses_inotify is use_inotify
+            writer.store("laptop:org/repo:session:claude_1", "status", "active")
+            assert _wait_for(lambda: "laptop:org/repo:session:claude_1" in seen)
+
+            writer.delete_scope("laptop:org/repo:session:claude_1")
+            assert _wait_for(lambda: seen.count("laptop:org/repo:session:claude_1") >= 2)
+        finally:
+            unsubscribe()
+            watcher.close()
+            writer.close()
+
+    def test_local_stops_watching_without_subscribers(self, tmp_path: Path) -> None:
+        """Test that the directory watcher thread only runs while needed."""
+        adapter = LocalFileAdapter(base_path=str(tmp_path))
+
+        unsubscribe = adapter.watch(lambda scope: None)
+        assert adapter._watcher._thread is not None
+        unsubscribe()
+        assert adapter._watcher._thread is None
+        adapter.close()
+
+    def test_redis_reports_other_clients(self) -> None:
+        """Test that Redis keyspace notifications report other clients' writes."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        # Enabled by the server's administrator
+        fakeredis.FakeRedis(server=server).config_set("notify-keyspace-events", "Kh")
+        watcher = RedisAdapter(client=fakeredis.FakeRedis(server=server))
+        writer = RedisAdapter(client=fakeredis.FakeRedis(server=server))
+        seen: list[str | None] = []
+
+        unsubscribe = watcher.watch(seen.append, "laptop:org/repo:*")
+        try:
+            writer.store("laptop:org/repo:session:claude_1", "status", "active")
+            assert _wait_for(lambda: "laptop:org/repo:session:claude_1" in seen)
+        finally:
+            unsubscribe()
+            watcher.close()
+            writer.close()
+
+    @pytest.mark.parametrize("enable", [False, True])
+    def test_redis_server_config_is_opt_in(
+        self, enable: bool, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that the server's notify-keyspace-events is only changed when allowed."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        adapter = RedisAdapter(client=client, enable_keyspace_events=enable)
+
+        with (
+            patch.object(client, "config_get", return_value={"notify-keyspace-events": ""}),
+            patch.object(client, "config_set") as config_set,
+            caplog.at_level("WARNING"),
+        ):
+            adapter.watch(lambda scope: None)()
+        adapter.close()
+
+        assert config_set.called is enable
+        assert ("keyspace notifications are off" in caplog.text) is not enable
+
+    def test_sqlite_reports_other_processes(self, tmp_path: Path) -> None:
+        """Test that commits by another SQLite connection are reported."""
+        path = str(tmp_path / "state.sqlite3")
+        watcher = SQLiteAdapter(path=path, watch_poll_interval_ms=20)
+        writer = SQLiteAdapter(path=path)
+        seen: list[str | None] = []
+
+        unsubscribe = watcher.watch(seen.append, "laptop:org/repo:*")
+        try:
+            writer.store("laptop:org/repo:session:claude_1", "status", "active")
+            # SQLite doesn't say which scope another connection changed
+            assert _wait_for(lambda: None in seen)
+        finally:
+            unsubscribe()
+            watcher.close()
+            writer.close()
+
+    def test_expiry_sweep_is_reported(self, adapter: StorageAdapter) -> None:
+        """Test that values removed by the expiry sweep notify their scope."""
+        scope = "laptop:org/repo:files"
+        adapter.store(scope, "src/server.py", "claude_1", ttl=0.01)
+        time.sleep(0.05)
+        seen: list[str | None] = []
+        unsubscribe = adapter.watch(seen.append, scope)
+
+        adapter.sweep_expired()
+        unsubscribe()
+
+        assert scope in seen or None in seen
+
+    def test_unsupported_adapters_raise(self, tmp_path: Path) -> None:
+        """Test that the interfaces' default watch says notifications are unsupported."""
+        adapter = SQLiteAdapter(path=str(tmp_path / "state.sqlite3"))
+
+        with pytest.raises(NotImplementedError):
+            StorageAdapter.watch(adapter, lambda scope: None)
+        with pytest.raises(NotImplementedError):
+            _MemoryAsyncAdapter().watch(lambda scope: None)
+        adapter.close()
+
+
+class TestAdapterFactory:
+    """Tests for AdapterFactory."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_create_local_adapter(self, temp_dir: Path) -> None:
+        """Test creating a local adapter from configuration."""
+        config = {"adapter": "local", "config": {"base_path": str(temp_dir)}}
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, LocalFileAdapter)
+        assert adapter.base_path == temp_dir
+
+    def test_create_local_adapter_default_path(self) -> None:
+        """Test creating local adapter with default path."""
+        config = {"adapter": "local", "config": {}}
+
+        adapter = AdapterFactory.create_adapter(config)
+        assert isinstance(adapter, LocalFileAdapter)
+        assert str(adapter.base_path).endswith(".claude/session-state")
+
+    def test_create_adapter_missing_type(self) -> None:
+        """Test that missing adapter type raises error."""
+        config = {"config": {}}
+
+        with pytest.raises(StorageError, match="Adapter type not specified"):
+            AdapterFactory.create_adapter(config)
+
+    def test_create_adapter_unknown_type(self) -> None:
+        """Test that unknown adapter type raises error."""
+        config = {"adapter": "unknown", "config": {}}
+
+        with pytest.raises(StorageError, match="Unknown adapter type"):
+            AdapterFactory.create_adapter(config)
+
+    def test_register_custom_adapter(self, temp_dir: Path) -> None:
+        """Test registering and creating a custom adapter."""
+
+        class CustomAdapter(StorageAdapter):
+            def __init__(self, custom_param: str) -> None:
+                self.custom_param = custom_param
+
+            def store(self, scope: str, key: str, value: Any) -> None:
+                pass
+
+            def retrieve(self, scope: str, key: str) -> Any | None:
+                return None
+
+            def delete(self, scope: str, key: str) -> bool:
+                return False
+
+            def list_keys(self, scope: str) -> list[str]:
+                return []
+
+            def list_scopes(self, pattern: str | None = None) -> list[str]:
+                return []
+
+            def delete_scope(self, scope: str) -> bool:
+                return False
+
+            def close(self) -> None:
+                pass
+
+        def create_custom(config: dict[str, Any]) -> CustomAdapter:
+            return CustomAdapter(custom_param=config.get("custom_param", "default"))
+
+        # Register the custom adapter
+        AdapterFactory.register_adapter("custom", create_custom)
+
+        # Create instance
+        config = {"adapter": "custom", "config": {"custom_param": "test_value"}}
+        adapter = AdapterFactory.create_adapter(config)
+
+        assert isinstance(adapter, CustomAdapter)
+        assert adapter.custom_param == "test_value"
+
+    def test_custom_adapter_creation_failure(self) -> None:
+        """Test that exceptions during custom adapter creation are handled."""
+
+        def failing_creator(config: dict[str, Any]) -> StorageAdapter:
+            raise ValueError("Creation failed!")
+
+        # Register a failing adapter
+        AdapterFactory.register_adapter("failing", failing_creator)
+
+        config = {"adapter": "failing", "config": {}}
+
+        with pytest.raises(StorageError, match="Failed to create adapter"):
+            AdapterFactory.create_adapter(config)
+
+
+class _SlowAdapter(LocalFileAdapter):
+    """Local adapter whose reads block, to observe thread pool concurrency."""
+
+    def retrieve(self, scope: str, key: str) -> Any | None:
+        time.sleep(0.2)
+        return super().retrieve(scope, key)
+
+
+class _MemoryAsyncAdapter(AsyncStorageAdapter):
+    """Minimal native async adapter relying on the interface defaults."""
+
+    def __init__(self) -> None:
+        self.scopes: dict[str, dict[str, Any]] = {}
+
+    async def store(self, scope: str, key: str, value: Any, ttl: float | None = None) -> None:
+        self.scopes.setdefault(scope, {})[key] = value
+
+    async def retrieve(self, scope: str, key: str) -> Any | None:
+        return self.scopes.get(scope, {}).get(key)
+
+    async def delete(self, scope: str, key: str) -> bool:
+        return self.scopes.get(scope, {}).pop(key, None) is not None
+
+    async def list_keys(self, scope: str) -> list[str]:
+        return list(self.scopes.get(scope, {}))
+
+    async def list_scopes(self, pattern: str | None = None) -> list[str]:
+        return sorted(self.scopes)
+
+    async def delete_scope(self, scope: str) -> bool:
+        return self.scopes.pop(scope, None) is not None
+
+    async def close(self) -> None:
+        pass
+
+
+class TestAsyncStorageAdapter:
+    """Tests for the async adapter interface and the thread pool wrapper."""
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        """Create a temporary directory for testing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_wrapper_round_trip(self, temp_dir: Path) -> None:
+        """Test that the wrapper forwards every operation to the sync adapter."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        scope = "laptop:org/repo:session:test"
+
+        async def run() -> None:
+            storage = to_async(adapter)
+            await storage.store_many(scope, {"a": 1, "b": 2})
+            await storage.store(scope, "c", 3, ttl=60)
+            assert await storage.retrieve_many(scope, ["a", "c"]) == {"a": 1, "c": 3}
+            assert await storage.transact(scope, lambda values: values.pop("b")) == 2
+            assert await storage.claim_instance("laptop:org/repo:instances") == "claude_1"
+            assert sorted(await storage.list_keys(scope)) == ["a", "c"]
+            assert await storage.list_scopes("laptop:org/repo:session:*") == [scope]
+            assert await storage.delete_scope(scope)
+            await storage.close()
+
+        asyncio.run(run())
+        assert adapter.retrieve("laptop:org/repo:instances", "registry")["claude_1"] == "taken"
+
+    def test_calls_run_concurrently(self, temp_dir: Path) -> None:
+        """Test that blocking calls overlap instead of queueing on the event loop."""
+        storage = to_async(_SlowAdapter(base_path=str(temp_dir)))
+
+        async def run() -> float:
+            start = time.perf_counter()
+            await asyncio.gather(*(storage.retrieve("laptop:org/repo:x", "k") for _ in range(4)))
+            return time.perf_counter() - start
+
+        assert asyncio.run(run()) < 0.6
+
+    def test_pool_is_bounded(self, temp_dir: Path) -> None:
+        """Test that no more than max_workers calls run at once."""
+        storage = ThreadedAsyncAdapter(_SlowAdapter(base_path=str(temp_dir)), max_workers=1)
+
+        async def run() -> float:
+            start = time.perf_counter()
+            await asyncio.gather(*(storage.retrieve("laptop:org/repo:x", "k") for _ in range(2)))
+            return time.perf_counter() - start
+
+        assert asyncio.run(run()) >= 0.4
+
+    def test_awatch_starts_source_off_the_event_loop(self, temp_dir: Path) -> None:
+        """Test that the change source is started and stopped in the thread pool."""
+        adapter = LocalFileAdapter(base_path=str(temp_dir))
+        threads: list[str] = []
+        start, stop = adapter._watcher.start, adapter._watcher.stop
+
+        def record(method: Callable[[], None]) -> Callable[[], None]:
+            def wrapper() -> None:
+                threads.append(threading.current_thread().name)
+                method()
+
+            return wrapper
+
+        adapter._watcher.start = record(start)  # type: ignore[method-assign]
+        adapter._watcher.stop = record(stop)  # type: ignore[method-assign]
+        seen: list[str | None] = []
+
+        async def run() -> None:
+            storage = to_async(adapter)
+            unsubscribe = await storage.awatch(seen.append, "laptop:org/repo:*")
+            await storage.store("laptop:org/repo:session:test", "k", 1)
+            await unsubscribe()
+            await storage.close()
+
+        asyncio.run(run())
+
+        assert len(threads) == 2
+        assert all(name.startswith("csc-storage") for name in threads)
+        assert "laptop:org/repo:session:test" in seen
+
+    def test_to_async_keeps_async_adapters(self) -> None:
+        """Test that native async adapters are not wrapped."""
+        adapter = _MemoryAsyncAdapter()
+        assert to_async(adapter) is adapter
+
+    def test_default_methods(self) -> None:
+        """Test the default batch, transaction and instance methods."""
+        adapter = _MemoryAsyncAdapter()
+        scope = "laptop:org/repo:instances"
+
+        async def run() -> None:
+            assert await adapter.claim_instance(scope, lease_ttl=60) == "claude_1"
+            assert await adapter.claim_instance(scope, "claude_1") is None
+            assert await adapter.renew_lease(scope, "claude_1", 60) is not None
+            assert await adapter.claim_instance(scope, "claude_2", lease_ttl=-1) == "claude_2"
+            assert await adapter.reap_expired_instances(scope) == ["claude_2"]
+            assert await adapter.release_instance(scope, "claude_1")
+            await adapter.store_many("s", {"a": 1, "b": 2})
+            assert await adapter.delete_many("s", ["a", "b", "c"]) == 2
+
+        asyncio.run(run())
+        assert set(adapter.scopes[scope]["registry"].values()) == {"available"}
+
 
 class TestStorageAdapterInterface:
     """Tests to ensure the interface contract is maintained."""
@@ -515,6 +2802,9 @@ class TestStorageAdapterInterface:
     def test_local_adapter_implements_interface(self) -> None:
         """Test that LocalFileAdapter implements StorageAdapter."""
         assert issubclass(LocalFileAdapter, StorageAdapter)
+        assert issubclass(LogStructuredAdapter, StorageAdapter)
+        assert issubclass(SQLiteAdapter, StorageAdapter)
+        assert issubclass(RedisAdapter, StorageAdapter)
 
     def test_adapter_has_all_required_methods(self) -> None:
         """Test that StorageAdapter defines all required methods."""
@@ -525,6 +2815,10 @@ class TestStorageAdapterInterface:
             "list_keys",
             "list_scopes",
             "delete_scope",
+            "store_many",
+            "retrieve_many",
+            "delete_many",
+            "flush",
             "close",
         ]
 
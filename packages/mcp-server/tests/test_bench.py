@@ -0,0 +1,187 @@
+"""Tests for the benchmark suite and the bench CLI subcommand."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from claude_session_coordinator import server
+from claude_session_coordinator.__main__ import cli_main, create_parser
+from claude_session_coordinator.bench import (
+    compare_reports,
+    percentile,
+    run_benchmarks,
+    summarize,
+)
+
+
+class TestStatistics:
+    """Tests for percentile and summary helpers."""
+
+    def test_percentile_nearest_rank(self) -> None:
+        """Test nearest-rank percentiles."""
+        samples = [float(i) for i in range(1, 101)]
+
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([3.0, 1.0, 2.0], 100) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self) -> None:
+        """Test latency summaries in microseconds."""
+        summary = summarize([1000, 2000, 3000, 4000])
+
+        assert summary["count"] == 4
+        assert summary["p50_us"] == 2.0
+        assert summary["p99_us"] == 4.0
+        assert summary["mean_us"] == 2.5
+        assert summary["ops_per_sec"] == 400000.0
+
+
+class TestRunBenchmarks:
+    """Tests for run_benchmarks."""
+
+    def test_report_structure(self) -> None:
+        """Test a tiny benchmark run over the file-based adapters."""
+        report = run_benchmarks(
+            adapters=["local", "sqlite"],
+            scope_counts=(2,),
+            key_counts=(3,),
+            value_sizes=(16,),
+            tool_rounds=2,
+        )
+
+        assert report["meta"]["version"]
+        assert [r["adapter"] for r in report["results"]] == ["local", "sqlite"]
+        operations = report["results"][0]["operations"]
+        assert set(operations) == {"store", "retrieve", "list_scopes", "delete_scope"}
+        assert operations["store"]["count"] == 6
+        assert operations["delete_scope"]["count"] == 2
+        assert report["tools"]["local"]["sign_on"]["count"] == 2
+        assert report["clients"] == {}
+        json.dumps(report)
+
+    def test_client_load(self) -> None:
+        """Test the concurrent-client load test."""
+        report = run_benchmarks(
+            adapters=["sqlite"], scope_counts=(1,), key_counts=(1,), value_sizes=(8,), clients=20
+        )
+
+        load = report["clients"]["sqlite"]
+        assert load["clients"] == 20
+        assert set(load["tools"]) == {
+            "sign_on",
+            "store_data",
+            "retrieve_data",
+            "session_context",
+            "sign_off",
+        }
+        assert all(summary["count"] == 20 for summary in load["tools"].values())
+
+    def test_growth(self) -> None:
+        """Test the new-scope growth workload."""
+        report = run_benchmarks(
+            adapters=["local"], scope_counts=(1,), key_counts=(1,), value_sizes=(8,), growth=30
+        )
+
+        grown = report["growth"]["local"]
+        assert grown["scopes"] == 30
+        assert grown["operations"]["store_new_scope"]["count"] == 30
+        assert grown["operations"]["list_scopes"]["count"] > 0
+        assert report["results"]
+
+    def test_tool_workload_restores_server_state(self, monkeypatch) -> None:
+        """Test that benchmarking the tools leaves the server's context untouched."""
+        monkeypatch.setattr(server, "coordinator", None)
+
+        run_benchmarks(
+            adapters=["local"], scope_counts=(1,), key_counts=(1,), value_sizes=(8,), clients=2
+        )
+
+        assert server.coordinator is None
+
+    def test_unavailable_adapters_are_skipped(self, monkeypatch) -> None:
+        """Test that unreachable or unknown adapters are reported, not raised."""
+        monkeypatch.delenv("REDIS_URL", raising=False)
+
+        report = run_benchmarks(adapters=["redis", "nonexistent"], tool_rounds=0)
+
+        assert report["results"] == []
+        assert "REDIS_URL" in report["skipped"]["redis"]
+        assert "Unknown adapter type" in report["skipped"]["nonexistent"]
+
+
+class TestCompareReports:
+    """Tests for regression detection."""
+
+    @staticmethod
+    def _report(p95: float) -> dict:
+        summary = {"count": 1, "p50_us": p95, "p95_us": p95, "p99_us": p95}
+        return {
+            "results": [
+                {
+                    "adapter": "local",
+                    "scopes": 10,
+                    "keys": 10,
+                    "value_size": 64,
+                    "operations": {"store": summary},
+                }
+            ],
+            "tools": {"local": {"sign_on": summary}},
+        }
+
+    def test_detects_regression(self) -> None:
+        """Test that a p95 increase above the threshold is reported."""
+        regressions = compare_reports(self._report(100.0), self._report(150.0), threshold=0.2)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith("local/10/10/64/store")
+
+    def test_ignores_small_changes(self) -> None:
+        """Test that changes within the threshold are not regressions."""
+        assert compare_reports(self._report(100.0), self._report(110.0), threshold=0.2) == []
+
+
+class TestBenchCLI:
+    """Tests for the bench subcommand."""
+
+    def test_parser_bench_defaults(self) -> None:
+        """Test bench argument parsing."""
+        args = create_parser().parse_args(["bench", "--scopes", "1,5", "--adapters", "local"])
+
+        assert args.command == "bench"
+        assert args.scopes == (1, 5)
+        assert args.adapters == ["local"]
+        assert args.value_sizes == (64, 4096)
+
+    def test_parser_rejects_bad_counts(self) -> None:
+        """Test that non-integer counts are rejected."""
+        with pytest.raises(SystemExit):
+            create_parser().parse_args(["bench", "--scopes", "ten"])
+
+    def test_bench_writes_report(self, tmp_path: Path) -> None:
+        """Test running the subcommand end to end."""
+        output = tmp_path / "bench.json"
+        argv = ["bench", "--adapters", "local", "--scopes", "1", "--keys", "1"]
+        argv += ["--value-sizes", "8", "--tool-rounds", "1", "--output", str(output)]
+
+        assert cli_main(argv) == 0
+
+        report = json.loads(output.read_text())
+        assert report["results"][0]["adapter"] == "local"
+
+    def test_bench_baseline_regression_fails(self, tmp_path: Path) -> None:
+        """Test that --baseline exits with 1 when latency regressed."""
+        baseline = tmp_path / "baseline.json"
+        report = run_benchmarks(
+            adapters=["local"], scope_counts=(1,), key_counts=(1,), value_sizes=(8,)
+        )
+        for result in report["results"]:
+            for summary in result["operations"].values():
+                summary["p95_us"] = 0.001
+        baseline.write_text(json.dumps(report))
+
+        argv = ["bench", "--adapters", "local", "--scopes", "1", "--keys", "1"]
+        argv += ["--value-sizes", "8", "--tool-rounds", "0", "--baseline", str(baseline)]
+        assert cli_main(argv) == 1
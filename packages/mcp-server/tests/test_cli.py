@@ -58,6 +58,18 @@ class TestCLIParser:
         args = parser.parse_args([])
         assert args.validate_config is False
         assert args.verbose is False
+        assert args.transport == "stdio"
+
+    def test_parser_transport(self):
+        """Test the HTTP transport options."""
+        parser = create_parser()
+        args = parser.parse_args(
+            ["--transport", "streamable-http", "--host", "0.0.0.0", "--port", "9000"]
+        )
+        assert (args.transport, args.host, args.port) == ("streamable-http", "0.0.0.0", 9000)
+
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--transport", "websocket"])
 
 
 class TestValidateConfig:
@@ -92,6 +104,17 @@ class TestValidateConfig:
         result = validate_config()
         assert result == 1
 
+    def test_validate_config_log_requires_daemon(self, monkeypatch, tmp_path, capsys):
+        """Test that the log adapter is rejected unless the daemon is enabled."""
+        mock_config = {"storage": {"adapter": "log", "config": {"base_path": str(tmp_path)}}}
+        monkeypatch.setattr("claude_session_coordinator.__main__.load_config", lambda: mock_config)
+
+        assert validate_config() == 1
+        assert "daemon" in capsys.readouterr().out
+
+        mock_config["daemon"] = {"enabled": True}
+        assert validate_config() == 0
+
     def test_validate_config_file_not_found(self, monkeypatch):
         """Test validation handles missing config file gracefully."""
 
@@ -187,3 +210,40 @@ class TestCLIMain:
         assert result == 1
         captured = capsys.readouterr()
         assert "Traceback" in captured.err or "RuntimeError" in captured.err
+
+
+class TestConvertCLI:
+    """Tests for the convert subcommand."""
+
+    def test_convert_path(self, tmp_path, capsys):
+        """Test converting an explicit scope directory."""
+        from claude_session_coordinator.adapters import LocalFileAdapter
+
+        LocalFileAdapter(base_path=str(tmp_path)).store("a:b:c:d", "key", "value")
+
+        assert cli_main(["convert", "--format", "json-compact", "--path", str(tmp_path)]) == 0
+
+        assert "Converted 1 scope files" in capsys.readouterr().out
+        adapter = LocalFileAdapter(base_path=str(tmp_path))
+        assert adapter._get_scope_path("a:b:c:d").read_bytes().startswith(b"#csc:json-compact")
+        assert adapter.retrieve("a:b:c:d", "key") == "value"
+
+    def test_convert_uses_configured_path(self, tmp_path, monkeypatch):
+        """Test that the local adapter's base_path is used by default."""
+        config = {"storage": {"adapter": "local", "config": {"base_path": str(tmp_path)}}}
+        monkeypatch.setattr("claude_session_coordinator.__main__.load_config", lambda: config)
+
+        assert cli_main(["convert", "--format", "json"]) == 0
+
+    def test_convert_rejects_other_adapters(self, monkeypatch, capsys):
+        """Test that convert without --path needs a local adapter."""
+        config = {"storage": {"adapter": "sqlite", "config": {}}}
+        monkeypatch.setattr("claude_session_coordinator.__main__.load_config", lambda: config)
+
+        assert cli_main(["convert", "--format", "json"]) == 1
+        assert "pass --path" in capsys.readouterr().err
+
+    def test_convert_rejects_unknown_format(self):
+        """Test that only known formats are accepted."""
+        with pytest.raises(SystemExit):
+            create_parser().parse_args(["convert", "--format", "yaml"])
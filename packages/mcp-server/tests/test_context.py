@@ -0,0 +1,116 @@
+"""Tests for the coordinator context and client connections."""
+
+import pytest
+
+from claude_session_coordinator.adapters import LocalFileAdapter, to_async
+from claude_session_coordinator.context import CoordinatorContext
+
+pytestmark = pytest.mark.anyio
+
+SCOPE = "laptop:org/repo:instances"
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run async tests on the asyncio backend only."""
+    return "asyncio"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create an asynchronous local adapter in a temporary directory."""
+    return to_async(LocalFileAdapter(str(tmp_path / "state")))
+
+
+@pytest.fixture
+async def coordinator(storage):
+    """Create a context for one project."""
+    coordinator = CoordinatorContext(storage, "laptop", "org/repo")
+    yield coordinator
+    await coordinator.aclose()
+
+
+class TestCoordinatorContext:
+    """Tests for CoordinatorContext."""
+
+    def test_from_config(self, tmp_path, monkeypatch):
+        """Test creating the context from configuration."""
+        monkeypatch.chdir(tmp_path)
+        config = {
+            "storage": {"adapter": "local", "config": {"base_path": str(tmp_path / "state")}},
+            "session": {
+                "machine_id": "laptop",
+                "project_detection": "directory",
+                "lease_ttl_seconds": 60,
+            },
+            "daemon": {"enabled": False},
+        }
+
+        coordinator = CoordinatorContext.from_config(config)
+
+        assert coordinator.prefix == f"laptop:{tmp_path.name}"
+        assert coordinator.lease_ttl == 60.0
+        assert isinstance(coordinator.storage.adapter, LocalFileAdapter)
+
+    async def test_aclose_closes_only_owned_storage(self, storage, tmp_path, monkeypatch):
+        """Test that aclose closes the adapter from_config created, but not a borrowed one."""
+        monkeypatch.chdir(tmp_path)
+        config = {
+            "storage": {"adapter": "local", "config": {"base_path": str(tmp_path / "own")}},
+            "session": {"machine_id": "laptop", "project_detection": "directory"},
+            "daemon": {"enabled": False},
+        }
+        owned = CoordinatorContext.from_config(config)
+        closed = []
+        monkeypatch.setattr(owned.storage.adapter, "close", lambda: closed.append(True))
+        borrowed = CoordinatorContext(storage, "laptop", "org/repo")
+
+        await owned.aclose()
+        await borrowed.aclose()
+
+        assert closed == [True]
+        await storage.store(SCOPE, "still", "open")
+
+    async def test_connections_are_isolated(self, coordinator):
+        """Test that each connection holds its own session."""
+        async with coordinator.connect() as first, coordinator.connect() as second:
+            first.session = {"session_id": "claude_1", "full_scope_prefix": coordinator.prefix}
+
+            assert second.session is None
+            assert coordinator.connections == {first, second}
+            assert first.coordinator is second.coordinator is coordinator
+
+        assert coordinator.connections == set()
+
+    async def test_disconnect_releases_instance(self, coordinator):
+        """Test that closing a connection releases its instance."""
+        async with coordinator.connect() as connection:
+            await coordinator.storage.claim_instance(SCOPE, "claude_2")
+            connection.session = {"session_id": "claude_2", "full_scope_prefix": coordinator.prefix}
+
+        assert (await coordinator.storage.retrieve(SCOPE, "registry"))["claude_2"] == "available"
+        assert connection.session is None
+
+    async def test_maintain_leases_reclaims_reaped_instance(self, coordinator):
+        """Test that a connected session whose instance was reaped claims it again."""
+        async with coordinator.connect() as connection:
+            connection.session = {"session_id": "claude_1", "full_scope_prefix": coordinator.prefix}
+
+            assert await coordinator.maintain_leases() == []
+
+            registry = await coordinator.storage.retrieve(SCOPE, "registry")
+            assert registry["claude_1"] == "taken"
+            assert connection.session is not None
+
+    async def test_projects_share_one_adapter(self, storage, coordinator):
+        """Test that contexts for different projects on one adapter don't interfere."""
+        other = CoordinatorContext(storage, "laptop", "org/other")
+
+        assert await coordinator.storage.claim_instance(SCOPE, lease_ttl=60) == "claude_1"
+        assert (
+            await other.storage.claim_instance(f"{other.prefix}:instances", lease_ttl=60)
+            == "claude_1"
+        )
+        assert coordinator.context_view is coordinator.context_view
+        assert coordinator.context_view is not other.context_view
+        await other.aclose()
@@ -0,0 +1,292 @@
+"""Tests for the coordinator daemon and the adapter that talks to it."""
+
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from claude_session_coordinator.__main__ import create_parser
+from claude_session_coordinator.adapters import LocalFileAdapter, RemoteAdapter, StorageError
+from claude_session_coordinator.context import CoordinatorContext
+from claude_session_coordinator.daemon import (
+    CoordinatorDaemon,
+    configured_socket_path,
+    daemon_running,
+    default_socket_path,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run async tests on the asyncio backend only."""
+    return "asyncio"
+
+
+@pytest.fixture
+def socket_path():
+    """Get a socket path short enough for AF_UNIX (pytest's tmp_path may not be)."""
+    directory = tempfile.mkdtemp(prefix="csc-")
+    yield Path(directory) / "daemon.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+async def daemon(tmp_path, socket_path):
+    """Run a daemon sharing a local adapter."""
+    daemon = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "state")), socket_path)
+    await daemon.start()
+    yield daemon
+    await daemon.close()
+
+
+@pytest.fixture
+async def client(daemon):
+    """Connect a RemoteAdapter to the daemon."""
+    client = RemoteAdapter(daemon.socket_path)
+    yield client
+    await client.close()
+
+
+class TestRemoteAdapter:
+    """Tests for storage calls forwarded to the daemon."""
+
+    async def test_round_trip(self, daemon, client):
+        """Test that calls reach the daemon's adapter and return its results."""
+        scope = "laptop:org/repo:session:claude_1"
+
+        await client.store(scope, "status", "active")
+        await client.store_many(scope, {"current_issue": 15, "todos": [1, 2]})
+
+        assert await client.retrieve(scope, "current_issue") == 15
+        assert await client.retrieve_many(scope, ["status", "missing"]) == {
+            "status": "active",
+            "missing": None,
+        }
+        assert sorted(await client.list_keys(scope)) == ["current_issue", "status", "todos"]
+        assert await client.list_scopes("laptop:org/repo:*") == [scope]
+        assert await client.snapshot_scopes("laptop:*", keys=["status"]) == {
+            scope: {"status": "active"}
+        }
+        assert await client.delete(scope, "status") is True
+        assert await client.delete_many(scope, ["todos", "missing"]) == 1
+        assert await client.delete_scope(scope) is True
+
+        assert daemon.storage.adapter.list_scopes() == []
+
+    async def test_sessions_share_state(self, daemon, client):
+        """Test that two clients see each other's writes through the daemon."""
+        other = RemoteAdapter(daemon.socket_path)
+        await client.store("laptop:org/repo:issue:15", "status", "in_progress")
+
+        assert await other.retrieve("laptop:org/repo:issue:15", "status") == "in_progress"
+        await other.close()
+
+    async def test_claims_are_atomic_across_clients(self, daemon):
+        """Test that concurrent claims from several clients never collide."""
+        clients = [RemoteAdapter(daemon.socket_path) for _ in range(6)]
+
+        claimed = await asyncio.gather(
+            *(c.claim_instance("laptop:org/repo:instances", lease_ttl=60) for c in clients)
+        )
+
+        winners = [instance for instance in claimed if instance is not None]
+        assert sorted(winners) == ["claude_1", "claude_2", "claude_3", "claude_4"]
+        assert claimed.count(None) == 2
+        for c in clients:
+            await c.close()
+
+    async def test_lease_operations(self, client):
+        """Test the lease operations that run atomically in the daemon."""
+        scope = "laptop:org/repo:instances"
+        assert await client.claim_instance(scope, "claude_2", lease_ttl=60) == "claude_2"
+        assert await client.renew_lease(scope, "claude_2", 60) is not None
+        assert await client.reap_expired_instances(scope) == []
+        assert await client.release_instance(scope, "claude_2") is True
+
+    async def test_errors_are_reraised(self, client):
+        """Test that errors raised in the daemon reach the caller."""
+        with pytest.raises(ValueError, match="Unknown method"):
+            await client._call("close")
+        with pytest.raises(StorageError, match="JSON-serializable"):
+            await client.store("laptop:org/repo:issue:15", "value", object())
+        with pytest.raises(StorageError, match="transact"):
+            await client.transact("laptop:org/repo:issue:15", lambda values: None)
+
+    async def test_watch_reports_other_clients(self, daemon, client):
+        """Test that change events from the daemon reach watchers."""
+        other = RemoteAdapter(daemon.socket_path)
+        changed = asyncio.Event()
+        seen = []
+
+        def on_change(scope):
+            seen.append(scope)
+            changed.set()
+
+        unsubscribe = client.watch(on_change, "laptop:org/repo:session:*")
+        # Wait for the background connection to subscribe
+        await client.connect()
+        await other.store("laptop:org/repo:issue:15", "status", "open")
+        await other.store("laptop:org/repo:session:claude_2", "status", "active")
+        await asyncio.wait_for(changed.wait(), 5)
+        unsubscribe()
+        await other.close()
+
+        # The local adapter may report its own write and the file event for it
+        assert set(seen) == {"laptop:org/repo:session:claude_2"}
+
+    async def test_unreachable_daemon(self, socket_path):
+        """Test that a missing daemon is reported as a StorageError."""
+        client = RemoteAdapter(socket_path)
+
+        with pytest.raises(StorageError, match="Cannot connect"):
+            await client.retrieve("laptop:org/repo:issue:15", "status")
+        await client.close()
+
+    async def test_reconnects_after_restart(self, tmp_path, socket_path):
+        """Test that a lost connection fails fast and is re-opened on the next call."""
+        first = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "state")), socket_path)
+        await first.start()
+        client = RemoteAdapter(socket_path)
+        await client.store("laptop:org/repo:issue:15", "status", "open")
+
+        await first.close()
+        await asyncio.sleep(0.05)
+        with pytest.raises(StorageError):
+            await client.retrieve("laptop:org/repo:issue:15", "status")
+
+        second = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "state")), socket_path)
+        await second.start()
+        assert await client.retrieve("laptop:org/repo:issue:15", "status") == "open"
+        await client.close()
+        await second.close()
+
+    async def test_hung_daemon_times_out(self, socket_path):
+        """Test that a daemon that never answers fails the call instead of blocking."""
+        accepted = []
+
+        async def never_answer(reader, writer):
+            accepted.append(writer)
+
+        hung = await asyncio.start_unix_server(never_answer, path=str(socket_path))
+        client = RemoteAdapter(socket_path, request_timeout=0.1)
+
+        with pytest.raises(StorageError, match="did not answer 'hello'"):
+            await client.retrieve("laptop:org/repo:issue:15", "status")
+        assert client._pending == {}
+
+        await client.close()
+        for writer in accepted:
+            writer.close()
+        hung.close()
+        await hung.wait_closed()
+
+
+class TestCoordinatorDaemon:
+    """Tests for the daemon's lifecycle and socket handling."""
+
+    async def test_socket_is_private(self, daemon):
+        """Test that only the owner may connect to the socket."""
+        assert daemon.socket_path.stat().st_mode & 0o777 == 0o600
+        assert daemon_running(daemon.socket_path)
+
+    async def test_socket_is_created_private(self, tmp_path, socket_path, monkeypatch):
+        """Test that the socket is bound under a restrictive umask, not chmod-ed afterwards."""
+        modes = []
+        real_chmod = os.chmod
+
+        def record_chmod(path, mode):
+            modes.append(Path(path).stat().st_mode & 0o777)
+            real_chmod(path, mode)
+
+        monkeypatch.setattr("claude_session_coordinator.daemon.os.chmod", record_chmod)
+        previous = os.umask(0o022)
+        try:
+            daemon = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "state")), socket_path)
+            await daemon.start()
+            # The process umask is restored
+            assert os.umask(0o022) == 0o022
+        finally:
+            os.umask(previous)
+
+        # Already inaccessible to group and others before the chmod
+        assert len(modes) == 1 and modes[0] & 0o077 == 0
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        await daemon.close()
+
+    async def test_refuses_second_daemon(self, tmp_path, daemon):
+        """Test that a second daemon on the same socket is refused."""
+        second = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "other")), daemon.socket_path)
+
+        with pytest.raises(StorageError, match="already running"):
+            await second.start()
+        await second.storage.close()
+
+    async def test_replaces_stale_socket(self, tmp_path, socket_path):
+        """Test that a socket left behind by a crashed daemon is replaced."""
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(socket_path))
+        stale.close()
+        assert socket_path.exists() and not daemon_running(socket_path)
+
+        daemon = CoordinatorDaemon(LocalFileAdapter(str(tmp_path / "state")), socket_path)
+        await daemon.start()
+        assert daemon_running(socket_path)
+        await daemon.close()
+
+        assert not socket_path.exists()
+
+
+class TestDaemonDiscovery:
+    """Tests for how MCP servers find the daemon."""
+
+    def test_socket_path_follows_storage(self, tmp_path, monkeypatch):
+        """Test that the same storage maps to the same socket, and other storage doesn't."""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        monkeypatch.chdir(tmp_path)
+        relative = {"adapter": "local", "config": {"base_path": ".claude/session-state"}}
+        absolute = {
+            "adapter": "local",
+            "config": {"base_path": str(tmp_path / ".claude/session-state")},
+        }
+        other = {"adapter": "sqlite", "config": {"path": ".claude/session-state.sqlite3"}}
+
+        assert default_socket_path(relative) == default_socket_path(absolute)
+        assert default_socket_path(relative) != default_socket_path(other)
+        assert default_socket_path(relative).parent == tmp_path
+
+    def test_configured_socket_path(self, tmp_path):
+        """Test the daemon settings in the configuration."""
+        storage = {"adapter": "local", "config": {"base_path": str(tmp_path)}}
+
+        assert configured_socket_path({"storage": storage}) == default_socket_path(storage)
+        assert configured_socket_path(
+            {"storage": storage, "daemon": {"socket_path": "/run/csc.sock"}}
+        ) == Path("/run/csc.sock")
+        assert configured_socket_path({"storage": storage, "daemon": {"enabled": False}}) is None
+
+    async def test_server_uses_running_daemon(self, daemon):
+        """Test that the MCP server forwards to a daemon serving its storage."""
+        config = {
+            "storage": {"adapter": "local", "config": {}},
+            "session": {"machine_id": "laptop", "project_detection": "directory"},
+            "daemon": {"socket_path": str(daemon.socket_path), "request_timeout_seconds": 5},
+        }
+
+        coordinator = CoordinatorContext.from_config(config)
+
+        assert isinstance(coordinator.storage, RemoteAdapter)
+        assert coordinator.storage.request_timeout == 5.0
+        await coordinator.storage.close()
+
+    def test_parser_daemon(self):
+        """Test the daemon subcommand's arguments."""
+        args = create_parser().parse_args(["daemon", "--socket", "/tmp/csc.sock"])
+
+        assert args.command == "daemon"
+        assert args.socket == "/tmp/csc.sock"
@@ -1,6 +1,7 @@
 """Comprehensive tests for configuration and detection modules."""
 
 import json
+import os
 import tempfile
 from pathlib import Path
 from typing import Any
@@ -15,6 +16,7 @@ from claude_session_coordinator.config import (
     validate_config,
 )
 from claude_session_coordinator.detection import (
+    DETECTION_CACHE,
     detect_machine_id,
     detect_project_id,
 )
@@ -301,6 +303,12 @@ class TestMachineDetection:
 class TestProjectDetection:
     """Tests for project ID detection."""
 
+    @pytest.fixture(autouse=True)
+    def project_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Run outside any git repository, so only the mocked git is consulted."""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
     def test_detect_project_from_git_ssh_format(self) -> None:
         """Test parsing project from SSH git remote URL."""
         config = {"session": {"project_detection": "git"}}
@@ -431,6 +439,12 @@ class TestProjectDetection:
 class TestConfigDetectionIntegration:
     """Integration tests combining config and detection."""
 
+    @pytest.fixture(autouse=True)
+    def project_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Run outside any git repository, so only the mocked git is consulted."""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
     @pytest.fixture
     def temp_dir(self) -> Path:
         """Create a temporary directory for testing."""
@@ -478,3 +492,172 @@ class TestConfigDetectionIntegration:
 
         assert machine_id == "build-server"
         assert project_id == "my-project"
+
+
+class TestGitConfigReader:
+    """Tests for reading the origin from .git/config without running git."""
+
+    @pytest.fixture
+    def repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Create a repository with an origin remote and run inside it."""
+        git_dir = tmp_path / "repo" / ".git"
+        git_dir.mkdir(parents=True)
+        (git_dir / "config").write_text(
+            "[core]\n"
+            "\tbare = false\n"
+            '[remote "upstream"]\n'
+            "\turl = git@github.com:upstream/repo.git\n"
+            '[remote "origin"]\n'
+            '\turl = "https://github.com/org/repo.git" ; the fork\n'
+            "\tfetch = +refs/heads/*:refs/remotes/origin/*\n"
+        )
+        monkeypatch.chdir(git_dir.parent)
+        # Keep the user's and the system's git configs out of the tests
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+        monkeypatch.delenv("GIT_CONFIG_GLOBAL", raising=False)
+        monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+        return git_dir.parent
+
+    @pytest.fixture
+    def git(self):
+        """Mock the git subprocess, failing like git outside a repository."""
+        from subprocess import CalledProcessError
+
+        with patch("claude_session_coordinator.detection.subprocess.run") as mock_run:
+            mock_run.side_effect = CalledProcessError(128, ["git"])
+            yield mock_run
+
+    def test_reads_origin_without_git(self, repo: Path, git) -> None:
+        """Test that the origin URL is read from .git/config."""
+        assert detect_project_id({}) == "org/repo"
+        git.assert_not_called()
+
+    def test_reads_origin_from_subdirectory(
+        self, repo: Path, git, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the repository is found from a subdirectory."""
+        (repo / "src" / "pkg").mkdir(parents=True)
+        monkeypatch.chdir(repo / "src" / "pkg")
+
+        assert detect_project_id({}) == "org/repo"
+        git.assert_not_called()
+
+    def test_reads_origin_from_worktree(
+        self, repo: Path, git, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a worktree's .git file leads to the main repository's config."""
+        worktree_git_dir = repo / ".git" / "worktrees" / "feature"
+        worktree_git_dir.mkdir(parents=True)
+        (worktree_git_dir / "commondir").write_text("../..\n")
+        worktree = tmp_path / "feature"
+        worktree.mkdir()
+        (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+        monkeypatch.chdir(worktree)
+
+        assert detect_project_id({}) == "org/repo"
+        git.assert_not_called()
+
+    def test_includes_are_left_to_git(self, repo: Path, git) -> None:
+        """Test that configs including other files are read by git."""
+        config = repo / ".git" / "config"
+        config.write_text(config.read_text() + "[include]\n\tpath = ~/remotes.inc\n")
+        git.side_effect = None
+        git.return_value.stdout = "git@github.com:other/repo.git\n"
+
+        assert detect_project_id({}) == "other/repo"
+        git.assert_called_once()
+
+    def test_unrecognized_url_is_left_to_git(self, repo: Path, git) -> None:
+        """Test that a URL git would rewrite (e.g. a global insteadOf) is resolved by git."""
+        (repo / ".git" / "config").write_text('[remote "origin"]\n\turl = gh:org/repo\n')
+        git.side_effect = None
+        git.return_value.stdout = "https://github.com/org/repo.git\n"
+
+        assert detect_project_id({}) == "org/repo"
+        git.assert_called_once()
+
+    def test_global_url_rewrite_is_left_to_git(
+        self, repo: Path, git, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an insteadOf in the user's git config is applied by git."""
+        global_config = tmp_path / "gitconfig"
+        global_config.write_text(
+            '[url "git@github.com:mirror/"]\n\tinsteadOf = https://github.com/org/\n'
+        )
+        monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(global_config))
+        git.side_effect = None
+        git.return_value.stdout = "git@github.com:mirror/repo.git\n"
+
+        assert detect_project_id({}) == "mirror/repo"
+        git.assert_called_once()
+
+    def test_cache_is_invalidated_by_global_config(
+        self, repo: Path, git, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that changing the user's git config invalidates the cached project."""
+        global_config = tmp_path / "gitconfig"
+        global_config.write_text("[user]\n\tname = Someone\n")
+        monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(global_config))
+        assert detect_project_id({}) == "org/repo"
+        git.assert_not_called()
+
+        global_config.write_text(
+            '[url "git@github.com:mirror/"]\n\tinsteadOf = https://github.com/org/\n'
+        )
+        stat = global_config.stat()
+        os.utime(global_config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        git.side_effect = None
+        git.return_value.stdout = "git@github.com:mirror/repo.git\n"
+
+        assert detect_project_id({}) == "mirror/repo"
+        git.assert_called_once()
+
+    def test_no_origin_falls_back_to_directory(self, repo: Path, git) -> None:
+        """Test that a repository without an origin uses the directory name."""
+        (repo / ".git" / "config").write_text("[core]\n\tbare = false\n")
+
+        assert detect_project_id({}) == "repo"
+        assert json.loads(DETECTION_CACHE.read_text())["project_id"] == "repo"
+
+        # The fallback is cached, so git isn't asked again
+        assert detect_project_id({}) == "repo"
+        git.assert_called_once()
+
+    def test_git_result_is_cached(self, repo: Path, git) -> None:
+        """Test that a URL resolved by git is cached like a parsed one."""
+        (repo / ".git" / "config").write_text('[remote "origin"]\n\turl = gh:org/repo\n')
+        git.side_effect = None
+        git.return_value.stdout = "https://github.com/org/repo.git\n"
+
+        assert detect_project_id({}) == "org/repo"
+        assert detect_project_id({}) == "org/repo"
+        git.assert_called_once()
+        # Written atomically through a temp file that is renamed into place
+        assert [path.name for path in DETECTION_CACHE.parent.iterdir()] == [DETECTION_CACHE.name]
+
+    def test_cache_is_used_until_config_changes(self, repo: Path, git) -> None:
+        """Test that the cached project is returned until .git/config is modified."""
+        assert detect_project_id({}) == "org/repo"
+        cached = json.loads(DETECTION_CACHE.read_text())
+        assert cached["cwd"] == str(repo)
+
+        # A cache hit doesn't read the config
+        DETECTION_CACHE.write_text(json.dumps({**cached, "project_id": "cached/repo"}))
+        assert detect_project_id({}) == "cached/repo"
+
+        # Changing the remote invalidates the cache
+        config = repo / ".git" / "config"
+        config.write_text('[remote "origin"]\n\turl = git@github.com:moved/repo.git\n')
+        stat = config.stat()
+        os.utime(config, ns=(stat.st_atime_ns, cached["mtime_ns"] + 1_000_000))
+        assert detect_project_id({}) == "moved/repo"
+        git.assert_not_called()
+
+    def test_corrupt_cache_is_ignored(self, repo: Path, git) -> None:
+        """Test that an unreadable cache file is replaced."""
+        DETECTION_CACHE.parent.mkdir()
+        DETECTION_CACHE.write_text("{not json")
+
+        assert detect_project_id({}) == "org/repo"
+        assert json.loads(DETECTION_CACHE.read_text())["project_id"] == "org/repo"
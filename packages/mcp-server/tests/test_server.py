@@ -1,11 +1,26 @@
 """Tests for the MCP server tools, resources, and prompts."""
 
+import asyncio
 import json
+import time
 
 import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import ResourceUpdatedNotification, ServerNotification
+from pydantic import AnyUrl
 
 from claude_session_coordinator import server
-from claude_session_coordinator.adapters import LocalFileAdapter
+from claude_session_coordinator.adapters import AdapterFactory, LocalFileAdapter, to_async
+from claude_session_coordinator.context import CoordinatorContext
+
+# Tools are coroutines; run the async tests on asyncio
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run async tests on the asyncio backend only."""
+    return "asyncio"
 
 
 @pytest.fixture
@@ -16,26 +31,22 @@ def test_storage(tmp_path):
 
 
 @pytest.fixture
-def initialized_server(test_storage, monkeypatch):
+async def initialized_server(test_storage, monkeypatch):
     """Initialize the server with test configuration."""
-    # Set up test server state
-    monkeypatch.setattr(server, "storage", test_storage)
-    monkeypatch.setattr(server, "machine_id", "test-machine")
-    monkeypatch.setattr(server, "project_id", "test-org/test-repo")
-    monkeypatch.setattr(server, "current_session", None)
+    coordinator = CoordinatorContext(to_async(test_storage), "test-machine", "test-org/test-repo")
+    monkeypatch.setattr(server, "coordinator", coordinator)
 
-    yield
+    yield coordinator
 
-    # Cleanup
-    server.current_session = None
+    await coordinator.aclose()
 
 
 class TestSignOn:
     """Tests for the sign_on tool."""
 
-    def test_sign_on_auto_assign(self, initialized_server):
+    async def test_sign_on_auto_assign(self, initialized_server):
         """Test signing on with automatic instance assignment."""
-        result = server.sign_on()
+        result = await server.sign_on()
 
         assert result["machine"] == "test-machine"
         assert result["project"] == "test-org/test-repo"
@@ -44,80 +55,176 @@ class TestSignOn:
 
         # Verify instance is marked as taken
         instances_scope = "test-machine:test-org/test-repo:instances"
-        instances = server.storage.retrieve(instances_scope, "registry")
+        instances = server.coordinator.storage.adapter.retrieve(instances_scope, "registry")
         assert instances["claude_1"] == "taken"
 
-    def test_sign_on_specific_instance(self, initialized_server):
+    async def test_sign_on_specific_instance(self, initialized_server):
         """Test signing on with a specific instance ID."""
-        result = server.sign_on(session_id="claude_3")
+        result = await server.sign_on(session_id="claude_3")
 
         assert result["session_id"] == "claude_3"
 
         # Verify instance is marked as taken
         instances_scope = "test-machine:test-org/test-repo:instances"
-        instances = server.storage.retrieve(instances_scope, "registry")
+        instances = server.coordinator.storage.adapter.retrieve(instances_scope, "registry")
         assert instances["claude_3"] == "taken"
 
-    def test_sign_on_sets_current_session(self, initialized_server):
+    async def test_sign_on_sets_current_session(self, initialized_server):
         """Test that sign_on sets the current session context."""
-        assert server.current_session is None
+        assert server.coordinator.default_connection.session is None
+
+        await server.sign_on()
+
+        assert server.coordinator.default_connection.session is not None
+        assert server.coordinator.default_connection.session["session_id"] == "claude_1"
+
+    async def test_sign_on_taken_instance(self, initialized_server):
+        """Test that an instance cannot be claimed twice."""
+        await server.sign_on(session_id="claude_2")
 
-        server.sign_on()
+        with pytest.raises(RuntimeError, match="claude_2 is already taken"):
+            await server.sign_on(session_id="claude_2")
 
-        assert server.current_session is not None
-        assert server.current_session["session_id"] == "claude_1"
+    async def test_sign_on_all_taken(self, initialized_server):
+        """Test signing on when every instance is taken."""
+        for _ in range(4):
+            await server.sign_on()
+
+        with pytest.raises(RuntimeError, match="All instances are currently taken"):
+            await server.sign_on()
 
 
 class TestSignOff:
     """Tests for the sign_off tool."""
 
-    def test_sign_off_releases_instance(self, initialized_server):
+    async def test_sign_off_releases_instance(self, initialized_server):
         """Test that sign_off releases the instance."""
         # First sign on
-        server.sign_on(session_id="claude_2")
+        await server.sign_on(session_id="claude_2")
 
         # Then sign off
-        result = server.sign_off()
+        result = await server.sign_off()
 
         assert result["status"] == "signed off"
         assert result["session"]["session_id"] == "claude_2"
 
         # Verify instance is marked as available
         instances_scope = "test-machine:test-org/test-repo:instances"
-        instances = server.storage.retrieve(instances_scope, "registry")
+        instances = server.coordinator.storage.adapter.retrieve(instances_scope, "registry")
         assert instances["claude_2"] == "available"
 
-    def test_sign_off_clears_current_session(self, initialized_server):
+    async def test_sign_off_clears_current_session(self, initialized_server):
         """Test that sign_off clears the current session context."""
-        server.sign_on()
-        assert server.current_session is not None
+        await server.sign_on()
+        assert server.coordinator.default_connection.session is not None
 
-        server.sign_off()
+        await server.sign_off()
 
-        assert server.current_session is None
+        assert server.coordinator.default_connection.session is None
 
-    def test_sign_off_without_session(self, initialized_server):
+    async def test_sign_off_without_session(self, initialized_server):
         """Test signing off when no session is active."""
-        result = server.sign_off()
+        result = await server.sign_off()
 
         assert result["status"] == "no active session"
 
 
+class TestLeases:
+    """Tests for instance leases, heartbeat and the background reaper."""
+
+    SCOPE = "test-machine:test-org/test-repo:instances"
+
+    async def test_sign_on_takes_lease(self, initialized_server):
+        """Test that sign_on records a lease for the claimed instance."""
+        await server.sign_on()
+
+        leases = server.coordinator.storage.adapter.retrieve(self.SCOPE, "leases")
+        assert leases["claude_1"] > time.time()
+
+    async def test_heartbeat_renews_lease(self, initialized_server, monkeypatch):
+        """Test that heartbeat pushes the lease expiry forward."""
+        monkeypatch.setattr(server.coordinator, "lease_ttl", 1.0)
+        await server.sign_on()
+        first = server.coordinator.storage.adapter.retrieve(self.SCOPE, "leases")["claude_1"]
+
+        monkeypatch.setattr(server.coordinator, "lease_ttl", 600.0)
+        result = await server.heartbeat()
+
+        assert result["session_id"] == "claude_1"
+        assert result["lease_ttl_seconds"] == 600.0
+        assert server.coordinator.storage.adapter.retrieve(self.SCOPE, "leases")["claude_1"] > first
+
+    async def test_heartbeat_without_session(self, initialized_server):
+        """Test that heartbeat requires a signed-on session."""
+        with pytest.raises(RuntimeError, match="Not signed on"):
+            await server.heartbeat()
+
+    async def test_heartbeat_after_lease_lost(self, initialized_server):
+        """Test heartbeat once the instance has been reaped."""
+        await server.sign_on()
+        server.coordinator.storage.adapter.release_instance(self.SCOPE, "claude_1")
+
+        with pytest.raises(RuntimeError, match="has expired"):
+            await server.heartbeat()
+        assert server.coordinator.default_connection.session is None
+
+    async def test_crashed_session_is_reaped(self, initialized_server, monkeypatch):
+        """Test that an instance whose lease expired is freed by maintain_leases."""
+        monkeypatch.setattr(server.coordinator, "lease_ttl", -1.0)
+        await server.sign_on()
+        server.coordinator.default_connection.session = None  # the session crashed without sign_off
+
+        assert await server.coordinator.maintain_leases() == ["claude_1"]
+        assert (
+            server.coordinator.storage.adapter.retrieve(self.SCOPE, "registry")["claude_1"]
+            == "available"
+        )
+
+    async def test_maintain_leases_renews_own_lease(self, initialized_server, monkeypatch):
+        """Test that the running server keeps its own instance alive."""
+        await server.sign_on()
+        server.coordinator.storage.adapter.claim_instance(self.SCOPE, "claude_2", lease_ttl=-1)
+
+        assert await server.coordinator.maintain_leases() == ["claude_2"]
+        assert server.coordinator.default_connection.session["session_id"] == "claude_1"
+        assert (
+            server.coordinator.storage.adapter.retrieve(self.SCOPE, "registry")["claude_1"]
+            == "taken"
+        )
+
+    async def test_reaper_task_runs(self, initialized_server, monkeypatch):
+        """Test that the background reaper calls maintain_leases periodically."""
+        calls = []
+
+        async def maintain_leases() -> list[str]:
+            calls.append(1)
+            return []
+
+        monkeypatch.setattr(server.coordinator, "lease_ttl", 0.03)
+        monkeypatch.setattr(server.coordinator, "maintain_leases", maintain_leases)
+
+        task = asyncio.create_task(server._lease_reaper(server.coordinator))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        assert calls
+
+
 class TestDataTools:
     """Tests for store_data, retrieve_data, and delete_data tools."""
 
-    def test_store_and_retrieve_data(self, initialized_server):
+    async def test_store_and_retrieve_data(self, initialized_server):
         """Test storing and retrieving data."""
-        server.sign_on()
+        await server.sign_on()
 
-        server.store_data("session:claude_1", "test_key", "test_value")
-        result = server.retrieve_data("session:claude_1", "test_key")
+        await server.store_data("session:claude_1", "test_key", "test_value")
+        result = await server.retrieve_data("session:claude_1", "test_key")
 
         assert result == "test_value"
 
-    def test_store_complex_data(self, initialized_server):
+    async def test_store_complex_data(self, initialized_server):
         """Test storing complex data structures."""
-        server.sign_on()
+        await server.sign_on()
 
         test_data = {
             "current_issue": 15,
@@ -127,84 +234,154 @@ class TestDataTools:
             ],
         }
 
-        server.store_data("session:claude_1", "complex_data", test_data)
-        result = server.retrieve_data("session:claude_1", "complex_data")
+        await server.store_data("session:claude_1", "complex_data", test_data)
+        result = await server.retrieve_data("session:claude_1", "complex_data")
 
         assert result == test_data
 
-    def test_retrieve_nonexistent_key(self, initialized_server):
+    async def test_retrieve_nonexistent_key(self, initialized_server):
         """Test retrieving a key that doesn't exist."""
-        server.sign_on()
+        await server.sign_on()
 
-        result = server.retrieve_data("session:claude_1", "nonexistent")
+        result = await server.retrieve_data("session:claude_1", "nonexistent")
 
         assert result is None
 
-    def test_delete_data(self, initialized_server):
+    async def test_delete_data(self, initialized_server):
         """Test deleting data."""
-        server.sign_on()
+        await server.sign_on()
 
-        server.store_data("session:claude_1", "test_key", "test_value")
-        deleted = server.delete_data("session:claude_1", "test_key")
+        await server.store_data("session:claude_1", "test_key", "test_value")
+        deleted = await server.delete_data("session:claude_1", "test_key")
 
         assert deleted is True
 
-        result = server.retrieve_data("session:claude_1", "test_key")
+        result = await server.retrieve_data("session:claude_1", "test_key")
         assert result is None
 
-    def test_delete_nonexistent_key(self, initialized_server):
+    async def test_delete_nonexistent_key(self, initialized_server):
         """Test deleting a key that doesn't exist."""
-        server.sign_on()
+        await server.sign_on()
 
-        deleted = server.delete_data("session:claude_1", "nonexistent")
+        deleted = await server.delete_data("session:claude_1", "nonexistent")
 
         assert deleted is False
 
-    def test_data_tools_require_sign_on(self, initialized_server):
+    async def test_data_tools_require_sign_on(self, initialized_server):
         """Test that data tools require sign_on to be called first."""
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.store_data("session:claude_1", "key", "value")
+            await server.store_data("session:claude_1", "key", "value")
 
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.retrieve_data("session:claude_1", "key")
+            await server.retrieve_data("session:claude_1", "key")
 
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.delete_data("session:claude_1", "key")
+            await server.delete_data("session:claude_1", "key")
+
+    async def test_tools_run_concurrently(self, initialized_server, monkeypatch):
+        """Test that a slow storage call does not hold up other tool calls."""
+        await server.sign_on()
+        await server.store_data("session:claude_1", "key", "value")
+        adapter = server.coordinator.storage.adapter
+        read = adapter.retrieve
+
+        def slow_retrieve(scope, key):
+            time.sleep(0.2)
+            return read(scope, key)
+
+        monkeypatch.setattr(adapter, "retrieve", slow_retrieve)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(server.retrieve_data("session:claude_1", "key") for _ in range(4))
+        )
+
+        assert results == ["value"] * 4
+        assert time.perf_counter() - start < 0.6
+
+
+class TestExpiringData:
+    """Tests for TTLs on store_data and the background sweeper."""
+
+    async def test_store_data_with_ttl(self, initialized_server):
+        """Test that a value stored with a TTL expires."""
+        await server.sign_on()
+        await server.store_data("files", "src/server.py", "claude_1", ttl=-1)
+        await server.store_data("files", "README.md", "claude_1", ttl=60)
+
+        assert await server.retrieve_data("files", "src/server.py") is None
+        assert await server.retrieve_data("files", "README.md") == "claude_1"
+
+    async def test_sweeper_task_runs(self, initialized_server, monkeypatch):
+        """Test that the background sweeper deletes expired values."""
+        await server.sign_on()
+        await server.store_data("files", "src/server.py", "claude_1", ttl=-1)
+        monkeypatch.setattr(server, "SWEEP_INTERVAL", 0.01)
+
+        task = asyncio.create_task(server._expiry_sweeper(server.coordinator))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        assert await server.list_scopes("files") == []
+
+
+class TestBatchTools:
+    """Tests for store_data_batch and retrieve_data_batch tools."""
+
+    async def test_store_and_retrieve_batch(self, initialized_server):
+        """Test storing and retrieving several keys at once."""
+        await server.sign_on()
+
+        await server.store_data_batch("session:claude_1", {"current_issue": 15, "status": "active"})
+        result = await server.retrieve_data_batch(
+            "session:claude_1", ["current_issue", "status", "x"]
+        )
+
+        assert result == {"current_issue": 15, "status": "active", "x": None}
+        assert await server.retrieve_data("session:claude_1", "status") == "active"
+
+    async def test_batch_tools_require_sign_on(self, initialized_server):
+        """Test that batch tools require sign_on to be called first."""
+        with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
+            await server.store_data_batch("session:claude_1", {"key": "value"})
+
+        with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
+            await server.retrieve_data_batch("session:claude_1", ["key"])
 
 
 class TestDiscoveryTools:
     """Tests for list_keys, list_scopes, and delete_scope tools."""
 
-    def test_list_keys(self, initialized_server):
+    async def test_list_keys(self, initialized_server):
         """Test listing keys in a scope."""
-        server.sign_on()
+        await server.sign_on()
 
-        server.store_data("session:claude_1", "key1", "value1")
-        server.store_data("session:claude_1", "key2", "value2")
-        server.store_data("session:claude_1", "key3", "value3")
+        await server.store_data("session:claude_1", "key1", "value1")
+        await server.store_data("session:claude_1", "key2", "value2")
+        await server.store_data("session:claude_1", "key3", "value3")
 
-        keys = server.list_keys("session:claude_1")
+        keys = await server.list_keys("session:claude_1")
 
         assert set(keys) == {"key1", "key2", "key3"}
 
-    def test_list_keys_empty_scope(self, initialized_server):
+    async def test_list_keys_empty_scope(self, initialized_server):
         """Test listing keys in an empty scope."""
-        server.sign_on()
+        await server.sign_on()
 
-        keys = server.list_keys("session:claude_1")
+        keys = await server.list_keys("session:claude_1")
 
         assert keys == []
 
-    def test_list_scopes_all(self, initialized_server):
+    async def test_list_scopes_all(self, initialized_server):
         """Test listing all scopes."""
-        server.sign_on()
+        await server.sign_on()
 
         # Create some scopes
-        server.store_data("session:claude_1", "key", "value")
-        server.store_data("session:claude_2", "key", "value")
-        server.store_data("issue:15", "key", "value")
+        await server.store_data("session:claude_1", "key", "value")
+        await server.store_data("session:claude_2", "key", "value")
+        await server.store_data("issue:15", "key", "value")
 
-        scopes = server.list_scopes()
+        scopes = await server.list_scopes()
 
         # Scopes should be returned without the machine:project prefix
         assert "session:claude_1" in scopes
@@ -212,63 +389,63 @@ class TestDiscoveryTools:
         assert "issue:15" in scopes
         assert "instances" in scopes  # Created by sign_on
 
-    def test_list_scopes_with_pattern(self, initialized_server):
+    async def test_list_scopes_with_pattern(self, initialized_server):
         """Test listing scopes with a pattern filter."""
-        server.sign_on()
+        await server.sign_on()
 
         # Create some scopes
-        server.store_data("session:claude_1", "key", "value")
-        server.store_data("session:claude_2", "key", "value")
-        server.store_data("issue:15", "key", "value")
+        await server.store_data("session:claude_1", "key", "value")
+        await server.store_data("session:claude_2", "key", "value")
+        await server.store_data("issue:15", "key", "value")
 
-        scopes = server.list_scopes("session:*")
+        scopes = await server.list_scopes("session:*")
 
         assert "session:claude_1" in scopes
         assert "session:claude_2" in scopes
         assert "issue:15" not in scopes
 
-    def test_delete_scope(self, initialized_server):
+    async def test_delete_scope(self, initialized_server):
         """Test deleting an entire scope."""
-        server.sign_on()
+        await server.sign_on()
 
         # Create a scope with multiple keys
-        server.store_data("issue:15", "key1", "value1")
-        server.store_data("issue:15", "key2", "value2")
+        await server.store_data("issue:15", "key1", "value1")
+        await server.store_data("issue:15", "key2", "value2")
 
-        deleted = server.delete_scope("issue:15")
+        deleted = await server.delete_scope("issue:15")
 
         assert deleted is True
 
         # Verify scope is gone
-        scopes = server.list_scopes()
+        scopes = await server.list_scopes()
         assert "issue:15" not in scopes
 
-    def test_delete_nonexistent_scope(self, initialized_server):
+    async def test_delete_nonexistent_scope(self, initialized_server):
         """Test deleting a scope that doesn't exist."""
-        server.sign_on()
+        await server.sign_on()
 
-        deleted = server.delete_scope("nonexistent:scope")
+        deleted = await server.delete_scope("nonexistent:scope")
 
         assert deleted is False
 
-    def test_discovery_tools_require_sign_on(self, initialized_server):
+    async def test_discovery_tools_require_sign_on(self, initialized_server):
         """Test that discovery tools require sign_on to be called first."""
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.list_keys("session:claude_1")
+            await server.list_keys("session:claude_1")
 
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.list_scopes()
+            await server.list_scopes()
 
         with pytest.raises(RuntimeError, match="Must call sign_on\\(\\) first"):
-            server.delete_scope("session:claude_1")
+            await server.delete_scope("session:claude_1")
 
 
 class TestResources:
     """Tests for MCP resources."""
 
-    def test_session_context_resource(self, initialized_server):
+    async def test_session_context_resource(self, initialized_server):
         """Test the session://context resource."""
-        result_json = server.get_session_context()
+        result_json = await server.get_session_context()
         result = json.loads(result_json)
 
         assert result["machine"] == "test-machine"
@@ -277,87 +454,428 @@ class TestResources:
         assert "instructions" in result
         assert result["first_available"] == "claude_1"
 
-    def test_session_context_after_sign_on(self, initialized_server):
+    async def test_session_context_after_sign_on(self, initialized_server):
         """Test session context after signing on."""
-        server.sign_on(session_id="claude_1")
+        await server.sign_on(session_id="claude_1")
 
-        result_json = server.get_session_context()
+        result_json = await server.get_session_context()
         result = json.loads(result_json)
 
         assert result["current_session"] is not None
         assert result["current_session"]["session_id"] == "claude_1"
 
-    def test_session_state_resource(self, initialized_server):
+    async def test_session_context_reads_sessions_in_bulk(self, initialized_server, monkeypatch):
+        """Test that active sessions come from one snapshot, not per-instance reads."""
+        await server.sign_on(session_id="claude_2")
+        await server.store_data_batch("session:claude_2", {"current_issue": 7, "todos": [1, 2]})
+        await server.sign_on(session_id="claude_1")
+        await server.store_data("session:claude_1", "status", "active")
+
+        adapter = server.coordinator.storage.adapter
+        reads = []
+        retrieve_many = adapter.retrieve_many
+
+        def counting_retrieve_many(scope, keys):
+            reads.append(scope)
+            return retrieve_many(scope, keys)
+
+        monkeypatch.setattr(adapter, "list_keys", lambda scope: pytest.fail("per-scope read"))
+        monkeypatch.setattr(adapter, "retrieve_many", counting_retrieve_many)
+
+        result = json.loads(await server.get_session_context())
+
+        # Only the registry is read key by key
+        assert reads == ["test-machine:test-org/test-repo:instances"]
+
+        assert result["active_sessions"] == [
+            {"instance": "claude_1", "status": "taken", "current_issue": None, "todo_count": 0},
+            {"instance": "claude_2", "status": "taken", "current_issue": 7, "todo_count": 2},
+        ]
+
+    async def test_session_context_is_cached(self, initialized_server, monkeypatch):
+        """Test that repeated reads of an unchanged context do no storage I/O."""
+        await server.sign_on(session_id="claude_1")
+        first = await server.get_session_context()
+
+        adapter = server.coordinator.storage.adapter
+        monkeypatch.setattr(adapter, "retrieve_many", lambda *a: pytest.fail("storage read"))
+        monkeypatch.setattr(adapter, "snapshot_scopes", lambda *a: pytest.fail("storage read"))
+
+        assert await server.get_session_context() is first
+
+    async def test_session_context_rereads_only_changed_scopes(
+        self, initialized_server, monkeypatch
+    ):
+        """Test that a write re-reads just the scope it changed."""
+        await server.sign_on(session_id="claude_1")
+        await server.get_session_context()
+
+        adapter = server.coordinator.storage.adapter
+        patterns = []
+        snapshot_scopes = adapter.snapshot_scopes
+
+        def recording_snapshot_scopes(pattern=None, keys=None):
+            patterns.append(pattern)
+            return snapshot_scopes(pattern, keys)
+
+        monkeypatch.setattr(adapter, "snapshot_scopes", recording_snapshot_scopes)
+        await server.store_data("session:claude_1", "current_issue", 42)
+
+        result = json.loads(await server.get_session_context())
+
+        assert patterns == ["test-machine:test-org/test-repo:session:claude_1"]
+        assert result["active_sessions"][0]["current_issue"] == 42
+
+    async def test_session_context_sees_other_processes(self, initialized_server, test_storage):
+        """Test that the context follows writes made by another server."""
+        await server.sign_on(session_id="claude_1")
+        await server.get_session_context()
+
+        # Another server on the same storage directory claims an instance
+        other = LocalFileAdapter(str(test_storage.base_path))
+        other.claim_instance("test-machine:test-org/test-repo:instances", "claude_2")
+        other.close()
+
+        deadline = time.monotonic() + 5
+        while True:
+            result = json.loads(await server.get_session_context())
+            if result["instances"]["claude_2"] == "taken" or time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.05)
+
+        assert result["instances"]["claude_2"] == "taken"
+
+    async def test_session_context_without_notifications(
+        self, initialized_server, test_storage, monkeypatch
+    ):
+        """Test that adapters without change notifications are re-read on every access."""
+
+        def unsupported(callback, pattern=None):
+            raise NotImplementedError("no change notifications")
+
+        monkeypatch.setattr(test_storage, "watch", unsupported)
+
+        await server.get_session_context()
+        test_storage.claim_instance("test-machine:test-org/test-repo:instances", "claude_3")
+
+        result = json.loads(await server.get_session_context())
+
+        assert result["instances"]["claude_3"] == "taken"
+        assert not server.coordinator.context_view.cacheable
+
+    async def test_session_state_resource(self, initialized_server):
         """Test the session://state/{instance_id} resource."""
         # Sign on and create some state
-        server.sign_on(session_id="claude_1")
-        server.store_data("session:claude_1", "current_issue", 15)
-        server.store_data("session:claude_1", "status", "in_progress")
+        await server.sign_on(session_id="claude_1")
+        await server.store_data("session:claude_1", "current_issue", 15)
+        await server.store_data("session:claude_1", "status", "in_progress")
 
         # Sign off and sign on as another instance to read the state
-        server.sign_off()
-        server.sign_on(session_id="claude_2")
+        await server.sign_off()
+        await server.sign_on(session_id="claude_2")
 
-        result_json = server.get_session_state("claude_1")
+        result_json = await server.get_session_state("claude_1")
         result = json.loads(result_json)
 
         assert result["instance"] == "claude_1"
         assert result["current_issue"] == 15
         assert result["status"] == "in_progress"
 
-    def test_session_state_nonexistent_instance(self, initialized_server):
+    async def test_session_state_nonexistent_instance(self, initialized_server):
         """Test reading state of a nonexistent instance."""
-        server.sign_on()
+        await server.sign_on()
 
-        result_json = server.get_session_state("nonexistent")
+        result_json = await server.get_session_state("nonexistent")
         result = json.loads(result_json)
 
         assert "error" in result
 
+    async def test_storage_config_lists_every_adapter(self, initialized_server):
+        """Test that session://storage-config covers every registered adapter."""
+        result = json.loads(await server.get_storage_config())
+
+        options = result["available_options"]
+        assert sorted(options) == AdapterFactory.available_adapters()
+        assert {"local", "log", "sqlite", "redis"} <= set(options)
+        assert options["sqlite"]["ready"] is True
+        assert options["log"]["display_name"] == "Log-Structured Storage"
+
+    async def test_update_storage_settings_accepts_registered_adapters(
+        self, initialized_server, tmp_path, monkeypatch
+    ):
+        """Test that update_storage_settings validates against the adapter registry."""
+        monkeypatch.chdir(tmp_path)
+
+        with pytest.raises(ValueError, match=", ".join(AdapterFactory.available_adapters())):
+            await server.update_storage_settings("unknown", "single-machine", "testing")
+
+        with pytest.warns(UserWarning, match="Recommended adapter: 'local'"):
+            result = await server.update_storage_settings("sqlite", "single-machine", "testing")
+        assert result["settings"]["storage_adapter"] == "sqlite"
+
+
+class TestChangeNotifications:
+    """Tests for the watch_scope tool and resource subscriptions."""
+
+    async def test_watch_scope_reports_change(self, initialized_server, test_storage):
+        """Test that watch_scope returns once another session writes the scope."""
+        await server.sign_on(session_id="claude_1")
+        other = LocalFileAdapter(str(test_storage.base_path))
+
+        async def write_later():
+            await asyncio.sleep(0.05)
+            await asyncio.to_thread(
+                other.store, "test-machine:test-org/test-repo:issue:15", "status", "done"
+            )
+
+        writer = asyncio.create_task(write_later())
+        result = await server.watch_scope("issue:*", timeout=5)
+        await writer
+        other.close()
+
+        assert result == {"changed": True, "scopes": ["issue:15"]}
+
+    async def test_watch_scope_times_out(self, initialized_server):
+        """Test that watch_scope returns unchanged after the timeout."""
+        await server.sign_on(session_id="claude_1")
+        await server.store_data("issue:16", "status", "open")
+
+        start = time.monotonic()
+        result = await server.watch_scope("issue:15", timeout=0.1)
+
+        assert result == {"changed": False, "scopes": []}
+        assert time.monotonic() - start < 2
+
+    async def test_watch_scope_requires_sign_on(self, initialized_server):
+        """Test that watch_scope requires sign_on first."""
+        with pytest.raises(RuntimeError, match="sign_on"):
+            await server.watch_scope("issue:15")
+
+    async def test_resource_scope_patterns(self, initialized_server):
+        """Test which scopes the subscribable resources are built from."""
+        prefix = "test-machine:test-org/test-repo"
+
+        assert server.resource_scope_patterns("session://context") == [
+            f"{prefix}:instances",
+            f"{prefix}:session:*",
+        ]
+        assert server.resource_scope_patterns("session://state/claude_2") == [
+            f"{prefix}:session:claude_2"
+        ]
+        with pytest.raises(ValueError, match="does not support subscriptions"):
+            server.resource_scope_patterns("session://storage-config")
+
+    async def test_subscribed_client_is_notified(self, initialized_server, test_storage):
+        """Test that a subscribed client gets resource-updated notifications."""
+        updated: list[str] = []
+        notified = asyncio.Event()
+
+        async def message_handler(message):
+            if isinstance(message, ServerNotification) and isinstance(
+                message.root, ResourceUpdatedNotification
+            ):
+                updated.append(str(message.root.params.uri))
+                notified.set()
+
+        other = LocalFileAdapter(str(test_storage.base_path))
+        async with create_connected_server_and_client_session(
+            server.app, message_handler=message_handler
+        ) as client:
+            assert client.get_server_capabilities().resources.subscribe is True
+            await client.subscribe_resource(AnyUrl("session://state/claude_2"))
+
+            # Another session's write to an unrelated scope is not reported
+            await asyncio.to_thread(
+                other.store, "test-machine:test-org/test-repo:session:claude_3", "status", "x"
+            )
+            await asyncio.to_thread(
+                other.store, "test-machine:test-org/test-repo:session:claude_2", "status", "x"
+            )
+            await asyncio.wait_for(notified.wait(), 5)
+
+            await client.unsubscribe_resource(AnyUrl("session://state/claude_2"))
+            await asyncio.to_thread(
+                other.store, "test-machine:test-org/test-repo:session:claude_2", "status", "y"
+            )
+            await asyncio.sleep(0.2)
+        other.close()
+
+        assert updated == ["session://state/claude_2"]
+
+
+class TestClientConnections:
+    """Tests for per-connection sessions when one server serves many clients."""
+
+    SCOPE = "test-machine:test-org/test-repo:instances"
+
+    @staticmethod
+    async def call(client, tool, **arguments):
+        """Call a tool over MCP and decode its JSON result."""
+        result = await client.call_tool(tool, arguments)
+        assert not result.isError, result.content
+        if not result.content:
+            return None
+        try:
+            return json.loads(result.content[0].text)
+        except ValueError:
+            return result.content[0].text
+
+    async def test_clients_have_separate_sessions(self, initialized_server):
+        """Test that each connected client signs on to its own instance."""
+        async with (
+            create_connected_server_and_client_session(server.app) as first,
+            create_connected_server_and_client_session(server.app) as second,
+        ):
+            assert (await self.call(first, "sign_on"))["session_id"] == "claude_1"
+            assert (await self.call(second, "sign_on"))["session_id"] == "claude_2"
+            await self.call(first, "store_data", scope="issue:15", key="owner", value="claude_1")
+
+            assert await self.call(second, "retrieve_data", scope="issue:15", key="owner") == (
+                "claude_1"
+            )
+            context = await second.read_resource(AnyUrl("session://context"))
+            assert json.loads(context.contents[0].text)["current_session"]["session_id"] == (
+                "claude_2"
+            )
+            assert (await self.call(first, "sign_off"))["session"]["session_id"] == "claude_1"
+            assert (await self.call(second, "heartbeat"))["session_id"] == "claude_2"
+            assert len(server.coordinator.connections) == 2
+
+        assert server.coordinator.default_connection.session is None
+
+    async def test_disconnect_releases_instance(self, initialized_server):
+        """Test that a client disconnecting without sign_off frees its instance."""
+        async with create_connected_server_and_client_session(server.app) as client:
+            await self.call(client, "sign_on", session_id="claude_3")
+            assert (
+                server.coordinator.storage.adapter.retrieve(self.SCOPE, "registry")["claude_3"]
+                == "taken"
+            )
+
+        assert (
+            server.coordinator.storage.adapter.retrieve(self.SCOPE, "registry")["claude_3"]
+            == "available"
+        )
+        assert server.coordinator.connections == set()
+
+    async def test_maintain_leases_renews_every_client(self, initialized_server, monkeypatch):
+        """Test that the reaper keeps every connected client's instance alive."""
+        monkeypatch.setattr(server.coordinator, "lease_ttl", 1.0)
+        async with (
+            create_connected_server_and_client_session(server.app) as first,
+            create_connected_server_and_client_session(server.app) as second,
+        ):
+            await self.call(first, "sign_on")
+            await self.call(second, "sign_on")
+
+            monkeypatch.setattr(server.coordinator, "lease_ttl", 600.0)
+            assert await server.coordinator.maintain_leases() == []
+
+            leases = server.coordinator.storage.adapter.retrieve(self.SCOPE, "leases")
+            assert leases["claude_1"] > time.time() + 300
+            assert leases["claude_2"] > time.time() + 300
+
+    async def test_hundreds_of_concurrent_clients(self, initialized_server):
+        """Load test: 200 clients work against one server and adapter at once."""
+
+        async def work(instance):
+            async with create_connected_server_and_client_session(server.app) as client:
+                assert (await self.call(client, "sign_on", session_id=instance))[
+                    "session_id"
+                ] == instance
+                await self.call(
+                    client, "store_data", scope=f"session:{instance}", key="status", value=instance
+                )
+                assert (
+                    await self.call(
+                        client, "retrieve_data", scope=f"session:{instance}", key="status"
+                    )
+                    == instance
+                )
+                await self.call(client, "sign_off")
+
+        instances = [f"agent_{i}" for i in range(200)]
+        await asyncio.wait_for(asyncio.gather(*(work(i) for i in instances)), 120)
+
+        registry = server.coordinator.storage.adapter.retrieve(self.SCOPE, "registry")
+        assert all(registry[instance] == "available" for instance in instances)
+        assert (
+            len(server.coordinator.storage.adapter.list_scopes("test-machine:*:session:agent_*"))
+            == 200
+        )
+        assert server.coordinator.connections == set()
+
+
+class TestShutdown:
+    """Tests for the server's shutdown."""
+
+    @pytest.mark.parametrize(
+        "transport, runner",
+        [("stdio", "run_stdio_async"), ("streamable-http", "run_streamable_http_async")],
+    )
+    async def test_shutdown_closes_adapter(self, test_storage, monkeypatch, transport, runner):
+        """Test that the adapter the server created is closed when the transport stops."""
+        coordinator = CoordinatorContext(
+            to_async(test_storage), "test-machine", "test-org/test-repo", owns_storage=True
+        )
+        closed = []
+        monkeypatch.setattr(test_storage, "close", lambda: closed.append(True))
+        monkeypatch.setattr(server, "initialize_server", lambda: coordinator)
+
+        async def serve():
+            # The client disconnected
+            return None
+
+        monkeypatch.setattr(server.app, runner, serve)
+
+        await server.main(transport)
+
+        assert closed == [True]
+
 
 class TestPrompts:
     """Tests for MCP prompts."""
 
-    def test_startup_prompt_with_available_instances(self, initialized_server, tmp_path):
+    async def test_startup_prompt_with_available_instances(self, initialized_server, tmp_path):
         """Test the startup prompt when instances are available."""
         # Create settings file to bypass first-run detection
         settings_path = tmp_path / "settings.local.json"
         settings_path.write_text(
             '{"storage_adapter": "local", "coordination_scope": "single-machine"}'
         )
-        server.settings_manager.settings_path = settings_path
+        server.coordinator.settings.settings_path = settings_path
 
-        result = server.startup()
+        result = await server.startup()
 
         assert "test-org/test-repo" in result
         assert "test-machine" in result
         assert "claude_1" in result
         assert "sign_on()" in result
 
-    def test_startup_prompt_no_available_instances(self, initialized_server, tmp_path):
+    async def test_startup_prompt_no_available_instances(self, initialized_server, tmp_path):
         """Test the startup prompt when no instances are available."""
         # Create settings file to bypass first-run detection
         settings_path = tmp_path / "settings.local.json"
         settings_path.write_text(
             '{"storage_adapter": "local", "coordination_scope": "single-machine"}'
         )
-        server.settings_manager.settings_path = settings_path
+        server.coordinator.settings.settings_path = settings_path
 
         # Mark all instances as taken
         instances_scope = "test-machine:test-org/test-repo:instances"
         instances = {f"claude_{i}": "taken" for i in range(1, 5)}
-        server.storage.store(instances_scope, "registry", instances)
+        server.coordinator.storage.adapter.store(instances_scope, "registry", instances)
 
-        result = server.startup()
+        result = await server.startup()
 
         assert "All instances are currently taken" in result
 
-    def test_startup_prompt_first_run(self, initialized_server):
+    async def test_startup_prompt_first_run(self, initialized_server):
         """Test the startup prompt on first run (no settings configured)."""
         # Ensure no settings file exists
-        assert not server.settings_manager.exists()
+        assert not server.coordinator.settings.exists()
 
-        result = server.startup()
+        result = await server.startup()
 
         assert "First-time setup needed" in result
         assert "update_storage_settings()" in result
@@ -365,9 +883,9 @@ class TestPrompts:
         assert "multi-machine" in result.lower()
         assert "team" in result.lower()
 
-    def test_sign_off_prompt_with_incomplete_tasks(self, initialized_server):
+    async def test_sign_off_prompt_with_incomplete_tasks(self, initialized_server):
         """Test the sign-off prompt with incomplete tasks."""
-        server.sign_on(session_id="claude_1")
+        await server.sign_on(session_id="claude_1")
 
         # Create some incomplete todos
         todos = [
@@ -375,32 +893,32 @@ class TestPrompts:
             {"task": "Task 2", "status": "pending"},
             {"task": "Task 3", "status": "in_progress"},
         ]
-        server.store_data("session:claude_1", "current_issue", 15)
-        server.store_data("session:claude_1", "todos", todos)
+        await server.store_data("session:claude_1", "current_issue", 15)
+        await server.store_data("session:claude_1", "todos", todos)
 
-        result = server.sign_off_prompt()
+        result = await server.sign_off_prompt()
 
         assert "incomplete tasks" in result
         assert "Task 2" in result or "Task 3" in result
 
-    def test_sign_off_prompt_all_complete(self, initialized_server):
+    async def test_sign_off_prompt_all_complete(self, initialized_server):
         """Test the sign-off prompt when all tasks are complete."""
-        server.sign_on(session_id="claude_1")
+        await server.sign_on(session_id="claude_1")
 
         # Create all completed todos
         todos = [
             {"task": "Task 1", "status": "completed"},
             {"task": "Task 2", "status": "completed"},
         ]
-        server.store_data("session:claude_1", "current_issue", 15)
-        server.store_data("session:claude_1", "todos", todos)
+        await server.store_data("session:claude_1", "current_issue", 15)
+        await server.store_data("session:claude_1", "todos", todos)
 
-        result = server.sign_off_prompt()
+        result = await server.sign_off_prompt()
 
         assert "Ready to Sign Off" in result or "complete" in result.lower()
 
-    def test_sign_off_prompt_no_active_session(self, initialized_server):
+    async def test_sign_off_prompt_no_active_session(self, initialized_server):
         """Test the sign-off prompt when no session is active."""
-        result = server.sign_off_prompt()
+        result = await server.sign_off_prompt()
 
         assert "No active session" in result
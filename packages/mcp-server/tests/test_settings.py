@@ -191,6 +191,38 @@ class TestHelperFunctions:
         assert info["setup_required"] is False
         assert "single-machine" in info["capabilities"].lower()
 
+    def test_get_adapter_info_log(self):
+        """Test get_adapter_info() for the log-structured adapter behind the daemon."""
+        config = {
+            "storage": {"adapter": "log", "config": {"base_path": ".claude/session-log"}},
+            "daemon": {"enabled": True},
+        }
+        info = get_adapter_info("log", config)
+
+        assert info["name"] == "log"
+        assert info["ready"] is True
+        assert info["setup_required"] is False
+        assert "single-machine" in info["capabilities"].lower()
+        assert "daemon" in info["capabilities"]
+
+    def test_get_adapter_info_log_without_daemon(self):
+        """Test that the log adapter needs the daemon enabled."""
+        config = {"storage": {"adapter": "log", "config": {"base_path": ".claude/session-log"}}}
+        info = get_adapter_info("log", config)
+
+        assert info["ready"] is False
+        assert info["setup_required"] is True
+        assert "daemon" in info["setup_instructions"]
+
+    def test_get_adapter_info_sqlite(self):
+        """Test get_adapter_info() for the SQLite adapter."""
+        config = {"storage": {"adapter": "sqlite", "config": {}}}
+        info = get_adapter_info("sqlite", config)
+
+        assert info["name"] == "sqlite"
+        assert info["ready"] is True
+        assert "single-machine" in info["capabilities"].lower()
+
     def test_get_adapter_info_redis_configured(self):
         """Test get_adapter_info() for redis when configured."""
         config = {